@@ -0,0 +1,570 @@
+"""
+Query Plan Regression Tests
+Runs EXPLAIN on the SQL strings in the controllers against a seeded copy of
+the schema and fails on full table scans or filesorts the indexes from
+011_composite_indexes.sql are meant to prevent.
+
+The SQL is read straight from the controller source, so editing a query
+re-checks its plan. When a query is rewritten so that it no longer contains
+its fragments below, test_query_found_in_controller fails: update the spec
+rather than deleting it.
+
+Requires PyMySQL and a migrated database (DB_HOST, DB_USER, DB_PASSWORD,
+DB_NAME as in backend/.env). Tables are copied with CREATE TABLE ... LIKE into
+a scratch schema (EXPLAIN_DB_NAME, default <DB_NAME>_explain) and filled with
+synthetic rows; the real data is never touched.
+
+The admin case search SQL is assembled at runtime, so it is rendered by
+utils/caseSearchUtils.js (through node) for each filter combination instead;
+so is the audit log SQL, by utils/auditUtils.js.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import pytest
+
+CONTROLLERS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'controllers')
+CASE_SEARCH_MODULE = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'src', 'utils', 'caseSearchUtils.js'
+))
+AUDIT_MODULE = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'src', 'utils', 'auditUtils.js'
+))
+
+SOURCE_DB = os.environ.get('DB_NAME', 'securevoice')
+EXPLAIN_DB = os.environ.get('EXPLAIN_DB_NAME', f'{SOURCE_DB}_explain')
+
+# Tables the checked queries touch; copied (indexes included) from SOURCE_DB
+TABLES = [
+    'category', 'location', 'users', 'admins', 'complaint', 'admin_cases',
+    'complaint_chat', 'complaint_notifications', 'status_updates', 'evidence',
+    'anonymous_reports', 'anonymous_evidence', 'evidence_derivatives',
+    'admin_audit_logs', 'admin_audit_logs_archive',
+]
+
+# Seed sizes: large enough that the optimizer prefers indexes over scans
+ADMINS = 20
+USERS = 400
+COMPLAINTS = 8000
+REPORTS = 1000
+AUDIT_LOGS = 20000
+
+ADMIN = 'explain_admin_1'
+USER = 'explain_user_1'
+USER_ID = 1
+COMPLAINT_ID = 1
+REPORT_ID = 'SV-EXPL0001'
+
+QueryPlan = namedtuple('QueryPlan', [
+    'name',           # test id
+    'source',         # controller file holding the SQL
+    'contains',       # fragments identifying the literal (whitespace-insensitive)
+    'params',         # values for the ? placeholders
+    'suffix',         # clauses the controller appends at runtime
+    'uses',           # {table alias: index the plan must use}
+    'allow_filesort', # the query sorts a grouped or joined result by design
+])
+QueryPlan.__new__.__defaults__ = ('', {}, False)
+
+QUERY_PLANS = [
+    # Admin dashboard
+    QueryPlan(
+        name='admin_dashboard_complaints',
+        source='adminController.js',
+        contains=["COALESCE(u.fullName, 'N/A') as user_fullname", 'ORDER BY c.created_at DESC'],
+        params=[ADMIN],
+        uses={'c': 'idx_complaint_admin_discarded_created'},
+    ),
+    QueryPlan(
+        name='admin_chat_history',
+        source='adminController.js',
+        contains=['SELECT * FROM complaint_chat', 'ORDER BY sent_at ASC'],
+        params=[COMPLAINT_ID],
+        uses={'complaint_chat': 'idx_chat_complaint_sent'},
+    ),
+
+    # Analytics: grouping on expressions always sorts the grouped rows, but
+    # the rows must still come from the index
+    QueryPlan(
+        name='analytics_trends',
+        source='analyticsController.js',
+        contains=['GROUP BY DATE(created_at), status'],
+        params=[ADMIN, 30],
+        uses={'complaint': 'idx_complaint_admin_discarded_created'},
+        allow_filesort=True,
+    ),
+    QueryPlan(
+        name='analytics_crime_distribution',
+        source='analyticsController.js',
+        contains=["COALESCE(cat.name, c.complaint_type, 'Other') as crime_type"],
+        params=[ADMIN],
+        uses={'c': 'idx_complaint_admin_discarded_created', 'su': 'idx_status_updates_complaint_status'},
+        allow_filesort=True,
+    ),
+    QueryPlan(
+        name='analytics_performance',
+        source='analyticsController.js',
+        contains=['COUNT(*) as total_cases'],
+        params=[ADMIN],
+        uses={'c': 'idx_complaint_admin_discarded_created', 'su': 'idx_status_updates_complaint_status'},
+    ),
+
+    # Complainant views
+    QueryPlan(
+        name='user_complaints_by_userid',
+        source='complaintController.js',
+        contains=['WHERE u.userid = ?', 'ORDER BY c.created_at DESC'],
+        params=[USER_ID],
+        uses={'c': 'idx_complaint_user_created'},
+    ),
+    QueryPlan(
+        name='user_complaints_with_location',
+        source='complaintController.js',
+        contains=['LEFT JOIN location l ON c.location_id = l.location_id', 'WHERE c.username = ?'],
+        params=[USER],
+        uses={'c': 'idx_complaint_user_created'},
+    ),
+    QueryPlan(
+        name='user_recent_complaints',
+        source='complaintController.js',
+        contains=['ORDER BY created_at DESC LIMIT 5'],
+        params=[USER],
+        uses={'complaint': 'idx_complaint_user_created'},
+    ),
+    QueryPlan(
+        name='user_my_complaints',
+        source='userController.js',
+        contains=['as unread_notifications', 'WHERE c.username = ?'],
+        params=[USER],
+        uses={'c': 'idx_complaint_user_created', 'cn': 'idx_notifications_complaint_read'},
+    ),
+    QueryPlan(
+        name='user_all_status_notifications',
+        source='userController.js',
+        contains=['FROM complaint_notifications cn', 'LIMIT 20'],
+        params=[USER],
+        uses={'c': 'idx_complaint_user_created'},
+        allow_filesort=True,
+    ),
+    QueryPlan(
+        name='user_all_chat_notifications',
+        source='userController.js',
+        contains=['FROM complaint_chat cc', 'LIMIT 10'],
+        params=[USER],
+        uses={'c': 'idx_complaint_user_created', 'cc': 'idx_chat_complaint_sender_read'},
+        allow_filesort=True,
+    ),
+
+    # Per-complaint chat and notifications
+    QueryPlan(
+        name='chat_unread_admin_messages',
+        source='complaintController.js',
+        contains=["sender_type = 'admin' AND is_read = 0", 'ORDER BY sent_at DESC'],
+        params=[COMPLAINT_ID],
+        uses={'complaint_chat': 'idx_chat_complaint_sender_read'},
+    ),
+    QueryPlan(
+        name='chat_history_complainant',
+        source='complaintController.js',
+        contains=['SELECT * FROM complaint_chat', 'ORDER BY sent_at ASC'],
+        params=[COMPLAINT_ID],
+        uses={'complaint_chat': 'idx_chat_complaint_sent'},
+    ),
+    QueryPlan(
+        name='chat_history_user',
+        source='userController.js',
+        contains=['SELECT * FROM complaint_chat', 'ORDER BY sent_at ASC'],
+        params=[COMPLAINT_ID],
+        uses={'complaint_chat': 'idx_chat_complaint_sent'},
+    ),
+    QueryPlan(
+        name='chat_mark_read',
+        source='complaintController.js',
+        contains=['UPDATE complaint_chat SET is_read = 1'],
+        params=[COMPLAINT_ID],
+    ),
+    QueryPlan(
+        name='complaint_notifications_list',
+        source='userController.js',
+        contains=['SELECT notification_id, message, type, is_read, created_at'],
+        params=[COMPLAINT_ID],
+        uses={'complaint_notifications': 'idx_notifications_complaint_created'},
+    ),
+    QueryPlan(
+        name='complaint_notifications_mark_read',
+        source='userController.js',
+        contains=['UPDATE complaint_notifications SET is_read = 1 WHERE complaint_id = ? AND is_read = 0'],
+        params=[COMPLAINT_ID],
+    ),
+
+    # Anonymous reports
+    QueryPlan(
+        name='anonymous_evidence_list',
+        source='anonymousReportController.js',
+        contains=['FROM anonymous_evidence', 'ORDER BY uploaded_at ASC'],
+        params=[REPORT_ID],
+        uses={'anonymous_evidence': 'idx_anonymous_evidence_report_uploaded'},
+    ),
+]
+
+CaseSearchPlan = namedtuple('CaseSearchPlan', [
+    'name',           # test id
+    'query',          # request query string of GET /get-admin-cases
+    'uses',           # {table alias: index the plan must use}
+    'allow_filesort', # relevance ranking sorts the matches by design
+])
+
+# EXPLAINed for both the page query and the facet query
+CASE_SEARCH_PLANS = [
+    CaseSearchPlan(
+        name='case_search_list',
+        query={},
+        uses={'c': 'idx_complaint_admin_discarded_created'},
+        allow_filesort=False,
+    ),
+    CaseSearchPlan(
+        name='case_search_dates',
+        query={'dateFrom': '2024-02-01', 'dateTo': '2024-03-01'},
+        uses={'c': 'idx_complaint_admin_discarded_created'},
+        allow_filesort=False,
+    ),
+    CaseSearchPlan(
+        name='case_search_category',
+        query={'categoryId': '3'},
+        uses={'c': 'idx_complaint_admin_discarded_category'},
+        allow_filesort=False,
+    ),
+    CaseSearchPlan(
+        name='case_search_text',
+        query={'q': 'Seeded User'},
+        uses={'complaint': 'ft_complaint_text', 'mu': 'ft_users_name'},
+        allow_filesort=True,
+    ),
+]
+
+AuditLogPlan = namedtuple('AuditLogPlan', [
+    'name',           # test id
+    'filters',        # buildAuditLogQuery() filters
+    'uses',           # {table: index the plan must use}
+])
+
+# Each UNION branch must read only its newest rows from an index; only the
+# merge of the two limited branches is sorted
+AUDIT_LOG_PLANS = [
+    AuditLogPlan(
+        name='audit_log_all',
+        filters={'limit': 500},
+        uses={'admin_audit_logs': 'idx_timestamp', 'admin_audit_logs_archive': 'idx_audit_archive_timestamp'},
+    ),
+    AuditLogPlan(
+        name='audit_log_admin',
+        filters={'adminUsername': ADMIN, 'limit': 100},
+        uses={'admin_audit_logs': 'idx_audit_admin_timestamp',
+              'admin_audit_logs_archive': 'idx_audit_archive_admin_timestamp'},
+    ),
+    AuditLogPlan(
+        name='audit_log_admin_dates',
+        filters={'adminUsername': ADMIN, 'dateFrom': '2024-02-01', 'dateTo': '2024-03-01', 'limit': 500},
+        uses={'admin_audit_logs': 'idx_audit_admin_timestamp',
+              'admin_audit_logs_archive': 'idx_audit_archive_admin_timestamp'},
+    ),
+]
+
+RENDER_AUDIT_LOG = """
+const Module = require('module');
+const load = Module._load;
+Module._load = function (request) {
+    return request === '../db' ? {} : load.apply(this, arguments);
+};
+const audit = require(process.argv[1]);
+process.stdout.write(JSON.stringify(audit.buildAuditLogQuery(JSON.parse(process.argv[2]))));
+"""
+
+# Loads caseSearchUtils without a database: the module only needs the pool at query time
+RENDER_CASE_SEARCH = """
+const Module = require('module');
+const load = Module._load;
+Module._load = function (request) {
+    return request === '../db' ? {} : load.apply(this, arguments);
+};
+const search = require(process.argv[1]);
+const filters = search.parseCaseFilters(JSON.parse(process.argv[3]));
+process.stdout.write(JSON.stringify(search.buildCaseQueries(process.argv[2], filters)));
+"""
+
+def string_literals(source):
+    """Yield the string literals in JS source, skipping comments
+
+    Template literals with ${} interpolation are built at runtime and skipped.
+    """
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if source.startswith('//', i):
+            i = source.find('\n', i)
+            i = length if i < 0 else i
+        elif source.startswith('/*', i):
+            i = source.find('*/', i + 2)
+            i = length if i < 0 else i + 2
+        elif char in '\'"`':
+            j = i + 1
+            while j < length and source[j] != char:
+                j += 2 if source[j] == '\\' else 1
+            literal = source[i + 1:j]
+            if not (char == '`' and '${' in literal):
+                yield literal
+            i = j + 1
+        else:
+            i += 1
+
+
+def normalize(sql):
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def find_query(spec):
+    """Return the SQL literal in spec.source that contains every fragment"""
+    with open(os.path.join(CONTROLLERS_DIR, spec.source), encoding='utf-8') as f:
+        source = f.read()
+
+    fragments = [normalize(fragment) for fragment in spec.contains]
+    for literal in string_literals(source):
+        if all(fragment in normalize(literal) for fragment in fragments):
+            return literal + spec.suffix
+    return None
+
+
+def seed(cursor):
+    """Fill the scratch schema with a realistic spread of rows"""
+    start = datetime(2024, 1, 1)
+    statuses = ['pending', 'verifying', 'investigating', 'resolved']
+
+    cursor.executemany(
+        'INSERT INTO category (category_id, name) VALUES (%s, %s)',
+        [(i, f'Category {i}') for i in range(1, 11)]
+    )
+    cursor.executemany(
+        'INSERT INTO location (location_id, location_name) VALUES (%s, %s)',
+        [(i, f'Location {i}') for i in range(1, 201)]
+    )
+    cursor.executemany(
+        'INSERT INTO admins (adminid, username, email, password) VALUES (%s, %s, %s, %s)',
+        [(i, f'explain_admin_{i}', f'admin{i}@explain.test', 'x') for i in range(1, ADMINS + 1)]
+    )
+    cursor.executemany(
+        'INSERT INTO users (userid, username, email, password, fullName) VALUES (%s, %s, %s, %s, %s)',
+        [(i, f'explain_user_{i}', f'user{i}@explain.test', 'x', f'User {i}') for i in range(1, USERS + 1)]
+    )
+
+    complaints, cases, chats, notifications, updates, evidence = [], [], [], [], [], []
+    for i in range(1, COMPLAINTS + 1):
+        created = start + timedelta(hours=i)
+        admin = f'explain_admin_{i % ADMINS + 1}'
+        user = f'explain_user_{i % USERS + 1}'
+        status = statuses[i % len(statuses)]
+        complaints.append((i, 'Seeded complaint', created, status, user, admin, i % 200 + 1,
+                           f'Category {i % 10 + 1}', i % 10 + 1, i % 25 == 0))
+        cases.append((i, admin, user, status))
+        for n in range(4):
+            sender = 'admin' if n % 2 else 'user'
+            chats.append((i, sender, admin if sender == 'admin' else user, 'Seeded message',
+                          created + timedelta(minutes=n), n < 2))
+        for n in range(2):
+            notifications.append((i, 'Seeded notification', 'status_change', n == 0, created + timedelta(minutes=n)))
+        updates.append((status, created + timedelta(days=1), admin, i))
+        updates.append(('pending', created, admin, i))
+        evidence.append((created, 'image', f'uploads/explain/{i}.jpg', i))
+
+    cursor.executemany(
+        '''INSERT INTO complaint (complaint_id, description, created_at, status, username, admin_username,
+                                  location_id, complaint_type, category_id, is_discarded)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)''',
+        complaints
+    )
+    cursor.executemany(
+        'INSERT INTO admin_cases (complaint_id, admin_username, complainant_username, status) VALUES (%s, %s, %s, %s)',
+        cases
+    )
+    cursor.executemany(
+        '''INSERT INTO complaint_chat (complaint_id, sender_type, sender_username, message, sent_at, is_read)
+           VALUES (%s, %s, %s, %s, %s, %s)''',
+        chats
+    )
+    cursor.executemany(
+        '''INSERT INTO complaint_notifications (complaint_id, message, type, is_read, created_at)
+           VALUES (%s, %s, %s, %s, %s)''',
+        notifications
+    )
+    cursor.executemany(
+        'INSERT INTO status_updates (status, updated_at, updated_by, complaint_id) VALUES (%s, %s, %s, %s)',
+        updates
+    )
+    cursor.executemany(
+        'INSERT INTO evidence (uploaded_at, file_type, file_path, complaint_id) VALUES (%s, %s, %s, %s)',
+        evidence
+    )
+
+    reports, report_evidence = [], []
+    for i in range(1, REPORTS + 1):
+        report_id = f'SV-EXPL{i:04d}'
+        reports.append((report_id, 'Seeded', 'Seeded report', start.date(), '12:00:00', 'Seeded address', f'ip{i % 50}'))
+        for n in range(3):
+            report_evidence.append((report_id, f'{n}.jpg', f'explain-{i}-{n}.jpg', f'uploads/explain/{i}-{n}.jpg',
+                                    'image', 1024, start + timedelta(minutes=i * 3 + n)))
+    cursor.executemany(
+        '''INSERT INTO anonymous_reports (report_id, crime_type, description, incident_date, incident_time,
+                                          location_address, ip_hash)
+           VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+        reports
+    )
+    cursor.executemany(
+        '''INSERT INTO anonymous_evidence (report_id, original_name, stored_name, file_path, file_type,
+                                           file_size, uploaded_at)
+           VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+        report_evidence
+    )
+
+    # Live and archived audit logs; the archive holds the older half
+    archived_at = start + timedelta(days=400)
+    live, archived = [], []
+    for i in range(1, AUDIT_LOGS + 1):
+        row = (i, f'explain_admin_{i % ADMINS + 1}', 'complaint_viewed', i % COMPLAINTS + 1,
+               start + timedelta(minutes=i * 20))
+        if i <= AUDIT_LOGS // 2:
+            archived.append(row + (archived_at,))
+        else:
+            live.append(row)
+    cursor.executemany(
+        '''INSERT INTO admin_audit_logs_archive (log_id, admin_username, action, complaint_id, timestamp, archived_at)
+           VALUES (%s, %s, %s, %s, %s, %s)''',
+        archived
+    )
+    cursor.executemany(
+        'INSERT INTO admin_audit_logs (log_id, admin_username, action, complaint_id, timestamp) VALUES (%s, %s, %s, %s, %s)',
+        live
+    )
+
+
+@pytest.fixture(scope='module')
+def explain_db():
+    pymysql = pytest.importorskip('pymysql')
+    try:
+        connection = pymysql.connect(
+            host=os.environ.get('DB_HOST', 'localhost'),
+            port=int(os.environ.get('DB_PORT', 3306)),
+            user=os.environ.get('DB_USER', 'root'),
+            password=os.environ.get('DB_PASSWORD', 'root'),
+            autocommit=True,
+            cursorclass=pymysql.cursors.DictCursor,
+        )
+    except pymysql.err.OperationalError as e:
+        pytest.skip(f'MySQL not available: {e}')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS `{EXPLAIN_DB}`')
+        cursor.execute(f'CREATE DATABASE `{EXPLAIN_DB}`')
+        cursor.execute(f'USE `{EXPLAIN_DB}`')
+        for table in TABLES:
+            cursor.execute(f'CREATE TABLE `{table}` LIKE `{SOURCE_DB}`.`{table}`')
+        # Columns the seed leaves out take their implicit defaults
+        cursor.execute("SET SESSION sql_mode = ''")
+        seed(cursor)
+        cursor.execute('ANALYZE TABLE ' + ', '.join(f'`{table}`' for table in TABLES))
+        cursor.fetchall()
+
+    yield connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS `{EXPLAIN_DB}`')
+    connection.close()
+
+
+@pytest.mark.parametrize('spec', QUERY_PLANS, ids=lambda spec: spec.name)
+def test_query_found_in_controller(spec):
+    # the spec must still point at a query the controller actually runs
+    assert find_query(spec) is not None, (
+        f'{spec.name}: no SQL in {spec.source} contains {spec.contains}; '
+        'the query changed, so update its spec and re-check the plan'
+    )
+
+
+def render_case_search(query):
+    """Return the (page, facets) queries caseSearchUtils builds for a request"""
+    node = shutil.which('node')
+    if node is None:
+        pytest.skip('node not available to render the case search SQL')
+    result = subprocess.run(
+        [node, '-e', RENDER_CASE_SEARCH, CASE_SEARCH_MODULE, ADMIN, json.dumps(query)],
+        capture_output=True, text=True, check=True,
+    )
+    queries = json.loads(result.stdout)
+    return queries['cases'], queries['facets']
+
+
+def render_audit_log(filters):
+    """Return the audit log query auditUtils builds for the filters"""
+    node = shutil.which('node')
+    if node is None:
+        pytest.skip('node not available to render the audit log SQL')
+    result = subprocess.run(
+        [node, '-e', RENDER_AUDIT_LOG, AUDIT_MODULE, json.dumps(filters)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def assert_plan(connection, name, sql, params, uses, allow_filesort):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN ' + sql.replace('%', '%%').replace('?', '%s'), params)
+        plan = cursor.fetchall()
+
+    problems = []
+    used = {}
+    for row in plan:
+        table = row.get('table')
+        # Derived tables and subquery results are checked through their own rows
+        if not table or table.startswith('<'):
+            continue
+        used[table] = row.get('key')
+        extra = row.get('Extra') or ''
+        if row.get('type') == 'ALL':
+            problems.append(f'full scan of {table}')
+        if 'Using filesort' in extra and not allow_filesort:
+            problems.append(f'filesort on {table}')
+
+    for table, index in uses.items():
+        if used.get(table) != index:
+            problems.append(f'{table} uses {used.get(table)!r}, expected {index!r}')
+
+    plan_text = '\n'.join(
+        f"  {row.get('table')}: type={row.get('type')} key={row.get('key')} extra={row.get('Extra')}"
+        for row in plan
+    )
+    assert not problems, f'{name}: ' + '; '.join(problems) + f'\n{normalize(sql)}\n{plan_text}'
+
+
+@pytest.mark.parametrize('spec', QUERY_PLANS, ids=lambda spec: spec.name)
+def test_query_plan(explain_db, spec):
+    sql = find_query(spec)
+    assert sql is not None, f'{spec.name}: query not found in {spec.source}'
+    assert_plan(explain_db, spec.name, sql, spec.params, spec.uses, spec.allow_filesort)
+
+
+@pytest.mark.parametrize('spec', CASE_SEARCH_PLANS, ids=lambda spec: spec.name)
+def test_case_search_plan(explain_db, spec):
+    page, facets = render_case_search(spec.query)
+    assert_plan(explain_db, spec.name, page['sql'], page['params'], spec.uses, spec.allow_filesort)
+    # Facets group the same rows; grouping is allowed to sort
+    assert_plan(explain_db, f'{spec.name}_facets', facets['sql'], facets['params'], spec.uses, True)
+
+
+@pytest.mark.parametrize('spec', AUDIT_LOG_PLANS, ids=lambda spec: spec.name)
+def test_audit_log_plan(explain_db, spec):
+    query = render_audit_log(spec.filters)
+    assert_plan(explain_db, spec.name, query['sql'], query['params'], spec.uses, False)
@@ -0,0 +1,283 @@
+"""
+Local SMTP Stand-In
+A small SMTP server for development and tests: accepts every message the
+email outbox dispatcher sends, keeps or writes it out instead of
+delivering it, and can misbehave on demand so retries, backoff and
+per-domain throttling can be watched without a real mail provider.
+
+Point the server at it with
+
+    EMAIL_HOST=127.0.0.1 EMAIL_PORT=2525 EMAIL_USER= npm start
+    python backend/Tests/email/smtp_sink.py --port 2525 --maildir /tmp/mail
+
+Leave EMAIL_USER empty (no AUTH) or set any credentials; AUTH PLAIN and
+LOGIN are accepted whatever the password. Failure injection:
+
+  --tempfail-rate 0.2        answer 451 to that share of recipients
+  --reject example.org       answer 550 (permanent) for a domain
+  --throttle gmail.com       answer 421 and hang up for a domain
+  --latency 0.5              wait before accepting each message
+  --max-connections 2        refuse connections beyond this (421)
+
+On exit (Ctrl-C) it prints connection and message counts, including the
+most connections open at once, which shows whether the dispatcher kept
+within EMAIL_MAX_CONNECTIONS and reused its pooled connections.
+
+Standard library only (asyncio).
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+GREETING = 'smtp-sink'
+MAX_LINE = 64 * 1024
+
+
+def domain_of(address):
+    return address.rsplit('@', 1)[-1].strip().lower() if '@' in address else ''
+
+
+def parse_path(argument):
+    """'FROM:<a@b.c> SIZE=10' -> 'a@b.c'"""
+    _, _, rest = argument.partition(':')
+    rest = rest.strip()
+    if rest.startswith('<'):
+        return rest[1:rest.find('>')] if '>' in rest else rest[1:]
+    return rest.split(' ', 1)[0]
+
+
+def unstuff(lines):
+    """DATA lines -> message text, undoing dot-stuffing"""
+    return '\r\n'.join(line[1:] if line.startswith('.') else line for line in lines) + '\r\n'
+
+
+class SmtpSink:
+    """
+    Asyncio SMTP server that records what it receives
+    messages: list of {mail_from, rcpt_to, data, received_at}
+    """
+
+    def __init__(self, host='127.0.0.1', port=2525, maildir=None, tempfail_rate=0.0,
+                 reject=(), throttle=(), latency=0.0, max_connections=0, seed=None, quiet=True):
+        self.host = host
+        self.port = port
+        self.maildir = maildir
+        self.tempfail_rate = tempfail_rate
+        self.reject = {domain.lower() for domain in reject}
+        self.throttle = {domain.lower() for domain in throttle}
+        self.latency = latency
+        self.max_connections = max_connections
+        self.random = random.Random(seed)
+        self.quiet = quiet
+        self.messages = []
+        self.stats = Counter()
+        self.domains = Counter()
+        self.open_connections = 0
+        self.peak_connections = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_LINE)
+        self.port = self.server.sockets[0].getsockname()[1]
+        if self.maildir:
+            os.makedirs(self.maildir, exist_ok=True)
+        return self
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def log(self, text):
+        if not self.quiet:
+            print(f'{time.strftime("%H:%M:%S")} {text}', flush=True)
+
+    # SESSION
+    # =======
+
+    async def handle(self, reader, writer):
+        self.stats['connections'] += 1
+        if self.max_connections and self.open_connections >= self.max_connections:
+            self.stats['refused_connections'] += 1
+            writer.write(b'421 Too many connections, try again later\r\n')
+            await writer.drain()
+            writer.close()
+            return
+
+        self.open_connections += 1
+        self.peak_connections = max(self.peak_connections, self.open_connections)
+
+        async def reply(line):
+            writer.write(line.encode() + b'\r\n')
+            await writer.drain()
+
+        async def read_line():
+            line = await reader.readline()
+            if not line:
+                raise ConnectionResetError
+            return line.decode('utf-8', 'replace').rstrip('\r\n')
+
+        mail_from, rcpt_to = None, []
+        try:
+            await reply(f'220 {GREETING} ESMTP ready')
+            while True:
+                line = await read_line()
+                verb, _, argument = line.partition(' ')
+                verb = verb.upper()
+
+                if verb == 'EHLO':
+                    await reply(f'250-{GREETING}\r\n250-PIPELINING\r\n250-8BITMIME\r\n'
+                                f'250-SIZE 26214400\r\n250 AUTH PLAIN LOGIN')
+                elif verb == 'HELO':
+                    await reply(f'250 {GREETING}')
+                elif verb == 'AUTH':
+                    await self.authenticate(argument, reply, read_line)
+                elif verb == 'MAIL':
+                    mail_from, rcpt_to = parse_path(argument), []
+                    await reply('250 OK')
+                elif verb == 'RCPT':
+                    if mail_from is None:
+                        await reply('503 Need MAIL first')
+                        continue
+                    address = parse_path(argument)
+                    domain = domain_of(address)
+                    if domain in self.throttle:
+                        self.stats['throttled'] += 1
+                        await reply('421 Too many messages from your host, try again later')
+                        return
+                    if domain in self.reject:
+                        self.stats['rejected'] += 1
+                        await reply('550 No such user here')
+                    elif self.tempfail_rate and self.random.random() < self.tempfail_rate:
+                        self.stats['tempfailed'] += 1
+                        await reply('451 Temporary local problem, try again later')
+                    else:
+                        rcpt_to.append(address)
+                        await reply('250 OK')
+                elif verb == 'DATA':
+                    if not rcpt_to:
+                        await reply('554 No valid recipients')
+                        continue
+                    await reply('354 End data with <CR><LF>.<CR><LF>')
+                    lines = []
+                    while True:
+                        data_line = await read_line()
+                        if data_line == '.':
+                            break
+                        lines.append(data_line)
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    message_id = self.store(mail_from, rcpt_to, unstuff(lines))
+                    await reply(f'250 OK queued as {message_id}')
+                    mail_from, rcpt_to = None, []
+                elif verb == 'RSET':
+                    mail_from, rcpt_to = None, []
+                    await reply('250 OK')
+                elif verb == 'NOOP':
+                    await reply('250 OK')
+                elif verb == 'VRFY':
+                    await reply('252 Cannot verify, will attempt delivery')
+                elif verb == 'QUIT':
+                    await reply('221 Bye')
+                    return
+                else:
+                    await reply('502 Command not implemented')
+        except (ConnectionResetError, asyncio.IncompleteReadError, BrokenPipeError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    async def authenticate(self, argument, reply, read_line):
+        mechanism, _, initial = argument.partition(' ')
+        mechanism = mechanism.upper()
+        if mechanism == 'PLAIN':
+            if not initial:
+                await reply('334 ')
+                initial = await read_line()
+            base64.b64decode(initial or '', validate=False)
+        elif mechanism == 'LOGIN':
+            if not initial:
+                await reply('334 VXNlcm5hbWU6')
+                await read_line()
+            await reply('334 UGFzc3dvcmQ6')
+            await read_line()
+        else:
+            await reply('504 Unrecognized authentication type')
+            return
+        await reply('235 Authentication successful')
+
+    def store(self, mail_from, rcpt_to, data):
+        self.stats['messages'] += 1
+        message_id = f'{int(time.time() * 1000):x}.{self.stats["messages"]}'
+        self.messages.append({'mail_from': mail_from, 'rcpt_to': list(rcpt_to), 'data': data,
+                              'received_at': time.time()})
+        for address in rcpt_to:
+            self.domains[domain_of(address)] += 1
+        if self.maildir:
+            with open(os.path.join(self.maildir, f'{message_id}.eml'), 'w', encoding='utf-8') as handle:
+                handle.write(data)
+        self.log(f'{mail_from} -> {", ".join(rcpt_to)} ({len(data)} bytes)')
+        return message_id
+
+    def summary(self):
+        lines = [f'connections {self.stats["connections"]} (peak {self.peak_connections} open, '
+                 f'{self.stats["refused_connections"]} refused)',
+                 f'messages {self.stats["messages"]}, recipients rejected {self.stats["rejected"]}, '
+                 f'tempfailed {self.stats["tempfailed"]}, throttled {self.stats["throttled"]}']
+        lines += [f'  {domain or "(none)"}: {count}' for domain, count in self.domains.most_common()]
+        return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Local SMTP stand-in for the email outbox')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=2525, type=int)
+    parser.add_argument('--maildir', help='Write each message here as <id>.eml')
+    parser.add_argument('--tempfail-rate', default=0.0, type=float,
+                        help='Share of recipients answered with 451 (default %(default)s)')
+    parser.add_argument('--reject', action='append', default=[], metavar='DOMAIN',
+                        help='Answer 550 for this recipient domain (repeatable)')
+    parser.add_argument('--throttle', action='append', default=[], metavar='DOMAIN',
+                        help='Answer 421 and disconnect for this recipient domain (repeatable)')
+    parser.add_argument('--latency', default=0.0, type=float, help='Seconds to wait before accepting a message')
+    parser.add_argument('--max-connections', default=0, type=int, help='Refuse connections beyond this (0 = no limit)')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--quiet', action='store_true', help='Do not log each message')
+    options = parser.parse_args(argv)
+    if not 0 <= options.tempfail_rate <= 1:
+        parser.error('--tempfail-rate must be between 0 and 1')
+    return options
+
+
+async def serve(options):
+    sink = SmtpSink(host=options.host, port=options.port, maildir=options.maildir,
+                    tempfail_rate=options.tempfail_rate, reject=options.reject, throttle=options.throttle,
+                    latency=options.latency, max_connections=options.max_connections, seed=options.seed,
+                    quiet=options.quiet)
+    await sink.start()
+    print(f'SMTP stand-in listening on {options.host}:{sink.port}', flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sink.stop()
+        print(sink.summary())
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    try:
+        asyncio.run(serve(options))
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+SMTP Stand-In Tests
+Drives smtp_sink.py with the standard library SMTP client, checking that
+messages are captured intact and that injected failures produce the
+replies the email outbox dispatcher treats as temporary or permanent.
+"""
+
+import asyncio
+import smtplib
+from email.message import EmailMessage
+
+import pytest
+
+import smtp_sink
+
+
+def make_message(to, body='Your OTP code is 123456'):
+    message = EmailMessage()
+    message['From'] = 'noreply@securevoice.test'
+    message['To'] = to
+    message['Subject'] = 'Your OTP Code'
+    message.set_content(body)
+    return message
+
+
+def run_with_sink(client, **options):
+    """Start a sink on a free port, run client(port) in a thread, return the sink"""
+    async def scenario():
+        sink = await smtp_sink.SmtpSink(port=0, **options).start()
+        try:
+            await asyncio.to_thread(client, sink.port)
+        finally:
+            await sink.stop()
+        return sink
+    return asyncio.run(scenario())
+
+
+def test_captures_messages_over_one_connection():
+    def client(port):
+        with smtplib.SMTP('127.0.0.1', port) as smtp:
+            smtp.login('anyone', 'anything')
+            smtp.send_message(make_message('citizen@example.com'))
+            smtp.send_message(make_message('admin@police.gov.bd', body='.leading dot\nline two'))
+
+    sink = run_with_sink(client)
+    assert sink.stats['connections'] == 1
+    assert [message['rcpt_to'] for message in sink.messages] == [['citizen@example.com'], ['admin@police.gov.bd']]
+    assert 'Your OTP code is 123456' in sink.messages[0]['data']
+    assert '\r\n.leading dot\r\n' in sink.messages[1]['data']
+    assert sink.domains == {'example.com': 1, 'police.gov.bd': 1}
+
+
+def test_rejected_domain_is_permanent():
+    def client(port):
+        with smtplib.SMTP('127.0.0.1', port) as smtp:
+            with pytest.raises(smtplib.SMTPRecipientsRefused) as refused:
+                smtp.send_message(make_message('nobody@bounce.test'))
+            assert refused.value.recipients['nobody@bounce.test'][0] == 550
+
+    sink = run_with_sink(client, reject=['bounce.test'])
+    assert sink.stats['rejected'] == 1
+    assert sink.messages == []
+
+
+def test_tempfail_and_throttle_replies():
+    def client(port):
+        with smtplib.SMTP('127.0.0.1', port) as smtp:
+            with pytest.raises(smtplib.SMTPRecipientsRefused) as refused:
+                smtp.send_message(make_message('someone@example.com'))
+            assert refused.value.recipients['someone@example.com'][0] == 451
+        with smtplib.SMTP('127.0.0.1', port) as smtp:
+            with pytest.raises((smtplib.SMTPRecipientsRefused, smtplib.SMTPServerDisconnected)):
+                smtp.send_message(make_message('someone@busy.test'))
+
+    sink = run_with_sink(client, tempfail_rate=1.0, throttle=['busy.test'])
+    assert sink.stats['tempfailed'] == 1
+    assert sink.stats['throttled'] == 1
+
+
+def test_connection_limit():
+    def client(port):
+        with smtplib.SMTP('127.0.0.1', port) as first:
+            first.noop()
+            with pytest.raises(smtplib.SMTPConnectError):
+                smtplib.SMTP('127.0.0.1', port)
+
+    sink = run_with_sink(client, max_connections=1)
+    assert sink.peak_connections == 1
+    assert sink.stats['refused_connections'] == 1
@@ -0,0 +1,496 @@
+"""
+Persona-Based Load Generator
+Drives a running SecureVoice deployment with three weighted populations of
+virtual users and records per-endpoint latency and error rates as a time
+series, to find the load at which a deployment saturates.
+
+  citizen    logs in, views the profile and its complaints, polls
+             notifications, reads and sends chat messages, and now and
+             then files a complaint with evidence
+  admin      logs in, loads dashboard stats, pages and filters the case
+             list, opens analytics and updates case statuses
+  anonymous  submits an anonymous report with evidence, then checks its
+             status by report ID
+
+Each virtual user has its own cookie jar (one aiohttp ClientSession), so
+logins behave like real browsers. The number of active users follows a
+ramp profile; between actions every user waits a random think time.
+
+Accounts come from the dataset seeder (backend/Tests/seed): citizens
+`<citizen-prefix><n>` and admins `<admin-prefix><n>` sharing one
+password. Anonymous reports are capped per client IP, so against a
+staging server started with TRUST_PROXY=1 use --spoof-ips to give every
+virtual user its own address; otherwise most of them are reported as
+rate limited (429), which is counted separately from errors.
+
+Requires aiohttp (pip install aiohttp). Example:
+
+    python backend/Tests/load/loadgen.py --base-url http://staging:3000 \\
+        --ramp 2m:200,10m:200,5m:1000,10m:1000,2m:0 \\
+        --mix citizen=70,admin=5,anonymous=25 --out results.csv
+
+Output: one CSV row per interval and endpoint with the active user count,
+requests, errors (5xx and network failures), rate-limited and other 4xx
+responses, and latency percentiles. Plot p95 and error rate against
+active_users: the saturation point is where throughput stops rising while
+latency climbs.
+"""
+
+import argparse
+import asyncio
+import csv
+import math
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'complaints')
+EVIDENCE_FILES = ['test_image_1.jpg', 'test_image_2.jpg', 'test_image_3.jpg']
+_evidence_cache = {}
+
+DEFAULT_MIX = 'citizen=70,admin=5,anonymous=25'
+DEFAULT_RAMP = '1m:50,5m:50,1m:0'
+
+COMPLAINT_TYPES = ['theft', 'assault', 'fraud', 'harassment', 'cybercrime', 'vandalism', 'other']
+CASE_STATUSES = ['verifying', 'investigating', 'resolved']
+PLACES = [
+    'Mirpur 10, Dhaka', 'Agrabad, Chattogram', 'Zindabazar, Sylhet',
+    'Shaheb Bazar, Rajshahi', 'Sonadanga, Khulna', 'Nathullabad, Barishal',
+]
+
+
+# RAMP PROFILE
+# ============
+
+def parse_duration(text):
+    """'90', '90s', '5m', '1h' -> seconds"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smh]?)', text.strip())
+    if not match:
+        raise ValueError(f'Invalid duration: {text!r}')
+    value, unit = float(match.group(1)), match.group(2)
+    return value * {'': 1, 's': 1, 'm': 60, 'h': 3600}[unit]
+
+
+def parse_ramp(text):
+    """
+    'duration:users,...' -> [(stage_end_seconds, users)]
+    Each stage moves linearly from the previous stage's users (0 at the
+    start) to its own, so '2m:100,10m:100' ramps up then holds.
+    """
+    stages = []
+    elapsed = 0.0
+    for part in text.split(','):
+        duration, users = part.split(':')
+        elapsed += parse_duration(duration)
+        stages.append((elapsed, int(users)))
+    if not stages:
+        raise ValueError('Ramp profile needs at least one stage')
+    return stages
+
+
+def target_users(stages, elapsed):
+    """Active users the ramp calls for at `elapsed` seconds (None when finished)"""
+    start_time, start_users = 0.0, 0
+    for end_time, end_users in stages:
+        if elapsed < end_time:
+            progress = (elapsed - start_time) / (end_time - start_time) if end_time > start_time else 1
+            return round(start_users + (end_users - start_users) * progress)
+        start_time, start_users = end_time, end_users
+    return None
+
+
+def parse_mix(text):
+    """'citizen=70,admin=5,anonymous=25' -> {persona: weight}"""
+    mix = {}
+    for part in text.split(','):
+        name, weight = part.split('=')
+        if name not in PERSONAS:
+            raise ValueError(f'Unknown persona: {name}')
+        mix[name] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError('Persona weights must add up to more than 0')
+    return mix
+
+
+def parse_think(text):
+    """'1-5' -> (1.0, 5.0) seconds"""
+    low, _, high = text.partition('-')
+    low = float(low)
+    return low, float(high) if high else low
+
+
+# RESULTS
+# =======
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(len(sorted_values) * p) - 1, 0)
+    return sorted_values[index]
+
+
+class Recorder:
+    """
+    Buckets every response by interval and endpoint, writing each interval
+    to the CSV once it is complete so a long run can be watched as it goes
+    """
+
+    FIELDS = [
+        'interval_start_s', 'endpoint', 'active_users', 'requests', 'errors',
+        'rate_limited', 'client_errors', 'error_rate', 'rps',
+        'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+    ]
+
+    def __init__(self, interval, writer=None, clock=time.monotonic):
+        self.interval = interval
+        self.writer = writer
+        self.clock = clock
+        self.started = clock()
+        self.active_users = 0
+        # interval index -> endpoint -> {'latencies': [...], counters}
+        self.buckets = defaultdict(lambda: defaultdict(lambda: {
+            'latencies': [], 'errors': 0, 'rate_limited': 0, 'client_errors': 0,
+        }))
+        # interval index -> most users active during it
+        self.users = defaultdict(int)
+        self.totals = defaultdict(lambda: {'latencies': [], 'errors': 0, 'rate_limited': 0, 'client_errors': 0})
+
+    def current_interval(self):
+        return int((self.clock() - self.started) // self.interval)
+
+    def set_active_users(self, count):
+        self.active_users = count
+        index = self.current_interval()
+        self.users[index] = max(self.users[index], count)
+
+    def record(self, endpoint, status, latency_ms):
+        """status: HTTP status, or None for a network failure or timeout"""
+        for entry in (self.buckets[self.current_interval()][endpoint], self.totals[endpoint]):
+            entry['latencies'].append(latency_ms)
+            if status is None or status >= 500:
+                entry['errors'] += 1
+            elif status == 429:
+                entry['rate_limited'] += 1
+            elif status >= 400:
+                entry['client_errors'] += 1
+
+    def rows(self, index):
+        for endpoint, entry in sorted(self.buckets[index].items()):
+            latencies = sorted(entry['latencies'])
+            count = len(latencies)
+            yield {
+                'interval_start_s': index * self.interval,
+                'endpoint': endpoint,
+                'active_users': self.users.get(index, self.active_users),
+                'requests': count,
+                'errors': entry['errors'],
+                'rate_limited': entry['rate_limited'],
+                'client_errors': entry['client_errors'],
+                'error_rate': round(entry['errors'] / count, 4) if count else 0,
+                'rps': round(count / self.interval, 2),
+                'p50_ms': round(percentile(latencies, 0.50), 1),
+                'p95_ms': round(percentile(latencies, 0.95), 1),
+                'p99_ms': round(percentile(latencies, 0.99), 1),
+                'max_ms': round(latencies[-1], 1) if latencies else 0,
+            }
+
+    def flush(self, final=False):
+        """Write every interval that has ended (all of them when final)"""
+        current = self.current_interval()
+        for index in sorted(self.buckets):
+            if index >= current and not final:
+                break
+            if self.writer:
+                self.writer.writerows(self.rows(index))
+            del self.buckets[index]
+
+    def summary(self):
+        lines = [f'{"endpoint":<36} {"requests":>9} {"errors":>7} {"429":>6} {"4xx":>6} {"p50":>8} {"p95":>8} {"p99":>8}']
+        for endpoint, entry in sorted(self.totals.items()):
+            latencies = sorted(entry['latencies'])
+            lines.append(
+                f'{endpoint:<36} {len(latencies):>9} {entry["errors"]:>7} {entry["rate_limited"]:>6} '
+                f'{entry["client_errors"]:>6} {percentile(latencies, 0.5):>8.1f} '
+                f'{percentile(latencies, 0.95):>8.1f} {percentile(latencies, 0.99):>8.1f}'
+            )
+        return '\n'.join(lines)
+
+
+# VIRTUAL USERS
+# =============
+
+class VirtualUser:
+    """One simulated browser: its own cookie jar, think times and recorder"""
+
+    def __init__(self, number, options, recorder):
+        import aiohttp
+
+        self.number = number
+        self.options = options
+        self.recorder = recorder
+        headers = {}
+        if options.spoof_ips:
+            # 10.x.y.z, unique per virtual user
+            headers['X-Forwarded-For'] = f'10.{(number >> 16) & 255}.{(number >> 8) & 255}.{number & 255}'
+        self.http = aiohttp.ClientSession(
+            base_url=options.base_url,
+            headers=headers,
+            # unsafe: keep cookies for IP-address hosts too
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            timeout=aiohttp.ClientTimeout(total=options.timeout),
+        )
+
+    async def close(self):
+        await self.http.close()
+
+    async def think(self):
+        low, high = self.options.think
+        await asyncio.sleep(random.uniform(low, high))
+
+    async def request(self, method, path, endpoint=None, **kwargs):
+        """Send a request and record it; returns (status, JSON body or None)"""
+        import aiohttp
+
+        endpoint = endpoint or f'{method} {path}'
+        started = time.perf_counter()
+        try:
+            async with self.http.request(method, path, **kwargs) as response:
+                body = None
+                if response.content_type == 'application/json':
+                    body = await response.json()
+                else:
+                    await response.read()
+                self.recorder.record(endpoint, response.status, (time.perf_counter() - started) * 1000)
+                return response.status, body
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.recorder.record(endpoint, None, (time.perf_counter() - started) * 1000)
+            return None, None
+
+    def evidence_form(self, fields, files=1):
+        import aiohttp
+
+        form = aiohttp.FormData()
+        for name, value in fields.items():
+            form.add_field(name, str(value))
+        for filename in random.sample(EVIDENCE_FILES, files):
+            if filename not in _evidence_cache:
+                with open(os.path.join(FIXTURES_DIR, filename), 'rb') as handle:
+                    _evidence_cache[filename] = handle.read()
+            form.add_field('evidence', _evidence_cache[filename], filename=filename, content_type='image/jpeg')
+        return form
+
+
+def random_place():
+    # Scatter around the middle of Bangladesh
+    return random.choice(PLACES), 23.7 + random.uniform(-1.5, 1.5), 90.4 + random.uniform(-1.5, 1.5)
+
+
+def recent_date(max_days=60):
+    return (date.today() - timedelta(days=random.randint(0, max_days))).isoformat()
+
+
+async def citizen(user):
+    """Login, then browse, poll, chat and occasionally file a complaint"""
+    options = user.options
+    username = f'{options.citizen_prefix}{random.randint(1, options.citizens)}'
+    status, _ = await user.request('POST', '/login', json={'username': username, 'password': options.password})
+    if status != 200:
+        return
+
+    complaint_ids = []
+    while True:
+        await user.think()
+        await user.request('GET', '/api/profile')
+
+        await user.think()
+        _, body = await user.request('GET', '/my-complaints')
+        if body and body.get('complaints'):
+            complaint_ids = [c['complaint_id'] for c in body['complaints']]
+
+        await user.think()
+        await user.request('GET', '/user-notifications')
+
+        if complaint_ids:
+            complaint_id = random.choice(complaint_ids)
+            await user.think()
+            await user.request('GET', f'/complaint-chat/{complaint_id}', endpoint='GET /complaint-chat/:id')
+            if random.random() < 0.3:
+                await user.think()
+                await user.request('POST', '/send-chat-message', json={
+                    'complaintId': complaint_id,
+                    'message': f'Any update on this case? (load test {random.randint(0, 10 ** 6)})',
+                })
+
+        if random.random() < options.submit_rate:
+            place, lat, lng = random_place()
+            await user.think()
+            await user.request('POST', '/submit-complaint', data=user.evidence_form({
+                'complaintType': random.choice(COMPLAINT_TYPES),
+                'description': 'Load test complaint: ' + ' '.join(random.choices(PLACES, k=4)),
+                'incidentDate': recent_date(),
+                'location': place,
+                'latitude': lat,
+                'longitude': lng,
+                'accuracyRadius': random.randint(5, 100),
+            }))
+
+
+async def admin(user):
+    """Login, then work the case list like a district officer"""
+    options = user.options
+    username = f'{options.admin_prefix}{random.randint(1, options.admins)}'
+    status, _ = await user.request('POST', '/adminLogin', json={'username': username, 'password': options.password})
+    if status != 200:
+        return
+
+    while True:
+        await user.think()
+        await user.request('GET', '/get-admin-dashboard-stats')
+
+        await user.think()
+        params = {'page': random.randint(1, 5)}
+        if random.random() < 0.5:
+            params['status'] = random.choice(['pending'] + CASE_STATUSES)
+        if random.random() < 0.2:
+            params['q'] = random.choice(['theft', 'fraud', 'mirpur', 'phone'])
+        _, body = await user.request('GET', '/get-admin-cases', params=params)
+        cases = (body or {}).get('cases') or []
+
+        if random.random() < 0.3:
+            await user.think()
+            path = random.choice(['/get-trend-analysis', '/get-crime-distribution', '/get-performance-metrics'])
+            await user.request('GET', path, params={'period': random.choice(['7', '30', '90'])})
+
+        if cases and random.random() < options.update_rate:
+            await user.think()
+            await user.request('POST', '/update-complaint-status', json={
+                'complaintId': random.choice(cases)['complaint_id'],
+                'newStatus': random.choice(CASE_STATUSES),
+            })
+
+
+async def anonymous(user):
+    """Submit one anonymous report, then check its status a few times"""
+    place, lat, lng = random_place()
+    await user.think()
+    status, body = await user.request('POST', '/anonymous-report', data=user.evidence_form({
+        'crimeType': random.choice(COMPLAINT_TYPES),
+        'description': 'Anonymous load test report describing an incident near ' + ', '.join(random.choices(PLACES, k=3)),
+        'incidentDate': recent_date(),
+        'incidentTime': f'{random.randint(0, 23):02d}:{random.randint(0, 59):02d}',
+        'location': f'Near the market, {place}',
+        'latitude': lat,
+        'longitude': lng,
+        'captchaAnswer': '7',
+        'captchaExpected': '7',
+    }))
+    report_id = (body or {}).get('reportId') if status in (200, 201) else None
+    if not report_id:
+        return
+
+    for _ in range(random.randint(1, 3)):
+        await user.think()
+        await user.request('GET', f'/anonymous-report/{report_id}/status', endpoint='GET /anonymous-report/:id/status')
+
+
+PERSONAS = {'citizen': citizen, 'admin': admin, 'anonymous': anonymous}
+
+
+async def run_user(persona, user):
+    try:
+        await PERSONAS[persona](user)
+    finally:
+        await user.close()
+
+
+# DRIVER
+# ======
+
+async def run(options):
+    stages = parse_ramp(options.ramp)
+    mix = parse_mix(options.mix)
+    personas, weights = list(mix), list(mix.values())
+
+    with open(options.out, 'w', newline='') as handle:
+        writer = csv.DictWriter(handle, fieldnames=Recorder.FIELDS)
+        writer.writeheader()
+        recorder = Recorder(options.interval, writer)
+        active = set()
+        spawned = 0
+
+        while True:
+            elapsed = time.monotonic() - recorder.started
+            target = target_users(stages, elapsed)
+            if target is None:
+                break
+
+            # Finished users (one-shot anonymous reporters, failed logins) are replaced
+            active = {task for task in active if not task.done()}
+            while len(active) < target:
+                spawned += 1
+                persona = random.choices(personas, weights)[0]
+                active.add(asyncio.create_task(run_user(persona, VirtualUser(spawned, options, recorder))))
+            for task in list(active)[target:]:
+                task.cancel()
+                active.discard(task)
+
+            recorder.set_active_users(len(active))
+            recorder.flush()
+            handle.flush()
+            await asyncio.sleep(1)
+
+        for task in active:
+            task.cancel()
+        await asyncio.gather(*active, return_exceptions=True)
+        recorder.flush(final=True)
+
+    print(recorder.summary())
+    print(f'\n{spawned} virtual users; time series written to {options.out}')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Persona-based load generator for SecureVoice')
+    parser.add_argument('--base-url', default=os.environ.get('LOAD_BASE_URL', 'http://localhost:3000'))
+    parser.add_argument('--ramp', default=DEFAULT_RAMP,
+                        help='Stages as duration:users, e.g. 2m:200,10m:200,2m:0 (default %(default)s)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Persona weights (default %(default)s)')
+    parser.add_argument('--think', default='1-5', type=parse_think,
+                        help='Think time range in seconds between actions (default %(default)s)')
+    parser.add_argument('--interval', default=10, type=float, help='Seconds per time-series row (default %(default)s)')
+    parser.add_argument('--out', default='loadgen_results.csv')
+    parser.add_argument('--timeout', default=30, type=float, help='Per-request timeout in seconds')
+    parser.add_argument('--citizens', default=1000, type=int, help='Seeded citizen accounts to log in as')
+    parser.add_argument('--admins', default=64, type=int, help='Seeded admin accounts to log in as')
+    parser.add_argument('--citizen-prefix', default='load_citizen_')
+    parser.add_argument('--admin-prefix', default='load_admin_')
+    parser.add_argument('--password', default=os.environ.get('LOAD_PASSWORD', 'LoadTest#2026'))
+    parser.add_argument('--submit-rate', default=0.05, type=float,
+                        help='Chance per citizen loop of filing a complaint (default %(default)s)')
+    parser.add_argument('--update-rate', default=0.2, type=float,
+                        help='Chance per admin loop of updating a case status (default %(default)s)')
+    parser.add_argument('--spoof-ips', action='store_true',
+                        help='Send a distinct X-Forwarded-For per virtual user (server needs TRUST_PROXY)')
+    options = parser.parse_args(argv)
+    parse_ramp(options.ramp)
+    parse_mix(options.mix)
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        sys.exit('loadgen needs aiohttp: pip install aiohttp')
+    try:
+        asyncio.run(run(options))
+    except KeyboardInterrupt:
+        print('Interrupted')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Load Generator Helper Tests
+Covers the ramp profile, persona mix and time-series bucketing of
+loadgen.py. These run without aiohttp or a server; the generator itself
+is exercised by running it against a deployment.
+"""
+
+import csv
+import io
+
+import pytest
+
+import loadgen
+
+
+def test_parse_duration_units():
+    assert loadgen.parse_duration('90') == 90
+    assert loadgen.parse_duration('30s') == 30
+    assert loadgen.parse_duration('2m') == 120
+    assert loadgen.parse_duration('1.5h') == 5400
+    with pytest.raises(ValueError):
+        loadgen.parse_duration('ten')
+
+
+def test_ramp_interpolates_between_stages():
+    stages = loadgen.parse_ramp('100s:100,100s:100,50s:0')
+    assert stages == [(100, 100), (200, 100), (250, 0)]
+    assert loadgen.target_users(stages, 0) == 0
+    assert loadgen.target_users(stages, 50) == 50
+    assert loadgen.target_users(stages, 150) == 100
+    assert loadgen.target_users(stages, 225) == 50
+    assert loadgen.target_users(stages, 250) is None
+
+
+def test_mix_rejects_unknown_personas():
+    assert loadgen.parse_mix('citizen=3,anonymous=1') == {'citizen': 3, 'anonymous': 1}
+    with pytest.raises(ValueError):
+        loadgen.parse_mix('tourist=1')
+    with pytest.raises(ValueError):
+        loadgen.parse_mix('citizen=0')
+
+
+def test_think_range():
+    assert loadgen.parse_think('1-5') == (1.0, 5.0)
+    assert loadgen.parse_think('2') == (2.0, 2.0)
+
+
+def test_recorder_buckets_by_interval_and_endpoint():
+    now = [0.0]
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=loadgen.Recorder.FIELDS)
+    writer.writeheader()
+    header = out.getvalue()
+    recorder = loadgen.Recorder(10, writer, clock=lambda: now[0])
+    recorder.set_active_users(5)
+
+    for latency in range(1, 101):
+        recorder.record('GET /api/profile', 200, float(latency))
+    recorder.record('GET /api/profile', 503, 5.0)
+    recorder.record('POST /login', 429, 2.0)
+    recorder.record('POST /login', None, 30000.0)
+    recorder.record('POST /login', 400, 3.0)
+
+    # The interval has not ended yet: nothing written
+    recorder.flush()
+    assert out.getvalue() == header
+
+    now[0] = 12.0
+    recorder.record('GET /api/profile', 200, 1.0)
+    recorder.flush()
+    rows = {row['endpoint']: row for row in csv.DictReader(io.StringIO(out.getvalue()))}
+
+    profile = rows['GET /api/profile']
+    assert profile['interval_start_s'] == '0'
+    assert profile['active_users'] == '5'
+    assert profile['requests'] == '101'
+    assert profile['errors'] == '1'
+    assert profile['p95_ms'] == '95.0'
+    assert profile['max_ms'] == '100.0'
+
+    login = rows['POST /login']
+    assert (login['errors'], login['rate_limited'], login['client_errors']) == ('1', '1', '1')
+
+    recorder.flush(final=True)
+    assert out.getvalue().count('GET /api/profile') == 2
+    assert 'GET /api/profile' in recorder.summary()
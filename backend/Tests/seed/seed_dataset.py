@@ -0,0 +1,657 @@
+"""
+Synthetic Dataset Seeder
+Fills a migrated SecureVoice schema with a realistic, reproducible dataset
+so heatmap, analytics, case search and dashboard queries can be measured at
+production scale rather than against a near-empty database.
+
+Generated, all tied together through explicit ids:
+  - districts for all 64 districts of Bangladesh, linked to their divisions
+  - locations clustered around hotspots in each district
+  - citizens (load_citizen_<n>) and one or more approved, verified district
+    admins per district (load_admin_<n>), all with one shared password
+  - complaints weighted by district population, category, time of day and
+    a growing monthly volume, with coordinates scattered around hotspots
+  - status histories in status_updates that only move forward in time
+    (pending -> verifying -> investigating -> resolved), with matching
+    admin_cases rows, notifications and admin audit logs
+  - chat threads and evidence rows per complaint
+  - anonymous reports with evidence, assigned to district admins
+  - complaint_counters rebuilt from the result
+
+The same --seed always produces the same data. Rows are generated in
+chunks and written with multi-row INSERTs, with unique and foreign key
+checks off for the session, and a commit per chunk, so millions of
+complaints load in minutes. Evidence rows point at paths under
+uploads/seed/ that are not created on disk.
+
+Requires PyMySQL and a schema migrated through backend/database
+(DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME as in backend/.env).
+Run it against a dedicated benchmark database:
+
+    DB_NAME=securevoice_bench python backend/Tests/seed/seed_dataset.py \\
+        --complaints 2000000 --citizens 200000 --anonymous-reports 300000
+
+--reset removes previously seeded rows first. The password defaults to
+the one backend/Tests/load/loadgen.py logs in with.
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+SEED_PREFIX = 'load_'
+CITIZEN_PREFIX = 'load_citizen_'
+ADMIN_PREFIX = 'load_admin_'
+REPORT_PREFIX = 'SV-LD'
+LOCATION_PREFIX = 'Seed: '
+DEFAULT_PASSWORD = 'LoadTest#2026'
+
+# division -> [(district, latitude, longitude, population in millions)]
+# Division names as in the divisions table (009_3nf_normalization.sql)
+GEOGRAPHY = {
+    'Dhaka': [
+        ('Dhaka', 23.81, 90.41, 14.7), ('Gazipur', 24.00, 90.42, 5.3), ('Narayanganj', 23.62, 90.50, 3.9),
+        ('Tangail', 24.25, 89.92, 4.0), ('Kishoreganj', 24.44, 90.78, 3.3), ('Manikganj', 23.86, 90.00, 1.6),
+        ('Munshiganj', 23.54, 90.53, 1.6), ('Narsingdi', 23.92, 90.72, 2.6), ('Faridpur', 23.61, 89.84, 2.2),
+        ('Gopalganj', 23.01, 89.83, 1.3), ('Madaripur', 23.17, 90.19, 1.3), ('Rajbari', 23.76, 89.65, 1.2),
+        ('Shariatpur', 23.24, 90.43, 1.3),
+    ],
+    'Chittagong': [
+        ('Chattogram', 22.36, 91.78, 9.2), ("Cox's Bazar", 21.43, 92.01, 2.8), ('Cumilla', 23.46, 91.18, 6.2),
+        ('Feni', 23.02, 91.40, 1.6), ('Brahmanbaria', 23.96, 91.11, 3.3), ('Chandpur', 23.23, 90.67, 2.6),
+        ('Lakshmipur', 22.94, 90.83, 1.9), ('Noakhali', 22.87, 91.10, 3.6), ('Khagrachhari', 23.12, 91.98, 0.7),
+        ('Rangamati', 22.65, 92.17, 0.6), ('Bandarban', 22.20, 92.22, 0.5),
+    ],
+    'Rajshahi': [
+        ('Rajshahi', 24.37, 88.60, 2.9), ('Bogura', 24.85, 89.37, 3.7), ('Chapainawabganj', 24.60, 88.27, 1.8),
+        ('Joypurhat', 25.10, 89.02, 1.0), ('Naogaon', 24.80, 88.95, 2.8), ('Natore', 24.41, 89.00, 1.9),
+        ('Pabna', 24.00, 89.24, 2.9), ('Sirajganj', 24.45, 89.70, 3.4),
+    ],
+    'Khulna': [
+        ('Khulna', 22.82, 89.55, 2.6), ('Bagerhat', 22.65, 89.79, 1.6), ('Chuadanga', 23.64, 88.84, 1.2),
+        ('Jashore', 23.17, 89.21, 3.1), ('Jhenaidah', 23.54, 89.15, 2.0), ('Kushtia', 23.90, 89.12, 2.1),
+        ('Magura', 23.49, 89.42, 1.0), ('Meherpur', 23.76, 88.63, 0.7), ('Narail', 23.17, 89.51, 0.8),
+        ('Satkhira', 22.72, 89.07, 2.2),
+    ],
+    'Barishal': [
+        ('Barishal', 22.70, 90.37, 2.6), ('Barguna', 22.15, 90.12, 1.0), ('Bhola', 22.69, 90.65, 2.0),
+        ('Jhalokati', 22.64, 90.20, 0.7), ('Patuakhali', 22.36, 90.33, 1.7), ('Pirojpur', 22.58, 89.97, 1.2),
+    ],
+    'Sylhet': [
+        ('Sylhet', 24.89, 91.87, 3.9), ('Habiganj', 24.37, 91.42, 2.4), ('Moulvibazar', 24.48, 91.78, 2.1),
+        ('Sunamganj', 25.07, 91.40, 2.7),
+    ],
+    'Rangpur': [
+        ('Rangpur', 25.74, 89.25, 3.2), ('Dinajpur', 25.63, 88.64, 3.3), ('Gaibandha', 25.33, 89.53, 2.6),
+        ('Kurigram', 25.81, 89.64, 2.3), ('Lalmonirhat', 25.92, 89.45, 1.4), ('Nilphamari', 25.93, 88.86, 2.0),
+        ('Panchagarh', 26.34, 88.55, 1.2), ('Thakurgaon', 26.03, 88.46, 1.5),
+    ],
+    'Mymensingh': [
+        ('Mymensingh', 24.75, 90.41, 5.9), ('Jamalpur', 24.92, 89.95, 2.5), ('Netrokona', 24.87, 90.73, 2.3),
+        ('Sherpur', 25.02, 90.02, 1.5),
+    ],
+}
+
+# crime_code (009_3nf_normalization.sql) -> relative frequency
+CATEGORY_WEIGHTS = {
+    'THEFT': 24, 'FRAUD': 14, 'HARASSMENT': 12, 'ASSAULT': 9, 'CYBERCRIME': 9, 'THREAT': 6,
+    'DOMESTIC_VIOLENCE': 6, 'DRUG_RELATED': 5, 'VANDALISM': 4, 'TRAFFIC_VIOLATION': 4,
+    'PUBLIC_SAFETY': 3, 'CORRUPTION': 3, 'ENVIRONMENTAL': 1, 'ORGANIZED_CRIME': 1,
+    'HUMAN_TRAFFICKING': 1, 'OTHER': 5,
+}
+
+# Reports by hour of day: quiet at night, peaking in the evening
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 2, 3, 5, 7, 8, 8, 8, 8, 8, 8, 8, 9, 10, 11, 12, 11, 9, 6, 4]
+
+STATUS_FLOW = ['pending', 'verifying', 'investigating', 'resolved']
+ANONYMOUS_STATUSES = ['pending', 'reviewing', 'reviewed', 'investigating', 'resolved', 'dismissed']
+
+PLACES = ['Bazar', 'Bus Stand', 'College Road', 'Station Road', 'Hospital Gate', 'Launch Ghat',
+          'Main Road', 'Thana Road', 'New Market', 'Court Area', 'School Para', 'Upazila Sadar']
+FIRST_NAMES = ['Abdul', 'Rahim', 'Karim', 'Fatema', 'Ayesha', 'Nusrat', 'Tanvir', 'Sabbir', 'Farhana',
+               'Imran', 'Shakil', 'Mitu', 'Rubel', 'Sumaiya', 'Hasan', 'Jannat', 'Arif', 'Mahmuda']
+LAST_NAMES = ['Hossain', 'Rahman', 'Islam', 'Ahmed', 'Chowdhury', 'Akter', 'Khan', 'Begum', 'Uddin',
+              'Sarker', 'Miah', 'Talukder', 'Haque', 'Alam']
+DESCRIPTIONS = {
+    'THEFT': 'My {item} was stolen near {place}. The person ran towards the main road.',
+    'FRAUD': 'Someone took {amount} taka from me promising a {scheme} and stopped answering calls.',
+    'HARASSMENT': 'I am being followed and harassed repeatedly near {place} in the evenings.',
+    'ASSAULT': 'I was attacked by {count} people near {place} after an argument.',
+    'CYBERCRIME': 'My {account} account was hacked and messages are being sent asking for money.',
+    'THREAT': 'I received threats over the phone demanding {amount} taka.',
+    'DOMESTIC_VIOLENCE': 'A neighbour is being beaten regularly; we hear it every night near {place}.',
+    'DRUG_RELATED': 'Drugs are being sold openly near {place}, mostly late at night.',
+    'VANDALISM': 'Shops near {place} were damaged last night and the shutters broken.',
+    'TRAFFIC_VIOLATION': 'Buses are racing on the highway near {place} and nearly hit pedestrians.',
+    'PUBLIC_SAFETY': 'Street lights near {place} have been off for weeks and there have been robberies.',
+    'CORRUPTION': 'An official asked for {amount} taka to process my application.',
+    'ENVIRONMENTAL': 'A factory near {place} is dumping waste into the canal.',
+    'ORGANIZED_CRIME': 'A group is collecting extortion money from shops near {place}.',
+    'HUMAN_TRAFFICKING': 'Young people are being recruited near {place} with fake job offers abroad.',
+    'OTHER': 'I want to report an incident near {place} that needs police attention.',
+}
+ITEMS = ['mobile phone', 'motorcycle', 'bag', 'laptop', 'gold chain', 'bicycle', 'wallet']
+SCHEMES = ['job abroad', 'loan', 'online prize', 'land deal', 'bKash cashback']
+ACCOUNTS = ['Facebook', 'bKash', 'WhatsApp', 'email', 'Nagad']
+CHAT_USER = ['Any update on my complaint?', 'I have more information about the incident.',
+             'Please let me know if you need anything else.', 'Thank you for the update.']
+CHAT_ADMIN = ['We have received your complaint and are looking into it.',
+              'An officer will contact you shortly.', 'Could you share more details about the time?',
+              'The case has been forwarded to the local police station.']
+EVIDENCE_TYPES = [('image', 'jpg', 70), ('video', 'mp4', 15), ('audio', 'mp3', 10), ('document', 'pdf', 5)]
+
+
+# GENERATION
+# ==========
+
+def districts():
+    """[(division, district, latitude, longitude, population)]"""
+    return [(division, *row) for division, rows in GEOGRAPHY.items() for row in rows]
+
+
+class Generator:
+    """Deterministic row generators driven by one random.Random"""
+
+    def __init__(self, options, category_ids):
+        self.options = options
+        self.random = random.Random(options.seed)
+        self.districts = districts()
+        self.district_weights = [d[4] for d in self.districts]
+        # 3-6 hotspots per district; complaints cluster around them
+        self.hotspots = {
+            d[1]: [(d[2] + self.random.gauss(0, 0.05), d[3] + self.random.gauss(0, 0.05), self.random.uniform(0.5, 3))
+                   for _ in range(self.random.randint(3, 6))]
+            for d in self.districts
+        }
+        self.categories = [code for code in CATEGORY_WEIGHTS if code in category_ids]
+        self.category_weights = [CATEGORY_WEIGHTS[code] for code in self.categories]
+        self.category_ids = category_ids
+        self.end = datetime(2026, 1, 1) if options.end is None else options.end
+        self.start = self.end - timedelta(days=30 * options.months)
+
+    def choice_weighted(self, values, weights):
+        return self.random.choices(values, weights)[0]
+
+    def district(self):
+        return self.choice_weighted(self.districts, self.district_weights)
+
+    def point(self, district_name, spread=0.02):
+        spots = self.hotspots[district_name]
+        lat, lng, _ = self.choice_weighted(spots, [s[2] for s in spots])
+        return round(lat + self.random.gauss(0, spread), 8), round(lng + self.random.gauss(0, spread), 8)
+
+    def timestamp(self):
+        """Volume grows over the period (triangular toward the end), evening-heavy"""
+        span_days = (self.end - self.start).days
+        day = self.random.triangular(0, span_days, span_days)
+        moment = self.start + timedelta(days=int(day))
+        hour = self.choice_weighted(range(24), HOUR_WEIGHTS)
+        return moment.replace(hour=hour, minute=self.random.randint(0, 59), second=self.random.randint(0, 59))
+
+    def name(self):
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    def description(self, code):
+        return DESCRIPTIONS[code].format(
+            item=self.random.choice(ITEMS), place=self.random.choice(PLACES),
+            amount=self.random.choice([2000, 5000, 15000, 50000, 120000]),
+            scheme=self.random.choice(SCHEMES), account=self.random.choice(ACCOUNTS),
+            count=self.random.randint(2, 5),
+        )
+
+    def status_history(self, created):
+        """
+        Forward-only status changes ending at a final status; older complaints
+        are further along. Returns [(status, changed_at)] starting with pending.
+        """
+        age_days = max((self.end - created).days, 0)
+        # Expected stage: about one step per three weeks, capped at resolved
+        stage = min(int(self.random.expovariate(1.0) * (1 + age_days / 21)), len(STATUS_FLOW) - 1)
+        history = [('pending', created)]
+        moment = created
+        for status in STATUS_FLOW[1:stage + 1]:
+            moment = moment + timedelta(hours=self.random.uniform(2, 24 * 10))
+            if moment >= self.end:
+                break
+            history.append((status, moment))
+        return history
+
+    def poisson(self, mean):
+        # Knuth; means here are small
+        limit, k, p = math.exp(-mean), 0, 1.0
+        while True:
+            p *= self.random.random()
+            if p <= limit:
+                return k
+            k += 1
+
+    def hex64(self):
+        return '%064x' % self.random.getrandbits(256)
+
+
+def hash_password(password):
+    """bcrypt hash compatible with bcryptjs (python bcrypt, else node)"""
+    try:
+        import bcrypt
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(10)).decode()
+    except ImportError:
+        pass
+    backend_dir = os.path.join(os.path.dirname(__file__), '..', '..')
+    result = subprocess.run(
+        ['node', '-e', "process.stdout.write(require('bcryptjs').hashSync(process.argv[1], 10))", password],
+        cwd=backend_dir, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit('Cannot hash the password: install python bcrypt, or run npm install in backend/, '
+                 'or pass --password-hash')
+    return result.stdout
+
+
+# DATABASE
+# ========
+
+class Seeder:
+    def __init__(self, connection, options):
+        self.connection = connection
+        self.options = options
+        self.cursor = connection.cursor()
+        self.started = time.monotonic()
+
+    def log(self, message):
+        print(f'[{time.monotonic() - self.started:7.1f}s] {message}', flush=True)
+
+    def scalar(self, sql, params=None):
+        self.cursor.execute(sql, params)
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def insert(self, table, columns, rows):
+        """Multi-row INSERT (PyMySQL batches executemany into large statements)"""
+        if not rows:
+            return
+        placeholders = ', '.join(['%s'] * len(columns))
+        self.cursor.executemany(
+            f'INSERT INTO `{table}` ({", ".join(columns)}) VALUES ({placeholders})', rows
+        )
+
+    def next_id(self, table, column):
+        return (self.scalar(f'SELECT COALESCE(MAX(`{column}`), 0) FROM `{table}`') or 0) + 1
+
+    def prepare_session(self):
+        self.cursor.execute('SET SESSION foreign_key_checks = 0')
+        self.cursor.execute('SET SESSION unique_checks = 0')
+
+    def reset(self):
+        """Delete previously seeded rows, in batches, children first"""
+        self.log('Removing previously seeded rows')
+        seeded_complaints = (f"complaint_id IN (SELECT complaint_id FROM complaint "
+                             f"WHERE username LIKE '{CITIZEN_PREFIX}%')")
+        steps = [
+            ('evidence', seeded_complaints),
+            ('complaint_chat', seeded_complaints),
+            ('complaint_notifications', seeded_complaints),
+            ('status_updates', seeded_complaints),
+            ('admin_cases', seeded_complaints),
+            ('admin_audit_logs', f"admin_username LIKE '{ADMIN_PREFIX}%'"),
+            ('complaint', f"username LIKE '{CITIZEN_PREFIX}%'"),
+            ('anonymous_evidence', f"report_id LIKE '{REPORT_PREFIX}%'"),
+            ('anonymous_reports', f"report_id LIKE '{REPORT_PREFIX}%'"),
+            ('location', f"location_name LIKE '{LOCATION_PREFIX}%'"),
+            ('admin_verification_tokens', f"admin_username LIKE '{ADMIN_PREFIX}%'"),
+            ('admin_approval_workflow', f"admin_username LIKE '{ADMIN_PREFIX}%'"),
+            ('admins', f"username LIKE '{ADMIN_PREFIX}%'"),
+            ('users', f"username LIKE '{CITIZEN_PREFIX}%'"),
+            ('complaint_counters', f"scope_key LIKE '{SEED_PREFIX}%'"),
+        ]
+        for table, where in steps:
+            total = 0
+            while True:
+                self.cursor.execute(f'DELETE FROM `{table}` WHERE {where} LIMIT 10000')
+                self.connection.commit()
+                total += self.cursor.rowcount
+                if self.cursor.rowcount < 10000:
+                    break
+            if total:
+                self.log(f'  {table}: {total} rows')
+
+    def seed_geography(self, generator):
+        self.cursor.executemany(
+            '''INSERT IGNORE INTO districts (district_name, division_id)
+               SELECT %s, division_id FROM divisions WHERE division_name = %s''',
+            [(d[1], d[0]) for d in generator.districts]
+        )
+        location_id = self.next_id('location', 'location_id')
+        locations = {}
+        rows = []
+        for _, district, *_ in generator.districts:
+            locations[district] = []
+            for place in PLACES:
+                lat, lng = generator.point(district, spread=0.01)
+                rows.append((location_id, f'{LOCATION_PREFIX}{place}, {district}', district, lat, lng, 50))
+                locations[district].append(location_id)
+                location_id += 1
+        self.insert('location', ['location_id', 'location_name', 'district_name', 'latitude', 'longitude',
+                                 'accuracy_radius'], rows)
+        self.connection.commit()
+        self.log(f'Geography: {len(generator.districts)} districts, {len(rows)} locations')
+        return locations
+
+    def seed_admins(self, generator, password_hash):
+        """Approved, active, email-verified admins; returns district -> [username]"""
+        admins = {}
+        admin_rows, workflow_rows, token_rows = [], [], []
+        number = 0
+        for _, district, *_ in generator.districts:
+            admins[district] = []
+            for _ in range(self.options.admins_per_district):
+                number += 1
+                username = f'{ADMIN_PREFIX}{number}'
+                admins[district].append(username)
+                admin_rows.append((username, f'{username}@seed.securevoice.test', password_hash,
+                                   f'OC {generator.name()}', district, 1, generator.start))
+                workflow_rows.append((username, 'approved', generator.start, generator.start, 'seed'))
+                token_rows.append((username, 'email_verification', generator.hex64(),
+                                   generator.start + timedelta(days=7), 1, generator.start))
+        self.insert('admins', ['username', 'email', 'password', 'fullName', 'district_name', 'is_active',
+                               'created_at'], admin_rows)
+        self.insert('admin_approval_workflow', ['admin_username', 'status', 'request_date', 'approval_date',
+                                                'approved_by'], workflow_rows)
+        self.insert('admin_verification_tokens', ['admin_username', 'token_type', 'token_value', 'expires_at',
+                                                  'is_used', 'created_at'], token_rows)
+        self.connection.commit()
+        self.log(f'Admins: {number}')
+        return admins
+
+    def seed_citizens(self, generator, password_hash):
+        """Returns [(username, district)] indexed by citizen number - 1"""
+        citizens = []
+        batch = []
+        nid_base = 1990000000000
+        for number in range(1, self.options.citizens + 1):
+            division, district, *_ = generator.district()
+            username = f'{CITIZEN_PREFIX}{number}'
+            dob = datetime(1950, 1, 1) + timedelta(days=generator.random.randint(0, 365 * 55))
+            citizens.append((username, district))
+            batch.append((username, f'{username}@seed.securevoice.test', password_hash, generator.name(),
+                          f'01{generator.random.randint(300000000, 999999999)}', str(nid_base + number),
+                          dob.date(), division, district, 1, 1, generator.start,
+                          generator.end.year - dob.year))
+            if len(batch) >= self.options.batch or number == self.options.citizens:
+                self.insert('users', ['username', 'email', 'password', 'fullName', 'phone', 'nid', 'dob',
+                                      'division', 'district', 'is_verified', 'is_nid_verified', 'created_at',
+                                      'age'], batch)
+                self.connection.commit()
+                batch = []
+        self.log(f'Citizens: {len(citizens)}')
+        return citizens
+
+    def seed_complaints(self, generator, citizens, admins, locations):
+        options = self.options
+        complaint_id = self.next_id('complaint', 'complaint_id')
+        by_district = {}
+        for username, district in citizens:
+            by_district.setdefault(district, []).append(username)
+
+        tables = {
+            'complaint': ['complaint_id', 'description', 'created_at', 'status', 'username', 'admin_username',
+                          'location_id', 'complaint_type', 'location_address', 'category_id', 'latitude',
+                          'longitude', 'location_accuracy_radius', 'is_discarded', 'discarded_at',
+                          'discarded_by'],
+            'admin_cases': ['complaint_id', 'admin_username', 'complainant_username', 'status', 'created_at',
+                            'last_updated'],
+            'status_updates': ['complaint_id', 'status', 'remarks', 'updated_at', 'updated_by'],
+            'complaint_notifications': ['complaint_id', 'message', 'type', 'is_read', 'created_at'],
+            'complaint_chat': ['complaint_id', 'sender_type', 'sender_username', 'message', 'sent_at', 'is_read'],
+            'evidence': ['complaint_id', 'uploaded_at', 'file_type', 'file_path', 'content_hash'],
+            'admin_audit_logs': ['admin_username', 'action', 'action_details', 'ip_address', 'complaint_id',
+                                 'target_username', 'result', 'timestamp'],
+        }
+        rows = {table: [] for table in tables}
+
+        def flush():
+            for table, columns in tables.items():
+                self.insert(table, columns, rows[table])
+                rows[table].clear()
+            self.connection.commit()
+
+        for n in range(options.complaints):
+            # Most complaints come from the complainant's own district
+            if generator.random.random() < 0.9:
+                district = generator.district()[1]
+                candidates = by_district.get(district)
+                username = generator.random.choice(candidates) if candidates else generator.random.choice(citizens)[0]
+            else:
+                username = generator.random.choice(citizens)[0]
+                district = generator.district()[1]
+            admin = generator.random.choice(admins[district])
+            code = generator.choice_weighted(generator.categories, generator.category_weights)
+            created = generator.timestamp()
+            lat, lng = generator.point(district)
+            history = generator.status_history(created)
+            status, last_change = history[-1]
+            discarded = generator.random.random() < options.discard_rate
+            place = generator.random.choice(PLACES)
+
+            rows['complaint'].append((
+                complaint_id, generator.description(code), created, status, username, admin,
+                generator.random.choice(locations[district]), code.lower(), f'{place}, {district}',
+                generator.category_ids[code], lat, lng, generator.random.choice([None, 10, 25, 50, 100]),
+                discarded, last_change + timedelta(days=1) if discarded else None, admin if discarded else None,
+            ))
+            rows['admin_cases'].append((complaint_id, admin, username, status, created, last_change))
+
+            for i, (step, changed_at) in enumerate(history):
+                rows['status_updates'].append((complaint_id, step, None if i == 0 else f'Status set to {step}',
+                                               changed_at, admin))
+                if i > 0:
+                    rows['complaint_notifications'].append((
+                        complaint_id, f'Your complaint #{complaint_id} is now {step}.', 'status_change',
+                        changed_at < generator.end - timedelta(days=3), changed_at,
+                    ))
+                    rows['admin_audit_logs'].append((
+                        admin, 'status_update', f'{{"from":"{history[i - 1][0]}","to":"{step}"}}',
+                        f'10.0.{generator.random.randint(0, 255)}.{generator.random.randint(1, 254)}',
+                        complaint_id, username, 'success', changed_at,
+                    ))
+            rows['admin_audit_logs'].append((admin, 'complaint_viewed', None, None, complaint_id, username,
+                                             'success', created + timedelta(hours=generator.random.uniform(1, 48))))
+
+            sent_at = created
+            for i in range(generator.poisson(options.chat_mean)):
+                sent_at = sent_at + timedelta(minutes=generator.random.uniform(5, 60 * 24))
+                if sent_at >= generator.end:
+                    break
+                from_admin = i % 2 == 1
+                rows['complaint_chat'].append((
+                    complaint_id, 'admin' if from_admin else 'user', admin if from_admin else username,
+                    generator.random.choice(CHAT_ADMIN if from_admin else CHAT_USER), sent_at,
+                    sent_at < generator.end - timedelta(days=2),
+                ))
+                if from_admin and generator.random.random() < 0.5:
+                    rows['complaint_notifications'].append((
+                        complaint_id, 'New message from the investigating officer.', 'admin_comment',
+                        sent_at < generator.end - timedelta(days=2), sent_at,
+                    ))
+
+            for i in range(generator.poisson(options.evidence_mean)):
+                file_type, extension, _ = generator.choice_weighted(EVIDENCE_TYPES, [e[2] for e in EVIDENCE_TYPES])
+                digest = generator.hex64()
+                rows['evidence'].append((complaint_id, created + timedelta(minutes=i), file_type,
+                                         f'uploads/seed/{digest[:2]}/{digest}.{extension}', digest))
+
+            complaint_id += 1
+            if (n + 1) % options.batch == 0:
+                flush()
+                if (n + 1) % (options.batch * 20) == 0:
+                    self.log(f'  complaints: {n + 1:,}')
+        flush()
+        self.log(f'Complaints: {options.complaints:,}')
+
+    def seed_anonymous_reports(self, generator, admins):
+        options = self.options
+        reports, evidence = [], []
+        start_number = (self.scalar(f"SELECT COUNT(*) FROM anonymous_reports WHERE report_id LIKE '{REPORT_PREFIX}%'")
+                        or 0) + 1
+        for number in range(start_number, start_number + options.anonymous_reports):
+            report_id = f'{REPORT_PREFIX}{number:010d}'
+            division, district, *_ = generator.district()
+            code = generator.choice_weighted(generator.categories, generator.category_weights)
+            submitted = generator.timestamp()
+            incident = submitted - timedelta(hours=generator.random.uniform(1, 24 * 14))
+            lat, lng = generator.point(district)
+            status = generator.choice_weighted(ANONYMOUS_STATUSES, [40, 15, 15, 15, 10, 5])
+            admin = generator.random.choice(admins[district])
+            reviewed = status != 'pending'
+            reports.append((
+                report_id, code.lower(), generator.category_ids[code], generator.description(code) * 2,
+                incident.date(), incident.strftime('%H:%M:00'), f'{generator.random.choice(PLACES)}, {district}',
+                lat, lng, district, admin, status, submitted,
+                submitted + timedelta(hours=generator.random.uniform(2, 72)) if reviewed else None,
+                admin if reviewed else None, generator.hex64(), generator.hex64(),
+            ))
+            for i in range(1 + generator.poisson(max(options.evidence_mean - 1, 0))):
+                file_type, extension, _ = generator.choice_weighted(EVIDENCE_TYPES, [e[2] for e in EVIDENCE_TYPES])
+                digest = generator.hex64()
+                evidence.append((report_id, f'evidence_{i + 1}.{extension}', f'{report_id}-{i}.{extension}',
+                                 f'uploads/seed/{digest[:2]}/{digest}.{extension}', digest, file_type,
+                                 generator.random.randint(50_000, 20_000_000), submitted))
+            if len(reports) >= options.batch:
+                self._write_reports(reports, evidence)
+        self._write_reports(reports, evidence)
+        self.log(f'Anonymous reports: {options.anonymous_reports:,}')
+
+    def _write_reports(self, reports, evidence):
+        self.insert('anonymous_reports', ['report_id', 'crime_type', 'category_id', 'description', 'incident_date',
+                                          'incident_time', 'location_address', 'latitude', 'longitude',
+                                          'district_name', 'assigned_admin', 'status', 'submitted_at',
+                                          'reviewed_at', 'reviewed_by', 'ip_hash', 'content_hash'], reports)
+        self.insert('anonymous_evidence', ['report_id', 'original_name', 'stored_name', 'file_path', 'content_hash',
+                                           'file_type', 'file_size', 'uploaded_at'], evidence)
+        self.connection.commit()
+        reports.clear()
+        evidence.clear()
+
+    def seed_logins(self, generator, admins):
+        """A login per admin per working day, for audit log volume and login history"""
+        rows = []
+        day = generator.start
+        usernames = [username for names in admins.values() for username in names]
+        while day < generator.end:
+            if day.weekday() != 4:  # Friday off
+                for username in usernames:
+                    moment = day.replace(hour=9) + timedelta(minutes=generator.random.uniform(0, 120))
+                    rows.append((username, 'login', 'Successful login', '10.0.0.1', 'success', moment))
+            day += timedelta(days=1)
+            if len(rows) >= self.options.batch:
+                self.insert('admin_audit_logs', ['admin_username', 'action', 'action_details', 'ip_address',
+                                                 'result', 'timestamp'], rows)
+                self.connection.commit()
+                rows = []
+        self.insert('admin_audit_logs', ['admin_username', 'action', 'action_details', 'ip_address', 'result',
+                                         'timestamp'], rows)
+        self.connection.commit()
+
+    def rebuild_counters(self):
+        """Same aggregation as 012_complaint_counters.sql"""
+        self.cursor.execute('DELETE FROM complaint_counters')
+        for scope, key, where in [
+            ('global', "''", 'is_discarded = FALSE'),
+            ('admin', 'admin_username', 'admin_username IS NOT NULL AND is_discarded = FALSE GROUP BY admin_username'),
+            ('user', 'username', 'username IS NOT NULL GROUP BY username'),
+        ]:
+            self.cursor.execute(f'''
+                INSERT INTO complaint_counters (scope, scope_key, total, pending, verifying, investigating, resolved)
+                SELECT '{scope}', {key}, COUNT(*),
+                       COALESCE(SUM(status = 'pending'), 0), COALESCE(SUM(status = 'verifying'), 0),
+                       COALESCE(SUM(status = 'investigating'), 0), COALESCE(SUM(status = 'resolved'), 0)
+                FROM complaint WHERE {where}''')
+        self.connection.commit()
+        self.log('complaint_counters rebuilt')
+
+    def analyze(self):
+        tables = ['users', 'admins', 'location', 'complaint', 'admin_cases', 'status_updates',
+                  'complaint_notifications', 'complaint_chat', 'evidence', 'admin_audit_logs',
+                  'anonymous_reports', 'anonymous_evidence', 'complaint_counters']
+        self.cursor.execute('ANALYZE TABLE ' + ', '.join(f'`{t}`' for t in tables))
+        self.cursor.fetchall()
+        self.log('Tables analyzed')
+
+
+def category_ids(cursor):
+    cursor.execute('SELECT crime_code, category_id FROM category WHERE crime_code IS NOT NULL')
+    return {code: category_id for code, category_id in cursor.fetchall()}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Seed a SecureVoice database with synthetic data')
+    parser.add_argument('--complaints', type=int, default=1_000_000)
+    parser.add_argument('--citizens', type=int, default=100_000)
+    parser.add_argument('--admins-per-district', type=int, default=1)
+    parser.add_argument('--anonymous-reports', type=int, default=150_000)
+    parser.add_argument('--months', type=int, default=24, help='Time span the data covers (default %(default)s)')
+    parser.add_argument('--end', type=lambda s: datetime.strptime(s, '%Y-%m-%d'), default=None,
+                        help='Last day of the data, YYYY-MM-DD (default 2026-01-01, for reproducibility)')
+    parser.add_argument('--chat-mean', type=float, default=2.0, help='Average chat messages per complaint')
+    parser.add_argument('--evidence-mean', type=float, default=1.2, help='Average evidence files per complaint')
+    parser.add_argument('--discard-rate', type=float, default=0.03)
+    parser.add_argument('--seed', type=int, default=2026, help='Random seed (default %(default)s)')
+    parser.add_argument('--batch', type=int, default=5000, help='Complaints per commit (default %(default)s)')
+    parser.add_argument('--password', default=os.environ.get('LOAD_PASSWORD', DEFAULT_PASSWORD))
+    parser.add_argument('--password-hash', help='Precomputed bcrypt hash for --password')
+    parser.add_argument('--reset', action='store_true', help='Delete previously seeded rows first')
+    parser.add_argument('--skip-logins', action='store_true', help='Do not generate daily admin login audit rows')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    try:
+        import pymysql
+    except ImportError:
+        sys.exit('seed_dataset needs PyMySQL: pip install pymysql')
+
+    connection = pymysql.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        port=int(os.environ.get('DB_PORT', 3306)),
+        user=os.environ.get('DB_USER', 'root'),
+        password=os.environ.get('DB_PASSWORD', ''),
+        database=os.environ.get('DB_NAME', 'securevoice'),
+        charset='utf8mb4',
+        autocommit=False,
+    )
+    seeder = Seeder(connection, options)
+    seeder.prepare_session()
+
+    if options.reset:
+        seeder.reset()
+    elif seeder.scalar(f"SELECT COUNT(*) FROM admins WHERE username LIKE '{ADMIN_PREFIX}%'"):
+        sys.exit('Seeded rows already exist; rerun with --reset to replace them')
+
+    ids = category_ids(seeder.cursor)
+    missing = [code for code in CATEGORY_WEIGHTS if code not in ids]
+    if missing:
+        seeder.log(f'Categories missing from the category table (skipped): {", ".join(missing)}')
+    generator = Generator(options, ids)
+    password_hash = options.password_hash or hash_password(options.password)
+
+    locations = seeder.seed_geography(generator)
+    admins = seeder.seed_admins(generator, password_hash)
+    citizens = seeder.seed_citizens(generator, password_hash)
+    seeder.seed_complaints(generator, citizens, admins, locations)
+    seeder.seed_anonymous_reports(generator, admins)
+    if not options.skip_logins:
+        seeder.seed_logins(generator, admins)
+    seeder.rebuild_counters()
+    seeder.analyze()
+    connection.close()
+    seeder.log('Done')
+
+
+if __name__ == '__main__':
+    main()
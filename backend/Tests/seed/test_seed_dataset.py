@@ -0,0 +1,61 @@
+"""
+Dataset Seeder Helper Tests
+Covers the geography table and the deterministic generators of
+seed_dataset.py. These run without PyMySQL or a database.
+"""
+
+from datetime import datetime
+
+import seed_dataset
+
+CATEGORY_IDS = {code: i + 1 for i, code in enumerate(seed_dataset.CATEGORY_WEIGHTS)}
+
+
+def make_generator(*argv):
+    return seed_dataset.Generator(seed_dataset.parse_args(list(argv)), CATEGORY_IDS)
+
+
+def test_geography_covers_all_districts():
+    rows = seed_dataset.districts()
+    assert len(rows) == 64
+    assert len({row[1] for row in rows}) == 64
+    assert set(seed_dataset.GEOGRAPHY) == {'Dhaka', 'Chittagong', 'Rajshahi', 'Khulna', 'Barishal', 'Sylhet',
+                                           'Rangpur', 'Mymensingh'}
+    for _, _, lat, lng, population in rows:
+        assert 20.5 < lat < 26.7 and 88.0 < lng < 92.7
+        assert population > 0
+
+
+def test_same_seed_same_data():
+    first, second = make_generator('--seed', '7'), make_generator('--seed', '7')
+    for _ in range(50):
+        assert first.timestamp() == second.timestamp()
+        assert first.point('Dhaka') == second.point('Dhaka')
+    assert make_generator('--seed', '8').timestamp() != make_generator('--seed', '7').timestamp()
+
+
+def test_timestamps_within_period():
+    generator = make_generator('--months', '6', '--end', '2025-07-01')
+    for _ in range(500):
+        moment = generator.timestamp()
+        assert generator.start <= moment < datetime(2025, 7, 2)
+
+
+def test_status_history_moves_forward():
+    generator = make_generator()
+    for _ in range(500):
+        created = generator.timestamp()
+        history = generator.status_history(created)
+        assert history[0] == ('pending', created)
+        statuses = [status for status, _ in history]
+        assert statuses == seed_dataset.STATUS_FLOW[:len(statuses)]
+        times = [moment for _, moment in history]
+        assert times == sorted(times)
+        assert times[-1] < generator.end
+
+
+def test_older_complaints_are_further_along():
+    generator = make_generator('--end', '2026-01-01')
+    old = [len(generator.status_history(datetime(2024, 2, 1))) for _ in range(1000)]
+    new = [len(generator.status_history(datetime(2025, 12, 30))) for _ in range(1000)]
+    assert sum(old) > sum(new)
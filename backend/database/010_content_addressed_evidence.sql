@@ -0,0 +1,49 @@
+-- =====================================================
+-- CONTENT-ADDRESSED EVIDENCE STORAGE
+-- Migration: 010_content_addressed_evidence.sql
+-- Purpose: Record the SHA-256 of every stored evidence file so identical
+--          uploads share one file on disk. The number of rows carrying a
+--          hash across evidence + anonymous_evidence is the file's
+--          reference count; the file is unlinked when it reaches zero.
+-- =====================================================
+
+USE `securevoice`;
+
+-- Add content_hash to evidence if it doesn't exist
+SET @column_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = 'securevoice'
+    AND TABLE_NAME = 'evidence'
+    AND COLUMN_NAME = 'content_hash'
+);
+
+SET @sql = IF(@column_exists = 0,
+    'ALTER TABLE evidence ADD COLUMN content_hash CHAR(64) DEFAULT NULL COMMENT ''SHA-256 of file content'' AFTER file_path, ADD INDEX idx_evidence_content_hash (content_hash)',
+    'SELECT "Column content_hash already exists in evidence"'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Add content_hash to anonymous_evidence if it doesn't exist
+SET @column_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = 'securevoice'
+    AND TABLE_NAME = 'anonymous_evidence'
+    AND COLUMN_NAME = 'content_hash'
+);
+
+SET @sql = IF(@column_exists = 0,
+    'ALTER TABLE anonymous_evidence ADD COLUMN content_hash CHAR(64) DEFAULT NULL COMMENT ''SHA-256 of file content'' AFTER file_path, ADD INDEX idx_anonymous_evidence_content_hash (content_hash)',
+    'SELECT "Column content_hash already exists in anonymous_evidence"'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Files uploaded before this migration keep their unique names and a NULL
+-- content_hash; they are deleted directly as before.
+
+SELECT 'Migration 010 completed: content_hash added to evidence tables' AS status;
@@ -0,0 +1,68 @@
+-- =====================================================
+-- COMPOSITE INDEXES FOR HOT QUERIES
+-- Migration: 011_composite_indexes.sql
+-- Purpose: Replace single-column lookups + filesorts on the most frequent
+--          dashboard, chat and notification queries with composite indexes
+--          that match their WHERE and ORDER BY clauses.
+-- Guarded by: backend/Tests/database/test_query_plans.py, which EXPLAINs the
+--          controller SQL and fails on full scans or unexpected filesorts.
+-- =====================================================
+
+USE `securevoice`;
+
+DELIMITER //
+DROP PROCEDURE IF EXISTS CreateIndexIfNotExists//
+CREATE PROCEDURE CreateIndexIfNotExists(
+    IN p_table VARCHAR(100),
+    IN p_index VARCHAR(100),
+    IN p_columns VARCHAR(255)
+)
+BEGIN
+    DECLARE indexExists INT DEFAULT 0;
+    SELECT COUNT(*) INTO indexExists FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index;
+    IF indexExists = 0 THEN
+        SET @sql = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, '(', p_columns, ')');
+        PREPARE stmt FROM @sql;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END//
+DELIMITER ;
+
+-- Admin case lists, dashboard stats and analytics:
+--   WHERE admin_username = ? AND (is_discarded IS NULL OR is_discarded = FALSE)
+--   ORDER BY created_at DESC
+-- is_discarded is NOT NULL (008), so the optimizer drops the IS NULL branch and
+-- this is two equalities followed by the sort column. status is included so
+-- the stats queries never touch the table rows.
+CALL CreateIndexIfNotExists('complaint', 'idx_complaint_admin_discarded_created', 'admin_username, is_discarded, created_at, status');
+
+-- User complaint lists and dashboard: WHERE username = ? ORDER BY created_at DESC
+CALL CreateIndexIfNotExists('complaint', 'idx_complaint_user_created', 'username, created_at');
+
+-- Unread admin messages and mark-as-read:
+--   WHERE complaint_id = ? AND sender_type = 'admin' AND is_read = 0 ORDER BY sent_at
+CALL CreateIndexIfNotExists('complaint_chat', 'idx_chat_complaint_sender_read', 'complaint_id, sender_type, is_read, sent_at');
+
+-- Chat history: WHERE complaint_id = ? ORDER BY sent_at
+CALL CreateIndexIfNotExists('complaint_chat', 'idx_chat_complaint_sent', 'complaint_id, sent_at');
+
+-- Unread counts and mark-as-read: WHERE complaint_id = ? AND is_read = 0
+CALL CreateIndexIfNotExists('complaint_notifications', 'idx_notifications_complaint_read', 'complaint_id, is_read');
+
+-- Notification lists: WHERE complaint_id = ? ORDER BY created_at DESC
+CALL CreateIndexIfNotExists('complaint_notifications', 'idx_notifications_complaint_created', 'complaint_id, created_at');
+
+-- Resolution times: SELECT MIN(updated_at) ... WHERE complaint_id = ? AND status = 'resolved'
+CALL CreateIndexIfNotExists('status_updates', 'idx_status_updates_complaint_status', 'complaint_id, status, updated_at');
+
+-- Anonymous report evidence: WHERE report_id = ? ORDER BY uploaded_at
+CALL CreateIndexIfNotExists('anonymous_evidence', 'idx_anonymous_evidence_report_uploaded', 'report_id, uploaded_at');
+
+DROP PROCEDURE IF EXISTS CreateIndexIfNotExists;
+
+-- Refresh statistics so the optimizer considers the new indexes immediately
+ANALYZE TABLE complaint, complaint_chat, complaint_notifications, status_updates, anonymous_evidence;
+
+SELECT 'Migration 011 completed: composite indexes added for hot queries' AS status;
@@ -0,0 +1,58 @@
+-- =====================================================
+-- COMPLAINT STATUS COUNTERS
+-- Migration: 012_complaint_counters.sql
+-- Purpose: Keep per-admin, per-user and global complaint counts by status so
+--          dashboard stats are a single primary-key read instead of scans of
+--          the complaint table. Rows are updated in the same transaction as
+--          the complaint insert / status change / delete (utils/counterUtils.js)
+--          and reconciled against the complaint table periodically.
+--
+-- Scopes:
+--   global - scope_key '' ; complaints not discarded
+--   admin  - scope_key = admin username ; complaints not discarded
+--   user   - scope_key = complainant username ; all of the user's complaints
+-- =====================================================
+
+USE `securevoice`;
+
+CREATE TABLE IF NOT EXISTS `complaint_counters` (
+    `scope` ENUM('global', 'admin', 'user') NOT NULL,
+    `scope_key` VARCHAR(100) NOT NULL DEFAULT '',
+    `total` INT NOT NULL DEFAULT 0,
+    `pending` INT NOT NULL DEFAULT 0,
+    `verifying` INT NOT NULL DEFAULT 0,
+    `investigating` INT NOT NULL DEFAULT 0,
+    `resolved` INT NOT NULL DEFAULT 0,
+    `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`scope`, `scope_key`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Initial counts (the server reconciles again on startup)
+INSERT INTO complaint_counters (scope, scope_key, total, pending, verifying, investigating, resolved)
+SELECT 'global', '', COUNT(*),
+       COALESCE(SUM(status = 'pending'), 0), COALESCE(SUM(status = 'verifying'), 0),
+       COALESCE(SUM(status = 'investigating'), 0), COALESCE(SUM(status = 'resolved'), 0)
+FROM complaint
+WHERE is_discarded = FALSE
+ON DUPLICATE KEY UPDATE total = VALUES(total), pending = VALUES(pending), verifying = VALUES(verifying),
+    investigating = VALUES(investigating), resolved = VALUES(resolved);
+
+INSERT INTO complaint_counters (scope, scope_key, total, pending, verifying, investigating, resolved)
+SELECT 'admin', admin_username, COUNT(*),
+       SUM(status = 'pending'), SUM(status = 'verifying'), SUM(status = 'investigating'), SUM(status = 'resolved')
+FROM complaint
+WHERE admin_username IS NOT NULL AND is_discarded = FALSE
+GROUP BY admin_username
+ON DUPLICATE KEY UPDATE total = VALUES(total), pending = VALUES(pending), verifying = VALUES(verifying),
+    investigating = VALUES(investigating), resolved = VALUES(resolved);
+
+INSERT INTO complaint_counters (scope, scope_key, total, pending, verifying, investigating, resolved)
+SELECT 'user', username, COUNT(*),
+       SUM(status = 'pending'), SUM(status = 'verifying'), SUM(status = 'investigating'), SUM(status = 'resolved')
+FROM complaint
+WHERE username IS NOT NULL
+GROUP BY username
+ON DUPLICATE KEY UPDATE total = VALUES(total), pending = VALUES(pending), verifying = VALUES(verifying),
+    investigating = VALUES(investigating), resolved = VALUES(resolved);
+
+SELECT 'Migration 012 completed: complaint_counters created and populated' AS status;
@@ -0,0 +1,57 @@
+-- =====================================================
+-- CASE SEARCH FULL-TEXT INDEXES
+-- Migration: 013_case_search_fulltext.sql
+-- Purpose: Back the admin case search (utils/caseSearchUtils.js) with
+--          FULLTEXT indexes instead of LIKE '%term%' scans over every case.
+--
+-- The ngram parser is used so searches match inside words and names (and work
+-- for text without spaces, e.g. Bangla/CJK), like the LIKE search it replaces.
+-- Tokens are ngram_token_size characters (default 2); the search falls back
+-- to a prefix LIKE for shorter terms.
+--
+-- The first FULLTEXT index on a table adds the hidden FTS_DOC_ID column and
+-- rebuilds the table; run this outside peak hours on large installations.
+-- =====================================================
+
+USE `securevoice`;
+
+DELIMITER //
+DROP PROCEDURE IF EXISTS CreateIndexIfNotExists//
+CREATE PROCEDURE CreateIndexIfNotExists(
+    IN p_table VARCHAR(100),
+    IN p_index VARCHAR(100),
+    IN p_columns VARCHAR(255),
+    IN p_fulltext BOOLEAN
+)
+BEGIN
+    DECLARE indexExists INT DEFAULT 0;
+    SELECT COUNT(*) INTO indexExists FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index;
+    IF indexExists = 0 THEN
+        IF p_fulltext THEN
+            SET @sql = CONCAT('CREATE FULLTEXT INDEX ', p_index, ' ON ', p_table, '(', p_columns, ') WITH PARSER ngram');
+        ELSE
+            SET @sql = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, '(', p_columns, ')');
+        END IF;
+        PREPARE stmt FROM @sql;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END//
+DELIMITER ;
+
+-- Case text: MATCH(description, location_address) AGAINST (? IN BOOLEAN MODE)
+CALL CreateIndexIfNotExists('complaint', 'ft_complaint_text', 'description, location_address', TRUE);
+
+-- Complainant: MATCH(username, fullName) AGAINST (? IN BOOLEAN MODE)
+CALL CreateIndexIfNotExists('users', 'ft_users_name', 'username, fullName', TRUE);
+
+-- Category filter: WHERE admin_username = ? AND is_discarded = FALSE AND category_id = ?
+--   ORDER BY created_at DESC
+CALL CreateIndexIfNotExists('complaint', 'idx_complaint_admin_discarded_category', 'admin_username, is_discarded, category_id, created_at', FALSE);
+
+DROP PROCEDURE IF EXISTS CreateIndexIfNotExists;
+
+ANALYZE TABLE complaint, users;
+
+SELECT 'Migration 013 completed: case search full-text indexes added' AS status;
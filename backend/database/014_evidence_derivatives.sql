@@ -0,0 +1,47 @@
+-- =====================================================
+-- IMAGE EVIDENCE DERIVATIVES
+-- Migration: 014_evidence_derivatives.sql
+-- Purpose: Track the WebP thumbnail and preview renditions produced for
+--          image evidence by the background processor
+--          (utils/imageProcessingUtils.js). Renditions have EXIF/GPS
+--          metadata removed and orientation applied.
+--
+-- Evidence is stored once per SHA-256 (010), so renditions are keyed by
+-- content_hash and shared by every evidence / anonymous_evidence row with
+-- that hash. The table doubles as the processing queue: rows start
+-- 'pending' and workers claim them with SELECT ... FOR UPDATE SKIP LOCKED.
+-- =====================================================
+
+USE `securevoice`;
+
+CREATE TABLE IF NOT EXISTS `evidence_derivatives` (
+    `content_hash` CHAR(64) NOT NULL,
+    `source_path` VARCHAR(255) NOT NULL COMMENT 'Original, relative to uploads/',
+    `status` ENUM('pending', 'processing', 'done', 'failed') NOT NULL DEFAULT 'pending',
+    `attempts` TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    `last_error` VARCHAR(255) DEFAULT NULL,
+    `width` INT DEFAULT NULL COMMENT 'Original width after orientation',
+    `height` INT DEFAULT NULL,
+    `thumbnail_path` VARCHAR(255) DEFAULT NULL COMMENT 'Relative to uploads/',
+    `preview_path` VARCHAR(255) DEFAULT NULL COMMENT 'Relative to uploads/',
+    `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    `claimed_at` TIMESTAMP NULL DEFAULT NULL,
+    `processed_at` TIMESTAMP NULL DEFAULT NULL,
+    PRIMARY KEY (`content_hash`),
+    INDEX `idx_derivatives_status_created` (`status`, `created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Queue existing content-addressed images (legacy files without a hash are left as they are)
+INSERT IGNORE INTO evidence_derivatives (content_hash, source_path)
+SELECT content_hash, MIN(file_path)
+FROM evidence
+WHERE content_hash IS NOT NULL AND file_type = 'image'
+GROUP BY content_hash;
+
+INSERT IGNORE INTO evidence_derivatives (content_hash, source_path)
+SELECT content_hash, MIN(REGEXP_REPLACE(file_path, '^/?uploads/', ''))
+FROM anonymous_evidence
+WHERE content_hash IS NOT NULL AND file_type = 'image'
+GROUP BY content_hash;
+
+SELECT 'Migration 014 completed: evidence_derivatives created and existing images queued' AS status;
@@ -0,0 +1,31 @@
+-- =====================================================
+-- FILE DELETION QUEUE
+-- Migration: 015_file_deletion_queue.sql
+-- Purpose: Durable queue of upload files to unlink
+--          (utils/storageGcUtils.js). Deleting evidence rows enqueues
+--          their files in the same transaction; a background worker
+--          unlinks them once nothing references them, retrying failures
+--          with backoff. The orphan collector enqueues files that no
+--          evidence row refers to.
+--
+-- Rows are removed once the file is gone. A row whose attempts ran out
+-- keeps next_attempt_at NULL and its last_error for inspection.
+-- =====================================================
+
+USE `securevoice`;
+
+CREATE TABLE IF NOT EXISTS `file_deletion_queue` (
+    `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    `file_path` VARCHAR(500) NOT NULL COMMENT 'Relative to uploads/',
+    `content_hash` CHAR(64) DEFAULT NULL COMMENT 'Set for content-addressed files: unlinked only when unreferenced',
+    `reason` ENUM('released', 'orphan') NOT NULL DEFAULT 'released',
+    `attempts` TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    `last_error` VARCHAR(255) DEFAULT NULL,
+    `next_attempt_at` TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `uq_file_deletion_path` (`file_path`),
+    INDEX `idx_file_deletion_due` (`next_attempt_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+SELECT 'Migration 015 completed: file_deletion_queue created' AS status;
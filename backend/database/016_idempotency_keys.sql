@@ -0,0 +1,30 @@
+-- =====================================================
+-- IDEMPOTENCY KEYS
+-- Migration: 016_idempotency_keys.sql
+-- Purpose: Remember the response to each submission sent with an
+--          Idempotency-Key header (middleware/idempotencyMiddleware.js),
+--          so a client retrying a complaint, anonymous report or chat
+--          message gets the stored result instead of a duplicate.
+--
+-- Keys are scoped per endpoint and per owner (user id, admin username,
+-- or '' for anonymous submissions). A row is 'processing' while its first
+-- request runs and 'done' once the response is stored; expired rows are
+-- purged by a background job.
+-- =====================================================
+
+USE `securevoice`;
+
+CREATE TABLE IF NOT EXISTS `idempotency_keys` (
+    `scope` VARCHAR(32) NOT NULL COMMENT 'Endpoint, e.g. complaint_submit',
+    `owner` VARCHAR(64) NOT NULL DEFAULT '',
+    `idempotency_key` VARCHAR(128) NOT NULL,
+    `status` ENUM('processing', 'done') NOT NULL DEFAULT 'processing',
+    `response_status` SMALLINT UNSIGNED DEFAULT NULL,
+    `response_body` MEDIUMTEXT DEFAULT NULL COMMENT 'JSON response replayed to retries',
+    `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `expires_at` TIMESTAMP NOT NULL,
+    PRIMARY KEY (`scope`, `owner`, `idempotency_key`),
+    INDEX `idx_idempotency_expires` (`expires_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+SELECT 'Migration 016 completed: idempotency_keys created' AS status;
@@ -0,0 +1,27 @@
+-- =====================================================
+-- REVOKED TOKENS
+-- Migration: 017_revoked_tokens.sql
+-- Purpose: Denylist for the optional signed-token authentication mode
+--          (utils/tokenUtils.js). Each server keeps an in-memory copy of
+--          this table and reloads it periodically, so validating a bearer
+--          token never needs a database or session store lookup.
+--
+-- `token_id` is either a token family id (every access/refresh token
+-- issued from one login, revoked on logout) or the id of a single refresh
+-- token that has been rotated. The primary key makes rotation atomic
+-- across servers: a refresh token can only be exchanged once. Rows are
+-- purged once every token they cover has expired.
+-- =====================================================
+
+USE `securevoice`;
+
+CREATE TABLE IF NOT EXISTS `revoked_tokens` (
+    `token_id` VARCHAR(64) NOT NULL,
+    `kind` ENUM('family', 'refresh') NOT NULL,
+    `expires_at` TIMESTAMP NOT NULL COMMENT 'When the last token covered by this row expires',
+    `revoked_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`token_id`),
+    INDEX `idx_revoked_tokens_expires` (`expires_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+SELECT 'Migration 017 completed: revoked_tokens created' AS status;
@@ -0,0 +1,27 @@
+-- =====================================================
+-- RATE LIMIT BUCKETS
+-- Migration: 018_rate_limit_buckets.sql
+-- Purpose: Shared token buckets for utils/rateLimitUtils.js when
+--          RATE_LIMIT_STORE=mysql, so every server in a cluster draws
+--          from the same budget. Single-server deployments keep buckets
+--          in memory and do not use this table.
+--
+-- Each bucket is stored as its theoretical arrival time (`tat`, epoch ms):
+-- a request is allowed while taking one more token would not push `tat`
+-- more than the bucket's refill period ahead of now. A single
+-- INSERT ... ON DUPLICATE KEY UPDATE takes a token and reports the
+-- outcome. Rows are purged once their bucket is full again (`expires_at`).
+-- =====================================================
+
+USE `securevoice`;
+
+CREATE TABLE IF NOT EXISTS `rate_limit_buckets` (
+    `bucket_key` VARCHAR(128) NOT NULL COMMENT 'policy:dimension:hash',
+    `tat` BIGINT UNSIGNED NOT NULL COMMENT 'Theoretical arrival time, epoch ms',
+    `last_result` BIGINT UNSIGNED NOT NULL COMMENT 'tat * 2, plus 1 if the last request was refused',
+    `expires_at` TIMESTAMP(3) NOT NULL,
+    PRIMARY KEY (`bucket_key`),
+    INDEX `idx_rate_limit_expires` (`expires_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+SELECT 'Migration 018 completed: rate_limit_buckets created' AS status;
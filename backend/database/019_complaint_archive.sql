@@ -0,0 +1,171 @@
+-- =====================================================
+-- COMPLAINT ARCHIVE
+-- Migration: 019_complaint_archive.sql
+-- Purpose: Cold storage for closed cases (utils/archiveUtils.js).
+--          Resolved or discarded complaints with no activity for
+--          ARCHIVE_AFTER_DAYS are moved, with their evidence rows, status
+--          history, chat, notifications and audit log entries, out of the
+--          hot tables in batched background transactions. Reads of an
+--          archived case fall back to these tables.
+--
+-- Archive tables keep the hot tables' ids and columns plus `archived_at`,
+-- and are partitioned by year of archival. Partitioned InnoDB tables
+-- cannot have foreign keys, and every unique key must include the
+-- partitioning column, hence (id, archived_at) primary keys. The archiver
+-- adds next year's partition ahead of time; `pmax` only catches rows if it
+-- falls behind. Old years can be dropped wholesale with
+--   ALTER TABLE <table> DROP PARTITION p2026;
+-- once retention allows.
+-- =====================================================
+
+USE `securevoice`;
+
+DELIMITER //
+DROP PROCEDURE IF EXISTS CreateIndexIfNotExists//
+CREATE PROCEDURE CreateIndexIfNotExists(
+    IN p_table VARCHAR(100),
+    IN p_index VARCHAR(100),
+    IN p_columns VARCHAR(255)
+)
+BEGIN
+    DECLARE indexExists INT DEFAULT 0;
+    SELECT COUNT(*) INTO indexExists FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index;
+    IF indexExists = 0 THEN
+        SET @sql = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, '(', p_columns, ')');
+        PREPARE stmt FROM @sql;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END//
+DELIMITER ;
+
+-- Archiver candidate scans: closed cases by age, oldest first
+CALL CreateIndexIfNotExists('complaint', 'idx_complaint_status_created', 'status, created_at');
+CALL CreateIndexIfNotExists('complaint', 'idx_complaint_discarded_created', 'is_discarded, created_at');
+
+CREATE TABLE IF NOT EXISTS `complaint_archive` (
+    `complaint_id` INT NOT NULL,
+    `description` TEXT,
+    `created_at` DATETIME DEFAULT NULL,
+    `status` ENUM('pending', 'verifying', 'investigating', 'resolved') DEFAULT NULL,
+    `username` VARCHAR(100) DEFAULT NULL,
+    `admin_username` VARCHAR(100) DEFAULT NULL,
+    `location_id` INT DEFAULT NULL,
+    `complaint_type` VARCHAR(100) DEFAULT NULL,
+    `location_address` TEXT,
+    `category_id` INT DEFAULT NULL,
+    `latitude` DECIMAL(10,8) DEFAULT NULL,
+    `longitude` DECIMAL(11,8) DEFAULT NULL,
+    `location_accuracy_radius` INT DEFAULT NULL,
+    `is_discarded` BOOLEAN NOT NULL DEFAULT FALSE,
+    `discarded_at` TIMESTAMP NULL DEFAULT NULL,
+    `discarded_by` VARCHAR(50) DEFAULT NULL,
+    `archived_at` DATETIME NOT NULL,
+    PRIMARY KEY (`complaint_id`, `archived_at`),
+    KEY `idx_complaint_archive_user_created` (`username`, `created_at`),
+    KEY `idx_complaint_archive_admin_created` (`admin_username`, `created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+PARTITION BY RANGE COLUMNS(`archived_at`) (
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS `evidence_archive` (
+    `evidence_id` INT NOT NULL,
+    `uploaded_at` DATETIME DEFAULT NULL,
+    `file_type` VARCHAR(50) DEFAULT NULL,
+    `file_path` VARCHAR(255) DEFAULT NULL,
+    `content_hash` CHAR(64) DEFAULT NULL,
+    `complaint_id` INT DEFAULT NULL,
+    `archived_at` DATETIME NOT NULL,
+    PRIMARY KEY (`evidence_id`, `archived_at`),
+    KEY `idx_evidence_archive_complaint` (`complaint_id`),
+    -- Reference counts and the orphan collector look archived files up too
+    KEY `idx_evidence_archive_content_hash` (`content_hash`),
+    KEY `idx_evidence_archive_file_path` (`file_path`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+PARTITION BY RANGE COLUMNS(`archived_at`) (
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS `status_updates_archive` (
+    `update_id` INT NOT NULL,
+    `status` ENUM('pending', 'verifying', 'investigating', 'resolved') DEFAULT NULL,
+    `remarks` TEXT,
+    `updated_at` DATETIME DEFAULT NULL,
+    `updated_by` VARCHAR(100) DEFAULT NULL,
+    `complaint_id` INT DEFAULT NULL,
+    `archived_at` DATETIME NOT NULL,
+    PRIMARY KEY (`update_id`, `archived_at`),
+    KEY `idx_status_updates_archive_complaint` (`complaint_id`, `updated_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+PARTITION BY RANGE COLUMNS(`archived_at`) (
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS `complaint_chat_archive` (
+    `chat_id` INT NOT NULL,
+    `complaint_id` INT NOT NULL,
+    `sender_type` ENUM('user', 'admin') NOT NULL,
+    `sender_username` VARCHAR(100) NOT NULL,
+    `message` TEXT NOT NULL,
+    `sent_at` TIMESTAMP NULL DEFAULT NULL,
+    `is_read` TINYINT(1) DEFAULT '0',
+    `archived_at` DATETIME NOT NULL,
+    PRIMARY KEY (`chat_id`, `archived_at`),
+    KEY `idx_chat_archive_complaint_sent` (`complaint_id`, `sent_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+PARTITION BY RANGE COLUMNS(`archived_at`) (
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS `complaint_notifications_archive` (
+    `notification_id` INT NOT NULL,
+    `complaint_id` INT NOT NULL,
+    `message` TEXT NOT NULL,
+    `type` ENUM('status_change', 'admin_comment', 'system') DEFAULT 'system',
+    `is_read` TINYINT(1) DEFAULT '0',
+    `created_at` TIMESTAMP NULL DEFAULT NULL,
+    `archived_at` DATETIME NOT NULL,
+    PRIMARY KEY (`notification_id`, `archived_at`),
+    KEY `idx_notifications_archive_complaint` (`complaint_id`, `created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+PARTITION BY RANGE COLUMNS(`archived_at`) (
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS `admin_audit_logs_archive` (
+    `log_id` INT NOT NULL,
+    `admin_username` VARCHAR(50) NOT NULL,
+    `action` VARCHAR(100) NOT NULL,
+    `action_details` TEXT DEFAULT NULL,
+    `ip_address` VARCHAR(45) DEFAULT NULL,
+    `user_agent` VARCHAR(500) DEFAULT NULL,
+    `complaint_id` INT DEFAULT NULL,
+    `target_username` VARCHAR(50) DEFAULT NULL,
+    `result` ENUM('success', 'failure', 'warning') DEFAULT 'success',
+    `timestamp` TIMESTAMP NULL DEFAULT NULL,
+    `archived_at` DATETIME NOT NULL,
+    PRIMARY KEY (`log_id`, `archived_at`),
+    KEY `idx_audit_archive_complaint` (`complaint_id`),
+    KEY `idx_audit_archive_admin_timestamp` (`admin_username`, `timestamp`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+PARTITION BY RANGE COLUMNS(`archived_at`) (
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+ANALYZE TABLE complaint;
+
+SELECT 'Migration 019 completed: complaint archive tables created' AS status;
@@ -0,0 +1,42 @@
+-- =====================================================
+-- EMAIL OUTBOX
+-- Migration: 020_email_outbox.sql
+-- Purpose: Durable queue of outgoing email (utils/emailOutboxUtils.js).
+--          Requests insert their messages here, inside their own
+--          transaction where they have one, instead of talking to SMTP
+--          while the client waits. A background dispatcher claims due
+--          rows with SKIP LOCKED and sends them over a pooled SMTP
+--          transport, retrying temporary failures with backoff.
+--
+-- Sent rows drop their body (it may hold an OTP) and are purged after
+-- EMAIL_OUTBOX_RETENTION_HOURS together with failed ones; until then a
+-- failed row keeps its last_error for inspection. Messages past
+-- expires_at (OTP codes) are not sent late but marked 'expired'.
+-- =====================================================
+
+USE `securevoice`;
+
+CREATE TABLE IF NOT EXISTS `email_outbox` (
+    `id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    `recipient` VARCHAR(320) NOT NULL,
+    `recipient_domain` VARCHAR(255) NOT NULL COMMENT 'Lower-cased, for per-domain throttling',
+    `subject` VARCHAR(255) NOT NULL,
+    `html` MEDIUMTEXT DEFAULT NULL COMMENT 'Cleared once sent',
+    `priority` TINYINT UNSIGNED NOT NULL DEFAULT 5 COMMENT 'Lower is sent first; OTP codes are 0',
+    `status` ENUM('pending', 'sending', 'sent', 'failed', 'expired') NOT NULL DEFAULT 'pending',
+    `attempts` TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    `last_error` VARCHAR(255) DEFAULT NULL,
+    `message_id` VARCHAR(255) DEFAULT NULL,
+    `next_attempt_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `expires_at` TIMESTAMP NULL DEFAULT NULL,
+    `claimed_at` TIMESTAMP NULL DEFAULT NULL,
+    `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    `sent_at` TIMESTAMP NULL DEFAULT NULL,
+    PRIMARY KEY (`id`),
+    -- Dispatcher claims: due pending rows, most urgent first
+    INDEX `idx_email_outbox_due` (`status`, `priority`, `next_attempt_at`),
+    -- Retention purge
+    INDEX `idx_email_outbox_created` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+SELECT 'Migration 020 completed: email_outbox created' AS status;
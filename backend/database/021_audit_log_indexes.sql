@@ -0,0 +1,47 @@
+-- =====================================================
+-- AUDIT LOG INDEXES
+-- Migration: 021_audit_log_indexes.sql
+-- Purpose: The audit log views read admin_audit_logs and
+--          admin_audit_logs_archive (019) as two branches, each taking its
+--          newest rows with ORDER BY timestamp DESC LIMIT ?, and merge
+--          them (utils/auditUtils.js). Each branch needs an index that
+--          serves its filter and sort, so a page load reads only the rows
+--          it shows however long the log history grows.
+-- Guarded by: backend/Tests/database/test_query_plans.py (audit_log_* plans).
+-- =====================================================
+
+USE `securevoice`;
+
+DELIMITER //
+DROP PROCEDURE IF EXISTS CreateIndexIfNotExists//
+CREATE PROCEDURE CreateIndexIfNotExists(
+    IN p_table VARCHAR(100),
+    IN p_index VARCHAR(100),
+    IN p_columns VARCHAR(255)
+)
+BEGIN
+    DECLARE indexExists INT DEFAULT 0;
+    SELECT COUNT(*) INTO indexExists FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index;
+    IF indexExists = 0 THEN
+        SET @sql = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, '(', p_columns, ')');
+        PREPARE stmt FROM @sql;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END//
+DELIMITER ;
+
+-- An admin's own log: WHERE admin_username = ? ORDER BY timestamp DESC LIMIT ?
+-- (the archive already has idx_audit_archive_admin_timestamp)
+CALL CreateIndexIfNotExists('admin_audit_logs', 'idx_audit_admin_timestamp', 'admin_username, timestamp');
+
+-- Super admin log: ORDER BY timestamp DESC LIMIT ?
+-- (the live table already has idx_timestamp)
+CALL CreateIndexIfNotExists('admin_audit_logs_archive', 'idx_audit_archive_timestamp', 'timestamp');
+
+DROP PROCEDURE IF EXISTS CreateIndexIfNotExists;
+
+ANALYZE TABLE admin_audit_logs, admin_audit_logs_archive;
+
+SELECT 'Migration 021 completed: audit log indexes added' AS status;
@@ -3,16 +3,36 @@ const path = require('path');
 require('dotenv').config();
 
 const { helmetConfig, corsConfig, sessionConfig, jsonParser, urlencodedParser } = require('./middleware/securityMiddleware');
-const { setupStatic } = require('./middleware/staticMiddleware');
+const { setupStatic, resolvePage } = require('./middleware/staticMiddleware');
+const { shedWhenPoolSaturated, handlePoolBusy } = require('./middleware/poolMiddleware');
+const { trackWrites } = require('./middleware/readRoutingMiddleware');
+const { recordRequestMetrics } = require('./middleware/metricsMiddleware');
+const { tokenAuth } = require('./middleware/tokenAuthMiddleware');
+const metricsController = require('./controllers/metricsController');
+const pool = require('./db');
 
 const app = express();
 
+// Behind a reverse proxy, TRUST_PROXY (hop count or subnet list) makes req.ip
+// the real client address; rate limits key on it
+if (process.env.TRUST_PROXY) {
+    const hops = Number(process.env.TRUST_PROXY);
+    app.set('trust proxy', Number.isInteger(hops) ? hops : process.env.TRUST_PROXY);
+}
+
+// Per-route request metrics (first, so latency covers the whole stack)
+app.use(recordRequestMetrics);
+
 // Security & middleware
 app.use(helmetConfig);
 app.use(corsConfig);
 app.use(jsonParser);
 app.use(urlencodedParser);
+// Bearer tokens (when enabled) replace the session lookup for that request
+app.use(tokenAuth);
 app.use(sessionConfig);
+// Keep a user's reads on the primary right after their own writes
+app.use(trackWrites);
 
 // View engine
 app.set('view engine', 'ejs');
@@ -21,16 +41,24 @@ app.set('views', path.join(__dirname, 'views'));
 // Static files
 setupStatic(app);
 
+// Prometheus scrape endpoint (ahead of load shedding so it stays readable under load)
+app.get('/api/metrics', metricsController.getMetrics);
+
+// Fast-fail with 503 while the database pool queue is full
+app.use(shedWhenPoolSaturated);
+
 // Mount all routes
 const routes = require('./routes');
 app.use('/', routes);
 
 // Health check endpoint
 app.get('/api/health', (req, res) => {
+    const { connectionLimit, open, idle, active, waiting } = pool.getPoolStats(0);
     res.json({ 
         status: 'OK', 
         message: 'SecureVoice API is running',
-        timestamp: new Date().toISOString()
+        timestamp: new Date().toISOString(),
+        database: { connectionLimit, open, idle, active, waiting }
     });
 });
 
@@ -41,12 +69,16 @@ app.use('/api/*', (req, res) => {
 
 // Catch all handler - serve index.html for SPA routing
 app.get('*', (req, res) => {
-    res.sendFile(path.join(__dirname, '../../frontend/index.html'));
+    res.sendFile(resolvePage(path.join(__dirname, '../../frontend/index.html')));
 });
 
 // Error handling middleware
 app.use((err, req, res, next) => {
+    if (handlePoolBusy(res, err)) return;
     console.error('Error:', err.stack);
+    if (err.type === 'entity.too.large') {
+        return res.status(413).json({ error: 'Request body too large' });
+    }
     res.status(500).json({ 
         error: 'Something went wrong!',
         message: process.env.NODE_ENV === 'development' ? err.message : 'Internal server error'
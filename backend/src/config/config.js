@@ -22,13 +22,17 @@ module.exports = {
     
     // Email config
     email: {
-        host: 'smtp.gmail.com',
-        port: 587,
-        secure: false,
+        host: process.env.EMAIL_HOST || 'smtp.gmail.com',
+        port: parseInt(process.env.EMAIL_PORT) || 587,
+        secure: process.env.EMAIL_SECURE === 'true',
         auth: {
             user: process.env.EMAIL_USER,
-            pass: process.env.EMAIL_PASS
-        }
+            pass: process.env.EMAIL_PASS || process.env.EMAIL_PASSWORD
+        },
+        from: process.env.EMAIL_FROM || process.env.EMAIL_USER,
+        // Pooled SMTP connections, shared by the outbox dispatcher
+        maxConnections: parseInt(process.env.EMAIL_MAX_CONNECTIONS) || 4,
+        maxMessages: 100
     },
     
     // Bcrypt config
@@ -15,6 +15,20 @@ const {
     getAddressHierarchy,
     getAllCategories
 } = require('../utils/helperUtils');
+const { MicroCache } = require('../utils/cacheUtils');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
+
+// Reference data shared by every caller and rarely edited
+const REFERENCE_CACHE = { ttlMs: 5 * 60 * 1000, staleMs: 60 * 60 * 1000 };
+const caches = {
+    divisions: new MicroCache('address-divisions', REFERENCE_CACHE),
+    districts: new MicroCache('address-districts', REFERENCE_CACHE),
+    policeStations: new MicroCache('address-police-stations', REFERENCE_CACHE),
+    unions: new MicroCache('address-unions', REFERENCE_CACHE),
+    villages: new MicroCache('address-villages', REFERENCE_CACHE),
+    hierarchy: new MicroCache('address-hierarchy', REFERENCE_CACHE),
+    categories: new MicroCache('categories', REFERENCE_CACHE)
+};
 
 /**
  * Get all divisions
@@ -22,13 +36,14 @@ const {
  */
 exports.getDivisions = async (req, res) => {
     try {
-        const divisions = await getAllDivisions();
+        const divisions = await caches.divisions.get('all', getAllDivisions);
         res.json({
             success: true,
             divisions
         });
     } catch (error) {
         console.error('Get divisions error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve divisions'
@@ -47,9 +62,10 @@ exports.getDistricts = async (req, res) => {
         
         let districts;
         if (divisionId) {
-            districts = await getDistrictsByDivision(parseInt(divisionId));
+            const id = parseInt(divisionId);
+            districts = await caches.districts.get(`division:${id}`, () => getDistrictsByDivision(id));
         } else {
-            districts = await getAllDistricts();
+            districts = await caches.districts.get('all', getAllDistricts);
         }
         
         res.json({
@@ -58,6 +74,7 @@ exports.getDistricts = async (req, res) => {
         });
     } catch (error) {
         console.error('Get districts error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve districts'
@@ -80,7 +97,7 @@ exports.getPoliceStations = async (req, res) => {
             });
         }
         
-        const policeStations = await getPoliceStationsByDistrict(district);
+        const policeStations = await caches.policeStations.get(district.toLowerCase(), () => getPoliceStationsByDistrict(district));
         
         res.json({
             success: true,
@@ -88,6 +105,7 @@ exports.getPoliceStations = async (req, res) => {
         });
     } catch (error) {
         console.error('Get police stations error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve police stations'
@@ -110,7 +128,7 @@ exports.getUnions = async (req, res) => {
             });
         }
         
-        const unions = await getUnionsByPoliceStation(parseInt(policeStationId));
+        const unions = await caches.unions.get(String(parseInt(policeStationId)), () => getUnionsByPoliceStation(parseInt(policeStationId)));
         
         res.json({
             success: true,
@@ -118,6 +136,7 @@ exports.getUnions = async (req, res) => {
         });
     } catch (error) {
         console.error('Get unions error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve unions'
@@ -140,7 +159,7 @@ exports.getVillages = async (req, res) => {
             });
         }
         
-        const villages = await getVillagesByUnion(parseInt(unionId));
+        const villages = await caches.villages.get(String(parseInt(unionId)), () => getVillagesByUnion(parseInt(unionId)));
         
         res.json({
             success: true,
@@ -148,6 +167,7 @@ exports.getVillages = async (req, res) => {
         });
     } catch (error) {
         console.error('Get villages error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve villages'
@@ -161,7 +181,7 @@ exports.getVillages = async (req, res) => {
  */
 exports.getFullAddressHierarchy = async (req, res) => {
     try {
-        const hierarchy = await getAddressHierarchy();
+        const hierarchy = await caches.hierarchy.get('all', getAddressHierarchy);
         
         // Transform into nested structure for easy frontend consumption
         const nested = {};
@@ -229,6 +249,7 @@ exports.getFullAddressHierarchy = async (req, res) => {
         });
     } catch (error) {
         console.error('Get address hierarchy error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve address hierarchy'
@@ -242,7 +263,7 @@ exports.getFullAddressHierarchy = async (req, res) => {
  */
 exports.getCategories = async (req, res) => {
     try {
-        const categories = await getAllCategories();
+        const categories = await caches.categories.get('all', getAllCategories);
         
         res.json({
             success: true,
@@ -250,6 +271,7 @@ exports.getCategories = async (req, res) => {
         });
     } catch (error) {
         console.error('Get categories error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve categories'
@@ -299,6 +321,7 @@ exports.searchLocations = async (req, res) => {
         });
     } catch (error) {
         console.error('Search locations error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to search locations'
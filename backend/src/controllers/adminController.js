@@ -1,7 +1,13 @@
 const pool = require('../db');
 const path = require('path');
+const { resolvePage } = require('../middleware/staticMiddleware');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
 const { createNotification } = require('../utils/notificationUtils');
-const { logAdminAction, getAdminAuditLogs } = require('../utils/auditUtils');
+const { logAdminAction, logAdminActions, getAdminAuditLogs } = require('../utils/auditUtils');
+const { getDuplicateCounts } = require('../utils/evidenceStoreUtils');
+const counters = require('../utils/counterUtils');
+const archive = require('../utils/archiveUtils');
+const caseSearch = require('../utils/caseSearchUtils');
 
 // Get Admin Dashboard
 exports.getAdminDashboard = async (req, res) => {
@@ -46,9 +52,10 @@ exports.getAdminDashboard = async (req, res) => {
         });
 
         // Serve the new admin dashboard HTML file
-        res.sendFile(path.join(__dirname, '../../../frontend/src/pages/admin_dashboard.html'));
+        res.sendFile(resolvePage(path.join(__dirname, '../../../frontend/src/pages/admin_dashboard.html')));
     } catch (err) {
         console.error("Dashboard error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).send("Error loading dashboard");
     }
 };
@@ -77,6 +84,7 @@ exports.getAdminSettings = async (req, res) => {
         res.json({ success: true, settings: results[0] });
     } catch (err) {
         console.error("Get settings error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching settings" });
     }
 };
@@ -103,6 +111,7 @@ exports.updateAdminSettings = async (req, res) => {
         res.json({ success: true, message: "Settings updated successfully" });
     } catch (err) {
         console.error("Update settings error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error updating settings" });
     }
 };
@@ -128,6 +137,7 @@ exports.updateAdminProfile = async (req, res) => {
         res.json({ success: true, message: "Profile updated successfully" });
     } catch (err) {
         console.error("Update profile error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error updating profile" });
     }
 };
@@ -148,6 +158,10 @@ exports.getAdminChat = async (req, res) => {
         );
 
         if (results.length === 0) {
+            // Closed cases moved to the archive stay readable
+            if (await archive.findArchivedComplaint(complaintId, { adminUsername })) {
+                return res.json({ success: true, messages: await archive.getArchivedChat(complaintId), archived: true });
+            }
             return res.status(404).json({ success: false, message: "Complaint not found" });
         }
 
@@ -165,6 +179,7 @@ exports.getAdminChat = async (req, res) => {
         res.json({ success: true, messages: messages });
     } catch (err) {
         console.error("Get chat error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching messages" });
     }
 };
@@ -183,18 +198,7 @@ exports.sendAdminChatMessage = async (req, res) => {
             return res.status(400).json({ success: false, message: "Missing required fields" });
         }
 
-        // Check for duplicates
-        const [duplicates] = await pool.query(
-            `SELECT COUNT(*) as count 
-             FROM complaint_chat 
-             WHERE complaint_id = ? AND sender_username = ? AND sender_type = 'admin'
-             AND message = ? AND sent_at > DATE_SUB(NOW(), INTERVAL 5 SECOND)`,
-            [complaintId, adminUsername, message.trim()]
-        );
-
-        if (duplicates[0].count > 0) {
-            return res.status(429).json({ success: false, message: "Duplicate message detected" });
-        }
+        // Retried sends are answered by the Idempotency-Key middleware
 
         // Verify complaint
         const [results] = await pool.query(
@@ -202,6 +206,10 @@ exports.sendAdminChatMessage = async (req, res) => {
             [complaintId]
         );
 
+        if (results.length === 0 && await archive.findArchivedComplaint(complaintId, { adminUsername })) {
+            return res.status(409).json({ success: false, message: "This complaint is closed and archived" });
+        }
+
         if (results.length === 0 || results[0].admin_username !== adminUsername) {
             return res.status(403).json({ success: false, message: "Access denied" });
         }
@@ -219,6 +227,7 @@ exports.sendAdminChatMessage = async (req, res) => {
         res.json({ success: true, message: "Message sent successfully" });
     } catch (err) {
         console.error("Send chat message error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error sending message" });
     }
 };
@@ -233,95 +242,76 @@ exports.getComplaintEvidence = async (req, res) => {
         const complaintId = req.params.complaintId;
         const adminUsername = req.session.adminUsername;
 
-        const [complaintResults] = await pool.query(
+        let [complaintResults] = await pool.query(
             "SELECT * FROM complaint WHERE complaint_id = ? AND admin_username = ?",
             [complaintId, adminUsername]
         );
 
-        if (complaintResults.length === 0) {
-            return res.status(404).json({ success: false, message: "Complaint not found" });
-        }
-
-        const [evidenceResults] = await pool.query(
-            "SELECT * FROM evidence WHERE complaint_id = ?",
-            [complaintId]
-        );
+        let evidenceResults;
+        if (complaintResults.length > 0) {
+            [evidenceResults] = await pool.query(
+                `SELECT e.*, d.status as processing_status, d.width, d.height,
+                        d.thumbnail_path IS NOT NULL as has_renditions
+                 FROM evidence e
+                 LEFT JOIN evidence_derivatives d ON d.content_hash = e.content_hash
+                 WHERE e.complaint_id = ?`,
+                [complaintId]
+            );
+        } else {
+            const archived = await archive.findArchivedComplaint(complaintId, { adminUsername });
+            if (!archived) {
+                return res.status(404).json({ success: false, message: "Complaint not found" });
+            }
+            complaintResults = [archived];
+            evidenceResults = await archive.getArchivedEvidence(complaintId);
+        }
+
+        // Identical files submitted elsewhere share a content hash
+        const duplicateCounts = await getDuplicateCounts(evidenceResults.map(e => e.content_hash));
+        const evidence = evidenceResults.map(({ has_renditions, ...e }) => ({
+            ...e,
+            url: `/evidence/${e.evidence_id}`,
+            // Processed images: load these first, the original on demand
+            thumbnail_url: has_renditions ? `/evidence/${e.evidence_id}?variant=thumb` : null,
+            preview_url: has_renditions ? `/evidence/${e.evidence_id}?variant=preview` : null,
+            duplicate_count: e.content_hash ? (duplicateCounts[e.content_hash] || 1) - 1 : 0
+        }));
 
         res.json({
             success: true,
-            evidence: evidenceResults,
+            evidence: evidence,
             complaint: complaintResults[0]
         });
     } catch (err) {
         console.error("Get evidence error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching evidence" });
     }
 };
 
-// Get Admin Cases (with filters)
+// Get Admin Cases (search, filters, pagination and facets)
 exports.getAdminCases = async (req, res) => {
     try {
         if (!req.session.adminId) {
             return res.status(401).json({ success: false, message: "Not authenticated" });
         }
 
-        const adminUsername = req.session.adminUsername;
-        const { username, dateFrom, dateTo } = req.query;
-
-        let casesQuery = `
-            SELECT 
-                c.complaint_id,
-                c.username as complainant_username,
-                COALESCE(u.fullName, 'N/A') as complainant_fullname,
-                COALESCE(cat.name, c.complaint_type, 'General') as complaint_type,
-                c.category_id,
-                cat.name as category_name,
-                cat.crime_code,
-                c.created_at,
-                c.status,
-                COALESCE(c.description, '') as description,
-                COALESCE(c.location_address, '') as location_address,
-                COALESCE(ac.last_updated, c.created_at) as last_updated
-            FROM complaint c 
-            INNER JOIN users u ON c.username = u.username
-            LEFT JOIN category cat ON c.category_id = cat.category_id
-            LEFT JOIN admin_cases ac ON c.complaint_id = ac.complaint_id AND ac.admin_username = ?
-            WHERE c.admin_username = ? AND (c.is_discarded IS NULL OR c.is_discarded = FALSE)
-        `;
-
-        const queryParams = [adminUsername, adminUsername];
-
-        if (username && username.trim() !== '') {
-            casesQuery += ' AND (LOWER(c.username) LIKE LOWER(?) OR LOWER(COALESCE(u.fullName, "")) LIKE LOWER(?))';
-            const searchTerm = `%${username.trim()}%`;
-            queryParams.push(searchTerm, searchTerm);
-        }
-
-        if (dateFrom && dateFrom.trim() !== '') {
-            casesQuery += ' AND DATE(c.created_at) >= ?';
-            queryParams.push(dateFrom);
-        }
-
-        if (dateTo && dateTo.trim() !== '') {
-            casesQuery += ' AND DATE(c.created_at) <= ?';
-            queryParams.push(dateTo);
-        }
-
-        casesQuery += ' ORDER BY c.created_at DESC';
-
-        const [results] = await pool.query(casesQuery, queryParams);
-
-        const analytics = {
-            total: results.length,
-            pending: results.filter(c => c.status === 'pending').length,
-            verifying: results.filter(c => c.status === 'verifying').length,
-            investigating: results.filter(c => c.status === 'investigating').length,
-            resolved: results.filter(c => c.status === 'resolved').length
-        };
+        const filters = caseSearch.parseCaseFilters(req.query);
+        const { cases, facets, pagination } = await caseSearch.searchCases(req.session.adminUsername, filters);
 
-        res.json({ success: true, cases: results, analytics: analytics });
+        res.json({
+            success: true,
+            cases: cases,
+            analytics: facets.status,
+            facets: facets,
+            pagination: pagination
+        });
     } catch (err) {
+        if (err instanceof caseSearch.CaseSearchError) {
+            return res.status(err.status).json({ success: false, message: err.message });
+        }
         console.error("Get cases error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching cases" });
     }
 };
@@ -352,6 +342,9 @@ exports.updateComplaintStatus = async (req, res) => {
         );
 
         if (results.length === 0) {
+            if (await archive.findArchivedComplaint(complaintIdInt, { adminUsername })) {
+                return res.status(409).json({ success: false, message: 'This complaint is closed and archived' });
+            }
             return res.status(404).json({ success: false, message: 'Complaint not found' });
         }
 
@@ -369,11 +362,18 @@ exports.updateComplaintStatus = async (req, res) => {
         await connection.beginTransaction();
 
         try {
+            // Lock the row so concurrent updates move the counters from the right status
+            const [locked] = await connection.query(
+                'SELECT username, admin_username, status, is_discarded FROM complaint WHERE complaint_id = ? FOR UPDATE',
+                [complaintIdInt]
+            );
+
             // Update complaint status
             await connection.query(
                 'UPDATE complaint SET status = ? WHERE complaint_id = ?',
                 [newStatus, complaintIdInt]
             );
+            await counters.recordStatusChange(connection, locked[0], newStatus);
 
             // Insert status update
             await connection.query(
@@ -420,10 +420,159 @@ exports.updateComplaintStatus = async (req, res) => {
         }
     } catch (err) {
         console.error("Update status error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error updating status" });
     }
 };
 
+// Bulk Update Complaint Status
+// Ownership, updates, history, admin_cases, notifications and counters are
+// set-based statements in one transaction; audit rows are one insert after it.
+const BULK_STATUS_MAX = 500;
+
+exports.bulkUpdateComplaintStatus = async (req, res) => {
+    try {
+        if (!req.session.adminId) {
+            return res.status(401).json({ success: false, message: "Unauthorized access" });
+        }
+
+        const { complaintIds, newStatus } = req.body;
+        const adminUsername = req.session.adminUsername;
+
+        if (!Array.isArray(complaintIds) || complaintIds.length === 0 || !newStatus) {
+            return res.status(400).json({ success: false, message: "complaintIds (array) and newStatus are required" });
+        }
+        if (complaintIds.length > BULK_STATUS_MAX) {
+            return res.status(400).json({ success: false, message: `At most ${BULK_STATUS_MAX} complaints per request` });
+        }
+        if (!counters.STATUSES.includes(newStatus)) {
+            return res.status(400).json({ success: false, message: "Invalid status" });
+        }
+
+        // Per-item outcome, reported in request order
+        const outcomes = new Map();
+        const ids = [];
+        for (const rawId of complaintIds) {
+            const id = parseInt(rawId);
+            if (isNaN(id)) {
+                outcomes.set(rawId, 'invalid');
+            } else if (!outcomes.has(id)) {
+                outcomes.set(id, 'not_found');
+                ids.push(id);
+            }
+        }
+
+        const updated = [];
+        const denied = [];
+
+        if (ids.length > 0) {
+            const connection = await pool.getConnection();
+            await connection.beginTransaction();
+
+            try {
+                // Ownership check and row locks in one statement
+                const [rows] = await connection.query(
+                    `SELECT complaint_id, username, admin_username, status, is_discarded
+                     FROM complaint WHERE complaint_id IN (?) FOR UPDATE`,
+                    [ids]
+                );
+
+                for (const row of rows) {
+                    const key = row.complaint_id;
+                    if (row.admin_username !== adminUsername) {
+                        outcomes.set(key, 'forbidden');
+                        denied.push(row);
+                    } else if (row.status === newStatus) {
+                        outcomes.set(key, 'unchanged');
+                    } else {
+                        outcomes.set(key, 'updated');
+                        updated.push(row);
+                    }
+                }
+
+                // Missing from complaint: this admin's closed cases may have been archived
+                const missingIds = ids.filter(id => outcomes.get(id) === 'not_found');
+                if (missingIds.length > 0) {
+                    const [archivedRows] = await connection.query(
+                        'SELECT complaint_id FROM complaint_archive WHERE complaint_id IN (?) AND admin_username = ?',
+                        [missingIds, adminUsername]
+                    );
+                    archivedRows.forEach(row => outcomes.set(row.complaint_id, 'archived'));
+                }
+
+                if (updated.length > 0) {
+                    const updatedIds = updated.map(row => row.complaint_id);
+
+                    await connection.query(
+                        'UPDATE complaint SET status = ? WHERE complaint_id IN (?)',
+                        [newStatus, updatedIds]
+                    );
+                    await counters.recordStatusChanges(connection, updated, newStatus);
+
+                    await connection.query(
+                        `INSERT INTO status_updates (complaint_id, status, updated_by, updated_at)
+                         SELECT complaint_id, ?, ?, NOW() FROM complaint WHERE complaint_id IN (?)`,
+                        [newStatus, adminUsername, updatedIds]
+                    );
+
+                    await connection.query(
+                        `INSERT INTO admin_cases (complaint_id, admin_username, complainant_username, status, last_updated) 
+                         SELECT c.complaint_id, ?, c.username, ?, NOW()
+                         FROM complaint c 
+                         WHERE c.complaint_id IN (?)
+                         ON DUPLICATE KEY UPDATE 
+                         status = VALUES(status), 
+                         last_updated = VALUES(last_updated)`,
+                        [adminUsername, newStatus, updatedIds]
+                    );
+
+                    // Same message as the single update, one row per complaint
+                    await connection.query(
+                        `INSERT INTO complaint_notifications (complaint_id, message, type, is_read, created_at)
+                         SELECT complaint_id, CONCAT('Your complaint #', complaint_id, ' status has been updated to: ', ?), 'status_change', 0, NOW()
+                         FROM complaint WHERE complaint_id IN (?)`,
+                        [newStatus.toUpperCase(), updatedIds]
+                    );
+                }
+
+                await connection.commit();
+                connection.release();
+            } catch (err) {
+                await connection.rollback();
+                connection.release();
+                throw err;
+            }
+        }
+
+        await logAdminActions(adminUsername, [
+            ...updated.map(row => ({
+                action: 'status_update',
+                actionDetails: JSON.stringify({ newStatus, bulk: true }),
+                complaintId: row.complaint_id,
+                targetUsername: row.username,
+                ipAddress: req.ip
+            })),
+            ...denied.map(row => ({
+                action: 'status_update_denied',
+                result: 'failure',
+                actionDetails: 'Attempted to update complaint from different admin',
+                complaintId: row.complaint_id,
+                ipAddress: req.ip
+            }))
+        ]);
+
+        const results = [...outcomes].map(([complaintId, result]) => ({ complaintId, result }));
+        const summary = { updated: 0, unchanged: 0, forbidden: 0, archived: 0, not_found: 0, invalid: 0 };
+        results.forEach(item => summary[item.result]++);
+
+        res.json({ success: true, newStatus, summary, results });
+    } catch (err) {
+        console.error("Bulk update status error:", err);
+        if (handlePoolBusy(res, err)) return;
+        res.status(500).json({ success: false, message: "Error updating statuses" });
+    }
+};
+
 // Get Admin's Audit Logs
 exports.getAdminLogs = async (req, res) => {
     try {
@@ -441,7 +590,7 @@ exports.getAdminLogs = async (req, res) => {
             limit: parseInt(limit) || 100
         };
 
-        const logs = await getAdminAuditLogs(adminUsername, filters);
+        const logs = await getAdminAuditLogs(adminUsername, filters, req);
 
         res.json({
             success: true,
@@ -450,6 +599,7 @@ exports.getAdminLogs = async (req, res) => {
 
     } catch (err) {
         console.error("Error fetching admin logs:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching logs" });
     }
 };
@@ -476,6 +626,7 @@ exports.getAdminProfile = async (req, res) => {
         });
     } catch (err) {
         console.error("Get admin profile error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching profile" });
     }
 };
@@ -512,6 +663,7 @@ exports.getAdminComplaints = async (req, res) => {
         });
     } catch (err) {
         console.error("Get admin complaints error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching complaints" });
     }
 };
@@ -548,6 +700,7 @@ exports.getDistrictUsers = async (req, res) => {
         });
     } catch (err) {
         console.error("Get district users error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching users" });
     }
 };
@@ -561,18 +714,8 @@ exports.getDashboardStats = async (req, res) => {
 
         const adminUsername = req.session.adminUsername;
 
-        const [complaints] = await pool.query(
-            'SELECT status FROM complaint WHERE admin_username = ? AND (is_discarded IS NULL OR is_discarded = FALSE)',
-            [adminUsername]
-        );
-
-        const stats = {
-            total: complaints.length,
-            pending: complaints.filter(c => c.status === 'pending').length,
-            verifying: complaints.filter(c => c.status === 'verifying').length,
-            investigating: complaints.filter(c => c.status === 'investigating').length,
-            resolved: complaints.filter(c => c.status === 'resolved').length
-        };
+        // Counts come from the admin's counter row (discarded cases excluded)
+        const stats = await counters.getCounts('admin', adminUsername);
 
         res.json({
             success: true,
@@ -580,6 +723,7 @@ exports.getDashboardStats = async (req, res) => {
         });
     } catch (err) {
         console.error("Get dashboard stats error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching stats" });
     }
 };
\ No newline at end of file
@@ -1,4 +1,5 @@
-const pool = require('../db');
+const { readerFor } = require('../utils/readRoutingUtils');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
 
 /**
  * Case Analytics Controller
@@ -16,7 +17,7 @@ exports.getTrendAnalysis = async (req, res) => {
         const { period = '30' } = req.query;
 
         // Get complaints over time
-        const [trends] = await pool.query(
+        const [trends] = await readerFor(req).query(
             `SELECT 
                 DATE(created_at) as date,
                 status,
@@ -40,6 +41,7 @@ exports.getTrendAnalysis = async (req, res) => {
 
     } catch (err) {
         console.error("Get trend analysis error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching trend analysis" });
     }
 };
@@ -53,7 +55,7 @@ exports.getCrimeDistribution = async (req, res) => {
 
         const adminUsername = req.session.adminUsername;
 
-        const [distribution] = await pool.query(
+        const [distribution] = await readerFor(req).query(
             `SELECT 
                 COALESCE(cat.name, c.complaint_type, 'Other') as crime_type,
                 COUNT(*) as count,
@@ -81,6 +83,7 @@ exports.getCrimeDistribution = async (req, res) => {
 
     } catch (err) {
         console.error("Get crime distribution error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching crime distribution" });
     }
 };
@@ -95,7 +98,7 @@ exports.getPerformanceMetrics = async (req, res) => {
         const adminUsername = req.session.adminUsername;
 
         // Get resolution time metrics
-        const [metrics] = await pool.query(
+        const [metrics] = await readerFor(req).query(
             `SELECT 
                 COUNT(*) as total_cases,
                 SUM(CASE WHEN status = 'resolved' THEN 1 ELSE 0 END) as resolved_cases,
@@ -136,6 +139,7 @@ exports.getPerformanceMetrics = async (req, res) => {
 
     } catch (err) {
         console.error("Get performance metrics error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching performance metrics" });
     }
 };
@@ -7,7 +7,6 @@
 const pool = require('../db');
 const crypto = require('crypto');
 const path = require('path');
-const fs = require('fs').promises;
 const { 
     findAdminByLocation, 
     geocodeAddress, 
@@ -15,12 +14,25 @@ const {
     getCategoryName,
     getAllCategories 
 } = require('../utils/helperUtils');
+const throttle = require('../utils/throttleUtils');
+const { getDuplicateCounts } = require('../utils/evidenceStoreUtils');
+const { readerFor } = require('../utils/readRoutingUtils');
+const { queueFileDeletions, drainFileDeletions } = require('../utils/storageGcUtils');
+const uploads = require('../utils/uploadSessionUtils');
+const { MicroCache } = require('../utils/cacheUtils');
+const { queueImageProcessing } = require('../utils/imageProcessingUtils');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
+
+// Public map and dashboard reads shared by every caller (stats per admin/district)
+const heatmapCache = new MicroCache('anonymous-heatmap', { ttlMs: 10000, staleMs: 60000 });
+const statsCache = new MicroCache('anonymous-report-stats', { ttlMs: 5000, staleMs: 30000 });
 
 // Configuration
 const IP_HASH_SALT = process.env.IP_HASH_SALT || 'securevoice-anonymous-salt-2026';
 const CONTENT_HASH_SALT = process.env.CONTENT_HASH_SALT || 'securevoice-content-salt-2026';
 const MAX_SUBMISSIONS_PER_DAY = parseInt(process.env.MAX_ANONYMOUS_SUBMISSIONS) || 3;
 const RATE_LIMIT_WINDOW_HOURS = 24;
+const DUPLICATE_WINDOW_HOURS = 24;
 
 // Valid crime types for anonymous reports (mapped to normalized category table)
 const VALID_CRIME_TYPES = [
@@ -89,55 +101,33 @@ function getClientIP(req) {
 }
 
 /**
- * Check rate limit for an IP
+ * Check rate limit for an IP (in-memory sliding window)
  */
 async function checkRateLimit(ipHash) {
-    const [results] = await pool.query(
-        `SELECT COUNT(*) as count FROM anonymous_rate_limits 
-         WHERE ip_hash = ? AND expires_at > NOW()`,
-        [ipHash]
-    );
-    return results[0].count < MAX_SUBMISSIONS_PER_DAY;
+    await throttle.ensureLoaded();
+    return throttle.countActiveSubmissions(ipHash) < MAX_SUBMISSIONS_PER_DAY;
 }
 
 /**
  * Record a submission for rate limiting
  */
-async function recordSubmission(ipHash) {
-    const expiresAt = new Date();
-    expiresAt.setHours(expiresAt.getHours() + RATE_LIMIT_WINDOW_HOURS);
-    
-    await pool.query(
-        `INSERT INTO anonymous_rate_limits (ip_hash, expires_at) VALUES (?, ?)`,
-        [ipHash, expiresAt]
-    );
+function recordSubmission(ipHash) {
+    throttle.recordSubmission(ipHash, RATE_LIMIT_WINDOW_HOURS * 60 * 60 * 1000);
 }
 
 /**
  * Check for duplicate submission
  */
 async function checkDuplicate(contentHash, ipHash) {
-    const [results] = await pool.query(
-        `SELECT id FROM anonymous_submission_hashes 
-         WHERE content_hash = ? AND ip_hash = ? AND expires_at > NOW()`,
-        [contentHash, ipHash]
-    );
-    return results.length > 0;
+    await throttle.ensureLoaded();
+    return throttle.isDuplicate(contentHash, ipHash);
 }
 
 /**
  * Record submission hash for duplicate detection
  */
-async function recordSubmissionHash(contentHash, ipHash) {
-    const expiresAt = new Date();
-    expiresAt.setHours(expiresAt.getHours() + 24);
-    
-    await pool.query(
-        `INSERT INTO anonymous_submission_hashes (content_hash, ip_hash, expires_at) 
-         VALUES (?, ?, ?) 
-         ON DUPLICATE KEY UPDATE expires_at = ?`,
-        [contentHash, ipHash, expiresAt, expiresAt]
-    );
+function recordSubmissionHash(contentHash, ipHash) {
+    throttle.recordSubmissionHash(contentHash, ipHash, DUPLICATE_WINDOW_HOURS * 60 * 60 * 1000);
 }
 
 /**
@@ -288,8 +278,23 @@ exports.submitAnonymousReport = async (req, res) => {
             });
         }
         
-        // Check for evidence files
-        if (!req.files || req.files.length === 0) {
+        // Collect evidence files (multipart uploads plus completed upload sessions)
+        let uploadIds;
+        try {
+            uploadIds = uploads.parseUploadIds(req.body.uploadIds);
+            uploadedFiles = (req.files || []).concat(
+                uploads.resolveUploads(uploadIds, { purpose: 'anonymous', owner: null })
+            );
+        } catch (err) {
+            if (!(err instanceof uploads.UploadSessionError)) throw err;
+            return res.status(err.status).json({
+                success: false,
+                error: 'invalid_upload',
+                message: err.message
+            });
+        }
+        
+        if (uploadedFiles.length === 0) {
             return res.status(400).json({
                 success: false,
                 error: 'no_evidence',
@@ -297,7 +302,13 @@ exports.submitAnonymousReport = async (req, res) => {
             });
         }
         
-        uploadedFiles = req.files;
+        if (uploadedFiles.length > 10) {
+            return res.status(400).json({
+                success: false,
+                error: 'too_many_files',
+                message: 'A maximum of 10 evidence files is allowed'
+            });
+        }
         
         // Create content hash for duplicate detection
         const contentHash = hashContent(`${crimeType}${description}${incidentDate}${location}`);
@@ -398,17 +409,10 @@ exports.submitAnonymousReport = async (req, res) => {
             ]
         );
         
-        // Process and save evidence files
-        const evidenceDir = path.join(__dirname, '../../uploads/anonymous');
-        await fs.mkdir(evidenceDir, { recursive: true });
-        
+        // Record evidence files (already stored by content hash in uploadMiddleware)
         for (const file of uploadedFiles) {
             const ext = path.extname(file.originalname);
             const storedName = generateFileId(ext);
-            const storedPath = path.join(evidenceDir, storedName);
-            
-            // Move file to anonymous evidence directory
-            await fs.rename(file.path, storedPath);
             
             // Get file type category
             let fileType = 'document';
@@ -417,16 +421,17 @@ exports.submitAnonymousReport = async (req, res) => {
             else if (file.mimetype.startsWith('audio/')) fileType = 'audio';
             
             // Insert evidence record
-            await pool.query(
+            await pool.execute(
                 `INSERT INTO anonymous_evidence (
-                    report_id, original_name, stored_name, file_path, 
+                    report_id, original_name, stored_name, file_path, content_hash,
                     file_type, file_size, mime_type
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)`,
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)`,
                 [
                     reportId,
                     file.originalname,
                     storedName,
-                    `uploads/anonymous/${storedName}`,
+                    `uploads/${file.relativePath}`,
+                    file.contentHash,
                     fileType,
                     file.size,
                     file.mimetype
@@ -434,9 +439,13 @@ exports.submitAnonymousReport = async (req, res) => {
             );
         }
         
+        uploads.consumeUploads(uploadIds);
+        // Thumbnails and previews without EXIF/GPS, so admins need not open originals
+        await queueImageProcessing(uploadedFiles);
+        
         // Record for rate limiting and duplicate detection
-        await recordSubmission(ipHash);
-        await recordSubmissionHash(contentHash, ipHash);
+        recordSubmission(ipHash);
+        recordSubmissionHash(contentHash, ipHash);
         
         console.log(`Anonymous report submitted: ${reportId}`);
         
@@ -450,15 +459,19 @@ exports.submitAnonymousReport = async (req, res) => {
     } catch (error) {
         console.error('Anonymous report submission error:', error);
         
-        // Clean up uploaded files on error
-        for (const file of uploadedFiles) {
-            try {
-                await fs.unlink(file.path);
-            } catch (unlinkError) {
-                // Ignore cleanup errors
-            }
+        // Release uploaded files on error (shared content is kept while referenced).
+        // Files from upload sessions stay with their session so a retry can reuse them.
+        try {
+            await queueFileDeletions(uploadedFiles.filter(file => !file.uploadId).map(file => ({
+                file_path: file.relativePath,
+                content_hash: file.contentHash
+            })));
+            drainFileDeletions();
+        } catch (releaseError) {
+            // Ignore cleanup errors
         }
         
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             error: 'server_error',
@@ -532,6 +545,7 @@ exports.checkAnonymousReportStatus = async (req, res) => {
         
     } catch (error) {
         console.error('Status check error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             error: 'server_error',
@@ -640,6 +654,7 @@ exports.getAnonymousReports = async (req, res) => {
         
     } catch (error) {
         console.error('Get anonymous reports error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve reports'
@@ -698,11 +713,12 @@ exports.getAnonymousReportDetails = async (req, res) => {
                 ...report,
                 ip_hash: undefined // Never expose IP hash
             },
-            evidence
+            evidence: evidence.map(e => ({ ...e, url: `/anonymous-evidence/${e.id}` }))
         });
         
     } catch (error) {
         console.error('Get anonymous report details error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve report details'
@@ -759,6 +775,7 @@ exports.updateAnonymousReportStatus = async (req, res) => {
         
     } catch (error) {
         console.error('Update anonymous report status error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to update report status'
@@ -806,6 +823,7 @@ exports.flagAnonymousReport = async (req, res) => {
         
     } catch (error) {
         console.error('Flag anonymous report error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to flag report'
@@ -822,40 +840,46 @@ exports.getAnonymousReportStats = async (req, res) => {
         const adminUsername = req.session?.adminUsername || '';
         const adminDistrict = req.session?.adminDistrict || '';
         
-        const whereClause = `WHERE (assigned_admin = ? OR district_name = ? OR (assigned_admin IS NULL AND district_name IS NULL))`;
-        const params = [adminUsername, adminDistrict];
-        
-        const [stats] = await pool.query(`
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
-                SUM(CASE WHEN status = 'reviewing' THEN 1 ELSE 0 END) as reviewing,
-                SUM(CASE WHEN status = 'investigating' THEN 1 ELSE 0 END) as investigating,
-                SUM(CASE WHEN status = 'resolved' THEN 1 ELSE 0 END) as resolved,
-                SUM(CASE WHEN status = 'dismissed' THEN 1 ELSE 0 END) as dismissed,
-                SUM(CASE WHEN is_flagged = 1 THEN 1 ELSE 0 END) as flagged
-            FROM anonymous_reports
-            ${whereClause}
-        `, params);
-        
-        const [byType] = await pool.query(`
-            SELECT crime_type, COUNT(*) as count 
-            FROM anonymous_reports 
-            ${whereClause}
-            GROUP BY crime_type 
-            ORDER BY count DESC
-        `, params);
+        const statistics = await statsCache.get(`${adminUsername}|${adminDistrict}`, async () => {
+            const reader = readerFor();
+            const whereClause = `WHERE (assigned_admin = ? OR district_name = ? OR (assigned_admin IS NULL AND district_name IS NULL))`;
+            const params = [adminUsername, adminDistrict];
+            
+            const [stats] = await reader.query(`
+                SELECT 
+                    COUNT(*) as total,
+                    SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
+                    SUM(CASE WHEN status = 'reviewing' THEN 1 ELSE 0 END) as reviewing,
+                    SUM(CASE WHEN status = 'investigating' THEN 1 ELSE 0 END) as investigating,
+                    SUM(CASE WHEN status = 'resolved' THEN 1 ELSE 0 END) as resolved,
+                    SUM(CASE WHEN status = 'dismissed' THEN 1 ELSE 0 END) as dismissed,
+                    SUM(CASE WHEN is_flagged = 1 THEN 1 ELSE 0 END) as flagged
+                FROM anonymous_reports
+                ${whereClause}
+            `, params);
+            
+            const [byType] = await reader.query(`
+                SELECT crime_type, COUNT(*) as count 
+                FROM anonymous_reports 
+                ${whereClause}
+                GROUP BY crime_type 
+                ORDER BY count DESC
+            `, params);
+            
+            return {
+                ...stats[0],
+                byType
+            };
+        });
         
         res.json({
             success: true,
-            statistics: {
-                ...stats[0],
-                byType
-            }
+            statistics
         });
         
     } catch (error) {
         console.error('Get anonymous report stats error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve statistics'
@@ -868,30 +892,34 @@ exports.getAnonymousReportStats = async (req, res) => {
  */
 exports.getAnonymousHeatmapData = async (req, res) => {
     try {
-        const [results] = await pool.query(`
-            SELECT 
-                latitude, 
-                longitude, 
-                crime_type,
-                status
-            FROM anonymous_reports 
-            WHERE latitude IS NOT NULL 
-            AND longitude IS NOT NULL
-            AND submitted_at > DATE_SUB(NOW(), INTERVAL 6 MONTH)
-        `);
-        
-        res.json({
-            success: true,
-            data: results.map(r => ({
+        const data = await heatmapCache.get('all', async () => {
+            const [results] = await readerFor().query(`
+                SELECT 
+                    latitude, 
+                    longitude, 
+                    crime_type,
+                    status
+                FROM anonymous_reports 
+                WHERE latitude IS NOT NULL 
+                AND longitude IS NOT NULL
+                AND submitted_at > DATE_SUB(NOW(), INTERVAL 6 MONTH)
+            `);
+            return results.map(r => ({
                 lat: parseFloat(r.latitude),
                 lng: parseFloat(r.longitude),
                 crimeType: r.crime_type,
                 status: r.status
-            }))
+            }));
+        });
+        
+        res.json({
+            success: true,
+            data
         });
         
     } catch (error) {
         console.error('Get anonymous heatmap data error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve heatmap data'
@@ -929,27 +957,44 @@ exports.getAnonymousReportEvidence = async (req, res) => {
         // Get evidence
         const [evidence] = await pool.query(
             `SELECT 
-                id, 
+                anonymous_evidence.id, 
                 original_name, 
                 stored_name, 
                 file_path, 
+                anonymous_evidence.content_hash,
                 file_type, 
                 file_size, 
                 mime_type,
-                uploaded_at 
+                uploaded_at,
+                d.status as processing_status,
+                d.width,
+                d.height,
+                d.thumbnail_path IS NOT NULL as has_renditions
              FROM anonymous_evidence 
+             LEFT JOIN evidence_derivatives d ON d.content_hash = anonymous_evidence.content_hash
              WHERE report_id = ?
              ORDER BY uploaded_at ASC`,
             [reportId]
         );
         
+        // Identical files submitted elsewhere share a content hash
+        const duplicateCounts = await getDuplicateCounts(evidence.map(e => e.content_hash));
+        
         res.json({
             success: true,
-            evidence
+            evidence: evidence.map(({ has_renditions, ...e }) => ({
+                ...e,
+                url: `/anonymous-evidence/${e.id}`,
+                // EXIF/GPS-free renditions; the original only on demand
+                thumbnail_url: has_renditions ? `/anonymous-evidence/${e.id}?variant=thumb` : null,
+                preview_url: has_renditions ? `/anonymous-evidence/${e.id}?variant=preview` : null,
+                duplicate_count: e.content_hash ? (duplicateCounts[e.content_hash] || 1) - 1 : 0
+            }))
         });
         
     } catch (error) {
         console.error('Get anonymous report evidence error:', error);
+        if (handlePoolBusy(res, error)) return;
         res.status(500).json({
             success: false,
             message: 'Failed to retrieve evidence'
@@ -1,7 +1,8 @@
 const pool = require('../../db');
 const { hashPassword, comparePassword } = require('../../utils/passwordUtils');
-const { sendEmail } = require('../../utils/emailUtils');
+const { queueEmail, drainEmailOutbox, PRIORITY } = require('../../utils/emailOutboxUtils');
 const { logAdminAction } = require('../../utils/auditUtils');
+const { sessionTokens } = require('../../utils/tokenUtils');
 const {
     CONFIG,
     sendError,
@@ -10,6 +11,7 @@ const {
     getFrontendUrl,
     EmailTemplates
 } = require('./common');
+const { handlePoolBusy } = require('../../middleware/poolMiddleware');
 
 // Admin Registration Request
 exports.adminRegistrationRequest = async (req, res) => {
@@ -29,23 +31,40 @@ exports.adminRegistrationRequest = async (req, res) => {
         const hashedPassword = await hashPassword(password);
         const emailVerificationToken = generateToken();
 
-        const [result] = await pool.query(
-            `INSERT INTO admins(username, email, fullName, phone, designation, official_id, district_name, password, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)`,
-            [username, email, fullName, phone, designation, official_id, district_name, hashedPassword]
-        );
+        const verifyLink = `${getFrontendUrl()}/admin-verify?token=${emailVerificationToken}`;
 
-        await pool.query(`INSERT INTO admin_approval_workflow(admin_username, status, request_date) VALUES (?, 'pending', NOW())`, [username]);
+        // The account, its workflow row, the verification token and both
+        // emails commit together
+        const connection = await pool.getConnection();
+        let result;
+        try {
+            await connection.beginTransaction();
 
-        await pool.query(`INSERT INTO admin_verification_tokens (admin_username, token_type, token_value, expires_at, is_used) VALUES (?, 'email_verification', ?, DATE_ADD(NOW(), INTERVAL ? DAY), 0)`, [username, emailVerificationToken, CONFIG.EMAIL_VERIFICATION_EXPIRY_DAYS]);
+            [result] = await connection.query(
+                `INSERT INTO admins(username, email, fullName, phone, designation, official_id, district_name, password, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)`,
+                [username, email, fullName, phone, designation, official_id, district_name, hashedPassword]
+            );
 
-        const verifyLink = `${getFrontendUrl()}/admin-verify?token=${emailVerificationToken}`;
-        try { await sendEmail(email, 'SecureVoice - Verify Your Email Address', EmailTemplates.adminVerification(fullName, verifyLink)); } catch (e) { console.error('Email send error:', e); }
+            await connection.query(`INSERT INTO admin_approval_workflow(admin_username, status, request_date) VALUES (?, 'pending', NOW())`, [username]);
+
+            await connection.query(`INSERT INTO admin_verification_tokens (admin_username, token_type, token_value, expires_at, is_used) VALUES (?, 'email_verification', ?, DATE_ADD(NOW(), INTERVAL ? DAY), 0)`, [username, emailVerificationToken, CONFIG.EMAIL_VERIFICATION_EXPIRY_DAYS]);
 
-        try { await sendEmail(process.env.SUPER_ADMIN_EMAIL || 'superadmin@crime.gov.bd', 'New District Admin Registration Request', EmailTemplates.superAdminNotification({ username, fullName, email, phone, designation, official_id, district_name })); } catch (e) { console.error('Super admin notify error:', e); }
+            await queueEmail(email, 'SecureVoice - Verify Your Email Address', EmailTemplates.adminVerification(fullName, verifyLink), { connection, priority: PRIORITY.ACCOUNT });
+            await queueEmail(process.env.SUPER_ADMIN_EMAIL || 'superadmin@crime.gov.bd', 'New District Admin Registration Request', EmailTemplates.superAdminNotification({ username, fullName, email, phone, designation, official_id, district_name }), { connection });
+
+            await connection.commit();
+        } catch (err) {
+            await connection.rollback();
+            throw err;
+        } finally {
+            connection.release();
+        }
+        drainEmailOutbox();
 
         sendSuccess(res, 'Registration request submitted successfully! Please check your email to verify your address. You will be notified once approved by the Super Admin.', { adminId: result.insertId });
     } catch (err) {
         console.error('Admin registration request error:', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Server error while processing registration request');
     }
 };
@@ -56,14 +75,14 @@ exports.adminLogin = async (req, res) => {
         const { username, password } = req.body;
         if (!username || !password) return sendError(res, 400, 'Username and password are required');
 
-        const [results] = await pool.query('SELECT * FROM admins WHERE username = ?', [username]);
+        const [results] = await pool.execute('SELECT * FROM admins WHERE username = ?', [username]);
         if (results.length === 0) {
             await logAdminAction(username, 'login_attempt', { result: 'failure', actionDetails: 'User not found', ipAddress: req.ip });
             return sendError(res, 401, 'Invalid username or password');
         }
 
         const admin = results[0];
-        const [workflowResults] = await pool.query('SELECT status FROM admin_approval_workflow WHERE admin_username = ?', [username]);
+        const [workflowResults] = await pool.execute('SELECT status FROM admin_approval_workflow WHERE admin_username = ?', [username]);
         const status = workflowResults.length > 0 ? workflowResults[0].status : 'pending';
         if (status !== 'approved') {
             await logAdminAction(username, 'login_attempt', { result: 'failure', actionDetails: `Account status: ${status}`, ipAddress: req.ip });
@@ -80,10 +99,10 @@ exports.adminLogin = async (req, res) => {
             return sendError(res, 401, 'Invalid username or password');
         }
 
-        const [verificationResults] = await pool.query(`SELECT is_used FROM admin_verification_tokens WHERE admin_username = ? AND token_type = 'email_verification' ORDER BY created_at DESC LIMIT 1`, [username]);
+        const [verificationResults] = await pool.execute(`SELECT is_used FROM admin_verification_tokens WHERE admin_username = ? AND token_type = 'email_verification' ORDER BY created_at DESC LIMIT 1`, [username]);
         if (verificationResults.length === 0 || verificationResults[0].is_used !== 1) return sendError(res, 403, 'Please verify your email before logging in.');
 
-        await pool.query('UPDATE admins SET last_login = NOW() WHERE username = ?', [username]);
+        await pool.execute('UPDATE admins SET last_login = NOW() WHERE username = ?', [username]);
 
         req.session.adminId = admin.adminid;
         req.session.adminUsername = admin.username;
@@ -93,9 +112,10 @@ exports.adminLogin = async (req, res) => {
 
         await logAdminAction(username, 'login', { result: 'success', actionDetails: 'Successful login', ipAddress: req.ip, userAgent: req.headers['user-agent'] });
 
-        sendSuccess(res, 'Login successful', { redirect: '/admin-dashboard', admin: { username: admin.username, email: admin.email, fullName: admin.fullName, district: admin.district_name } });
+        sendSuccess(res, 'Login successful', { redirect: '/admin-dashboard', admin: { username: admin.username, email: admin.email, fullName: admin.fullName, district: admin.district_name }, ...sessionTokens(req, 'admin') });
     } catch (err) {
         console.error('Admin login error:', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Server error');
     }
 };
@@ -113,9 +133,9 @@ exports.adminVerifyOTP = async (req, res) => {
         }
 
         await pool.query('UPDATE admin_otp_verification SET is_used = 1 WHERE id = ?', [otpResults[0].id]);
-        const [adminResults] = await pool.query('SELECT * FROM admins WHERE username = ?', [username]);
+        const [adminResults] = await pool.execute('SELECT * FROM admins WHERE username = ?', [username]);
         const admin = adminResults[0];
-        await pool.query('UPDATE admins SET last_login = NOW() WHERE username = ?', [username]);
+        await pool.execute('UPDATE admins SET last_login = NOW() WHERE username = ?', [username]);
 
         req.session.adminId = admin.adminid;
         req.session.adminUsername = admin.username;
@@ -125,9 +145,10 @@ exports.adminVerifyOTP = async (req, res) => {
 
         await logAdminAction(username, 'login', { result: 'success', actionDetails: 'Successful login with OTP verification', ipAddress: req.ip, userAgent: req.headers['user-agent'] });
 
-        sendSuccess(res, 'Login successful', { redirect: '/admin-dashboard', admin: { username: admin.username, email: admin.email, fullName: admin.fullName, district: admin.district_name } });
+        sendSuccess(res, 'Login successful', { redirect: '/admin-dashboard', admin: { username: admin.username, email: admin.email, fullName: admin.fullName, district: admin.district_name }, ...sessionTokens(req, 'admin') });
     } catch (err) {
         console.error('OTP verification error:', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Server error');
     }
 };
@@ -153,12 +174,13 @@ exports.setupAdminPassword = async (req, res) => {
         await logAdminAction(username, 'password_setup', { result: 'success', actionDetails: 'Password setup completed', ipAddress: req.ip });
 
         if (adminResults.length > 0) {
-            try { await sendEmail(adminResults[0].email, 'Password Setup Successful', EmailTemplates.passwordSetupSuccess(`${getFrontendUrl()}/adminLogin`)); } catch (e) { console.error('Password setup email error:', e); }
+            try { await queueEmail(adminResults[0].email, 'Password Setup Successful', EmailTemplates.passwordSetupSuccess(`${getFrontendUrl()}/adminLogin`), { priority: PRIORITY.ACCOUNT }); } catch (e) { console.error('Password setup email error:', e); }
         }
 
         sendSuccess(res, 'Password setup successful! Please verify your email to complete activation.', { redirect: '/adminLogin' });
     } catch (err) {
         console.error('Password setup error:', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Server error');
     }
 };
@@ -182,6 +204,7 @@ exports.verifyAdminEmail = async (req, res) => {
         sendSuccess(res, 'Email verified successfully! Your account is now pending Super Admin approval.');
     } catch (err) {
         console.error('Email verification error:', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Server error');
     }
 };
@@ -198,11 +221,13 @@ exports.adminLogout = async (req, res) => {
         });
     } catch (err) {
         console.error('Logout error:', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Server error');
     }
 };
 
 // Check admin auth
+// With a bearer token req.session comes from the verified claims: no store lookup
 exports.checkAdminAuth = async (req, res) => {
     if (req.session.adminId && req.session.adminUsername) return sendSuccess(res, 'Authenticated', { isAuthenticated: true, admin: { username: req.session.adminUsername, email: req.session.adminEmail, district: req.session.district } });
     res.status(401).json({ success: false, isAuthenticated: false });
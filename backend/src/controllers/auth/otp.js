@@ -1,6 +1,7 @@
 const pool = require('../../db');
-const { sendEmail } = require('../../utils/emailUtils');
+const { queueEmail, PRIORITY } = require('../../utils/emailOutboxUtils');
 const { sendError, sendSuccess, generateOTP, otpStore, EmailTemplates, CONFIG, createRegistrationSession } = require('./common');
+const { handlePoolBusy } = require('../../middleware/poolMiddleware');
 
 // Send OTP to email or phone during registration
 exports.sendOTP = async (req, res) => {
@@ -18,7 +19,7 @@ exports.sendOTP = async (req, res) => {
         // In dev, log OTP. In prod, send via SMS gateway / email
         console.log('Generated OTP for', email || phone, otp);
         if (email) {
-            try { await sendEmail(email, 'Your OTP Code', EmailTemplates.otp(otp)); } catch (e) { console.error('OTP email error:', e); }
+            try { await queueEmail(email, 'Your OTP Code', EmailTemplates.otp(otp), { priority: PRIORITY.OTP, ttlMs: CONFIG.OTP_EXPIRY_MS }); } catch (e) { console.error('OTP email error:', e); }
         }
 
         sendSuccess(res, 'OTP sent', { 
@@ -27,6 +28,7 @@ exports.sendOTP = async (req, res) => {
         });
     } catch (err) {
         console.error('sendOTP error', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Failed to send OTP');
     }
 };
@@ -46,6 +48,7 @@ exports.verifyOTP = async (req, res) => {
         sendSuccess(res, 'OTP verified');
     } catch (err) {
         console.error('verifyOTP error', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'OTP verification failed');
     }
 };
@@ -75,7 +78,7 @@ exports.resendOTP = async (req, res) => {
 
         if (email) {
             try {
-                await sendEmail(email, 'SecureVoice - New Code', EmailTemplates.resendOtp(otp));
+                await queueEmail(email, 'SecureVoice - New Code', EmailTemplates.resendOtp(otp), { priority: PRIORITY.OTP, ttlMs: CONFIG.OTP_EXPIRY_MS });
             } catch (e) {
                 console.error('Email error:', e);
             }
@@ -86,6 +89,7 @@ exports.resendOTP = async (req, res) => {
         sendSuccess(res, response.message, { devOTP: response.devOTP });
     } catch (err) {
         console.error('Resend OTP error', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Failed to resend OTP');
     }
 };
@@ -1,5 +1,8 @@
 const pool = require('../../db');
+const fs = require('fs').promises;
+const { storePendingFaceImage, removeFaceImage } = require('../../utils/faceImageUtils');
 const { sendError, sendSuccess, isValidUsername, isValidEmail, registrationSessions, createRegistrationSession, updateRegistrationSession, buildLocationString } = require('./common');
+const { handlePoolBusy } = require('../../middleware/poolMiddleware');
 
 // Create or update temporary registration session (multi-step registration)
 exports.startRegistrationSession = (req, res) => {
@@ -10,6 +13,7 @@ exports.startRegistrationSession = (req, res) => {
         sendSuccess(res, 'Session created', { sessionId });
     } catch (err) {
         console.error('startRegistrationSession', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Failed to create session');
     }
 };
@@ -23,6 +27,7 @@ exports.getRegistrationSession = (req, res) => {
         sendSuccess(res, 'Session retrieved', { session });
     } catch (err) {
         console.error('getRegistrationSession', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Failed to fetch session');
     }
 };
@@ -40,6 +45,7 @@ exports.saveAddress = async (req, res) => {
         sendSuccess(res, 'Address saved');
     } catch (err) {
         console.error('saveAddress', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Failed to save address');
     }
 };
@@ -59,24 +65,40 @@ exports.verifyNID = async (req, res) => {
         sendSuccess(res, 'NID validated and saved');
     } catch (err) {
         console.error('verifyNID', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Failed to verify NID');
     }
 };
 
 /**
  * Save Face Image (Registration Step 4)
+ * Multipart upload (faceImage file + sessionId); the session keeps only the
+ * stored path.
  */
 exports.saveFaceImage = async (req, res) => {
     try {
-        const { faceImage, sessionId } = req.body;
+        const { sessionId } = req.body;
 
-        if (!faceImage) return sendError(res, 400, 'Face image is required');
-        if (!faceImage.startsWith('data:image/')) return sendError(res, 400, 'Invalid image format');
+        if (!req.file) return sendError(res, 400, 'Face image is required');
 
         const session = registrationSessions.get(sessionId);
-        if (!session) return sendError(res, 404, 'Session not found');
+        if (!session) {
+            await fs.unlink(req.file.path).catch(() => {});
+            return sendError(res, 404, 'Session not found');
+        }
+
+        let faceImagePath;
+        try {
+            faceImagePath = await storePendingFaceImage(req.file);
+        } catch (err) {
+            console.error('storePendingFaceImage', err);
+            return sendError(res, 400, 'Invalid image format');
+        }
+
+        // A retake replaces the earlier capture
+        if (session.data.faceImagePath) await removeFaceImage(session.data.faceImagePath);
 
-        session.data = { ...session.data, faceImage };
+        session.data = { ...session.data, faceImagePath };
         session.faceVerified = true;
         session.step = 4;
         updateRegistrationSession(sessionId, session);
@@ -84,6 +106,7 @@ exports.saveFaceImage = async (req, res) => {
         sendSuccess(res, 'Face image saved successfully');
     } catch (err) {
         console.error('saveFaceImage', err);
+        if (handlePoolBusy(res, err)) return;
         sendError(res, 500, 'Failed to save face image');
     }
 };
@@ -1,4 +1,6 @@
 const { sendError, sendSuccess } = require('./common');
+const { isTokenAuthEnabled, refreshTokens, TokenError } = require('../../utils/tokenUtils');
+const { handlePoolBusy } = require('../../middleware/poolMiddleware');
 
 // User Logout
 exports.userLogout = (req, res) => {
@@ -10,6 +12,7 @@ exports.userLogout = (req, res) => {
 };
 
 // Check User Authentication Status
+// With a bearer token req.session comes from the verified claims: no store lookup
 exports.checkAuth = (req, res) => {
     if (req.session && req.session.userId) {
         return res.json({
@@ -24,3 +27,19 @@ exports.checkAuth = (req, res) => {
 exports.logout = (req, res) => {
     exports.userLogout(req, res);
 };
+
+// Exchange a refresh token for a new access/refresh pair (token mode)
+exports.refreshToken = async (req, res) => {
+    if (!isTokenAuthEnabled()) return sendError(res, 404, 'Token authentication is not enabled');
+    const { refreshToken } = req.body;
+    if (!refreshToken) return sendError(res, 400, 'Refresh token is required');
+    try {
+        const tokens = await refreshTokens(refreshToken);
+        sendSuccess(res, 'Token refreshed', { tokens });
+    } catch (err) {
+        if (err instanceof TokenError) return sendError(res, err.status, err.message);
+        console.error('Token refresh error:', err);
+        if (handlePoolBusy(res, err)) return;
+        sendError(res, 500, 'Server error');
+    }
+};
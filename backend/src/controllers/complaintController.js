@@ -1,6 +1,11 @@
 const pool = require('../db');
-const path = require('path');
-const fs = require('fs');
+const { queueFileDeletions, drainFileDeletions } = require('../utils/storageGcUtils');
+const uploads = require('../utils/uploadSessionUtils');
+const counters = require('../utils/counterUtils');
+const archive = require('../utils/archiveUtils');
+const { readerFor } = require('../utils/readRoutingUtils');
+const { MicroCache } = require('../utils/cacheUtils');
+const { queueImageProcessing } = require('../utils/imageProcessingUtils');
 const {
     findAdminByLocation,
     getOrCreateLocation,
@@ -8,6 +13,7 @@ const {
     getCategoryIdNormalized,
     getCategoryName
 } = require('../utils/helperUtils');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
 
 // Submit Complaint
 exports.submitComplaint = async (req, res) => {
@@ -31,6 +37,22 @@ exports.submitComplaint = async (req, res) => {
             return res.status(400).json({ success: false, message: "All fields are required" });
         }
 
+        // Evidence sent through resumable upload sessions is attached by ID
+        let uploadIds;
+        let evidenceFiles;
+        try {
+            uploadIds = uploads.parseUploadIds(req.body.uploadIds);
+            evidenceFiles = (req.files || []).concat(
+                uploads.resolveUploads(uploadIds, { purpose: 'complaint', owner: username })
+            );
+        } catch (err) {
+            if (!(err instanceof uploads.UploadSessionError)) throw err;
+            return res.status(err.status).json({ success: false, message: err.message });
+        }
+        if (evidenceFiles.length > 10) {
+            return res.status(400).json({ success: false, message: "A maximum of 10 evidence files is allowed" });
+        }
+
         // Find admin for location
         const adminData = await findAdminByLocation(location);
 
@@ -79,44 +101,52 @@ exports.submitComplaint = async (req, res) => {
             }
         }
 
-        // Insert complaint with location coordinates
-        const [complaintResult] = await pool.query(
-            `INSERT INTO complaint (
-                description, created_at, status, username, admin_username, 
-                location_id, complaint_type, location_address, category_id,
-                latitude, longitude, location_accuracy_radius
-            ) VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-            [description, formattedDate, username, adminUsername, locationId, 
-             complaintType, location, categoryId, lat, lng, radius]
-        );
+        // Insert complaint with location coordinates, counting it in the same transaction
+        const connection = await pool.getConnection();
+        let complaintId;
+        try {
+            await connection.beginTransaction();
+            const [complaintResult] = await connection.query(
+                `INSERT INTO complaint (
+                    description, created_at, status, username, admin_username, 
+                    location_id, complaint_type, location_address, category_id,
+                    latitude, longitude, location_accuracy_radius
+                ) VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+                [description, formattedDate, username, adminUsername, locationId, 
+                 complaintType, location, categoryId, lat, lng, radius]
+            );
+            complaintId = complaintResult.insertId;
 
-        const complaintId = complaintResult.insertId;
+            await counters.recordComplaintCreated(connection, {
+                username,
+                admin_username: adminUsername,
+                status: 'pending'
+            });
+            await connection.commit();
+        } catch (err) {
+            await connection.rollback();
+            throw err;
+        } finally {
+            connection.release();
+        }
 
         // Handle file uploads
-        if (req.files && req.files.length > 0) {
-            for (const file of req.files) {
+        if (evidenceFiles.length > 0) {
+            for (const file of evidenceFiles) {
                 let fileType;
                 if (file.mimetype.startsWith('image/')) fileType = 'image';
                 else if (file.mimetype.startsWith('video/')) fileType = 'video';
                 else if (file.mimetype.startsWith('audio/')) fileType = 'audio';
 
-                let relativePath;
-                if (file.mimetype.startsWith('image/')) {
-                    relativePath = `images/${file.filename}`;
-                } else if (file.mimetype.startsWith('video/')) {
-                    relativePath = `videos/${file.filename}`;
-                } else if (file.mimetype.startsWith('audio/')) {
-                    relativePath = `audio/${file.filename}`;
-                } else {
-                    relativePath = file.filename;
-                }
-
-                await pool.query(
-                    `INSERT INTO evidence (uploaded_at, file_type, file_path, complaint_id)
-                     VALUES (?, ?, ?, ?)`,
-                    [createdAt, fileType, relativePath, complaintId]
+                // relativePath is the content-addressed path set by uploadMiddleware
+                await pool.execute(
+                    `INSERT INTO evidence (uploaded_at, file_type, file_path, content_hash, complaint_id)
+                     VALUES (?, ?, ?, ?, ?)`,
+                    [createdAt, fileType, file.relativePath, file.contentHash, complaintId]
                 );
             }
+            uploads.consumeUploads(uploadIds);
+            await queueImageProcessing(evidenceFiles);
         }
 
         res.json({
@@ -136,6 +166,7 @@ exports.submitComplaint = async (req, res) => {
         });
     } catch (err) {
         console.error("Submit complaint error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error submitting complaint" });
     }
 };
@@ -180,6 +211,7 @@ exports.notifyAdmin = async (req, res) => {
         });
     } catch (err) {
         console.error("Notify admin error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -193,6 +225,7 @@ exports.serveComplaintForm = async (req, res) => {
         res.json({ success: true, authenticated: true });
     } catch (err) {
         console.error("Serve complaint form error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Server error" });
     }
 };
@@ -219,6 +252,7 @@ exports.getUserComplaints = async (req, res) => {
         res.json({ success: true, complaints });
     } catch (err) {
         console.error("Get user complaints error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -242,6 +276,7 @@ exports.getComplaintNotifications = async (req, res) => {
         res.json({ success: true, notifications });
     } catch (err) {
         console.error("Get complaint notifications error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -263,6 +298,7 @@ exports.markNotificationsRead = async (req, res) => {
         res.json({ success: true, message: "Notifications marked as read" });
     } catch (err) {
         console.error("Mark notifications read error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -286,6 +322,7 @@ exports.getComplaintChat = async (req, res) => {
         res.json({ success: true, messages });
     } catch (err) {
         console.error("Get complaint chat error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -313,6 +350,7 @@ exports.sendChatMessage = async (req, res) => {
         res.json({ success: true, message: "Message sent successfully" });
     } catch (err) {
         console.error("Send chat message error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -324,39 +362,19 @@ exports.getDashboardStats = async (req, res) => {
             return res.status(401).json({ success: false, message: "Not authenticated" });
         }
 
-        const userId = req.session.userId;
-
-        const [totalComplaints] = await pool.query(
-            `SELECT COUNT(*) as count FROM complaint c
-             JOIN users u ON c.username = u.username
-             WHERE u.userid = ?`,
-            [userId]
-        );
-
-        const [pendingComplaints] = await pool.query(
-            `SELECT COUNT(*) as count FROM complaint c
-             JOIN users u ON c.username = u.username
-             WHERE u.userid = ? AND c.status = 'pending'`,
-            [userId]
-        );
-
-        const [resolvedComplaints] = await pool.query(
-            `SELECT COUNT(*) as count FROM complaint c
-             JOIN users u ON c.username = u.username
-             WHERE u.userid = ? AND c.status = 'resolved'`,
-            [userId]
-        );
+        const counts = await counters.getCounts('user', req.session.username);
 
         res.json({
             success: true,
             stats: {
-                total: totalComplaints[0].count,
-                pending: pendingComplaints[0].count,
-                resolved: resolvedComplaints[0].count
+                total: counts.total,
+                pending: counts.pending,
+                resolved: counts.resolved
             }
         });
     } catch (err) {
         console.error("Get dashboard stats error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -386,7 +404,7 @@ exports.deleteComplaint = async (req, res) => {
 
         // Get evidence files
         const [evidenceFiles] = await pool.query(
-            'SELECT file_path FROM evidence WHERE complaint_id = ?',
+            'SELECT file_path, content_hash FROM evidence WHERE complaint_id = ?',
             [complaintId]
         );
 
@@ -394,6 +412,12 @@ exports.deleteComplaint = async (req, res) => {
         await connection.beginTransaction();
 
         try {
+            // Lock the row so the counters see the status it is deleted with
+            const [locked] = await connection.query(
+                'SELECT username, admin_username, status, is_discarded FROM complaint WHERE complaint_id = ? FOR UPDATE',
+                [complaintId]
+            );
+
             // Delete evidence from DB
             await connection.query('DELETE FROM evidence WHERE complaint_id = ?', [complaintId]);
 
@@ -408,22 +432,19 @@ exports.deleteComplaint = async (req, res) => {
 
             if (deleteResult.affectedRows === 0) {
                 await connection.rollback();
+                connection.release();
                 return res.status(404).json({ success: false, message: "Complaint not found" });
             }
 
+            await counters.recordComplaintDeleted(connection, locked[0]);
+
+            // Queue the files with the delete; shared files are kept until unreferenced
+            await queueFileDeletions(evidenceFiles, connection);
+
             await connection.commit();
             connection.release();
 
-            // Delete physical files
-            evidenceFiles.forEach(file => {
-                if (file.file_path) {
-                    const rootDir = path.join(__dirname, '../..');
-                    const filePath = path.join(rootDir, 'uploads', file.file_path);
-                    fs.unlink(filePath, (err) => {
-                        if (err) console.error(`Error deleting file ${filePath}:`, err);
-                    });
-                }
-            });
+            drainFileDeletions();
 
             res.json({ success: true, message: "Complaint deleted successfully" });
         } catch (err) {
@@ -433,6 +454,7 @@ exports.deleteComplaint = async (req, res) => {
         }
     } catch (err) {
         console.error("Delete complaint error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -450,8 +472,10 @@ exports.getUserComplaints = async (req, res) => {
         }
 
         const username = req.session.username;
+        // Replica unless this user has just submitted or changed a complaint
+        const reader = readerFor(req);
 
-        const [complaints] = await pool.query(
+        const [complaints] = await reader.query(
             `SELECT c.*, 
                     l.location_name, l.district_name,
                     cat.name as category_name
@@ -465,19 +489,23 @@ exports.getUserComplaints = async (req, res) => {
 
         // Get evidence for each complaint
         for (let complaint of complaints) {
-            const [evidence] = await pool.query(
+            const [evidence] = await reader.query(
                 'SELECT * FROM evidence WHERE complaint_id = ?',
                 [complaint.complaint_id]
             );
             complaint.evidence = evidence;
         }
 
+        // Closed cases moved to the archive are listed after the active ones
+        const archived = await archive.getArchivedUserComplaints(username);
+
         res.json({
             success: true,
-            complaints: complaints
+            complaints: complaints.concat(archived)
         });
     } catch (err) {
         console.error("Get user complaints error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -489,23 +517,26 @@ exports.getComplaintNotifications = async (req, res) => {
         const username = req.session.username;
 
         // Check if user owns this complaint
-        const [ownership] = await pool.query(
+        const [ownership] = await pool.execute(
             'SELECT complaint_id FROM complaint WHERE complaint_id = ? AND username = ?',
             [complaint_id, username]
         );
 
-        if (ownership.length === 0) {
+        let notifications;
+        if (ownership.length > 0) {
+            // Get unread messages from admin
+            [notifications] = await pool.execute(
+                `SELECT * FROM complaint_chat 
+                 WHERE complaint_id = ? AND sender_type = 'admin' AND is_read = 0
+                 ORDER BY sent_at DESC`,
+                [complaint_id]
+            );
+        } else if (await archive.findArchivedComplaint(complaint_id, { username })) {
+            notifications = await archive.getArchivedChat(complaint_id, { unreadFromAdmin: true });
+        } else {
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        // Get unread messages from admin
-        const [notifications] = await pool.query(
-            `SELECT * FROM complaint_chat 
-             WHERE complaint_id = ? AND sender_type = 'admin' AND is_read = 0
-             ORDER BY sent_at DESC`,
-            [complaint_id]
-        );
-
         res.json({
             success: true,
             notifications: notifications,
@@ -513,6 +544,7 @@ exports.getComplaintNotifications = async (req, res) => {
         });
     } catch (err) {
         console.error("Get complaint notifications error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -524,16 +556,20 @@ exports.markNotificationsRead = async (req, res) => {
         const username = req.session.username;
 
         // Check ownership
-        const [ownership] = await pool.query(
+        const [ownership] = await pool.execute(
             'SELECT complaint_id FROM complaint WHERE complaint_id = ? AND username = ?',
             [complaint_id, username]
         );
 
         if (ownership.length === 0) {
+            // Archived cases are read-only; there is nothing left to mark
+            if (await archive.findArchivedComplaint(complaint_id, { username })) {
+                return res.json({ success: true, message: "Notifications marked as read" });
+            }
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        await pool.query(
+        await pool.execute(
             `UPDATE complaint_chat SET is_read = 1 
              WHERE complaint_id = ? AND sender_type = 'admin'`,
             [complaint_id]
@@ -542,6 +578,7 @@ exports.markNotificationsRead = async (req, res) => {
         res.json({ success: true, message: "Notifications marked as read" });
     } catch (err) {
         console.error("Mark notifications read error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -553,16 +590,19 @@ exports.getComplaintChat = async (req, res) => {
         const username = req.session.username;
 
         // Check ownership
-        const [ownership] = await pool.query(
+        const [ownership] = await pool.execute(
             'SELECT complaint_id FROM complaint WHERE complaint_id = ? AND username = ?',
             [complaintId, username]
         );
 
         if (ownership.length === 0) {
+            if (await archive.findArchivedComplaint(complaintId, { username })) {
+                return res.json({ success: true, messages: await archive.getArchivedChat(complaintId), archived: true });
+            }
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        const [messages] = await pool.query(
+        const [messages] = await pool.execute(
             `SELECT * FROM complaint_chat 
              WHERE complaint_id = ?
              ORDER BY sent_at ASC`,
@@ -575,6 +615,7 @@ exports.getComplaintChat = async (req, res) => {
         });
     } catch (err) {
         console.error("Get complaint chat error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -586,16 +627,19 @@ exports.sendChatMessage = async (req, res) => {
         const username = req.session.username;
 
         // Check ownership
-        const [ownership] = await pool.query(
+        const [ownership] = await pool.execute(
             'SELECT complaint_id FROM complaint WHERE complaint_id = ? AND username = ?',
             [complaintId, username]
         );
 
         if (ownership.length === 0) {
+            if (await archive.findArchivedComplaint(complaintId, { username })) {
+                return res.status(409).json({ success: false, message: "This complaint is closed and archived" });
+            }
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        const [result] = await pool.query(
+        const [result] = await pool.execute(
             `INSERT INTO complaint_chat (complaint_id, sender_type, sender_username, message)
              VALUES (?, 'user', ?, ?)`,
             [complaintId, username, message]
@@ -608,6 +652,7 @@ exports.sendChatMessage = async (req, res) => {
         });
     } catch (err) {
         console.error("Send chat message error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
@@ -617,18 +662,8 @@ exports.getDashboardStats = async (req, res) => {
     try {
         const username = req.session.username;
 
-        // Get total complaints
-        const [totalResult] = await pool.query(
-            'SELECT COUNT(*) as total FROM complaint WHERE username = ?',
-            [username]
-        );
-
-        // Get complaints by status
-        const [statusResult] = await pool.query(
-            `SELECT status, COUNT(*) as count FROM complaint 
-             WHERE username = ? GROUP BY status`,
-            [username]
-        );
+        // Counts come from the user's counter row
+        const stats = await counters.getCounts('user', username);
 
         // Get recent complaints
         const [recentComplaints] = await pool.query(
@@ -638,18 +673,6 @@ exports.getDashboardStats = async (req, res) => {
             [username]
         );
 
-        const stats = {
-            total: totalResult[0].total,
-            pending: 0,
-            verifying: 0,
-            investigating: 0,
-            resolved: 0
-        };
-
-        statusResult.forEach(row => {
-            stats[row.status] = row.count;
-        });
-
         res.json({
             success: true,
             stats: stats,
@@ -657,90 +680,100 @@ exports.getDashboardStats = async (req, res) => {
         });
     } catch (err) {
         console.error("Get dashboard stats error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
 
 // Get Complaint Location Data for Heatmap
+// Heatmap points and summaries are the same for every caller; one
+// computation is shared per cache window
+const heatmapCache = new MicroCache('complaint-heatmap', { ttlMs: 10000, staleMs: 60000 });
+
+async function loadComplaintHeatmap() {
+    const [complaints] = await readerFor().query(
+        `SELECT 
+                COALESCE(c.latitude, l.latitude) AS latitude,
+                COALESCE(c.longitude, l.longitude) AS longitude,
+                c.complaint_type,
+                c.status,
+                c.created_at,
+                cat.name AS category_name,
+                l.location_name,
+                l.district_name,
+                c.location_id,
+                COUNT(*) AS incident_count
+         FROM complaint c
+         LEFT JOIN category cat ON c.category_id = cat.category_id
+         LEFT JOIN location l ON c.location_id = l.location_id
+         WHERE COALESCE(c.latitude, l.latitude) IS NOT NULL
+             AND COALESCE(c.longitude, l.longitude) IS NOT NULL
+             AND COALESCE(c.latitude, l.latitude) != 0
+             AND COALESCE(c.longitude, l.longitude) != 0
+         GROUP BY c.location_id, COALESCE(c.latitude, l.latitude), COALESCE(c.longitude, l.longitude), 
+                  c.complaint_type, c.status, c.created_at, cat.name, l.location_name, l.district_name
+         ORDER BY c.created_at DESC`
+    );
+
+    // Transform data for heatmap
+    const heatmapData = complaints.map(complaint => ({
+        lat: parseFloat(complaint.latitude),
+        lng: parseFloat(complaint.longitude),
+        intensity: complaint.incident_count,
+        type: complaint.complaint_type,
+        category: complaint.category_name,
+        location: complaint.location_name,
+        district: complaint.district_name,
+        status: complaint.status,
+        created_at: complaint.created_at,
+        location_id: complaint.location_id
+    }));
+
+    // Get summary statistics
+    const [totalStats] = await pool.query(
+        `SELECT 
+            COUNT(*) as total_complaints,
+            COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_complaints,
+            COUNT(CASE WHEN status = 'resolved' THEN 1 END) as resolved_complaints,
+            COUNT(CASE WHEN status = 'investigating' THEN 1 END) as investigating_complaints
+                     FROM complaint 
+                     LEFT JOIN location l ON complaint.location_id = l.location_id
+                     WHERE COALESCE(complaint.latitude, l.latitude) IS NOT NULL 
+                         AND COALESCE(complaint.longitude, l.longitude) IS NOT NULL
+                         AND COALESCE(complaint.latitude, l.latitude) != 0
+                         AND COALESCE(complaint.longitude, l.longitude) != 0`
+    );
+
+    // Get complaints by category
+    const [categoryStats] = await pool.query(
+        `SELECT 
+            cat.name as category,
+            COUNT(*) as count
+                     FROM complaint c
+                     LEFT JOIN category cat ON c.category_id = cat.category_id
+                     LEFT JOIN location l ON c.location_id = l.location_id
+                     WHERE COALESCE(c.latitude, l.latitude) IS NOT NULL 
+                         AND COALESCE(c.longitude, l.longitude) IS NOT NULL
+                         AND COALESCE(c.latitude, l.latitude) != 0
+                         AND COALESCE(c.longitude, l.longitude) != 0
+         GROUP BY cat.name
+         ORDER BY count DESC`
+    );
+
+    return {
+        heatmapData: heatmapData,
+        totalStats: totalStats[0],
+        categoryStats: categoryStats
+    };
+}
+
 exports.getComplaintHeatmapData = async (req, res) => {
     try {
-                const [complaints] = await pool.query(
-                        `SELECT 
-                                COALESCE(c.latitude, l.latitude) AS latitude,
-                                COALESCE(c.longitude, l.longitude) AS longitude,
-                                c.complaint_type,
-                                c.status,
-                                c.created_at,
-                                cat.name AS category_name,
-                                l.location_name,
-                                l.district_name,
-                                c.location_id,
-                                COUNT(*) AS incident_count
-                         FROM complaint c
-                         LEFT JOIN category cat ON c.category_id = cat.category_id
-                         LEFT JOIN location l ON c.location_id = l.location_id
-                         WHERE COALESCE(c.latitude, l.latitude) IS NOT NULL
-                             AND COALESCE(c.longitude, l.longitude) IS NOT NULL
-                             AND COALESCE(c.latitude, l.latitude) != 0
-                             AND COALESCE(c.longitude, l.longitude) != 0
-                         GROUP BY c.location_id, COALESCE(c.latitude, l.latitude), COALESCE(c.longitude, l.longitude), 
-                                  c.complaint_type, c.status, c.created_at, cat.name, l.location_name, l.district_name
-                         ORDER BY c.created_at DESC`
-                );
-
-        // Transform data for heatmap
-        const heatmapData = complaints.map(complaint => ({
-            lat: parseFloat(complaint.latitude),
-            lng: parseFloat(complaint.longitude),
-            intensity: complaint.incident_count,
-            type: complaint.complaint_type,
-            category: complaint.category_name,
-            location: complaint.location_name,
-            district: complaint.district_name,
-            status: complaint.status,
-            created_at: complaint.created_at,
-            location_id: complaint.location_id
-        }));
-
-        // Get summary statistics
-        const [totalStats] = await pool.query(
-            `SELECT 
-                COUNT(*) as total_complaints,
-                COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_complaints,
-                COUNT(CASE WHEN status = 'resolved' THEN 1 END) as resolved_complaints,
-                COUNT(CASE WHEN status = 'investigating' THEN 1 END) as investigating_complaints
-                         FROM complaint 
-                         LEFT JOIN location l ON complaint.location_id = l.location_id
-                         WHERE COALESCE(complaint.latitude, l.latitude) IS NOT NULL 
-                             AND COALESCE(complaint.longitude, l.longitude) IS NOT NULL
-                             AND COALESCE(complaint.latitude, l.latitude) != 0
-                             AND COALESCE(complaint.longitude, l.longitude) != 0`
-        );
-
-        // Get complaints by category
-        const [categoryStats] = await pool.query(
-            `SELECT 
-                cat.name as category,
-                COUNT(*) as count
-                         FROM complaint c
-                         LEFT JOIN category cat ON c.category_id = cat.category_id
-                         LEFT JOIN location l ON c.location_id = l.location_id
-                         WHERE COALESCE(c.latitude, l.latitude) IS NOT NULL 
-                             AND COALESCE(c.longitude, l.longitude) IS NOT NULL
-                             AND COALESCE(c.latitude, l.latitude) != 0
-                             AND COALESCE(c.longitude, l.longitude) != 0
-             GROUP BY cat.name
-             ORDER BY count DESC`
-        );
-
-        res.json({
-            success: true,
-            heatmapData: heatmapData,
-            totalStats: totalStats[0],
-            categoryStats: categoryStats
-        });
+        const data = await heatmapCache.get('all', loadComplaintHeatmap);
+        res.json({ success: true, ...data });
     } catch (err) {
         console.error("Get complaint heatmap data error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Database error" });
     }
 };
\ No newline at end of file
@@ -0,0 +1,249 @@
+/**
+ * Evidence Controller
+ * Streams complaint and anonymous report evidence after an access check.
+ * Supports HTTP Range requests so video and audio can be scrubbed without
+ * downloading whole files. ?variant=thumb|preview serves the WebP renditions
+ * of processed images (utils/imageProcessingUtils.js).
+ */
+
+const pool = require('../db');
+const path = require('path');
+const fs = require('fs').promises;
+const { UPLOADS_ROOT, DERIVED_VARIANTS } = require('../utils/evidenceStoreUtils');
+const { findArchivedEvidenceFile } = require('../utils/archiveUtils');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
+
+// Configuration
+// Short, so a reassigned case stops streaming soon after; long enough to
+// cover the burst of Range requests a player makes while seeking
+const GRANT_TTL_MS = 30 * 1000;
+const MAX_GRANTS = 5000;
+const STREAM_CHUNK_SIZE = 256 * 1024;
+// Evidence files never change once stored, so clients may keep them for a year
+const EVIDENCE_CACHE_CONTROL = 'private, max-age=31536000, immutable';
+// When set (e.g. "/protected-uploads/"), the file is handed off to nginx via
+// X-Accel-Redirect so it is served with sendfile(2) instead of through Node
+const ACCEL_REDIRECT_PREFIX = process.env.EVIDENCE_ACCEL_REDIRECT || null;
+
+// `${sessionID}:${kind}:${evidenceId}` -> resolved file grant
+// A video player issues many Range requests per file; the access check and
+// stat run once and later requests are served from this map.
+const grants = new Map();
+
+function getGrant(key) {
+    const grant = grants.get(key);
+    if (!grant) return null;
+    if (grant.expires <= Date.now()) {
+        grants.delete(key);
+        return null;
+    }
+    return grant;
+}
+
+function setGrant(key, grant) {
+    if (grants.size >= MAX_GRANTS) {
+        // Maps iterate in insertion order, so the first key is the oldest
+        grants.delete(grants.keys().next().value);
+    }
+    grants.set(key, { ...grant, expires: Date.now() + GRANT_TTL_MS });
+}
+
+/**
+ * Resolve a stored evidence path and stat it
+ * Complaint evidence stores paths relative to uploads/ ("images/ab/cd/<hash>.jpg"),
+ * anonymous evidence stores them with the prefix ("uploads/images/ab/cd/<hash>.jpg").
+ */
+async function resolveEvidenceFile(filePath) {
+    if (!filePath) return null;
+    const relativePath = filePath.replace(/^\/?uploads\//, '');
+    const absPath = path.resolve(UPLOADS_ROOT, relativePath);
+    if (!absPath.startsWith(UPLOADS_ROOT + path.sep)) return null;
+
+    try {
+        const stat = await fs.stat(absPath);
+        if (!stat.isFile()) return null;
+
+        // Strong validator: content-addressed files (and their renditions,
+        // "<hash>-thumb.webp") are named by their SHA-256; legacy files are
+        // immutable once written
+        const contentHash = path.basename(absPath).match(/^[0-9a-f]{64}(-[a-z]+)?/);
+        const etag = contentHash
+            ? `"${contentHash[0]}"`
+            : `"${stat.size.toString(16)}-${Math.floor(stat.mtimeMs).toString(16)}"`;
+
+        return {
+            absPath,
+            relativePath: relativePath.split(path.sep).join('/'),
+            etag
+        };
+    } catch (err) {
+        if (err.code === 'ENOENT') return null;
+        throw err;
+    }
+}
+
+/**
+ * Requested rendition: ?variant=thumb|preview, or null for the original
+ */
+function getVariant(req) {
+    return DERIVED_VARIANTS.includes(req.query.variant) ? req.query.variant : null;
+}
+
+/**
+ * Stored path for the requested rendition
+ * Falls back to the original until the image has been processed.
+ */
+function selectFile(row, variant) {
+    const derivedPath = { thumb: row.thumbnail_path, preview: row.preview_path }[variant];
+    return derivedPath
+        ? { filePath: derivedPath, derived: true }
+        : { filePath: row.file_path, derived: false };
+}
+
+/**
+ * Send an evidence file with caching headers and Range support
+ */
+function sendEvidence(req, res, grant) {
+    res.set({
+        'ETag': grant.etag,
+        'Cache-Control': EVIDENCE_CACHE_CONTROL,
+        'X-Content-Type-Options': 'nosniff'
+    });
+
+    if (req.query.download) {
+        res.attachment(grant.downloadName);
+    }
+
+    if (ACCEL_REDIRECT_PREFIX) {
+        res.set('X-Accel-Redirect', path.posix.join(ACCEL_REDIRECT_PREFIX, grant.relativePath));
+        return res.end();
+    }
+
+    res.sendFile(grant.absPath, {
+        acceptRanges: true,
+        cacheControl: false,
+        etag: false,
+        lastModified: true,
+        highWaterMark: STREAM_CHUNK_SIZE
+    }, (err) => {
+        if (err && !res.headersSent) {
+            console.error('Evidence stream error:', err);
+            res.status(err.status || 500).json({ success: false, message: 'Error streaming evidence' });
+        }
+    });
+}
+
+// Stream Complaint Evidence (complaint owner or assigned admin)
+exports.streamComplaintEvidence = async (req, res) => {
+    try {
+        if (!req.session.userId && !req.session.adminId) {
+            return res.status(401).json({ success: false, message: 'Not authenticated' });
+        }
+
+        const evidenceId = parseInt(req.params.evidenceId);
+        if (isNaN(evidenceId)) {
+            return res.status(400).json({ success: false, message: 'Invalid evidence ID' });
+        }
+
+        const variant = getVariant(req);
+        const grantKey = `${req.sessionID}:complaint:${evidenceId}:${variant || 'original'}`;
+        let grant = getGrant(grantKey);
+
+        if (!grant) {
+            const [results] = await pool.execute(
+                `SELECT e.file_path, c.username, c.admin_username, d.thumbnail_path, d.preview_path
+                 FROM evidence e
+                 JOIN complaint c ON e.complaint_id = c.complaint_id
+                 LEFT JOIN evidence_derivatives d ON d.content_hash = e.content_hash AND d.status = 'done'
+                 WHERE e.evidence_id = ?`,
+                [evidenceId]
+            );
+
+            // Evidence of archived complaints keeps its id and file
+            const evidence = results[0] || await findArchivedEvidenceFile(evidenceId);
+            if (!evidence) {
+                return res.status(404).json({ success: false, message: 'Evidence not found' });
+            }
+
+            const isOwner = req.session.userId && evidence.username === req.session.username;
+            const isAssignedAdmin = req.session.adminId && evidence.admin_username === req.session.adminUsername;
+            if (!isOwner && !isAssignedAdmin) {
+                return res.status(403).json({ success: false, message: 'Access denied' });
+            }
+
+            const file = await resolveEvidenceFile(selectFile(evidence, variant).filePath);
+            if (!file) {
+                return res.status(404).json({ success: false, message: 'Evidence file not found' });
+            }
+
+            grant = { ...file, downloadName: path.basename(file.relativePath) };
+            setGrant(grantKey, grant);
+        }
+
+        sendEvidence(req, res, grant);
+    } catch (err) {
+        console.error('Stream complaint evidence error:', err);
+        if (handlePoolBusy(res, err)) return;
+        res.status(500).json({ success: false, message: 'Error fetching evidence' });
+    }
+};
+
+// Stream Anonymous Report Evidence (admins of the report's district)
+exports.streamAnonymousEvidence = async (req, res) => {
+    try {
+        if (!req.session.adminId) {
+            return res.status(401).json({ success: false, message: 'Admin authentication required' });
+        }
+
+        const evidenceId = parseInt(req.params.evidenceId);
+        if (isNaN(evidenceId)) {
+            return res.status(400).json({ success: false, message: 'Invalid evidence ID' });
+        }
+
+        const variant = getVariant(req);
+        const grantKey = `${req.sessionID}:anonymous:${evidenceId}:${variant || 'original'}`;
+        let grant = getGrant(grantKey);
+
+        if (!grant) {
+            const adminUsername = req.session.adminUsername;
+            const adminDistrict = req.session.district || '';
+
+            const [results] = await pool.execute(
+                `SELECT ae.file_path, ae.original_name, d.thumbnail_path, d.preview_path
+                 FROM anonymous_evidence ae
+                 JOIN anonymous_reports ar ON ae.report_id = ar.report_id
+                 LEFT JOIN evidence_derivatives d ON d.content_hash = ae.content_hash AND d.status = 'done'
+                 WHERE ae.id = ?
+                 AND (ar.assigned_admin = ? OR ar.district_name = ? OR (ar.assigned_admin IS NULL AND ar.district_name IS NULL))`,
+                [evidenceId, adminUsername, adminDistrict]
+            );
+
+            if (results.length === 0) {
+                return res.status(404).json({ success: false, message: 'Evidence not found' });
+            }
+
+            const selected = selectFile(results[0], variant);
+            const file = await resolveEvidenceFile(selected.filePath);
+            if (!file) {
+                return res.status(404).json({ success: false, message: 'Evidence file not found' });
+            }
+
+            const originalName = results[0].original_name;
+            grant = {
+                ...file,
+                downloadName: selected.derived
+                    ? `${path.parse(originalName).name}-${variant}.webp`
+                    : originalName
+            };
+            setGrant(grantKey, grant);
+        }
+
+        sendEvidence(req, res, grant);
+    } catch (err) {
+        console.error('Stream anonymous evidence error:', err);
+        if (handlePoolBusy(res, err)) return;
+        res.status(500).json({ success: false, message: 'Error fetching evidence' });
+    }
+};
+
+module.exports = exports;
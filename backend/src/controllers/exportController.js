@@ -0,0 +1,202 @@
+const pool = require('../db');
+const { logAdminAction, auditLogSource } = require('../utils/auditUtils');
+const { ExportError, parseExportOptions, selectList, streamExport } = require('../utils/exportUtils');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
+
+// Export column name -> SQL expression; ?columns= picks from these keys
+const CASE_COLUMNS = {
+    complaint_id: 'c.complaint_id',
+    complainant_username: 'c.username',
+    complainant_fullname: 'u.fullName',
+    category: "COALESCE(cat.name, c.complaint_type, 'General')",
+    crime_code: 'cat.crime_code',
+    status: 'c.status',
+    created_at: 'c.created_at',
+    last_updated: 'COALESCE(ac.last_updated, c.created_at)',
+    location_address: 'c.location_address',
+    latitude: 'c.latitude',
+    longitude: 'c.longitude',
+    description: 'c.description',
+    archived: 'FALSE'
+};
+
+const ANONYMOUS_REPORT_COLUMNS = {
+    report_id: 'ar.report_id',
+    crime_type: 'COALESCE(cat.name, ar.crime_type)',
+    crime_code: 'cat.crime_code',
+    status: 'ar.status',
+    is_flagged: 'ar.is_flagged',
+    incident_date: "DATE_FORMAT(ar.incident_date, '%Y-%m-%d')",
+    incident_time: 'ar.incident_time',
+    submitted_at: 'ar.submitted_at',
+    reviewed_at: 'ar.reviewed_at',
+    reviewed_by: 'ar.reviewed_by',
+    district_name: 'ar.district_name',
+    location_address: 'ar.location_address',
+    latitude: 'ar.latitude',
+    longitude: 'ar.longitude',
+    description: 'ar.description',
+    suspect_description: 'ar.suspect_description',
+    additional_notes: 'ar.additional_notes'
+};
+
+const AUDIT_LOG_COLUMNS = {
+    log_id: 'log_id',
+    timestamp: '`timestamp`',
+    admin_username: 'admin_username',
+    action: 'action',
+    result: 'result',
+    complaint_id: 'complaint_id',
+    target_username: 'target_username',
+    ip_address: 'ip_address',
+    user_agent: 'user_agent',
+    action_details: 'action_details'
+};
+
+function handleExportError(res, err, fallbackMessage) {
+    if (res.headersSent || handlePoolBusy(res, err)) return;
+    if (err instanceof ExportError) {
+        return res.status(err.status).json({ success: false, message: err.message });
+    }
+    console.error(`${fallbackMessage}:`, err);
+    res.status(500).json({ success: false, message: fallbackMessage });
+}
+
+// Export Admin Cases (CSV / NDJSON)
+exports.exportAdminCases = async (req, res) => {
+    try {
+        if (!req.session.adminId) {
+            return res.status(401).json({ success: false, message: "Not authenticated" });
+        }
+
+        const adminUsername = req.session.adminUsername;
+        const options = parseExportOptions(req.query, CASE_COLUMNS);
+
+        // Live and archived cases are filtered per branch and merged by date
+        let where = 'c.admin_username = ? AND c.is_discarded = FALSE';
+        const branchParams = [adminUsername, adminUsername];
+
+        if (req.query.status) {
+            where += ' AND c.status = ?';
+            branchParams.push(req.query.status);
+        }
+        if (options.dateFrom) {
+            where += ' AND c.created_at >= ?';
+            branchParams.push(options.dateFrom);
+        }
+        if (options.dateTo) {
+            where += ' AND c.created_at < DATE_ADD(?, INTERVAL 1 DAY)';
+            branchParams.push(options.dateTo);
+        }
+
+        const branch = (table, columns) => `
+            (SELECT ${selectList(columns, options.columns)}, c.created_at AS sort_created_at
+            FROM ${table} c
+            INNER JOIN users u ON c.username = u.username
+            LEFT JOIN category cat ON c.category_id = cat.category_id
+            LEFT JOIN admin_cases ac ON c.complaint_id = ac.complaint_id AND ac.admin_username = ?
+            WHERE ${where})
+        `;
+        const sql = `${branch('complaint', CASE_COLUMNS)} UNION ALL ${branch('complaint_archive', { ...CASE_COLUMNS, archived: 'TRUE' })} ORDER BY sort_created_at DESC`;
+        const params = [...branchParams, ...branchParams];
+
+        await logAdminAction(adminUsername, 'cases_exported', {
+            actionDetails: { format: options.format, columns: options.columns, dateFrom: options.dateFrom, dateTo: options.dateTo },
+            ipAddress: req.ip
+        });
+
+        await streamExport(req, res, { filename: 'cases', format: options.format, columns: options.columns, sql, params });
+    } catch (err) {
+        handleExportError(res, err, 'Error exporting cases');
+    }
+};
+
+// Export Anonymous Reports (CSV / NDJSON), same district filter as the list
+exports.exportAnonymousReports = async (req, res) => {
+    try {
+        if (!req.session.adminId) {
+            return res.status(401).json({ success: false, message: 'Admin authentication required' });
+        }
+
+        const adminUsername = req.session.adminUsername;
+        const options = parseExportOptions(req.query, ANONYMOUS_REPORT_COLUMNS);
+
+        const [adminResult] = await pool.query(
+            'SELECT district_name FROM admins WHERE username = ?',
+            [adminUsername]
+        );
+        if (adminResult.length === 0) {
+            return res.status(403).json({ success: false, message: 'Admin not found' });
+        }
+
+        let sql = `
+            SELECT ${selectList(ANONYMOUS_REPORT_COLUMNS, options.columns)}
+            FROM anonymous_reports ar
+            LEFT JOIN category cat ON ar.category_id = cat.category_id
+            WHERE (ar.assigned_admin = ? OR ar.district_name = ? OR (ar.assigned_admin IS NULL AND ar.district_name IS NULL))
+        `;
+        const params = [adminUsername, adminResult[0].district_name];
+
+        if (req.query.status) {
+            sql += ' AND ar.status = ?';
+            params.push(req.query.status);
+        }
+        if (options.dateFrom) {
+            sql += ' AND ar.submitted_at >= ?';
+            params.push(options.dateFrom);
+        }
+        if (options.dateTo) {
+            sql += ' AND ar.submitted_at < DATE_ADD(?, INTERVAL 1 DAY)';
+            params.push(options.dateTo);
+        }
+        sql += ' ORDER BY ar.submitted_at DESC';
+
+        await logAdminAction(adminUsername, 'anonymous_reports_exported', {
+            actionDetails: { format: options.format, columns: options.columns, dateFrom: options.dateFrom, dateTo: options.dateTo },
+            ipAddress: req.ip
+        });
+
+        await streamExport(req, res, { filename: 'anonymous-reports', format: options.format, columns: options.columns, sql, params });
+    } catch (err) {
+        handleExportError(res, err, 'Error exporting anonymous reports');
+    }
+};
+
+// Export Audit Logs (Super Admin, CSV / NDJSON)
+exports.exportAuditLogs = async (req, res) => {
+    try {
+        if (!req.session.isSuperAdmin) {
+            return res.status(403).json({ success: false, message: "Unauthorized access" });
+        }
+
+        const options = parseExportOptions(req.query, AUDIT_LOG_COLUMNS);
+
+        let where = '1=1';
+        const params = [];
+
+        if (req.query.username) {
+            where += ' AND admin_username = ?';
+            params.push(req.query.username);
+        }
+        if (req.query.action) {
+            where += ' AND action = ?';
+            params.push(req.query.action);
+        }
+        if (options.dateFrom) {
+            where += ' AND `timestamp` >= ?';
+            params.push(options.dateFrom);
+        }
+        if (options.dateTo) {
+            where += ' AND `timestamp` < DATE_ADD(?, INTERVAL 1 DAY)';
+            params.push(options.dateTo);
+        }
+
+        // Entries of archived cases are exported with the live ones
+        const source = auditLogSource(where, params);
+        const sql = `SELECT ${selectList(AUDIT_LOG_COLUMNS, options.columns)} FROM ${source.from} ORDER BY \`timestamp\` DESC`;
+
+        await streamExport(req, res, { filename: 'audit-logs', format: options.format, columns: options.columns, sql, params: source.params });
+    } catch (err) {
+        handleExportError(res, err, 'Error exporting audit logs');
+    }
+};
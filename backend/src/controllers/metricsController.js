@@ -0,0 +1,212 @@
+const crypto = require('crypto');
+const pool = require('../db');
+const { MetricsWriter, getRuntimeStats } = require('../utils/metricsUtils');
+const { getRequestStats } = require('../middleware/metricsMiddleware');
+const { getCacheStats } = require('../utils/cacheUtils');
+const { getRateLimitStats } = require('../utils/rateLimitUtils');
+const { getArchiveStats } = require('../utils/archiveUtils');
+const { getReadRoutingStats } = require('../utils/readRoutingUtils');
+const { getEmailOutboxStats } = require('../utils/emailOutboxUtils');
+
+const LOOPBACK_ADDRESSES = new Set(['127.0.0.1', '::1', '::ffff:127.0.0.1']);
+
+// Set by reverse proxies; a loopback peer sending one is relaying a remote client
+const FORWARDING_HEADERS = ['x-forwarded-for', 'forwarded', 'x-real-ip'];
+
+// Scrapers authenticate with METRICS_TOKEN. Without one, production serves
+// nobody and other environments serve direct local requests only.
+function isScrapeAllowed(req) {
+    const token = process.env.METRICS_TOKEN;
+    if (!token) {
+        if (process.env.NODE_ENV === 'production') return false;
+        return LOOPBACK_ADDRESSES.has(req.socket.remoteAddress)
+            && !FORWARDING_HEADERS.some(header => req.get(header) !== undefined);
+    }
+
+    const header = req.get('authorization') || '';
+    const expected = Buffer.from(`Bearer ${token}`);
+    const given = Buffer.from(header);
+    return given.length === expected.length && crypto.timingSafeEqual(given, expected);
+}
+
+function writeRequestMetrics(writer) {
+    const { inFlight, routes } = getRequestStats();
+
+    writer.family('http_requests_in_flight', 'gauge', 'Requests currently being handled')
+        .sample('http_requests_in_flight', null, inFlight);
+
+    writer.family('http_requests_total', 'counter', 'Requests by route template and status');
+    for (const entry of routes) {
+        for (const [status, count] of entry.statuses) {
+            writer.sample('http_requests_total', { method: entry.method, route: entry.route, status }, count);
+        }
+    }
+
+    writer.family('http_request_duration_seconds', 'histogram', 'Request latency by route template');
+    for (const entry of routes) {
+        writer.histogram('http_request_duration_seconds', { method: entry.method, route: entry.route }, entry.latency);
+    }
+}
+
+function writeRuntimeMetrics(writer) {
+    const { eventLoopDelayMs, gcPauses, memory } = getRuntimeStats();
+
+    if (eventLoopDelayMs) {
+        writer.family('nodejs_eventloop_lag_seconds', 'gauge', 'Event loop delay since the previous scrape');
+        for (const quantile of ['mean', 'p50', 'p99', 'max']) {
+            writer.sample('nodejs_eventloop_lag_seconds', { quantile }, Math.round(eventLoopDelayMs[quantile] * 1000) / 1e6);
+        }
+    }
+
+    writer.family('nodejs_gc_duration_seconds', 'histogram', 'Garbage collection pauses by kind');
+    for (const [kind, histogram] of gcPauses) {
+        writer.histogram('nodejs_gc_duration_seconds', { kind }, histogram);
+    }
+
+    writer.family('nodejs_memory_bytes', 'gauge', 'Process memory usage');
+    writer.sample('nodejs_memory_bytes', { type: 'rss' }, memory.rss)
+        .sample('nodejs_memory_bytes', { type: 'heap_used' }, memory.heapUsed)
+        .sample('nodejs_memory_bytes', { type: 'heap_total' }, memory.heapTotal)
+        .sample('nodejs_memory_bytes', { type: 'heap_limit' }, memory.heapLimit)
+        .sample('nodejs_memory_bytes', { type: 'external' }, memory.external);
+}
+
+function writePoolMetrics(writer) {
+    const stats = pool.getPoolStats(0);
+
+    writer.family('db_pool_connections', 'gauge', 'Database pool connections by state');
+    writer.sample('db_pool_connections', { state: 'active' }, stats.active)
+        .sample('db_pool_connections', { state: 'waiting' }, stats.waiting)
+        .sample('db_pool_connections', { state: 'open' }, stats.open)
+        .sample('db_pool_connections', { state: 'idle' }, stats.idle);
+
+    writer.family('db_pool_rejected_total', 'counter', 'Requests refused because the pool queue was full')
+        .sample('db_pool_rejected_total', null, stats.rejected);
+    writer.family('db_query_errors_total', 'counter', 'Failed database statements')
+        .sample('db_query_errors_total', null, stats.errors);
+    writer.family('db_slow_queries_total', 'counter', 'Statements slower than DB_SLOW_QUERY_MS')
+        .sample('db_slow_queries_total', null, stats.slowQueries);
+    writer.family('db_prepared_statement_lookups_total', 'counter', 'Prepared statement cache lookups by result')
+        .sample('db_prepared_statement_lookups_total', { result: 'hit' }, stats.preparedStatements.hits)
+        .sample('db_prepared_statement_lookups_total', { result: 'miss' }, stats.preparedStatements.misses);
+}
+
+function writeCacheMetrics(writer) {
+    const caches = getCacheStats();
+
+    writer.family('cache_lookups_total', 'counter', 'Micro-cache lookups by result (stale = served while refreshing, coalesced = joined an in-flight load)');
+    for (const cache of caches) {
+        for (const result of ['hit', 'stale', 'coalesced', 'miss']) {
+            writer.sample('cache_lookups_total', { cache: cache.name, result }, cache[result]);
+        }
+    }
+    writer.family('cache_load_errors_total', 'counter', 'Micro-cache loads that failed');
+    for (const cache of caches) {
+        writer.sample('cache_load_errors_total', { cache: cache.name }, cache.error);
+    }
+    writer.family('cache_entries', 'gauge', 'Keys held per micro-cache');
+    for (const cache of caches) {
+        writer.sample('cache_entries', { cache: cache.name }, cache.entries);
+    }
+}
+
+function writeRateLimitMetrics(writer) {
+    const { store, buckets, policies } = getRateLimitStats();
+
+    writer.family('rate_limit_decisions_total', 'counter', 'Rate limit checks by policy and result (errors = store failed, request allowed)');
+    for (const entry of policies) {
+        for (const result of ['allowed', 'limited', 'errors']) {
+            writer.sample('rate_limit_decisions_total', { policy: entry.policy, result }, entry[result]);
+        }
+    }
+    if (store === 'memory') {
+        writer.family('rate_limit_buckets', 'gauge', 'Partially drained buckets held in memory')
+            .sample('rate_limit_buckets', null, buckets);
+    }
+}
+
+function writeArchiveMetrics(writer) {
+    const stats = getArchiveStats();
+
+    writer.family('archive_complaints_total', 'counter', 'Complaints moved to the archive tables')
+        .sample('archive_complaints_total', null, stats.complaints);
+    writer.family('archive_rows_total', 'counter', 'Rows moved to the archive tables, complaints included')
+        .sample('archive_rows_total', null, stats.rows);
+    writer.family('archive_runs_total', 'counter', 'Background archive runs by result');
+    writer.sample('archive_runs_total', { result: 'ok' }, stats.runs);
+    writer.sample('archive_runs_total', { result: 'error' }, stats.errors);
+}
+
+function writeReadRoutingMetrics(writer) {
+    const stats = getReadRoutingStats();
+
+    writer.family('db_read_routing_total', 'counter', 'Reporting reads by target (fallback = replica failed, retried on primary)');
+    for (const target of ['replica', 'primary', 'fallback']) {
+        writer.sample('db_read_routing_total', { target }, stats.routed[target]);
+    }
+    if (!stats.configured) return;
+
+    const replica = pool.replica.getPoolStats(0);
+    writer.family('db_replica_pool_connections', 'gauge', 'Read replica pool connections by state');
+    writer.sample('db_replica_pool_connections', { state: 'active' }, replica.active)
+        .sample('db_replica_pool_connections', { state: 'waiting' }, replica.waiting)
+        .sample('db_replica_pool_connections', { state: 'open' }, replica.open)
+        .sample('db_replica_pool_connections', { state: 'idle' }, replica.idle);
+    writer.family('db_replica_healthy', 'gauge', 'Whether reads may use the replica (lag within DB_REPLICA_MAX_LAG_SECONDS)')
+        .sample('db_replica_healthy', null, stats.healthy ? 1 : 0);
+    if (stats.lagSeconds !== null) {
+        writer.family('db_replica_lag_seconds', 'gauge', 'Replication lag at the last check')
+            .sample('db_replica_lag_seconds', null, stats.lagSeconds);
+    }
+}
+
+function writeEmailMetrics(writer) {
+    const stats = getEmailOutboxStats();
+
+    writer.family('email_outbox_messages_total', 'counter', 'Outbox messages by delivery result (retried = temporary failure, sent again later)');
+    for (const result of ['sent', 'retried', 'failed', 'expired']) {
+        writer.sample('email_outbox_messages_total', { result }, stats[result]);
+    }
+    writer.family('email_outbox_queue', 'gauge', 'Outbox messages waiting or being sent, at the last poll');
+    writer.sample('email_outbox_queue', { status: 'pending' }, stats.queue.pending)
+        .sample('email_outbox_queue', { status: 'sending' }, stats.queue.sending);
+    writer.family('email_outbox_oldest_pending_seconds', 'gauge', 'Age of the oldest pending message at the last poll')
+        .sample('email_outbox_oldest_pending_seconds', null, stats.queue.oldestPendingSeconds);
+    writer.family('email_sends_in_flight', 'gauge', 'Messages this process is sending now')
+        .sample('email_sends_in_flight', null, stats.active);
+    writer.family('email_domain_pauses_total', 'counter', 'Times a recipient domain was paused after a 421/450/451 reply')
+        .sample('email_domain_pauses_total', null, stats.domainPauses);
+    writer.family('email_send_duration_seconds', 'histogram', 'SMTP send latency of delivered messages');
+    writer.histogram('email_send_duration_seconds', null, stats.sendLatency);
+}
+
+// Prometheus scrape endpoint
+exports.getMetrics = (req, res) => {
+    if (!isScrapeAllowed(req)) {
+        return res.status(403).json({
+            success: false,
+            message: 'Forbidden'
+        });
+    }
+
+    try {
+        const writer = new MetricsWriter();
+        writeRequestMetrics(writer);
+        writeRuntimeMetrics(writer);
+        writePoolMetrics(writer);
+        writeCacheMetrics(writer);
+        writeRateLimitMetrics(writer);
+        writeArchiveMetrics(writer);
+        writeReadRoutingMetrics(writer);
+        writeEmailMetrics(writer);
+
+        res.set('Cache-Control', 'no-store');
+        res.type('text/plain; version=0.0.4; charset=utf-8').send(writer.toString());
+    } catch (err) {
+        console.error('Metrics error:', err);
+        res.status(500).json({
+            success: false,
+            message: 'Failed to collect metrics'
+        });
+    }
+};
@@ -1,5 +1,6 @@
 const fs = require('fs');
 const path = require('path');
+const { resolvePage } = require('../middleware/staticMiddleware');
 
 // Get Homepage
 exports.getHomepage = (req, res) => {
@@ -8,7 +9,7 @@ exports.getHomepage = (req, res) => {
     const username = req.session && req.session.username ? req.session.username : null;
     const adminUsername = req.session && req.session.adminUsername ? req.session.adminUsername : null;
 
-    const homepagePath = path.join(__dirname, '../../../frontend/index.html');
+    const homepagePath = resolvePage(path.join(__dirname, '../../../frontend/index.html'));
 
     if (!fs.existsSync(homepagePath)) {
         return res.status(404).send("Homepage file not found");
@@ -51,7 +52,7 @@ exports.getContactUs = (req, res) => {
     const isAuthenticated = req.session && req.session.userId ? true : false;
     const username = req.session && req.session.username ? req.session.username : null;
 
-    const contactUsPath = path.join(__dirname, '../../../frontend/src/pages/contact-us.html');
+    const contactUsPath = resolvePage(path.join(__dirname, '../../../frontend/src/pages/contact-us.html'));
 
     if (!fs.existsSync(contactUsPath)) {
         return res.status(404).send("Contact Us page not found");
@@ -76,7 +77,7 @@ exports.getContactUs = (req, res) => {
 
 // Get Admin Login Page
 exports.getAdminLoginPage = (req, res) => {
-    const adminLoginPath = path.join(__dirname, '../../../frontend/src/pages/adminLogin.html');
+    const adminLoginPath = resolvePage(path.join(__dirname, '../../../frontend/src/pages/adminLogin.html'));
 
     if (!fs.existsSync(adminLoginPath)) {
         return res.status(404).send("Admin login page not found");
@@ -87,7 +88,7 @@ exports.getAdminLoginPage = (req, res) => {
 
 // Get Login Page
 exports.getLoginPage = (req, res) => {
-    const loginPath = path.join(__dirname, '../../../frontend/src/pages/login.html');
+    const loginPath = resolvePage(path.join(__dirname, '../../../frontend/src/pages/login.html'));
 
     if (!fs.existsSync(loginPath)) {
         return res.status(404).send("Login page not found");
@@ -98,7 +99,7 @@ exports.getLoginPage = (req, res) => {
 
 // Get Signup Page
 exports.getSignupPage = (req, res) => {
-    const signupPath = path.join(__dirname, '../../../frontend/src/pages/login.html');
+    const signupPath = resolvePage(path.join(__dirname, '../../../frontend/src/pages/login.html'));
     res.sendFile(signupPath);
 };
 
@@ -113,7 +114,7 @@ exports.getComplainPage = (req, res) => {
 
 // Get Anonymous Report Page
 exports.getAnonymousReportPage = (req, res) => {
-    const anonymousReportPath = path.join(__dirname, '../../../frontend/src/pages/anonymous-report.html');
+    const anonymousReportPath = resolvePage(path.join(__dirname, '../../../frontend/src/pages/anonymous-report.html'));
 
     if (!fs.existsSync(anonymousReportPath)) {
         return res.status(404).send("Anonymous report page not found");
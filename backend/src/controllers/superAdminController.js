@@ -1,8 +1,14 @@
 const pool = require('../db');
 const { hashPassword } = require('../utils/passwordUtils');
-const { sendEmail } = require('../utils/emailUtils');
+const { queueEmail, drainEmailOutbox, PRIORITY } = require('../utils/emailOutboxUtils');
 const { logAdminAction, getAllAuditLogs } = require('../utils/auditUtils');
+const counters = require('../utils/counterUtils');
+const { collectOrphans, getDeletionQueueStats } = require('../utils/storageGcUtils');
+const { runArchive, getArchiveStats } = require('../utils/archiveUtils');
+const { readerFor, getReadRoutingStats } = require('../utils/readRoutingUtils');
+const { sessionTokens } = require('../utils/tokenUtils');
 const crypto = require('crypto');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
 
 // ========== SUPER ADMIN LOGIN ==========
 exports.superAdminLogin = async (req, res) => {
@@ -54,11 +60,13 @@ exports.superAdminLogin = async (req, res) => {
         res.json({
             success: true,
             message: "Login successful",
-            redirect: "/super-admin-dashboard"
+            redirect: "/super-admin-dashboard",
+            ...sessionTokens(req, 'super_admin')
         });
 
     } catch (err) {
         console.error("Super admin login error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -94,6 +102,7 @@ exports.getPendingAdminRequests = async (req, res) => {
 
     } catch (err) {
         console.error("Error fetching pending requests:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -144,6 +153,7 @@ exports.getAllAdminRequests = async (req, res) => {
 
     } catch (err) {
         console.error("Error fetching admin requests:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -215,45 +225,41 @@ exports.approveAdminRequest = async (req, res) => {
 
         const emailVerified = verificationResults.length > 0 && verificationResults[0].is_used === 1;
 
-        // Update workflow status to approved and activate account
-        await pool.query(
-            `UPDATE admin_approval_workflow 
-            SET status = 'approved',
-                approval_date = NOW(),
-                approved_by = ?
-            WHERE admin_username = ?`,
-            [req.session.superAdminUsername, admin.username]
-        );
-
-        // Activate admin account (password already set at registration)
-        await pool.query(
-            `UPDATE admins SET is_active = 1 WHERE username = ?`,
-            [admin.username]
-        );
+        // Approval, activation and the notification email commit together
+        const connection = await pool.getConnection();
+        try {
+            await connection.beginTransaction();
+
+            // Update workflow status to approved and activate account
+            await connection.query(
+                `UPDATE admin_approval_workflow 
+                SET status = 'approved',
+                    approval_date = NOW(),
+                    approved_by = ?
+                WHERE admin_username = ?`,
+                [req.session.superAdminUsername, admin.username]
+            );
 
-        // Log action
-        await logAdminAction(admin.username, 'account_approved', {
-            result: 'success',
-            approvedBy: req.session.superAdminUsername,
-            emailVerified: emailVerified
-        });
+            // Activate admin account (password already set at registration)
+            await connection.query(
+                `UPDATE admins SET is_active = 1 WHERE username = ?`,
+                [admin.username]
+            );
 
-        // Send approval notification email
-        try {
-            await sendEmail(
+            await queueEmail(
                 admin.email,
                 'District Admin Account Approved - You Can Now Login!',
                 `
                 <h2>🎉 Your District Admin Account Has Been Approved!</h2>
                 <p>Dear ${admin.fullName || admin.username},</p>
                 <p>Great news! Your registration request for District Admin access has been approved by the Super Administrator.</p>
-                
+            
                 ${!emailVerified ? `
                 <div style="background: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; margin: 20px 0; border-radius: 4px;">
                     <strong>⚠️ Important:</strong> Please verify your email before logging in if you haven't already.
                 </div>
                 ` : ''}
-                
+            
                 <h3>Your Account Details:</h3>
                 <ul>
                     <li><strong>Username:</strong> ${admin.username}</li>
@@ -262,28 +268,38 @@ exports.approveAdminRequest = async (req, res) => {
                     <li><strong>Designation:</strong> ${admin.designation}</li>
                     <li><strong>Email Verified:</strong> ${emailVerified ? '✅ Yes' : '❌ Not yet'}</li>
                 </ul>
-                
+            
                 <p>You can now login to the Admin Dashboard:</p>
                 <a href="${process.env.FRONTEND_URL || 'http://localhost:3000'}/adminLogin" style="display: inline-block; margin: 15px 0; padding: 12px 24px; background-color: #4CAF50; color: white; text-decoration: none; border-radius: 5px; font-weight: bold;">
                     Login to Dashboard
                 </a>
-                
+            
                 <p><strong>Note:</strong> Two-factor authentication (OTP) will be required for each login for enhanced security.</p>
-                
+            
                 <hr>
                 <p style="color: #666; font-size: 12px;">
                     This is an official notification from the SecureVoice Crime Reporting System.<br>
                     If you did not request this account, please contact the Super Administrator immediately.
                 </p>
-                `
+                `,
+                { connection, priority: PRIORITY.ACCOUNT }
             );
-        } catch (emailErr) {
-            console.error('Error sending approval email:', emailErr);
-            return res.status(500).json({
-                success: false,
-                message: "Admin approved but failed to send email notification"
-            });
+
+            await connection.commit();
+        } catch (err) {
+            await connection.rollback();
+            throw err;
+        } finally {
+            connection.release();
         }
+        drainEmailOutbox();
+
+        // Log action
+        await logAdminAction(admin.username, 'account_approved', {
+            result: 'success',
+            approvedBy: req.session.superAdminUsername,
+            emailVerified: emailVerified
+        });
 
         res.json({
             success: true,
@@ -293,6 +309,7 @@ exports.approveAdminRequest = async (req, res) => {
 
     } catch (err) {
         console.error("Error approving admin:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -334,44 +351,54 @@ exports.rejectAdminRequest = async (req, res) => {
 
         const admin = adminResults[0];
 
-        // Update workflow status to rejected
-        await pool.query(
-            `UPDATE admin_approval_workflow 
-            SET status = 'rejected',
-                rejection_reason = ?,
-                approval_date = NOW(),
-                approved_by = ?
-            WHERE admin_username = ?`,
-            [rejectionReason, req.session.superAdminUsername, admin.username]
-        );
-
-        // Send rejection email
+        // The rejection and its email commit together
+        const connection = await pool.getConnection();
         try {
-            await sendEmail(
+            await connection.beginTransaction();
+
+            // Update workflow status to rejected
+            await connection.query(
+                `UPDATE admin_approval_workflow 
+                SET status = 'rejected',
+                    rejection_reason = ?,
+                    approval_date = NOW(),
+                    approved_by = ?
+                WHERE admin_username = ?`,
+                [rejectionReason, req.session.superAdminUsername, admin.username]
+            );
+
+            await queueEmail(
                 admin.email,
                 'District Admin Registration Request Rejected',
                 `
                 <h2>Registration Request Update</h2>
                 <p>Dear ${admin.fullName || admin.username},</p>
                 <p>We regret to inform you that your registration request for District Admin access has been rejected.</p>
-                
+            
                 <h3>Reason for Rejection:</h3>
                 <p style="background-color: #f5f5f5; padding: 15px; border-left: 4px solid #f44336;">
                     ${rejectionReason}
                 </p>
-                
+            
                 <p>If you believe this is an error or have additional documentation to support your request, 
                 please contact the Super Administrator at ${process.env.SUPER_ADMIN_EMAIL || 'superadmin@crime.gov.bd'}.</p>
-                
+            
                 <hr>
                 <p style="color: #666; font-size: 12px;">
                     This is an official notification from the SecureVoice Crime Reporting System.
                 </p>
-                `
+                `,
+                { connection, priority: PRIORITY.ACCOUNT }
             );
-        } catch (emailErr) {
-            console.error('Error sending rejection email:', emailErr);
+
+            await connection.commit();
+        } catch (err) {
+            await connection.rollback();
+            throw err;
+        } finally {
+            connection.release();
         }
+        drainEmailOutbox();
 
         res.json({
             success: true,
@@ -380,6 +407,7 @@ exports.rejectAdminRequest = async (req, res) => {
 
     } catch (err) {
         console.error("Error rejecting admin:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -445,6 +473,7 @@ exports.suspendAdminAccount = async (req, res) => {
 
     } catch (err) {
         console.error("Error suspending admin:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -510,6 +539,7 @@ exports.reactivateAdminAccount = async (req, res) => {
 
     } catch (err) {
         console.error("Error reactivating admin:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -529,34 +559,13 @@ exports.getAuditLogs = async (req, res) => {
 
         const { username, dateFrom, dateTo, limit } = req.query;
 
-        let query = 'SELECT * FROM admin_audit_logs WHERE 1=1';
-        const params = [];
-
-        if (username) {
-            query += ' AND admin_username = ?';
-            params.push(username);
-        }
-
-        if (dateFrom) {
-            query += ' AND DATE(timestamp) >= ?';
-            params.push(dateFrom);
-        }
-
-        if (dateTo) {
-            query += ' AND DATE(timestamp) <= ?';
-            params.push(dateTo);
-        }
-
-        query += ' ORDER BY timestamp DESC';
-
-        if (limit) {
-            query += ' LIMIT ?';
-            params.push(parseInt(limit));
-        } else {
-            query += ' LIMIT 500';
-        }
-
-        const [logs] = await pool.query(query, params);
+        // Live and archived entries, newest first
+        const logs = await getAllAuditLogs({
+            adminUsername: username,
+            dateFrom,
+            dateTo,
+            limit: parseInt(limit) || 500
+        }, req);
 
         res.json({
             success: true,
@@ -565,6 +574,7 @@ exports.getAuditLogs = async (req, res) => {
 
     } catch (err) {
         console.error("Error fetching audit logs:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -582,25 +592,29 @@ exports.getSuperAdminStats = async (req, res) => {
             });
         }
 
-        // Get counts from admin_approval_workflow table
-        const [pendingCount] = await pool.query('SELECT COUNT(*) as count FROM admin_approval_workflow WHERE status = "pending"');
-        const [approvedCount] = await pool.query('SELECT COUNT(*) as count FROM admin_approval_workflow WHERE status = "approved"');
-        const [rejectedCount] = await pool.query('SELECT COUNT(*) as count FROM admin_approval_workflow WHERE status = "rejected"');
-        const [suspendedCount] = await pool.query('SELECT COUNT(*) as count FROM admin_approval_workflow WHERE status = "suspended"');
-        const [activeCount] = await pool.query('SELECT COUNT(*) as count FROM admins WHERE is_active = 1');
+        // Replica unless this super admin has just approved or changed an admin
+        const reader = readerFor(req);
 
-        // Get average approval time (in hours)
-        const [avgApprovalTime] = await pool.query(`
-            SELECT AVG(TIMESTAMPDIFF(HOUR, request_date, approval_date)) as avg_hours
+        // Workflow counts and average approval time (hours) in one pass
+        const [workflowStats] = await reader.query(`
+            SELECT 
+                COALESCE(SUM(status = 'pending'), 0) as pending,
+                COALESCE(SUM(status = 'approved'), 0) as approved,
+                COALESCE(SUM(status = 'rejected'), 0) as rejected,
+                COALESCE(SUM(status = 'suspended'), 0) as suspended,
+                AVG(CASE WHEN status = 'approved' AND approval_date IS NOT NULL
+                    THEN TIMESTAMPDIFF(HOUR, request_date, approval_date) END) as avg_hours,
+                (SELECT COUNT(*) FROM admins WHERE is_active = 1) as active
             FROM admin_approval_workflow
-            WHERE approval_date IS NOT NULL AND status = 'approved'
         `);
+        const workflow = workflowStats[0];
 
-        // Get total actions from audit logs
-        const [totalActions] = await pool.query('SELECT COUNT(*) as count FROM admin_audit_logs');
+        // Audit log total and complaint counts are kept by the counters
+        const totalActions = await counters.getAuditActionCount();
+        const complaintStats = await counters.getCounts('global');
 
         // Get district distribution
-        const [districtStats] = await pool.query(`
+        const [districtStats] = await reader.query(`
             SELECT 
                 a.district_name as district,
                 SUM(CASE WHEN aw.status = 'approved' AND a.is_active = 1 THEN 1 ELSE 0 END) as active,
@@ -615,18 +629,20 @@ exports.getSuperAdminStats = async (req, res) => {
 
         res.json({
             success: true,
-            pendingRequests: pendingCount[0].count,
-            approvedAdmins: approvedCount[0].count,
-            activeAdmins: activeCount[0].count,
-            suspendedAdmins: suspendedCount[0].count,
-            rejectedAdmins: rejectedCount[0].count,
-            avgApprovalTime: Math.round(avgApprovalTime[0].avg_hours || 0),
-            totalActions: totalActions[0].count,
+            pendingRequests: Number(workflow.pending),
+            approvedAdmins: Number(workflow.approved),
+            activeAdmins: Number(workflow.active),
+            suspendedAdmins: Number(workflow.suspended),
+            rejectedAdmins: Number(workflow.rejected),
+            avgApprovalTime: Math.round(workflow.avg_hours || 0),
+            totalActions: totalActions,
+            complaintStats: complaintStats,
             districtStats: districtStats
         });
 
     } catch (err) {
         console.error("Error fetching super admin stats:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -634,6 +650,102 @@ exports.getSuperAdminStats = async (req, res) => {
     }
 };
 
+// ========== GET DATABASE POOL STATISTICS ==========
+exports.getDatabaseStats = async (req, res) => {
+    if (!req.session.isSuperAdmin) {
+        return res.status(403).json({
+            success: false,
+            message: "Unauthorized access"
+        });
+    }
+
+    res.json({
+        success: true,
+        pool: pool.getPoolStats(parseInt(req.query.top) || 20),
+        replicaPool: pool.replica ? pool.replica.getPoolStats(parseInt(req.query.top) || 20) : null,
+        readRouting: getReadRoutingStats()
+    });
+};
+
+// ========== STORAGE GARBAGE COLLECTION ==========
+// GET reports orphaned upload files (dry run); POST queues them for deletion.
+// Each call scans up to maxFiles files after ?cursor=, and returns nextCursor
+// to continue from (null once the walk reached the end).
+async function runStorageGc(req, res, dryRun) {
+    try {
+        if (!req.session.isSuperAdmin) {
+            return res.status(403).json({
+                success: false,
+                message: "Unauthorized access"
+            });
+        }
+
+        const maxFiles = Math.min(parseInt(req.query.maxFiles) || 5000, 50000);
+        const report = await collectOrphans({ dryRun, cursor: req.query.cursor || null, maxFiles });
+
+        res.json({
+            success: true,
+            report,
+            deletionQueue: await getDeletionQueueStats()
+        });
+    } catch (err) {
+        console.error("Error collecting orphaned files:", err);
+        if (handlePoolBusy(res, err)) return;
+        res.status(500).json({
+            success: false,
+            message: "Server error"
+        });
+    }
+}
+
+exports.getStorageGcReport = (req, res) => runStorageGc(req, res, true);
+exports.runStorageGc = (req, res) => runStorageGc(req, res, false);
+
+// ========== COMPLAINT ARCHIVE ==========
+// GET counts the closed cases due for archival (dry run); POST archives them
+// now instead of waiting for the background job. ?afterDays= overrides
+// ARCHIVE_AFTER_DAYS for the call.
+async function runComplaintArchive(req, res, dryRun) {
+    try {
+        if (!req.session.isSuperAdmin) {
+            return res.status(403).json({
+                success: false,
+                message: "Unauthorized access"
+            });
+        }
+
+        const options = { dryRun };
+        const afterDays = parseInt(req.query.afterDays);
+        if (!isNaN(afterDays)) {
+            if (afterDays < 30) {
+                return res.status(400).json({
+                    success: false,
+                    message: "afterDays must be at least 30"
+                });
+            }
+            options.afterDays = afterDays;
+        }
+
+        const report = await runArchive(options);
+
+        res.json({
+            success: true,
+            report,
+            archiver: getArchiveStats()
+        });
+    } catch (err) {
+        console.error("Error archiving complaints:", err);
+        if (handlePoolBusy(res, err)) return;
+        res.status(500).json({
+            success: false,
+            message: "Server error"
+        });
+    }
+}
+
+exports.getComplaintArchiveReport = (req, res) => runComplaintArchive(req, res, true);
+exports.runComplaintArchive = (req, res) => runComplaintArchive(req, res, false);
+
 // ========== GET ADMIN DETAILS ==========
 exports.getAdminDetails = async (req, res) => {
     try {
@@ -694,6 +806,7 @@ exports.getAdminDetails = async (req, res) => {
 
     } catch (err) {
         console.error("Error fetching admin details:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -720,6 +833,7 @@ exports.checkSuperAdminAuth = async (req, res) => {
         });
     } catch (err) {
         console.error("Check auth error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             authenticated: false,
@@ -746,6 +860,7 @@ exports.superAdminLogout = async (req, res) => {
         });
     } catch (err) {
         console.error("Logout error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -777,6 +892,7 @@ exports.getSuperAdminSettings = async (req, res) => {
         });
     } catch (err) {
         console.error("Error fetching settings:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -810,6 +926,7 @@ exports.saveSuperAdminSettings = async (req, res) => {
         });
     } catch (err) {
         console.error("Error saving settings:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({
             success: false,
             message: "Server error"
@@ -0,0 +1,136 @@
+/**
+ * Upload Session Controller
+ * Resumable chunked uploads for large evidence files. A session is created,
+ * chunks are PUT (in any order, in parallel, retried as needed), and the
+ * completed upload ID is attached when the complaint or anonymous report is
+ * submitted.
+ */
+
+const crypto = require('crypto');
+const uploads = require('../utils/uploadSessionUtils');
+
+/**
+ * Scope a request to the sessions it may use
+ * Anonymous uploads carry no account identity so reports stay unlinkable.
+ */
+function getScope(req, purpose) {
+    return {
+        purpose,
+        owner: purpose === 'complaint' ? req.session.username : null
+    };
+}
+
+function getClientKey(req, purpose) {
+    if (purpose === 'complaint') return `user:${req.session.username}`;
+    return 'ip:' + crypto.createHash('sha256').update(req.ip || '').digest('hex');
+}
+
+function sendError(res, err, fallbackMessage) {
+    if (err instanceof uploads.UploadSessionError) {
+        return res.status(err.status).json({ success: false, message: err.message });
+    }
+    console.error(`${fallbackMessage}:`, err);
+    res.status(500).json({ success: false, message: fallbackMessage });
+}
+
+/**
+ * Load the session named in the URL for this caller
+ * Complaint uploads require the owning user's session.
+ */
+function loadSession(req) {
+    return uploads.getSession(req.params.uploadId, {
+        owner: req.session.userId ? req.session.username : null
+    });
+}
+
+// Create Upload Session
+exports.createUploadSession = async (req, res) => {
+    try {
+        const { purpose, fileName, fileSize, mimeType, sha256 } = req.body || {};
+
+        if (purpose === 'complaint' && !req.session.userId) {
+            return res.status(401).json({ success: false, message: 'Please log in to upload complaint evidence' });
+        }
+
+        const session = await uploads.createSession({
+            ...getScope(req, purpose),
+            clientKey: getClientKey(req, purpose),
+            fileName,
+            fileSize,
+            mimeType,
+            sha256
+        });
+
+        res.status(201).json({ success: true, ...uploads.describeSession(session) });
+    } catch (err) {
+        sendError(res, err, 'Error creating upload session');
+    }
+};
+
+// Get Upload Session Status (used to resume after a dropped connection)
+exports.getUploadSession = async (req, res) => {
+    try {
+        const session = loadSession(req);
+        res.json({ success: true, ...uploads.describeSession(session) });
+    } catch (err) {
+        sendError(res, err, 'Error fetching upload session');
+    }
+};
+
+// Upload Chunk
+// Body is the raw chunk bytes; X-Chunk-Sha256 carries its optional checksum
+exports.uploadChunk = async (req, res) => {
+    try {
+        const session = loadSession(req);
+        const index = Number(req.params.index);
+
+        const { offset, length } = await uploads.writeChunk(
+            session,
+            index,
+            req,
+            req.get('X-Chunk-Sha256')
+        );
+
+        res.json({
+            success: true,
+            index,
+            offset,
+            length,
+            receivedChunks: session.received.size,
+            totalChunks: session.totalChunks
+        });
+    } catch (err) {
+        sendError(res, err, 'Error uploading chunk');
+    }
+};
+
+// Complete Upload Session
+exports.completeUploadSession = async (req, res) => {
+    try {
+        const session = loadSession(req);
+        const file = await uploads.completeSession(session);
+
+        res.json({
+            success: true,
+            uploadId: session.uploadId,
+            size: file.size,
+            contentHash: file.contentHash,
+            deduplicated: file.deduplicated
+        });
+    } catch (err) {
+        sendError(res, err, 'Error completing upload');
+    }
+};
+
+// Cancel Upload Session
+exports.cancelUploadSession = async (req, res) => {
+    try {
+        const session = loadSession(req);
+        await uploads.discardSession(session);
+        res.json({ success: true, message: 'Upload cancelled' });
+    } catch (err) {
+        sendError(res, err, 'Error cancelling upload');
+    }
+};
+
+module.exports = exports;
@@ -1,5 +1,7 @@
 const pool = require('../db');
 const path = require('path');
+const { resolvePage } = require('../middleware/staticMiddleware');
+const { handlePoolBusy } = require('../middleware/poolMiddleware');
 const { 
     calculateAge, 
     saveUserAddress, 
@@ -21,9 +23,10 @@ exports.getProfile = async (req, res) => {
         });
 
         // Send the static HTML file - data will be loaded via API
-        res.sendFile(path.join(__dirname, '../../../frontend/src/pages/profile.html'));
+        res.sendFile(resolvePage(path.join(__dirname, '../../../frontend/src/pages/profile.html')));
     } catch (err) {
         console.error("Profile error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).send("Error loading profile page");
     }
 };
@@ -76,6 +79,7 @@ exports.updateProfile = async (req, res) => {
         res.json({ success: true, message: "Profile updated successfully" });
     } catch (err) {
         console.error("Update profile error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error updating profile" });
     }
 };
@@ -121,6 +125,7 @@ exports.getUserData = async (req, res) => {
         res.json({ success: true, user });
     } catch (err) {
         console.error("Get user data error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching user data" });
     }
 };
@@ -140,20 +145,11 @@ exports.getMyComplaints = async (req, res) => {
                 c.status,
                 c.complaint_type,
                 c.location_address,
-                COALESCE(evidence_count.count, 0) as evidence_count,
-                COALESCE(notification_count.unread_notifications, 0) as unread_notifications
+                (SELECT COUNT(*) FROM evidence e
+                 WHERE e.complaint_id = c.complaint_id) as evidence_count,
+                (SELECT COUNT(*) FROM complaint_notifications cn
+                 WHERE cn.complaint_id = c.complaint_id AND cn.is_read = 0) as unread_notifications
             FROM complaint c
-            LEFT JOIN (
-                SELECT complaint_id, COUNT(*) as count
-                FROM evidence
-                GROUP BY complaint_id
-            ) evidence_count ON c.complaint_id = evidence_count.complaint_id
-            LEFT JOIN (
-                SELECT complaint_id, COUNT(*) as unread_notifications
-                FROM complaint_notifications
-                WHERE is_read = 0
-                GROUP BY complaint_id
-            ) notification_count ON c.complaint_id = notification_count.complaint_id
             WHERE c.username = ?
             ORDER BY c.created_at DESC`,
             [req.session.username]
@@ -162,6 +158,7 @@ exports.getMyComplaints = async (req, res) => {
         res.json({ success: true, complaints: complaints });
     } catch (err) {
         console.error("Get complaints error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching complaints" });
     }
 };
@@ -177,7 +174,7 @@ exports.getComplaintNotifications = async (req, res) => {
         const username = req.session.username;
 
         // Verify ownership
-        const [verifyResult] = await pool.query(
+        const [verifyResult] = await pool.execute(
             'SELECT username FROM complaint WHERE complaint_id = ?',
             [complaint_id]
         );
@@ -186,7 +183,7 @@ exports.getComplaintNotifications = async (req, res) => {
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        const [notifications] = await pool.query(
+        const [notifications] = await pool.execute(
             `SELECT notification_id, message, type, is_read, created_at
              FROM complaint_notifications 
              WHERE complaint_id = ? 
@@ -197,6 +194,7 @@ exports.getComplaintNotifications = async (req, res) => {
         res.json({ success: true, notifications: notifications });
     } catch (err) {
         console.error("Get notifications error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching notifications" });
     }
 };
@@ -212,7 +210,7 @@ exports.markNotificationsRead = async (req, res) => {
         const username = req.session.username;
 
         // Verify ownership
-        const [verifyResult] = await pool.query(
+        const [verifyResult] = await pool.execute(
             'SELECT username FROM complaint WHERE complaint_id = ?',
             [complaint_id]
         );
@@ -221,7 +219,7 @@ exports.markNotificationsRead = async (req, res) => {
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        await pool.query(
+        await pool.execute(
             'UPDATE complaint_notifications SET is_read = 1 WHERE complaint_id = ? AND is_read = 0',
             [complaint_id]
         );
@@ -229,6 +227,7 @@ exports.markNotificationsRead = async (req, res) => {
         res.json({ success: true, message: 'Notifications marked as read' });
     } catch (err) {
         console.error("Mark notifications error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error updating notifications" });
     }
 };
@@ -244,7 +243,7 @@ exports.getComplaintChat = async (req, res) => {
         const username = req.session.username;
 
         // Verify ownership
-        const [results] = await pool.query(
+        const [results] = await pool.execute(
             'SELECT username FROM complaint WHERE complaint_id = ?',
             [complaintId]
         );
@@ -253,7 +252,7 @@ exports.getComplaintChat = async (req, res) => {
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        const [messages] = await pool.query(
+        const [messages] = await pool.execute(
             `SELECT * FROM complaint_chat 
              WHERE complaint_id = ? 
              ORDER BY sent_at ASC`,
@@ -263,6 +262,7 @@ exports.getComplaintChat = async (req, res) => {
         res.json({ success: true, messages: messages });
     } catch (err) {
         console.error("Get chat error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching messages" });
     }
 };
@@ -282,7 +282,7 @@ exports.sendChatMessage = async (req, res) => {
         }
 
         // Verify ownership
-        const [results] = await pool.query(
+        const [results] = await pool.execute(
             'SELECT username FROM complaint WHERE complaint_id = ?',
             [complaint_id]
         );
@@ -291,7 +291,7 @@ exports.sendChatMessage = async (req, res) => {
             return res.status(403).json({ success: false, message: "Access denied" });
         }
 
-        await pool.query(
+        await pool.execute(
             `INSERT INTO complaint_chat (complaint_id, sender_type, sender_username, message, sent_at) 
              VALUES (?, 'user', ?, ?, NOW())`,
             [complaint_id, username, message.trim()]
@@ -300,6 +300,7 @@ exports.sendChatMessage = async (req, res) => {
         res.json({ success: true, message: "Message sent successfully" });
     } catch (err) {
         console.error("Send message error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error sending message" });
     }
 };
@@ -335,6 +336,7 @@ exports.getDashboardStats = async (req, res) => {
         res.json({ success: true, stats: stats });
     } catch (err) {
         console.error("Get stats error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching stats" });
     }
 };
@@ -399,6 +401,7 @@ exports.getAllUserNotifications = async (req, res) => {
         });
     } catch (err) {
         console.error("Get all notifications error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error fetching notifications" });
     }
 };
@@ -433,6 +436,7 @@ exports.markAllUserNotificationsRead = async (req, res) => {
         res.json({ success: true, message: "All notifications marked as read" });
     } catch (err) {
         console.error("Mark all notifications error:", err);
+        if (handlePoolBusy(res, err)) return;
         res.status(500).json({ success: false, message: "Error updating notifications" });
     }
 };
\ No newline at end of file
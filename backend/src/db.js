@@ -1,24 +1,439 @@
 const mysql = require('mysql2/promise');
+const path = require('path');
+const { Histogram, elapsedMs } = require('./utils/metricsUtils');
 require('dotenv').config();
 
-const pool = mysql.createPool({
+const POOL_CONFIG = {
+    connectionLimit: parseInt(process.env.DB_POOL_SIZE) || 10,
+    // Callers allowed to wait for a connection before new work is refused
+    // with a 503 (0 = unlimited)
+    queueLimit: process.env.DB_QUEUE_LIMIT !== undefined ? parseInt(process.env.DB_QUEUE_LIMIT) : 50,
+    slowQueryMs: parseInt(process.env.DB_SLOW_QUERY_MS) || 200,
+    // Prepared statements kept per connection (mysql2 evicts least recently used)
+    maxPreparedStatements: parseInt(process.env.DB_MAX_PREPARED_STATEMENTS) || 256,
+    maxTrackedStatements: 500
+};
+
+// Read replica for reporting queries (utils/readRoutingUtils.js); off unless
+// DB_REPLICA_HOST is set. Credentials default to the primary's.
+const REPLICA_CONFIG = {
+    host: process.env.DB_REPLICA_HOST || null,
+    port: parseInt(process.env.DB_REPLICA_PORT) || 3306,
+    user: process.env.DB_REPLICA_USER || process.env.DB_USER || 'root',
+    password: process.env.DB_REPLICA_PASSWORD || process.env.DB_PASSWORD || 'root',
+    connectionLimit: parseInt(process.env.DB_REPLICA_POOL_SIZE) || POOL_CONFIG.connectionLimit
+};
+
+// core connection -> Map of SQL it has prepared, oldest first. Mirrors the
+// LRU mysql2 keeps per connection so cache hit rates can be reported.
+const preparedByConnection = new WeakMap();
+// raw SQL -> normalized SQL (the same strings recur on every request)
+const normalizedCache = new Map();
+
+const SRC_ROOT = __dirname + path.sep;
+
+// ======================
+// INSTRUMENTATION
+// ======================
+
+/**
+ * Reduce a statement to its shape: literals become ?, IN lists collapse
+ */
+function normalizeSql(sql) {
+    const text = typeof sql === 'object' && sql !== null ? sql.sql : String(sql);
+    let normalized = normalizedCache.get(text);
+    if (normalized) return normalized;
+
+    normalized = text
+        .replace(/--[^\n]*/g, ' ')
+        .replace(/'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"/g, '?')
+        .replace(/\b\d+(?:\.\d+)?\b/g, '?')
+        .replace(/\s+/g, ' ')
+        .replace(/\(\s*\?(?:\s*,\s*\?)+\s*\)/g, '(?+)')
+        .trim();
+
+    if (normalizedCache.size >= 1000) normalizedCache.clear();
+    normalizedCache.set(text, normalized);
+    return normalized;
+}
+
+/**
+ * Capture the call stack cheaply; V8 only formats it if .stack is read,
+ * which happens just for slow queries.
+ */
+function captureCallsite(fn) {
+    const holder = {};
+    Error.captureStackTrace(holder, fn);
+    return holder;
+}
+
+/**
+ * Find the controller/route frame that issued a statement
+ */
+function describeCaller(callsite) {
+    const frames = (callsite.stack || '').split('\n').slice(1);
+    const frame = frames.find(line =>
+        /[\\/](controllers|routes|utils|middleware)[\\/]/.test(line) && !line.includes(__filename)
+    );
+    return frame ? frame.trim().replace(/^at /, '').replace(SRC_ROOT, '') : 'unknown';
+}
+
+/**
+ * The binary protocol rejects undefined; query() sends it as NULL, so
+ * execute() does the same
+ */
+function bindValues(values) {
+    return Array.isArray(values) ? values.map(value => (value === undefined ? null : value)) : values;
+}
+
+function poolBusyError() {
+    const err = new Error('Database is busy, please retry shortly');
+    err.code = 'POOL_QUEUE_FULL';
+    err.status = 503;
+    return err;
+}
+
+function hitRate(hits, misses) {
+    const total = hits + misses;
+    return total ? Math.round((hits / total) * 10000) / 10000 : 0;
+}
+
+// ======================
+// POOL FACTORY
+// ======================
+
+/**
+ * Create an instrumented pool with the mysql2 promise pool's surface
+ * Each pool keeps its own occupancy, wait/hold times and statement stats.
+ * @param {string} name - 'primary' or 'replica', for logs
+ * @param {object} connectionOptions - host, user, password, database (, port)
+ * @param {object} limits - connectionLimit (other limits from POOL_CONFIG)
+ */
+function createPool(name, connectionOptions, limits) {
+    const rawPool = mysql.createPool({
+        ...connectionOptions,
+        waitForConnections: true,
+        connectionLimit: limits.connectionLimit,
+        // The wrapper below enforces POOL_CONFIG.queueLimit itself
+        queueLimit: 0,
+        maxPreparedStatements: POOL_CONFIG.maxPreparedStatements
+    });
+
+    const counters = {
+        active: 0,
+        // Callers inside rawPool.getConnection(); those beyond the free
+        // capacity are the ones actually queued
+        pending: 0,
+        acquired: 0,
+        rejected: 0,
+        errors: 0,
+        slowQueries: 0,
+        preparedHits: 0,
+        preparedMisses: 0,
+        preparedEvictions: 0
+    };
+    const acquireWait = new Histogram();
+    const holdTime = new Histogram();
+    // normalized SQL -> { latency: Histogram, errors, hits, misses }
+    const statements = new Map();
+
+    function getStatementEntry(sql) {
+        const normalized = normalizeSql(sql);
+        let entry = statements.get(normalized);
+        if (!entry) {
+            const key = statements.size >= POOL_CONFIG.maxTrackedStatements ? '(other)' : normalized;
+            entry = statements.get(key);
+            if (!entry) {
+                entry = { latency: new Histogram(), errors: 0, hits: 0, misses: 0 };
+                statements.set(key, entry);
+            }
+        }
+        return entry;
+    }
+
+    /**
+     * Record whether execute() found the statement already prepared on this
+     * connection, keeping the mirror in LRU order
+     */
+    function recordPrepare(connection, sql) {
+        const core = connection.connection || connection;
+        let prepared = preparedByConnection.get(core);
+        if (!prepared) {
+            prepared = new Map();
+            preparedByConnection.set(core, prepared);
+        }
+
+        const key = typeof sql === 'object' && sql !== null ? sql.sql : sql;
+        const entry = getStatementEntry(sql);
+        if (prepared.has(key)) {
+            prepared.delete(key);
+            counters.preparedHits++;
+            entry.hits++;
+        } else {
+            counters.preparedMisses++;
+            entry.misses++;
+            if (prepared.size >= POOL_CONFIG.maxPreparedStatements) {
+                prepared.delete(prepared.keys().next().value);
+                counters.preparedEvictions++;
+            }
+        }
+        prepared.set(key, true);
+    }
+
+    function recordStatement(sql, ms, failed, callsite) {
+        const entry = getStatementEntry(sql);
+        entry.latency.observe(ms);
+        if (failed) entry.errors++;
+
+        if (ms >= POOL_CONFIG.slowQueryMs) {
+            counters.slowQueries++;
+            console.warn(`Slow query (${Math.round(ms)}ms) from ${describeCaller(callsite)}: ${normalizeSql(sql).slice(0, 500)}`);
+        }
+    }
+
+    /**
+     * Run a statement on a connection method and record its latency
+     */
+    async function runStatement(method, sql, values, callsite) {
+        const start = process.hrtime.bigint();
+        let failed = false;
+        try {
+            return await method(sql, values);
+        } catch (err) {
+            failed = true;
+            counters.errors++;
+            throw err;
+        } finally {
+            recordStatement(sql, elapsedMs(start), failed, callsite);
+        }
+    }
+
+    /**
+     * Take a connection from the pool, recording how long the caller waited
+     * Fails fast when the wait queue is already full.
+     */
+    async function acquire() {
+        if (isSaturated()) {
+            counters.rejected++;
+            throw poolBusyError();
+        }
+
+        const start = process.hrtime.bigint();
+        counters.pending++;
+        let connection;
+        try {
+            connection = await rawPool.getConnection();
+        } finally {
+            counters.pending--;
+        }
+        acquireWait.observe(elapsedMs(start));
+        counters.active++;
+        counters.acquired++;
+        return { connection, acquiredAt: process.hrtime.bigint() };
+    }
+
+    function markReleased(acquiredAt) {
+        counters.active--;
+        holdTime.observe(elapsedMs(acquiredAt));
+    }
+
+    // ======================
+    // POOL API (same surface as the mysql2 promise pool)
+    // ======================
+
+    async function query(sql, values) {
+        const callsite = captureCallsite(query);
+        const { connection, acquiredAt } = await acquire();
+        try {
+            return await runStatement(connection.query.bind(connection), sql, values, callsite);
+        } finally {
+            markReleased(acquiredAt);
+            connection.release();
+        }
+    }
+
+    /**
+     * Run a statement as a server-side prepared statement (binary protocol)
+     * The statement is prepared once per connection and reused from mysql2's
+     * cache, so use it for hot statements with a fixed shape; statements built
+     * with IN (?) lists or LIMIT ? parameters should stay on query().
+     */
+    async function execute(sql, values) {
+        const callsite = captureCallsite(execute);
+        const { connection, acquiredAt } = await acquire();
+        try {
+            recordPrepare(connection, sql);
+            return await runStatement(connection.execute.bind(connection), sql, bindValues(values), callsite);
+        } finally {
+            markReleased(acquiredAt);
+            connection.release();
+        }
+    }
+
+    /**
+     * Stream a result set as objects, one per row, with backpressure
+     * mysql2 pauses reading the socket while the consumer is behind, so memory
+     * stays bounded by highWaterMark whatever the result size. The connection
+     * is held until the stream ends; if the stream is closed early (client gone)
+     * or fails, the connection is destroyed since unread rows are still on it.
+     * Long by design, so exports are not reported as slow queries.
+     */
+    async function stream(sql, values, highWaterMark = 100) {
+        const { connection, acquiredAt } = await acquire();
+        const rows = connection.connection.query(sql, bindValues(values)).stream({ highWaterMark });
+
+        let done = false;
+        const finish = (reuse) => {
+            if (done) return;
+            done = true;
+            markReleased(acquiredAt);
+            if (reuse) connection.release();
+            else connection.destroy();
+        };
+        rows.on('end', () => finish(true));
+        rows.on('error', () => {
+            counters.errors++;
+            finish(false);
+        });
+        rows.on('close', () => finish(false));
+
+        return rows;
+    }
+
+    /**
+     * Get a dedicated connection (transactions); its statements, hold time and
+     * release are tracked like pooled queries
+     */
+    async function getConnection() {
+        const { connection, acquiredAt } = await acquire();
+
+        const rawQuery = connection.query.bind(connection);
+        const rawExecute = connection.execute.bind(connection);
+        const rawRelease = connection.release.bind(connection);
+        const rawDestroy = connection.destroy.bind(connection);
+        let released = false;
+
+        connection.query = function instrumentedQuery(sql, values) {
+            return runStatement(rawQuery, sql, values, captureCallsite(instrumentedQuery));
+        };
+        connection.execute = function instrumentedExecute(sql, values) {
+            recordPrepare(connection, sql);
+            return runStatement(rawExecute, sql, bindValues(values), captureCallsite(instrumentedExecute));
+        };
+        connection.release = () => {
+            if (released) return;
+            released = true;
+            markReleased(acquiredAt);
+            rawRelease();
+        };
+        connection.destroy = () => {
+            if (!released) {
+                released = true;
+                markReleased(acquiredAt);
+            }
+            rawDestroy();
+        };
+
+        return connection;
+    }
+
+    /**
+     * Callers waiting because every connection is in use
+     */
+    function queuedCount() {
+        return Math.max(0, counters.pending + counters.active - limits.connectionLimit);
+    }
+
+    /**
+     * True when the wait queue is full and new database work should be refused
+     */
+    function isSaturated() {
+        return POOL_CONFIG.queueLimit > 0 && queuedCount() >= POOL_CONFIG.queueLimit;
+    }
+
+    /**
+     * Pool occupancy, wait/hold times and the most expensive statements
+     * @param {number} [topStatements=20] - Statements to include, by total time
+     */
+    function getPoolStats(topStatements = 20) {
+        // mysql2 keeps these on the underlying callback pool
+        const core = rawPool.pool || {};
+        const open = core._allConnections ? core._allConnections.length : null;
+        const idle = core._freeConnections ? core._freeConnections.length : null;
+
+        return {
+            connectionLimit: limits.connectionLimit,
+            queueLimit: POOL_CONFIG.queueLimit,
+            open,
+            idle,
+            active: counters.active,
+            waiting: queuedCount(),
+            acquired: counters.acquired,
+            rejected: counters.rejected,
+            errors: counters.errors,
+            slowQueries: counters.slowQueries,
+            slowQueryMs: POOL_CONFIG.slowQueryMs,
+            acquireWaitMs: acquireWait.snapshot(),
+            holdTimeMs: holdTime.snapshot(),
+            preparedStatements: {
+                maxPerConnection: POOL_CONFIG.maxPreparedStatements,
+                hits: counters.preparedHits,
+                misses: counters.preparedMisses,
+                evictions: counters.preparedEvictions,
+                hitRate: hitRate(counters.preparedHits, counters.preparedMisses)
+            },
+            statements: Array.from(statements, ([sql, entry]) => ({
+                sql,
+                errors: entry.errors,
+                ...entry.latency.snapshot(),
+                ...(entry.hits + entry.misses > 0 && {
+                    prepared: { hits: entry.hits, misses: entry.misses, hitRate: hitRate(entry.hits, entry.misses) }
+                })
+            }))
+                .sort((a, b) => b.sum - a.sum)
+                .slice(0, topStatements)
+        };
+    }
+
+    // Test database connection on startup
+    rawPool.getConnection()
+        .then(connection => {
+            console.log(name === 'primary' ? '✅ Database connected successfully' : `✅ Database ${name} connected successfully`);
+            connection.release();
+        })
+        .catch(err => {
+            console.error(name === 'primary' ? '❌ Database connection failed:' : `❌ Database ${name} connection failed:`, err.message);
+        });
+
+    const pool = {
+        query,
+        execute,
+        stream,
+        getConnection,
+        getPoolStats,
+        isSaturated,
+        on: (...args) => rawPool.on(...args),
+        end: () => rawPool.end()
+    };
+
+    return pool;
+}
+
+const pool = createPool('primary', {
     host: process.env.DB_HOST || 'localhost',
     user: process.env.DB_USER || 'root',
     password: process.env.DB_PASSWORD || 'root',
-    database: process.env.DB_NAME || 'securevoice',
-    waitForConnections: true,
-    connectionLimit: 10,
-    queueLimit: 0
-});
-
-// Test database connection on startup
-pool.getConnection()
-    .then(connection => {
-        console.log('✅ Database connected successfully');
-        connection.release();
-    })
-    .catch(err => {
-        console.error('❌ Database connection failed:', err.message);
-    });
+    database: process.env.DB_NAME || 'securevoice'
+}, { connectionLimit: POOL_CONFIG.connectionLimit });
+
+pool.replica = REPLICA_CONFIG.host
+    ? createPool('replica', {
+        host: REPLICA_CONFIG.host,
+        port: REPLICA_CONFIG.port,
+        user: REPLICA_CONFIG.user,
+        password: REPLICA_CONFIG.password,
+        database: process.env.DB_NAME || 'securevoice'
+    }, { connectionLimit: REPLICA_CONFIG.connectionLimit })
+    : null;
 
-module.exports = pool;
\ No newline at end of file
+module.exports = pool;
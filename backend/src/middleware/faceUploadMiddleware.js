@@ -0,0 +1,49 @@
+const multer = require('multer');
+const path = require('path');
+const fs = require('fs');
+const crypto = require('crypto');
+const { UPLOADS_ROOT } = require('../utils/evidenceStoreUtils');
+const { FACE_IMAGE_CONFIG, FACE_IMAGE_TYPES } = require('../utils/faceImageUtils');
+
+const TMP_DIR = path.join(UPLOADS_ROOT, 'tmp');
+
+// Registration face capture: one image streamed to a temp file, downsized
+// afterwards by the controller (utils/faceImageUtils.js)
+const faceUpload = multer({
+    storage: multer.diskStorage({
+        destination: function (req, file, cb) {
+            fs.mkdir(TMP_DIR, { recursive: true }, (err) => cb(err, TMP_DIR));
+        },
+        filename: function (req, file, cb) {
+            cb(null, 'face-' + Date.now() + '-' + crypto.randomBytes(8).toString('hex'));
+        }
+    }),
+    limits: {
+        fileSize: FACE_IMAGE_CONFIG.MAX_BYTES,
+        files: 1,
+        fields: 5
+    },
+    fileFilter: function (req, file, cb) {
+        if (FACE_IMAGE_TYPES[file.mimetype]) {
+            cb(null, true);
+        } else {
+            cb(new multer.MulterError('LIMIT_UNEXPECTED_FILE', file.fieldname), false);
+        }
+    }
+}).single('faceImage');
+
+// Report upload problems as 400s instead of falling through to the 500 handler
+function acceptFaceImage(req, res, next) {
+    faceUpload(req, res, (err) => {
+        if (!err) return next();
+        if (err instanceof multer.MulterError) {
+            const message = err.code === 'LIMIT_FILE_SIZE'
+                ? `Face image must be smaller than ${FACE_IMAGE_CONFIG.MAX_BYTES / (1024 * 1024)} MB`
+                : 'Invalid face image upload';
+            return res.status(400).json({ success: false, message });
+        }
+        next(err);
+    });
+}
+
+module.exports = acceptFaceImage;
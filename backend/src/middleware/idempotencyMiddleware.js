@@ -0,0 +1,72 @@
+const { claimKey, completeKey, releaseKey } = require('../utils/idempotencyUtils');
+
+const KEY_PATTERN = /^[A-Za-z0-9_.:-]{8,128}$/;
+
+function getOwner(req) {
+    if (req.session.adminUsername) return `admin:${req.session.adminUsername}`;
+    if (req.session.userId) return `user:${req.session.userId}`;
+    return '';
+}
+
+/**
+ * Make a submission endpoint safe to retry
+ * Requests carrying an Idempotency-Key header run once; retries with the
+ * same key get the stored JSON response (with Idempotent-Replayed: true)
+ * without running the handler again. Mount it before upload middleware so
+ * a replay does not store the files a second time. Requests without the
+ * header are handled as before.
+ * Only successful (2xx) responses are stored: a request rejected by
+ * validation or failing on the server runs again when retried.
+ * @param {string} scope - Endpoint name the keys are scoped to
+ */
+function idempotent(scope) {
+    return async (req, res, next) => {
+        const key = req.get('Idempotency-Key');
+        if (key === undefined) return next();
+        if (!KEY_PATTERN.test(key)) {
+            return res.status(400).json({ success: false, message: 'Invalid Idempotency-Key header' });
+        }
+
+        const owner = getOwner(req);
+        let claim;
+        try {
+            claim = await claimKey(scope, owner, key);
+        } catch (err) {
+            return next(err);
+        }
+
+        if (!claim.claimed) {
+            if (claim.status === 'processing') {
+                res.set('Retry-After', '1');
+                return res.status(409).json({ success: false, message: 'A request with this Idempotency-Key is still being processed' });
+            }
+            res.set('Idempotent-Replayed', 'true');
+            return res.status(claim.responseStatus).json(JSON.parse(claim.responseBody));
+        }
+
+        let settled = false;
+        const settle = (responseStatus, body) => {
+            if (settled) return;
+            settled = true;
+            const succeeded = body && body.success !== false && responseStatus >= 200 && responseStatus < 300;
+            const pending = succeeded
+                ? completeKey(scope, owner, key, responseStatus, body)
+                : releaseKey(scope, owner, key);
+            pending.catch(err => console.error('Idempotency key store error:', err));
+        };
+
+        // Store the result as soon as it is known, even if the client has
+        // already hung up: that is exactly the request it will retry
+        const json = res.json.bind(res);
+        res.json = (body) => {
+            settle(res.statusCode, body);
+            return json(body);
+        };
+        // Sent without res.json (nothing to replay): let retries run again
+        res.on('finish', () => settle(res.statusCode));
+
+        next();
+    };
+}
+
+module.exports = { idempotent };
@@ -0,0 +1,66 @@
+const { Histogram, elapsedMs } = require('../utils/metricsUtils');
+
+// Route templates are a fixed set; the cap only guards against a router
+// that builds paths dynamically
+const MAX_TRACKED_ROUTES = 500;
+// Requests no route handled (static files, 404s)
+const UNMATCHED_ROUTE = '(unmatched)';
+
+// "METHOD template" -> { method, route, latency: Histogram, statuses: Map<status, count> }
+const routes = new Map();
+let inFlight = 0;
+
+/**
+ * The route template that handled a request, e.g. /api/complaints/:id
+ * rather than the concrete URL, so series stay bounded
+ */
+function routeTemplate(req) {
+    if (!req.route) return UNMATCHED_ROUTE;
+    return (req.baseUrl || '') + String(req.route.path);
+}
+
+function getRouteEntry(method, route) {
+    let key = `${method} ${route}`;
+    let entry = routes.get(key);
+    if (!entry) {
+        if (routes.size >= MAX_TRACKED_ROUTES) {
+            route = UNMATCHED_ROUTE;
+            key = `${method} ${route}`;
+            entry = routes.get(key);
+        }
+        if (!entry) {
+            entry = { method, route, latency: new Histogram(), statuses: new Map() };
+            routes.set(key, entry);
+        }
+    }
+    return entry;
+}
+
+// Record count, status and latency per route template, plus in-flight requests
+function recordRequestMetrics(req, res, next) {
+    const start = process.hrtime.bigint();
+    let recorded = false;
+    inFlight++;
+
+    const record = () => {
+        if (recorded) return;
+        recorded = true;
+        inFlight--;
+
+        const entry = getRouteEntry(req.method, routeTemplate(req));
+        entry.latency.observe(elapsedMs(start));
+        // 'close' before 'finish' means the client went away mid-response
+        const status = res.writableFinished ? String(res.statusCode) : 'aborted';
+        entry.statuses.set(status, (entry.statuses.get(status) || 0) + 1);
+    };
+
+    res.once('finish', record);
+    res.once('close', record);
+    next();
+}
+
+function getRequestStats() {
+    return { inFlight, routes: Array.from(routes.values()) };
+}
+
+module.exports = { recordRequestMetrics, getRequestStats };
@@ -0,0 +1,29 @@
+const pool = require('../db');
+
+function sendBusy(res) {
+    res.set('Retry-After', '1');
+    res.status(503).json({
+        success: false,
+        message: 'Server is busy, please try again shortly'
+    });
+}
+
+// Refuse new requests while the database wait queue is full, before they
+// start work that would only time out behind it
+function shedWhenPoolSaturated(req, res, next) {
+    if (!pool.isSaturated()) return next();
+    sendBusy(res);
+}
+
+/**
+ * Answer 503 with Retry-After when a handler's error is the pool refusing
+ * to queue it (db.js, POOL_QUEUE_FULL); call from catch-alls before the 500
+ * @returns {boolean} - true when the response has been sent
+ */
+function handlePoolBusy(res, err) {
+    if (!err || err.code !== 'POOL_QUEUE_FULL' || res.headersSent) return false;
+    sendBusy(res);
+    return true;
+}
+
+module.exports = { shedWhenPoolSaturated, handlePoolBusy };
@@ -0,0 +1,21 @@
+const { RATE_LIMIT_POLICIES, consume } = require('../utils/rateLimitUtils');
+
+/**
+ * Refuse requests over a rate limit policy with 429 and Retry-After
+ * Mount it first on the route, ahead of upload parsing, password hashing,
+ * email sending and database work, so refused requests cost next to nothing.
+ * @param {string} policyName - Policy from utils/rateLimitUtils.js
+ */
+function rateLimit(policyName) {
+    if (!RATE_LIMIT_POLICIES[policyName]) throw new Error(`Unknown rate limit policy: ${policyName}`);
+    return async (req, res, next) => {
+        const decision = await consume(policyName, { ip: req.ip, body: req.body });
+        if (decision.remaining !== null) res.set('RateLimit-Remaining', String(decision.remaining));
+        if (decision.allowed) return next();
+
+        res.set('Retry-After', String(Math.max(Math.ceil(decision.retryAfterMs / 1000), 1)));
+        res.status(429).json({ success: false, message: 'Too many requests. Try again later.' });
+    };
+}
+
+module.exports = { rateLimit };
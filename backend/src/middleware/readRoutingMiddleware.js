@@ -0,0 +1,19 @@
+const pool = require('../db');
+const { actorOf, recordWrite } = require('../utils/readRoutingUtils');
+
+const READ_METHODS = new Set(['GET', 'HEAD', 'OPTIONS']);
+
+// After a successful write, keep the writer's reads on the primary until the
+// replica has caught up (see utils/readRoutingUtils.js)
+function trackWrites(req, res, next) {
+    if (!pool.replica || READ_METHODS.has(req.method)) return next();
+
+    // Login sets the session during the request and logout destroys it
+    const actorBefore = actorOf(req);
+    res.on('finish', () => {
+        if (res.statusCode < 400) recordWrite(actorOf(req) || actorBefore);
+    });
+    next();
+}
+
+module.exports = { trackWrites };
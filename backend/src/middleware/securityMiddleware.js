@@ -81,8 +81,10 @@ const sessionConfig = session({
 });
 
 // Body parser configurations
-const jsonParser = bodyParser.json({ limit: '10mb' });
-const urlencodedParser = bodyParser.urlencoded({ extended: true, limit: '10mb' });
+// Files arrive as multipart or chunked uploads, so form and JSON bodies stay small
+const BODY_LIMIT = process.env.BODY_LIMIT || '16kb';
+const jsonParser = bodyParser.json({ limit: BODY_LIMIT });
+const urlencodedParser = bodyParser.urlencoded({ extended: true, limit: BODY_LIMIT });
 
 module.exports = {
     helmetConfig,
@@ -1,10 +1,85 @@
 const express = require('express');
 const path = require('path');
+const fs = require('fs');
+
+const frontendPath = path.join(__dirname, '../../../frontend');
+const distPath = path.join(frontendPath, 'dist');
+
+/**
+ * Load the manifest written by `npm run build:assets` (frontend/scripts/build-assets.js)
+ * Without a build, pages and assets are served from the source tree as before.
+ */
+function loadManifest() {
+    try {
+        return JSON.parse(fs.readFileSync(path.join(distPath, 'manifest.json'), 'utf8'));
+    } catch (err) {
+        return null;
+    }
+}
+
+const manifest = loadManifest();
+
+/**
+ * Resolve a source page to its built version when one exists
+ * @param {string} pagePath - Absolute path of a page in the frontend tree
+ * @returns {string} - Absolute path of the page to send
+ */
+function resolvePage(pagePath) {
+    if (!manifest) return pagePath;
+    const relPath = path.relative(frontendPath, pagePath).split(path.sep).join('/');
+    const page = manifest.pages[relPath];
+    return page ? path.join(distPath, page.file) : pagePath;
+}
+
+// Serve built pages for direct requests to the source HTML files
+function serveBuiltPages(req, res, next) {
+    if (req.method !== 'GET' && req.method !== 'HEAD') return next();
+
+    let relPath = 'index.html';
+    if (req.path !== '/') {
+        try {
+            relPath = decodeURIComponent(req.path).slice(1);
+        } catch (err) {
+            // Malformed escape: not a page, fall through to the usual 404
+            return next();
+        }
+    }
+    const page = manifest.pages[relPath];
+    if (!page) return next();
+
+    res.sendFile(path.join(distPath, page.file));
+}
+
+// Swap in a brotli/gzip variant when the client accepts one
+function servePrecompressed(req, res, next) {
+    const fileName = path.basename(req.path);
+    const encodings = manifest.compressed[fileName];
+    if (!encodings) return next();
+
+    res.vary('Accept-Encoding');
+    const encoding = req.acceptsEncodings(...encodings);
+    if (encoding) {
+        res.type(path.extname(fileName));
+        res.set('Content-Encoding', encoding);
+        req.url = req.url.replace(/(\?|$)/, (encoding === 'br' ? '.br' : '.gz') + '$1');
+    }
+    next();
+}
 
 // Configure static file serving
 function setupStatic(app) {
-    const frontendPath = path.join(__dirname, '../../../frontend');
-    
+    if (manifest) {
+        app.use(serveBuiltPages);
+        // Fingerprinted names change whenever content does, so they never go stale
+        app.use('/assets', servePrecompressed, express.static(path.join(distPath, 'assets'), {
+            index: false,
+            maxAge: '1y',
+            immutable: true
+        }));
+        // Unknown fingerprints must not fall through to the SPA index.html
+        app.use('/assets', (req, res) => res.status(404).end());
+    }
+
     // Main frontend static files
     app.use(express.static(frontendPath));
     app.use('/src', express.static(path.join(frontendPath, 'src')));
@@ -12,9 +87,8 @@ function setupStatic(app) {
     app.use('/js', express.static(path.join(frontendPath, 'src/js')));
     app.use('/images', express.static(path.join(frontendPath, 'images')));
     app.use('/public', express.static(path.join(frontendPath, 'public')));
-    
-    // Uploaded files
-    app.use('/uploads', express.static(path.join(__dirname, '../../uploads')));
+
+    // Uploaded evidence is not served statically; see routes/evidence.js
 }
 
-module.exports = { setupStatic };
+module.exports = { setupStatic, resolvePage };
@@ -0,0 +1,65 @@
+const crypto = require('crypto');
+const { isTokenAuthEnabled, verifyAccessToken, sessionFromClaims, revokeFamily } = require('../utils/tokenUtils');
+
+/**
+ * Request-scoped stand-in for an express-session session
+ * Holds the fields decoded from the token; nothing is persisted. Mounted
+ * before the session middleware, which leaves an existing req.session
+ * alone, so token requests never touch the session store or set a cookie.
+ */
+function tokenSession(req, data, claims) {
+    const session = { ...data };
+    const hide = (name, value) => Object.defineProperty(session, name, { value, enumerable: false });
+    hide('isTokenSession', true);
+    hide('save', (cb) => cb && cb());
+    hide('touch', () => session);
+    hide('reload', (cb) => cb && cb());
+    hide('regenerate', (cb) => {
+        for (const key of Object.keys(session)) delete session[key];
+        if (cb) cb();
+    });
+    // Logout: revoke every token from this login
+    hide('destroy', (cb) => {
+        const revoked = claims ? revokeFamily(claims.sid) : Promise.resolve();
+        revoked.then(() => cb && cb(), (err) => {
+            console.error('Token revocation error:', err);
+            if (cb) cb(err);
+        });
+    });
+    // Per-login key for anything that caches by session id
+    req.sessionID = claims ? `token:${claims.sid}` : `token:${crypto.randomUUID()}`;
+    return session;
+}
+
+/**
+ * Authenticate `Authorization: Bearer <access token>` requests
+ * Valid tokens populate req.session from their claims (and req.auth with
+ * the claims themselves); invalid, expired or revoked tokens get a 401 so
+ * the client refreshes instead of silently falling back to a cookie.
+ * Requests sending `X-Auth-Mode: token` without a token (logins) get an
+ * empty stand-in session, so the login issues tokens instead of a cookie.
+ * Everything else uses cookie sessions as before.
+ */
+function tokenAuth(req, res, next) {
+    if (!isTokenAuthEnabled()) return next();
+
+    const header = req.get('Authorization');
+    if (header && header.startsWith('Bearer ')) {
+        const claims = verifyAccessToken(header.slice(7).trim());
+        if (!claims) {
+            res.set('WWW-Authenticate', 'Bearer error="invalid_token"');
+            return res.status(401).json({ success: false, message: 'Invalid or expired access token' });
+        }
+        req.auth = claims;
+        req.session = tokenSession(req, sessionFromClaims(claims), claims);
+        return next();
+    }
+
+    if (req.get('X-Auth-Mode') === 'token') {
+        req.auth = null;
+        req.session = tokenSession(req, {}, null);
+    }
+    next();
+}
+
+module.exports = { tokenAuth };
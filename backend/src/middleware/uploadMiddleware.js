@@ -1,29 +1,68 @@
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
+const crypto = require('crypto');
+const { UPLOADS_ROOT, getContentPath } = require('../utils/evidenceStoreUtils');
 
-const storage = multer.diskStorage({
-    destination: function (req, file, cb) {
-        let uploadPath;
-        if (file.mimetype.startsWith('image/')) {
-            uploadPath = path.join(__dirname, '../../uploads/images/');
-        } else if (file.mimetype.startsWith('video/')) {
-            uploadPath = path.join(__dirname, '../../uploads/videos/');
-        } else if (file.mimetype.startsWith('audio/')) {
-            uploadPath = path.join(__dirname, '../../uploads/audio/');
-        }
+const TMP_DIR = path.join(UPLOADS_ROOT, 'tmp');
 
-        if (!fs.existsSync(uploadPath)) {
-            fs.mkdirSync(uploadPath, { recursive: true });
-        }
+// Content-addressed storage engine: the SHA-256 is computed while the upload
+// streams to a temp file, which is then renamed to its sharded hash path.
+// Identical uploads land on the same path, so each file is kept once.
+const storage = {
+    _handleFile: function (req, file, cb) {
+        fs.mkdirSync(TMP_DIR, { recursive: true });
+
+        const tmpPath = path.join(TMP_DIR, Date.now() + '-' + crypto.randomBytes(8).toString('hex'));
+        const hash = crypto.createHash('sha256');
+        const out = fs.createWriteStream(tmpPath);
+        let size = 0;
+
+        file.stream.on('data', (chunk) => {
+            hash.update(chunk);
+            size += chunk.length;
+        });
+        file.stream.on('error', (err) => {
+            out.destroy();
+            fs.unlink(tmpPath, () => cb(err));
+        });
+        out.on('error', (err) => {
+            fs.unlink(tmpPath, () => cb(err));
+        });
+        out.on('finish', () => {
+            const contentHash = hash.digest('hex');
+            const relativePath = getContentPath(contentHash, file.mimetype, path.extname(file.originalname));
+            const finalPath = path.join(UPLOADS_ROOT, relativePath);
+            const deduplicated = fs.existsSync(finalPath);
 
-        cb(null, uploadPath);
+            fs.mkdirSync(path.dirname(finalPath), { recursive: true });
+            // Rename even when the content already exists: it atomically
+            // replaces identical bytes and guarantees the file is present
+            // for this upload if another request released it meanwhile.
+            fs.rename(tmpPath, finalPath, (err) => {
+                if (err) return fs.unlink(tmpPath, () => cb(err));
+                cb(null, {
+                    destination: path.dirname(finalPath),
+                    filename: path.basename(finalPath),
+                    path: finalPath,
+                    relativePath,
+                    contentHash,
+                    deduplicated,
+                    size
+                });
+            });
+        });
+
+        file.stream.pipe(out);
     },
-    filename: function (req, file, cb) {
-        const uniqueName = Date.now() + '-' + Math.round(Math.random() * 1E9) + path.extname(file.originalname);
-        cb(null, uniqueName);
+
+    // Called by multer when a request fails after some files were stored.
+    // Only files this upload created are removed; shared content stays.
+    _removeFile: function (req, file, cb) {
+        if (!file.path || file.deduplicated) return cb(null);
+        fs.unlink(file.path, (err) => cb(err && err.code !== 'ENOENT' ? err : null));
     }
-});
+};
 
 const upload = multer({
     storage: storage,
@@ -41,4 +80,4 @@ const upload = multer({
     }
 });
 
-module.exports = upload;
\ No newline at end of file
+module.exports = upload;
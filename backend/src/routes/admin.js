@@ -4,11 +4,14 @@ const router = express.Router();
 const adminAuth = require('../controllers/auth/adminAuth');
 const adminController = require('../controllers/adminController');
 const analyticsController = require('../controllers/analyticsController');
+const exportController = require('../controllers/exportController');
+const { idempotent } = require('../middleware/idempotencyMiddleware');
+const { rateLimit } = require('../middleware/rateLimitMiddleware');
 
 // ========== ADMIN AUTH ROUTES ==========
-router.post('/admin-registration-request', adminAuth.adminRegistrationRequest);
-router.post('/adminLogin', adminAuth.adminLogin);
-router.post('/admin-verify-otp', adminAuth.adminVerifyOTP);
+router.post('/admin-registration-request', rateLimit('admin_registration'), adminAuth.adminRegistrationRequest);
+router.post('/adminLogin', rateLimit('admin_login'), adminAuth.adminLogin);
+router.post('/admin-verify-otp', rateLimit('otp_verify'), adminAuth.adminVerifyOTP);
 router.post('/setup-admin-password', adminAuth.setupAdminPassword);
 router.get('/verify-admin-email', adminAuth.verifyAdminEmail);
 router.post('/admin-logout', adminAuth.adminLogout);
@@ -20,10 +23,12 @@ router.get('/get-admin-settings', adminController.getAdminSettings);
 router.post('/update-admin-settings', adminController.updateAdminSettings);
 router.post('/update-admin-profile', adminController.updateAdminProfile);
 router.get('/admin-chat/:complaintId', adminController.getAdminChat);
-router.post('/admin-send-chat-message', adminController.sendAdminChatMessage);
+router.post('/admin-send-chat-message', idempotent('admin_chat_message'), adminController.sendAdminChatMessage);
 router.get('/get-complaint-evidence/:complaintId', adminController.getComplaintEvidence);
 router.get('/get-admin-cases', adminController.getAdminCases);
+router.get('/export-admin-cases', exportController.exportAdminCases);
 router.post('/update-complaint-status', adminController.updateComplaintStatus);
+router.post('/bulk-update-complaint-status', adminController.bulkUpdateComplaintStatus);
 router.get('/get-admin-logs', adminController.getAdminLogs);
 router.get('/get-admin-profile', adminController.getAdminProfile);
 router.get('/get-admin-complaints', adminController.getAdminComplaints);
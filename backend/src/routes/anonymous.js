@@ -2,16 +2,20 @@ const express = require('express');
 const router = express.Router();
 
 const anonymousReportController = require('../controllers/anonymousReportController');
+const exportController = require('../controllers/exportController');
 const upload = require('../middleware/uploadMiddleware');
+const { idempotent } = require('../middleware/idempotencyMiddleware');
+const { rateLimit } = require('../middleware/rateLimitMiddleware');
 
 // ========== PUBLIC ANONYMOUS REPORT ROUTES ==========
-router.post('/anonymous-report', upload.array('evidence', 10), anonymousReportController.submitAnonymousReport);
+router.post('/anonymous-report', rateLimit('anonymous_report'), idempotent('anonymous_report_submit'), upload.array('evidence', 10), anonymousReportController.submitAnonymousReport);
 router.get('/anonymous-report/:reportId/status', anonymousReportController.checkAnonymousReportStatus);
 router.get('/anonymous-heatmap-data', anonymousReportController.getAnonymousHeatmapData);
 router.get('/anonymous-report-stats', anonymousReportController.getAnonymousReportStats);
 
 // ========== ADMIN ROUTES FOR ANONYMOUS REPORTS ==========
 router.get('/admin/anonymous-reports', anonymousReportController.getAnonymousReports);
+router.get('/admin/anonymous-reports/export', exportController.exportAnonymousReports);
 router.get('/admin/anonymous-reports/:reportId', anonymousReportController.getAnonymousReportDetails);
 router.put('/admin/anonymous-reports/:reportId/status', anonymousReportController.updateAnonymousReportStatus);
 router.patch('/admin/anonymous-reports/:reportId/flag', anonymousReportController.flagAnonymousReport);
@@ -7,24 +7,31 @@ const registrationController = require('../controllers/auth/registrationSteps');
 const sessionController = require('../controllers/auth/session');
 const authMiddleware = require('../middleware/authMiddleware');
 const upload = require('../middleware/uploadMiddleware');
+const acceptFaceImage = require('../middleware/faceUploadMiddleware');
+const { idempotent } = require('../middleware/idempotencyMiddleware');
+const { rateLimit } = require('../middleware/rateLimitMiddleware');
 const helperUtils = require('../utils/helperUtils');
+const counters = require('../utils/counterUtils');
+const { queueImageProcessing } = require('../utils/imageProcessingUtils');
+const { isStoredFaceImage, resolveFaceImage } = require('../utils/faceImageUtils');
 
 // DB helper
 const db = require('../db');
 
 // Auth routes
-router.post('/signup', userAuth.signup);
-router.post('/login', userAuth.login);
+router.post('/signup', rateLimit('signup'), userAuth.signup);
+router.post('/login', rateLimit('login'), userAuth.login);
 router.post('/logout', sessionController.logout);
 router.get('/auth/check', sessionController.checkAuth);
+router.post('/auth/refresh', sessionController.refreshToken);
 
 // Registration step routes
-router.post('/auth/send-otp', otpController.sendOTP);
-router.post('/auth/verify-otp', otpController.verifyOTP);
+router.post('/auth/send-otp', rateLimit('otp_send'), otpController.sendOTP);
+router.post('/auth/verify-otp', rateLimit('otp_verify'), otpController.verifyOTP);
 router.post('/auth/verify-nid', registrationController.verifyNID);
-router.post('/auth/save-face', registrationController.saveFaceImage);
+router.post('/auth/save-face', acceptFaceImage, registrationController.saveFaceImage);
 router.post('/auth/save-address', registrationController.saveAddress);
-router.post('/auth/resend-otp', otpController.resendOTP);
+router.post('/auth/resend-otp', rateLimit('otp_send'), otpController.resendOTP);
 router.get('/auth/registration-status/:sessionId', registrationController.getRegistrationStatus);
 
 // User routes - Full profile data
@@ -34,7 +41,15 @@ router.get('/profile', authMiddleware.requireUser, async (req, res) => {
             'SELECT userid, username, email, fullName, name_bn, father_name, mother_name, face_image, phone, nid, dob, location, division, district, police_station, union_name, village, place_details, is_verified, is_nid_verified, is_face_verified, created_at, age FROM users WHERE username = ?',
             [req.session.username]
         );
-        if (users.length > 0) return res.json({ success: true, user: users[0] });
+        if (users.length > 0) {
+            const user = users[0];
+            // Stored captures are served by /api/profile/face-image; older
+            // accounts still carry a data URL
+            if (isStoredFaceImage(user.face_image)) {
+                user.face_image = `/api/profile/face-image?v=${encodeURIComponent(user.face_image.split('/').pop())}`;
+            }
+            return res.json({ success: true, user });
+        }
         return res.json({ success: true, user: { id: req.session.userId, username: req.session.username, email: req.session.email } });
     } catch (error) {
         console.error('Profile fetch error:', error);
@@ -42,6 +57,25 @@ router.get('/profile', authMiddleware.requireUser, async (req, res) => {
     }
 });
 
+// Profile face image (owner only)
+router.get('/profile/face-image', authMiddleware.requireUser, async (req, res) => {
+    try {
+        const [users] = await db.query('SELECT face_image FROM users WHERE username = ?', [req.session.username]);
+        const faceImagePath = users.length > 0 && isStoredFaceImage(users[0].face_image)
+            ? resolveFaceImage(users[0].face_image)
+            : null;
+        if (!faceImagePath) return res.status(404).json({ success: false, message: 'Face image not found' });
+
+        res.set('Cache-Control', 'private, max-age=86400');
+        res.sendFile(faceImagePath, (err) => {
+            if (err && !res.headersSent) res.status(404).json({ success: false, message: 'Face image not found' });
+        });
+    } catch (error) {
+        console.error('Face image fetch error:', error);
+        res.status(500).json({ success: false, message: 'Failed to fetch face image' });
+    }
+});
+
 // Update profile
 router.put('/profile/update', authMiddleware.requireUser, async (req, res) => {
     try {
@@ -113,7 +147,7 @@ router.get('/complaints', authMiddleware.requireUser, async (req, res) => {
 });
 
 // Submit a new complaint
-router.post('/complaints', authMiddleware.requireUser, upload.array('evidence', 10), async (req, res) => {
+router.post('/complaints', authMiddleware.requireUser, idempotent('complaint_submit'), upload.array('evidence', 10), async (req, res) => {
     try {
         const { complaint_type, incident_date, incident_time, location_address, description, witnesses, anonymous } = req.body;
         const username = req.session.username;
@@ -127,21 +161,29 @@ router.post('/complaints', authMiddleware.requireUser, upload.array('evidence',
         if (incident_time) incidentDateTime = `${incident_date} ${incident_time}`;
         const formattedDate = new Date(incidentDateTime).toISOString().slice(0, 19).replace('T', ' ');
         const createdAt = new Date().toISOString().slice(0, 19).replace('T', ' ');
-        const [complaintResult] = await db.query(`INSERT INTO complaint (description, created_at, status, username, admin_username, location_id, complaint_type, location_address, category_id) VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?)`, [description, formattedDate, username, adminUsername, locationId, complaint_type, location_address, categoryId]);
-        const complaintId = complaintResult.insertId;
+        const connection = await db.getConnection();
+        let complaintId;
+        try {
+            await connection.beginTransaction();
+            const [complaintResult] = await connection.query(`INSERT INTO complaint (description, created_at, status, username, admin_username, location_id, complaint_type, location_address, category_id) VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?)`, [description, formattedDate, username, adminUsername, locationId, complaint_type, location_address, categoryId]);
+            complaintId = complaintResult.insertId;
+            await counters.recordComplaintCreated(connection, { username, admin_username: adminUsername, status: 'pending' });
+            await connection.commit();
+        } catch (err) {
+            await connection.rollback();
+            throw err;
+        } finally {
+            connection.release();
+        }
         if (req.files && req.files.length > 0) {
             for (const file of req.files) {
                 let fileType;
                 if (file.mimetype.startsWith('image/')) fileType = 'image';
                 else if (file.mimetype.startsWith('video/')) fileType = 'video';
                 else if (file.mimetype.startsWith('audio/')) fileType = 'audio';
-                let relativePath;
-                if (file.mimetype.startsWith('image/')) relativePath = `images/${file.filename}`;
-                else if (file.mimetype.startsWith('video/')) relativePath = `videos/${file.filename}`;
-                else if (file.mimetype.startsWith('audio/')) relativePath = `audio/${file.filename}`;
-                else relativePath = file.filename;
-                await db.query(`INSERT INTO evidence (uploaded_at, file_type, file_path, complaint_id) VALUES (?, ?, ?, ?)`, [createdAt, fileType, relativePath, complaintId]);
+                await db.query(`INSERT INTO evidence (uploaded_at, file_type, file_path, content_hash, complaint_id) VALUES (?, ?, ?, ?, ?)`, [createdAt, fileType, file.relativePath, file.contentHash, complaintId]);
             }
+            await queueImageProcessing(req.files);
         }
         res.json({ success: true, message: 'Complaint submitted successfully!', complaintId, complaint: { id: complaintId, type: complaint_type, status: 'pending', location: location_address, createdAt } });
     } catch (err) {
@@ -8,16 +8,18 @@ const userController = require('../controllers/userController');
 const complaintController = require('../controllers/complaintController');
 const { requireUser } = require('../middleware/authMiddleware');
 const upload = require('../middleware/uploadMiddleware');
+const { idempotent } = require('../middleware/idempotencyMiddleware');
+const { rateLimit } = require('../middleware/rateLimitMiddleware');
 
 // ========== USER AUTH ROUTES ==========
-router.post('/signup', userAuth.signup);
-router.post('/login', userAuth.login);
+router.post('/signup', rateLimit('signup'), userAuth.signup);
+router.post('/login', rateLimit('login'), userAuth.login);
 router.post('/logout', sessionController.userLogout);
 router.get('/check-auth', sessionController.checkAuth);
 
 // ========== OTP ROUTES ==========
-router.post('/send-otp', otpController.sendOTP);
-router.post('/verify-otp', otpController.verifyOTP);
+router.post('/send-otp', rateLimit('otp_send'), otpController.sendOTP);
+router.post('/verify-otp', rateLimit('otp_verify'), otpController.verifyOTP);
 
 // ========== USER PROFILE ROUTES ==========
 router.get('/profile', requireUser, userController.getProfile);
@@ -30,13 +32,13 @@ router.post('/mark-all-notifications-read', requireUser, userController.markAllU
 router.get('/complain', requireUser, (req, res) => {
     res.redirect('/profile?tab=new-report');
 });
-router.post('/submit-complaint', requireUser, upload.array('evidence', 10), complaintController.submitComplaint);
+router.post('/submit-complaint', requireUser, idempotent('complaint_submit'), upload.array('evidence', 10), complaintController.submitComplaint);
 router.post('/notify-admin', complaintController.notifyAdmin);
 router.get('/my-complaints', requireUser, complaintController.getUserComplaints);
 router.get('/complaint-notifications/:complaint_id', requireUser, complaintController.getComplaintNotifications);
 router.post('/mark-notifications-read/:complaint_id', requireUser, complaintController.markNotificationsRead);
 router.get('/complaint-chat/:complaintId', requireUser, complaintController.getComplaintChat);
-router.post('/send-chat-message', requireUser, complaintController.sendChatMessage);
+router.post('/send-chat-message', requireUser, idempotent('user_chat_message'), complaintController.sendChatMessage);
 router.delete('/delete-complaint/:id', requireUser, complaintController.deleteComplaint);
 router.get('/dashboard-stats', requireUser, complaintController.getDashboardStats);
 router.get('/complaint-heatmap-data', complaintController.getComplaintHeatmapData);
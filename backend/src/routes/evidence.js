@@ -0,0 +1,10 @@
+const express = require('express');
+const router = express.Router();
+
+const evidenceController = require('../controllers/evidenceController');
+
+// ========== EVIDENCE DELIVERY ROUTES ==========
+router.get('/evidence/:evidenceId', evidenceController.streamComplaintEvidence);
+router.get('/anonymous-evidence/:evidenceId', evidenceController.streamAnonymousEvidence);
+
+module.exports = router;
@@ -9,6 +9,8 @@ const superAdminRoutes = require('./superAdmin');
 const complaintRoutes = require('./complaints');
 const anonymousRoutes = require('./anonymous');
 const addressRoutes = require('./address');
+const evidenceRoutes = require('./evidence');
+const uploadRoutes = require('./uploads');
 
 // Mount routes - Order matters! API/action routes before page routes
 router.use('/api', apiRoutes);         // API routes (/api/*)
@@ -17,6 +19,8 @@ router.use('/', superAdminRoutes);     // Super admin routes
 router.use('/', complaintRoutes);      // Complaint routes
 router.use('/', anonymousRoutes);      // Anonymous report routes
 router.use('/', addressRoutes);        // Address & category routes
+router.use('/', evidenceRoutes);       // Evidence delivery routes
+router.use('/', uploadRoutes);         // Resumable upload routes
 router.use('/', pageRoutes);           // Page routes (GET handlers - must be last)
 
 module.exports = router;
@@ -3,13 +3,14 @@ const path = require('path');
 const router = express.Router();
 
 const pageController = require('../controllers/pageController');
+const { resolvePage } = require('../middleware/staticMiddleware');
 
 const frontendPages = path.join(__dirname, '../../../frontend/src/pages');
 const frontendRoot = path.join(__dirname, '../../../frontend');
 
 // Helper to send page files
-const sendPage = (page) => (req, res) => res.sendFile(path.join(frontendPages, page));
-const sendRoot = (page) => (req, res) => res.sendFile(path.join(frontendRoot, page));
+const sendPage = (page) => (req, res) => res.sendFile(resolvePage(path.join(frontendPages, page)));
+const sendRoot = (page) => (req, res) => res.sendFile(resolvePage(path.join(frontendRoot, page)));
 
 // ========== HOMEPAGE & MAIN PAGES ==========
 router.get('/', pageController.getHomepage);
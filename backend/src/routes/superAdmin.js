@@ -2,12 +2,19 @@ const express = require('express');
 const router = express.Router();
 
 const superAdminController = require('../controllers/superAdminController');
+const exportController = require('../controllers/exportController');
+const { rateLimit } = require('../middleware/rateLimitMiddleware');
 
 // ========== SUPER ADMIN ROUTES ==========
-router.post('/super-admin-login', superAdminController.superAdminLogin);
+router.post('/super-admin-login', rateLimit('admin_login'), superAdminController.superAdminLogin);
 router.get('/super-admin-check-auth', superAdminController.checkSuperAdminAuth);
 router.post('/super-admin-logout', superAdminController.superAdminLogout);
 router.get('/super-admin-stats', superAdminController.getSuperAdminStats);
+router.get('/super-admin-db-stats', superAdminController.getDatabaseStats);
+router.get('/super-admin-storage-gc', superAdminController.getStorageGcReport);
+router.post('/super-admin-storage-gc', superAdminController.runStorageGc);
+router.get('/super-admin-archive', superAdminController.getComplaintArchiveReport);
+router.post('/super-admin-archive', superAdminController.runComplaintArchive);
 router.get('/super-admin-pending-requests', superAdminController.getPendingAdminRequests);
 router.get('/super-admin-all-admins', superAdminController.getAllAdminRequests);
 router.get('/super-admin-admin-details/:adminId', superAdminController.getAdminDetails);
@@ -16,6 +23,7 @@ router.post('/super-admin-reject', superAdminController.rejectAdminRequest);
 router.post('/super-admin-suspend', superAdminController.suspendAdminAccount);
 router.post('/super-admin-reactivate', superAdminController.reactivateAdminAccount);
 router.get('/super-admin-audit-logs', superAdminController.getAuditLogs);
+router.get('/super-admin-export-audit-logs', exportController.exportAuditLogs);
 router.get('/super-admin-settings', superAdminController.getSuperAdminSettings);
 router.post('/super-admin-settings', superAdminController.saveSuperAdminSettings);
 
@@ -0,0 +1,13 @@
+const express = require('express');
+const router = express.Router();
+
+const uploadSessionController = require('../controllers/uploadSessionController');
+
+// ========== RESUMABLE UPLOAD ROUTES ==========
+router.post('/upload-sessions', uploadSessionController.createUploadSession);
+router.get('/upload-sessions/:uploadId', uploadSessionController.getUploadSession);
+router.put('/upload-sessions/:uploadId/chunks/:index', uploadSessionController.uploadChunk);
+router.post('/upload-sessions/:uploadId/complete', uploadSessionController.completeUploadSession);
+router.delete('/upload-sessions/:uploadId', uploadSessionController.cancelUploadSession);
+
+module.exports = router;
@@ -1,6 +1,19 @@
 const app = require('./app');
 const pool = require('./db');
 const config = require('./config/config');
+const { startThrottleJobs, stopThrottleJobs } = require('./utils/throttleUtils');
+const { startUploadSessionJobs, stopUploadSessionJobs } = require('./utils/uploadSessionUtils');
+const { startRuntimeMetrics, stopRuntimeMetrics } = require('./utils/metricsUtils');
+const { startCounterJobs, stopCounterJobs } = require('./utils/counterUtils');
+const { startImageJobs, stopImageJobs } = require('./utils/imageProcessingUtils');
+const { startFaceImageJobs, stopFaceImageJobs } = require('./utils/faceImageUtils');
+const { startStorageGcJobs, stopStorageGcJobs } = require('./utils/storageGcUtils');
+const { startIdempotencyJobs, stopIdempotencyJobs } = require('./utils/idempotencyUtils');
+const { startTokenJobs, stopTokenJobs } = require('./utils/tokenUtils');
+const { startRateLimitJobs, stopRateLimitJobs } = require('./utils/rateLimitUtils');
+const { startArchiveJobs, stopArchiveJobs } = require('./utils/archiveUtils');
+const { startReadRoutingJobs, stopReadRoutingJobs } = require('./utils/readRoutingUtils');
+const { startEmailJobs, stopEmailJobs } = require('./utils/emailOutboxUtils');
 const { exec } = require('child_process');
 const os = require('os');
 require('dotenv').config();
@@ -12,6 +25,21 @@ const URL = `http://${HOST}:${PORT}`;
 
 console.log('🚀 Starting SecureVoice Crime Reporting System...\n');
 
+// Background jobs
+startThrottleJobs();
+startUploadSessionJobs();
+startRuntimeMetrics();
+startCounterJobs();
+startImageJobs();
+startFaceImageJobs();
+startStorageGcJobs();
+startIdempotencyJobs();
+startTokenJobs();
+startRateLimitJobs();
+startArchiveJobs();
+startReadRoutingJobs();
+startEmailJobs();
+
 const server = app.listen(PORT, () => {
     console.log(`✅ Server running on port ${PORT}`);
     console.log(`📍 Access: http://localhost:${PORT}`);
@@ -78,7 +106,20 @@ function autoOpenBrowser(url) {
 // Graceful shutdown
 process.on('SIGINT', () => {
     console.log('\n\n👋 Shutting down server gracefully...');
-    server.close(() => {
+    server.close(async () => {
+        await stopThrottleJobs();
+        stopUploadSessionJobs();
+        stopRuntimeMetrics();
+        stopCounterJobs();
+        stopImageJobs();
+        stopFaceImageJobs();
+        stopStorageGcJobs();
+        stopIdempotencyJobs();
+        stopTokenJobs();
+        stopRateLimitJobs();
+        stopArchiveJobs();
+        stopReadRoutingJobs();
+        stopEmailJobs();
         console.log('✅ Server closed');
         process.exit(0);
     });
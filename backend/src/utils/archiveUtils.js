@@ -0,0 +1,352 @@
+const pool = require('../db');
+const counters = require('./counterUtils');
+
+/**
+ * Hot/cold archival of closed complaints
+ *
+ * Resolved or discarded complaints with no status change, chat message or
+ * discard for ARCHIVE_AFTER_DAYS are moved, with their evidence rows,
+ * status history, chat, notifications and audit log entries, into the
+ * year-partitioned `*_archive` tables (019). Each batch is one transaction:
+ * the complaint rows are locked FOR UPDATE, which also holds back inserts
+ * of new child rows (their foreign key checks wait on the parent), the rows
+ * are copied with their original ids and then deleted from the hot tables.
+ * admin_cases rows go with the complaint (ON DELETE CASCADE).
+ *
+ * Archived complaints drop out of the hot tables' lists, analytics and the
+ * global and admin counters; their owners still see them listed and
+ * counted. Reads of one case fall back to the archive through the helpers
+ * below; archived cases are read-only.
+ */
+
+const CONFIG = {
+    // 0 disables the archiver
+    AFTER_DAYS: process.env.ARCHIVE_AFTER_DAYS !== undefined ? parseInt(process.env.ARCHIVE_AFTER_DAYS) : 365,
+    INTERVAL_MS: parseInt(process.env.ARCHIVE_INTERVAL_MS) || 60 * 60 * 1000,
+    BATCH_SIZE: parseInt(process.env.ARCHIVE_BATCH_SIZE) || 200,
+    // Per run, so a large backlog is worked off over several runs
+    MAX_BATCHES_PER_RUN: 50,
+    // Pause between batches to leave the pool and the redo log to requests
+    BATCH_PAUSE_MS: 200
+};
+
+const COMPLAINT_COLUMNS = [
+    'complaint_id', 'description', 'created_at', 'status', 'username', 'admin_username', 'location_id',
+    'complaint_type', 'location_address', 'category_id', 'latitude', 'longitude', 'location_accuracy_radius',
+    'is_discarded', 'discarded_at', 'discarded_by'
+];
+
+// Child tables, copied before the complaint rows are deleted
+const CHILD_TABLES = [
+    { table: 'evidence', columns: ['evidence_id', 'uploaded_at', 'file_type', 'file_path', 'content_hash', 'complaint_id'] },
+    { table: 'status_updates', columns: ['update_id', 'status', 'remarks', 'updated_at', 'updated_by', 'complaint_id'] },
+    { table: 'complaint_chat', columns: ['chat_id', 'complaint_id', 'sender_type', 'sender_username', 'message', 'sent_at', 'is_read'] },
+    { table: 'complaint_notifications', columns: ['notification_id', 'complaint_id', 'message', 'type', 'is_read', 'created_at'] },
+    {
+        table: 'admin_audit_logs',
+        columns: ['log_id', 'admin_username', 'action', 'action_details', 'ip_address', 'user_agent', 'complaint_id',
+            'target_username', 'result', 'timestamp']
+    }
+];
+
+const ARCHIVE_TABLES = ['complaint', ...CHILD_TABLES.map(({ table }) => table)].map(table => `${table}_archive`);
+
+const stats = { runs: 0, batches: 0, complaints: 0, rows: 0, errors: 0, lastRunAt: null, lastRunMs: null };
+
+let archiveTimer = null;
+let running = false;
+
+// ARCHIVER
+// ========
+
+// No status change, chat message or discard since the cutoff
+const INACTIVE_SINCE = `
+    (c.discarded_at IS NULL OR c.discarded_at < ?)
+    AND NOT EXISTS (SELECT 1 FROM status_updates s WHERE s.complaint_id = c.complaint_id AND s.updated_at >= ?)
+    AND NOT EXISTS (SELECT 1 FROM complaint_chat m WHERE m.complaint_id = c.complaint_id AND m.sent_at >= ?)`;
+
+/**
+ * Oldest archivable complaint ids
+ * One branch per closed state so each walks its (state, created_at) index
+ * in order and stops at the limit.
+ */
+async function findCandidates(cutoff, limit) {
+    const [rows] = await pool.query(
+        `SELECT complaint_id FROM (
+            (SELECT c.complaint_id, c.created_at FROM complaint c
+             WHERE c.status = 'resolved' AND c.created_at < ? AND ${INACTIVE_SINCE}
+             ORDER BY c.created_at LIMIT ?)
+            UNION
+            (SELECT c.complaint_id, c.created_at FROM complaint c
+             WHERE c.is_discarded = TRUE AND c.created_at < ? AND ${INACTIVE_SINCE}
+             ORDER BY c.created_at LIMIT ?)
+         ) candidates
+         ORDER BY created_at
+         LIMIT ?`,
+        [cutoff, cutoff, cutoff, cutoff, limit, cutoff, cutoff, cutoff, cutoff, limit, limit]
+    );
+    return rows.map(row => row.complaint_id);
+}
+
+/**
+ * Move one batch of complaints and their rows to the archive
+ * @param {Array<number>} complaintIds - Candidates from findCandidates
+ * @returns {Promise<object>} - { complaints, rows } moved
+ */
+async function archiveComplaints(complaintIds) {
+    const connection = await pool.getConnection();
+    let moved;
+
+    try {
+        await connection.beginTransaction();
+
+        // Re-check under the lock: a case may have been reopened since
+        const [locked] = await connection.query(
+            `SELECT complaint_id, username, admin_username, status, is_discarded FROM complaint
+             WHERE complaint_id IN (?) AND (status = 'resolved' OR is_discarded = TRUE)
+             FOR UPDATE`,
+            [complaintIds]
+        );
+        if (locked.length === 0) {
+            await connection.rollback();
+            return { complaints: 0, rows: 0 };
+        }
+
+        const ids = locked.map(row => row.complaint_id);
+        const archivedAt = new Date();
+        let rows = 0;
+
+        for (const { table, columns } of CHILD_TABLES) {
+            const [copied] = await connection.query(
+                `INSERT INTO ${table}_archive (${columns.join(', ')}, archived_at)
+                 SELECT ${columns.join(', ')}, ? FROM ${table} WHERE complaint_id IN (?)`,
+                [archivedAt, ids]
+            );
+            await connection.query(`DELETE FROM ${table} WHERE complaint_id IN (?)`, [ids]);
+            rows += copied.affectedRows;
+        }
+
+        await connection.query(
+            `INSERT INTO complaint_archive (${COMPLAINT_COLUMNS.join(', ')}, archived_at)
+             SELECT ${COMPLAINT_COLUMNS.join(', ')}, ? FROM complaint WHERE complaint_id IN (?)`,
+            [archivedAt, ids]
+        );
+        await connection.query('DELETE FROM complaint WHERE complaint_id IN (?)', [ids]);
+        await counters.recordComplaintsRemoved(connection, locked);
+
+        await connection.commit();
+        moved = { complaints: ids.length, rows: rows + ids.length };
+    } catch (err) {
+        await connection.rollback();
+        throw err;
+    } finally {
+        connection.release();
+    }
+
+    return moved;
+}
+
+/**
+ * Make sure each archive table has a partition for this year and the next
+ * Splits them off `pmax`, which is empty as long as this keeps ahead.
+ */
+async function ensurePartitions() {
+    const [rows] = await pool.query(
+        `SELECT TABLE_NAME AS table_name, MAX(CAST(SUBSTRING(PARTITION_NAME, 2) AS UNSIGNED)) AS last_year
+         FROM INFORMATION_SCHEMA.PARTITIONS
+         WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (?) AND PARTITION_NAME REGEXP '^p[0-9]{4}$'
+         GROUP BY TABLE_NAME`,
+        [ARCHIVE_TABLES]
+    );
+    const targetYear = new Date().getFullYear() + 1;
+
+    for (const { table_name: table, last_year: lastYear } of rows) {
+        if (Number(lastYear) >= targetYear) continue;
+        const partitions = [];
+        for (let year = Number(lastYear) + 1; year <= targetYear; year++) {
+            partitions.push(`PARTITION p${year} VALUES LESS THAN ('${year + 1}-01-01')`);
+        }
+        await pool.query(
+            `ALTER TABLE ${table} REORGANIZE PARTITION pmax INTO (
+                ${partitions.join(',\n')},
+                PARTITION pmax VALUES LESS THAN (MAXVALUE))`
+        );
+        console.log(`Archive partitions added to ${table} through ${targetYear}`);
+    }
+}
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Archive closed cases older than the cutoff, a bounded number of batches
+ * @param {object} [options] - { afterDays, maxBatches, dryRun }
+ * @returns {Promise<object>} - { cutoff, candidates (dry run), complaints, rows, batches }
+ */
+async function runArchive({ afterDays = CONFIG.AFTER_DAYS, maxBatches = CONFIG.MAX_BATCHES_PER_RUN, dryRun = false } = {}) {
+    const cutoff = new Date(Date.now() - afterDays * 24 * 60 * 60 * 1000);
+    const report = { cutoff, complaints: 0, rows: 0, batches: 0 };
+
+    if (dryRun) {
+        report.candidates = (await findCandidates(cutoff, CONFIG.BATCH_SIZE * maxBatches)).length;
+        return report;
+    }
+
+    await ensurePartitions();
+    while (report.batches < maxBatches) {
+        const ids = await findCandidates(cutoff, CONFIG.BATCH_SIZE);
+        if (ids.length === 0) break;
+
+        const moved = await archiveComplaints(ids);
+        report.batches++;
+        report.complaints += moved.complaints;
+        report.rows += moved.rows;
+        stats.batches++;
+        stats.complaints += moved.complaints;
+        stats.rows += moved.rows;
+
+        if (ids.length < CONFIG.BATCH_SIZE) break;
+        await sleep(CONFIG.BATCH_PAUSE_MS);
+    }
+    return report;
+}
+
+async function runBackgroundArchive() {
+    if (running) return;
+    running = true;
+    const started = Date.now();
+    try {
+        const report = await runArchive();
+        if (report.complaints > 0) {
+            console.log(`Archived ${report.complaints} complaints (${report.rows} rows) older than ${CONFIG.AFTER_DAYS} days`);
+        }
+        stats.runs++;
+    } catch (err) {
+        stats.errors++;
+        console.error('Complaint archive error:', err);
+    } finally {
+        stats.lastRunAt = new Date();
+        stats.lastRunMs = Date.now() - started;
+        running = false;
+    }
+}
+
+function getArchiveStats() {
+    return { afterDays: CONFIG.AFTER_DAYS, running, ...stats };
+}
+
+function startArchiveJobs() {
+    if (archiveTimer || CONFIG.AFTER_DAYS <= 0) return;
+    archiveTimer = setInterval(runBackgroundArchive, CONFIG.INTERVAL_MS);
+    archiveTimer.unref();
+}
+
+function stopArchiveJobs() {
+    clearInterval(archiveTimer);
+    archiveTimer = null;
+}
+
+// READS
+// =====
+
+/**
+ * An archived complaint, for reads that missed the hot table
+ * @param {number|string} complaintId - Complaint ID
+ * @param {object} [owner] - { username } or { adminUsername } the complaint must belong to
+ * @returns {Promise<object|null>} - Archived row (with archived_at) or null
+ */
+async function findArchivedComplaint(complaintId, owner = {}) {
+    let sql = 'SELECT * FROM complaint_archive WHERE complaint_id = ?';
+    const params = [complaintId];
+    if (owner.username) {
+        sql += ' AND username = ?';
+        params.push(owner.username);
+    }
+    if (owner.adminUsername) {
+        sql += ' AND admin_username = ?';
+        params.push(owner.adminUsername);
+    }
+    const [rows] = await pool.query(sql, params);
+    return rows[0] || null;
+}
+
+/**
+ * Archived complaints of one user, newest first, with location, category and evidence
+ */
+async function getArchivedUserComplaints(username) {
+    const [complaints] = await pool.query(
+        `SELECT c.*, l.location_name, l.district_name, cat.name as category_name
+         FROM complaint_archive c
+         LEFT JOIN location l ON c.location_id = l.location_id
+         LEFT JOIN category cat ON c.category_id = cat.category_id
+         WHERE c.username = ?
+         ORDER BY c.created_at DESC`,
+        [username]
+    );
+    if (complaints.length === 0) return complaints;
+
+    const [evidence] = await pool.query(
+        'SELECT * FROM evidence_archive WHERE complaint_id IN (?)',
+        [complaints.map(complaint => complaint.complaint_id)]
+    );
+    for (const complaint of complaints) {
+        complaint.archived = true;
+        complaint.evidence = evidence.filter(e => e.complaint_id === complaint.complaint_id);
+    }
+    return complaints;
+}
+
+/**
+ * Chat of an archived complaint, oldest first
+ * @param {object} [filter] - { unreadFromAdmin } to return only unread admin messages, newest first
+ */
+async function getArchivedChat(complaintId, filter = {}) {
+    const [messages] = await pool.query(
+        filter.unreadFromAdmin
+            ? `SELECT * FROM complaint_chat_archive
+               WHERE complaint_id = ? AND sender_type = 'admin' AND is_read = 0
+               ORDER BY sent_at DESC`
+            : 'SELECT * FROM complaint_chat_archive WHERE complaint_id = ? ORDER BY sent_at ASC',
+        [complaintId]
+    );
+    return messages;
+}
+
+async function getArchivedEvidence(complaintId) {
+    const [evidence] = await pool.query(
+        `SELECT e.*, d.status as processing_status, d.width, d.height,
+                d.thumbnail_path IS NOT NULL as has_renditions
+         FROM evidence_archive e
+         LEFT JOIN evidence_derivatives d ON d.content_hash = e.content_hash
+         WHERE e.complaint_id = ?`,
+        [complaintId]
+    );
+    return evidence;
+}
+
+/**
+ * One archived evidence row with the owner and admin of its complaint,
+ * in the shape evidenceController reads from the hot tables
+ */
+async function findArchivedEvidenceFile(evidenceId) {
+    const [rows] = await pool.query(
+        `SELECT e.file_path, c.username, c.admin_username, d.thumbnail_path, d.preview_path
+         FROM evidence_archive e
+         JOIN complaint_archive c ON e.complaint_id = c.complaint_id
+         LEFT JOIN evidence_derivatives d ON d.content_hash = e.content_hash AND d.status = 'done'
+         WHERE e.evidence_id = ?`,
+        [evidenceId]
+    );
+    return rows[0] || null;
+}
+
+module.exports = {
+    runArchive,
+    getArchiveStats,
+    startArchiveJobs,
+    stopArchiveJobs,
+    findArchivedComplaint,
+    getArchivedUserComplaints,
+    getArchivedChat,
+    getArchivedEvidence,
+    findArchivedEvidenceFile
+};
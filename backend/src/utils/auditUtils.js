@@ -1,4 +1,86 @@
 const pool = require('../db');
+const { recordAuditAction } = require('./counterUtils');
+const { readerFor } = require('./readRoutingUtils');
+
+// admin_audit_logs columns; admin_audit_logs_archive has the same plus archived_at
+const AUDIT_LOG_FIELDS = [
+    'log_id', 'admin_username', 'action', 'action_details', 'ip_address', 'user_agent', 'complaint_id',
+    'target_username', 'result', 'timestamp'
+];
+
+/**
+ * Derived table of live and archived audit logs (see utils/archiveUtils.js)
+ * The conditions are applied to each table so both can use their indexes.
+ * For exports, which read every match; pages use buildAuditLogQuery().
+ * @param {string} where - Conditions for the WHERE clause, with ? placeholders
+ * @param {Array} params - Values for the placeholders
+ * @returns {{ from: string, params: Array }} - `from` is aliased as logs
+ */
+function auditLogSource(where, params) {
+    const fields = AUDIT_LOG_FIELDS.join(', ');
+    return {
+        from: `(SELECT ${fields} FROM admin_audit_logs WHERE ${where}
+                UNION ALL
+                SELECT ${fields} FROM admin_audit_logs_archive WHERE ${where}) logs`,
+        params: [...params, ...params]
+    };
+}
+
+/**
+ * Newest live and archived audit logs matching the filters
+ * MySQL does not push an outer LIMIT into UNION branches, so each branch
+ * takes its own newest `limit` rows from its timestamp index (021) and only
+ * those are merged; the cost follows the limit, not the log history.
+ * @param {object} filters - { adminUsername, action, startDate, endDate (timestamps),
+ *                             dateFrom, dateTo (YYYY-MM-DD, inclusive), limit }
+ * @returns {{ sql: string, params: Array }}
+ */
+function buildAuditLogQuery({
+    adminUsername = null, action = null, startDate = null, endDate = null, dateFrom = null, dateTo = null, limit = 500
+} = {}) {
+    let where = '1=1';
+    const params = [];
+
+    if (adminUsername) {
+        where += ' AND admin_username = ?';
+        params.push(adminUsername);
+    }
+
+    if (action) {
+        where += ' AND action = ?';
+        params.push(action);
+    }
+
+    if (startDate) {
+        where += ' AND timestamp >= ?';
+        params.push(startDate);
+    }
+
+    if (endDate) {
+        where += ' AND timestamp <= ?';
+        params.push(endDate);
+    }
+
+    // Whole days, as ranges on the column so the timestamp indexes apply
+    if (dateFrom) {
+        where += ' AND timestamp >= ?';
+        params.push(dateFrom);
+    }
+
+    if (dateTo) {
+        where += ' AND timestamp < DATE_ADD(?, INTERVAL 1 DAY)';
+        params.push(dateTo);
+    }
+
+    const fields = AUDIT_LOG_FIELDS.join(', ');
+    return {
+        sql: `(SELECT ${fields} FROM admin_audit_logs WHERE ${where} ORDER BY timestamp DESC LIMIT ?)
+              UNION ALL
+              (SELECT ${fields} FROM admin_audit_logs_archive WHERE ${where} ORDER BY timestamp DESC LIMIT ?)
+              ORDER BY timestamp DESC LIMIT ?`,
+        params: [...params, limit, ...params, limit, limit]
+    };
+}
 
 /**
  * Log admin actions for audit trail
@@ -34,44 +116,62 @@ async function logAdminAction(adminUsername, action, options = {}) {
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)`,
             [adminUsername, action, details, ipAddress, userAgent, complaintId, targetUsername, result]
         );
+        recordAuditAction();
     } catch (err) {
         console.error('Error logging admin action:', err);
         // Don't throw error - logging failure shouldn't break the main operation
     }
 }
 
+/**
+ * Log several admin actions with one multi-row insert
+ * @param {string} adminUsername - Admin username performing the actions
+ * @param {Array<object>} entries - { action, ...options of logAdminAction }
+ */
+async function logAdminActions(adminUsername, entries) {
+    if (entries.length === 0) return;
+
+    try {
+        const rows = entries.map(({
+            action,
+            actionDetails = null,
+            ipAddress = null,
+            userAgent = null,
+            complaintId = null,
+            targetUsername = null,
+            result = 'success'
+        }) => {
+            const details = typeof actionDetails === 'object' 
+                ? JSON.stringify(actionDetails) 
+                : actionDetails;
+            return [adminUsername, action, details, ipAddress, userAgent, complaintId, targetUsername, result];
+        });
+
+        await pool.query(
+            `INSERT INTO admin_audit_logs 
+            (admin_username, action, action_details, ip_address, user_agent, complaint_id, target_username, result) 
+            VALUES ?`,
+            [rows]
+        );
+        recordAuditAction(rows.length);
+    } catch (err) {
+        console.error('Error logging admin actions:', err);
+        // Don't throw error - logging failure shouldn't break the main operation
+    }
+}
+
 /**
  * Get audit logs for a specific admin
  * @param {string} adminUsername - Admin username
  * @param {object} filters - Optional filters
+ * @param {object} [req] - Request, to read from the replica unless the admin just wrote
  * @returns {Promise<Array>} - Array of log entries
  */
-async function getAdminAuditLogs(adminUsername, filters = {}) {
+async function getAdminAuditLogs(adminUsername, filters = {}, req = null) {
     try {
         const { action = null, startDate = null, endDate = null, limit = 100 } = filters;
-        
-        let query = 'SELECT * FROM admin_audit_logs WHERE admin_username = ?';
-        const params = [adminUsername];
-
-        if (action) {
-            query += ' AND action = ?';
-            params.push(action);
-        }
-
-        if (startDate) {
-            query += ' AND timestamp >= ?';
-            params.push(startDate);
-        }
-
-        if (endDate) {
-            query += ' AND timestamp <= ?';
-            params.push(endDate);
-        }
-
-        query += ' ORDER BY timestamp DESC LIMIT ?';
-        params.push(limit);
-
-        const [logs] = await pool.query(query, params);
+        const query = buildAuditLogQuery({ adminUsername, action, startDate, endDate, limit });
+        const [logs] = await readerFor(req).query(query.sql, query.params);
         return logs;
     } catch (err) {
         console.error('Error fetching audit logs:', err);
@@ -82,39 +182,13 @@ async function getAdminAuditLogs(adminUsername, filters = {}) {
 /**
  * Get all audit logs (Super Admin only)
  * @param {object} filters - Optional filters
+ * @param {object} [req] - Request, to read from the replica unless the caller just wrote
  * @returns {Promise<Array>} - Array of log entries
  */
-async function getAllAuditLogs(filters = {}) {
+async function getAllAuditLogs(filters = {}, req = null) {
     try {
-        const { adminUsername = null, action = null, startDate = null, endDate = null, limit = 500 } = filters;
-        
-        let query = 'SELECT * FROM admin_audit_logs WHERE 1=1';
-        const params = [];
-
-        if (adminUsername) {
-            query += ' AND admin_username = ?';
-            params.push(adminUsername);
-        }
-
-        if (action) {
-            query += ' AND action = ?';
-            params.push(action);
-        }
-
-        if (startDate) {
-            query += ' AND timestamp >= ?';
-            params.push(startDate);
-        }
-
-        if (endDate) {
-            query += ' AND timestamp <= ?';
-            params.push(endDate);
-        }
-
-        query += ' ORDER BY timestamp DESC LIMIT ?';
-        params.push(limit);
-
-        const [logs] = await pool.query(query, params);
+        const query = buildAuditLogQuery(filters);
+        const [logs] = await readerFor(req).query(query.sql, query.params);
         return logs;
     } catch (err) {
         console.error('Error fetching all audit logs:', err);
@@ -124,6 +198,9 @@ async function getAllAuditLogs(filters = {}) {
 
 module.exports = {
     logAdminAction,
+    logAdminActions,
     getAdminAuditLogs,
-    getAllAuditLogs
+    getAllAuditLogs,
+    auditLogSource,
+    buildAuditLogQuery
 };
@@ -0,0 +1,134 @@
+/**
+ * Single-flight micro-cache for hot shared reads
+ *
+ * Concurrent callers asking for the same key share one in-flight load, and
+ * the result is kept for a few seconds. Once fresh time runs out, the value
+ * is still served for a stale window while one background load refreshes
+ * it, so a burst of traffic costs at most one database computation per key
+ * per TTL and callers never wait on a refresh.
+ * Only successful loads are cached; a failed refresh keeps serving the stale
+ * value until its window ends.
+ */
+
+const DEFAULTS = {
+    ttlMs: 5000,
+    staleMs: 30000,
+    maxEntries: 500
+};
+
+// name -> MicroCache, for metrics
+const registry = new Map();
+
+class MicroCache {
+    /**
+     * @param {string} name - Metrics label, usually the endpoint
+     * @param {object} [options] - { ttlMs, staleMs, maxEntries }
+     */
+    constructor(name, options = {}) {
+        this.name = name;
+        this.ttlMs = options.ttlMs !== undefined ? options.ttlMs : DEFAULTS.ttlMs;
+        this.staleMs = options.staleMs !== undefined ? options.staleMs : DEFAULTS.staleMs;
+        this.maxEntries = options.maxEntries || DEFAULTS.maxEntries;
+        // key -> { value, loadedAt, hasValue, pending }
+        this.entries = new Map();
+        this.stats = { hit: 0, stale: 0, coalesced: 0, miss: 0, error: 0 };
+        registry.set(name, this);
+    }
+
+    /**
+     * Get a cached value, loading it at most once per key at a time
+     * @param {string} key - Cache key within this cache
+     * @param {Function} loader - async () => value
+     */
+    async get(key, loader) {
+        const now = Date.now();
+        const entry = this.entries.get(key);
+
+        if (entry && entry.hasValue) {
+            const age = now - entry.loadedAt;
+            if (age < this.ttlMs) {
+                this.stats.hit++;
+                return entry.value;
+            }
+            if (age < this.ttlMs + this.staleMs) {
+                this.stats.stale++;
+                if (!entry.pending) {
+                    // Errors are counted in load(); the stale value stays
+                    this.load(key, entry, loader).catch(() => {});
+                }
+                return entry.value;
+            }
+        }
+
+        if (entry && entry.pending) {
+            this.stats.coalesced++;
+            return entry.pending;
+        }
+
+        this.stats.miss++;
+        return this.load(key, entry || this.createEntry(key), loader);
+    }
+
+    createEntry(key) {
+        if (this.entries.size >= this.maxEntries) {
+            // Map iteration is insertion order: drop the oldest key
+            this.entries.delete(this.entries.keys().next().value);
+        }
+        const entry = { value: undefined, loadedAt: 0, hasValue: false, pending: null };
+        this.entries.set(key, entry);
+        return entry;
+    }
+
+    load(key, entry, loader) {
+        entry.pending = (async () => {
+            try {
+                const value = await loader();
+                entry.value = value;
+                entry.loadedAt = Date.now();
+                entry.hasValue = true;
+                // Re-insert so eviction order follows the latest load
+                this.entries.delete(key);
+                this.entries.set(key, entry);
+                return value;
+            } catch (err) {
+                this.stats.error++;
+                if (!entry.hasValue) this.entries.delete(key);
+                throw err;
+            } finally {
+                entry.pending = null;
+            }
+        })();
+        return entry.pending;
+    }
+
+    /**
+     * Drop one key, or every key when none is given
+     */
+    invalidate(key) {
+        if (key === undefined) this.entries.clear();
+        else this.entries.delete(key);
+    }
+
+    snapshot() {
+        const served = this.stats.hit + this.stats.stale + this.stats.coalesced;
+        const total = served + this.stats.miss;
+        return {
+            name: this.name,
+            entries: this.entries.size,
+            ...this.stats,
+            hitRate: total ? Math.round((served / total) * 10000) / 10000 : 0
+        };
+    }
+}
+
+/**
+ * Per-cache lookup counts for metrics
+ */
+function getCacheStats() {
+    return Array.from(registry.values(), cache => cache.snapshot());
+}
+
+module.exports = {
+    MicroCache,
+    getCacheStats
+};
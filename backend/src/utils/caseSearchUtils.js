@@ -0,0 +1,300 @@
+const pool = require('../db');
+
+/**
+ * Admin case search
+ *
+ * Text search runs against the ngram FULLTEXT indexes from
+ * 013_case_search_fulltext.sql (complaint description / location address and
+ * complainant username / full name). Matching cases are ranked by relevance,
+ * filtered, paginated and faceted in MySQL, so only one page of rows and the
+ * facet counts leave the database.
+ */
+
+const CONFIG = {
+    DEFAULT_PAGE_SIZE: 50,
+    MAX_PAGE_SIZE: 200,
+    // ngram_token_size default; shorter terms cannot use the FULLTEXT index
+    MIN_TERM_LENGTH: 2,
+    MAX_TERMS: 8,
+    MAX_QUERY_LENGTH: 200,
+    // A match on the complainant's name ranks above one in the case text
+    NAME_WEIGHT: 2
+};
+
+const STATUSES = ['pending', 'verifying', 'investigating', 'resolved'];
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}$/;
+
+class CaseSearchError extends Error {
+    constructor(status, message) {
+        super(message);
+        this.status = status;
+    }
+}
+
+function parsePositiveInt(value, fallback) {
+    const parsed = parseInt(value);
+    return Number.isInteger(parsed) && parsed > 0 ? parsed : fallback;
+}
+
+function parseDate(value, name) {
+    if (!value || value.trim() === '') return null;
+    const date = value.trim();
+    if (!DATE_PATTERN.test(date) || isNaN(Date.parse(date))) {
+        throw new CaseSearchError(400, `Invalid ${name}, expected YYYY-MM-DD`);
+    }
+    return date;
+}
+
+/**
+ * Normalise case search query parameters
+ * `q` is the full-text search; `username` keeps its original meaning, a
+ * substring match on the complainant's username or full name. Without
+ * `page` or `pageSize` every matching case is returned, as the endpoint
+ * did before pagination.
+ * @param {object} query - req.query
+ * @returns {object} - { q, username, status, categoryId, dateFrom, dateTo, page, pageSize (null = all) }
+ */
+function parseCaseFilters(query) {
+    const text = String(query.q || '').trim().slice(0, CONFIG.MAX_QUERY_LENGTH);
+    const username = String(query.username || '').trim().slice(0, CONFIG.MAX_QUERY_LENGTH);
+    const paged = query.page !== undefined || query.pageSize !== undefined;
+
+    const status = query.status ? String(query.status).toLowerCase() : null;
+    if (status && !STATUSES.includes(status)) {
+        throw new CaseSearchError(400, 'Invalid status filter');
+    }
+
+    let categoryId = null;
+    if (query.categoryId !== undefined && query.categoryId !== '') {
+        categoryId = parseInt(query.categoryId);
+        if (isNaN(categoryId)) {
+            throw new CaseSearchError(400, 'Invalid category filter');
+        }
+    }
+
+    return {
+        q: text,
+        username,
+        status,
+        categoryId,
+        dateFrom: parseDate(query.dateFrom, 'dateFrom'),
+        dateTo: parseDate(query.dateTo, 'dateTo'),
+        page: paged ? parsePositiveInt(query.page, 1) : 1,
+        pageSize: paged ? Math.min(parsePositiveInt(query.pageSize, CONFIG.DEFAULT_PAGE_SIZE), CONFIG.MAX_PAGE_SIZE) : null
+    };
+}
+
+/**
+ * Build a BOOLEAN MODE query from free text
+ * Each word is quoted: with the ngram parser a quoted phrase matches as a
+ * substring, which keeps the behaviour of the old LIKE '%term%' search.
+ * Words are OR-ed and ranked, so cases matching more of them come first.
+ * @param {string} text - Search text
+ * @returns {string|null} - Null when no word is long enough to index
+ */
+function toBooleanQuery(text) {
+    const terms = text
+        .replace(/["+\-<>()~*@]/g, ' ')
+        .split(/\s+/)
+        .filter(term => term.length >= CONFIG.MIN_TERM_LENGTH)
+        .slice(0, CONFIG.MAX_TERMS);
+    return terms.length > 0 ? terms.map(term => `"${term}"`).join(' ') : null;
+}
+
+function escapeLike(text) {
+    return text.replace(/[\\%_]/g, match => `\\${match}`);
+}
+
+/**
+ * Shared FROM / WHERE for the page and facet queries
+ * When searching, a CTE collects the ids and summed relevance of cases that
+ * match in either FULLTEXT index; both branches are restricted to the admin's
+ * cases so the index lookups never rank other districts.
+ */
+function buildSearch(adminUsername, filters) {
+    const cteParams = [];
+    let withClause = '';
+    let from = 'complaint c INNER JOIN users u ON c.username = u.username';
+    let relevance = null;
+
+    const clauses = ['c.admin_username = ?', 'c.is_discarded = FALSE'];
+    const whereParams = [adminUsername];
+
+    const booleanQuery = filters.q ? toBooleanQuery(filters.q) : null;
+    if (booleanQuery) {
+        withClause = `
+            WITH matches AS (
+                SELECT complaint_id, SUM(score) as score
+                FROM (
+                    SELECT complaint_id, MATCH(description, location_address) AGAINST (? IN BOOLEAN MODE) as score
+                    FROM complaint
+                    WHERE MATCH(description, location_address) AGAINST (? IN BOOLEAN MODE)
+                      AND admin_username = ? AND is_discarded = FALSE
+                    UNION ALL
+                    SELECT mc.complaint_id, MATCH(mu.username, mu.fullName) AGAINST (? IN BOOLEAN MODE) * ${CONFIG.NAME_WEIGHT}
+                    FROM users mu
+                    INNER JOIN complaint mc ON mc.username = mu.username
+                    WHERE MATCH(mu.username, mu.fullName) AGAINST (? IN BOOLEAN MODE)
+                      AND mc.admin_username = ? AND mc.is_discarded = FALSE
+                ) scored
+                GROUP BY complaint_id
+            )`;
+        cteParams.push(booleanQuery, booleanQuery, adminUsername, booleanQuery, booleanQuery, adminUsername);
+        from = `matches m
+            INNER JOIN complaint c ON c.complaint_id = m.complaint_id
+            INNER JOIN users u ON c.username = u.username`;
+        relevance = 'm.score';
+    } else if (filters.q) {
+        // Terms too short for the index: prefix match on the complainant only
+        const prefix = `${escapeLike(filters.q)}%`;
+        clauses.push('(c.username LIKE ? OR u.fullName LIKE ?)');
+        whereParams.push(prefix, prefix);
+    }
+
+    if (filters.username) {
+        const term = `%${escapeLike(filters.username)}%`;
+        clauses.push('(c.username LIKE ? OR u.fullName LIKE ?)');
+        whereParams.push(term, term);
+    }
+    if (filters.status) {
+        clauses.push('c.status = ?');
+        whereParams.push(filters.status);
+    }
+    if (filters.categoryId !== null) {
+        clauses.push('c.category_id = ?');
+        whereParams.push(filters.categoryId);
+    }
+    // Ranges on created_at rather than DATE(created_at) so the index applies
+    if (filters.dateFrom) {
+        clauses.push('c.created_at >= ?');
+        whereParams.push(filters.dateFrom);
+    }
+    if (filters.dateTo) {
+        clauses.push('c.created_at < DATE_ADD(?, INTERVAL 1 DAY)');
+        whereParams.push(filters.dateTo);
+    }
+
+    return {
+        withClause,
+        from,
+        where: clauses.join(' AND '),
+        cteParams,
+        whereParams,
+        relevance
+    };
+}
+
+function buildFacets(rows) {
+    const status = { total: 0, pending: 0, verifying: 0, investigating: 0, resolved: 0 };
+    const categories = new Map();
+
+    for (const row of rows) {
+        const count = Number(row.count);
+        status.total += count;
+        if (row.status in status) status[row.status] += count;
+
+        const key = row.category_id === null ? 'none' : row.category_id;
+        const category = categories.get(key) || { category_id: row.category_id, name: row.category_name, count: 0 };
+        category.count += count;
+        categories.set(key, category);
+    }
+
+    return {
+        status,
+        category: [...categories.values()].sort((a, b) => b.count - a.count)
+    };
+}
+
+/**
+ * Build the page and facet queries for a search
+ * Kept free of I/O so Tests/database/test_query_plans.py can EXPLAIN them.
+ * @param {string} adminUsername - Assigned admin
+ * @param {object} filters - Output of parseCaseFilters
+ * @returns {object} - { cases: { sql, params }, facets: { sql, params } }
+ */
+function buildCaseQueries(adminUsername, filters) {
+    const search = buildSearch(adminUsername, filters);
+    const limit = filters.pageSize ? '\n        LIMIT ? OFFSET ?' : '';
+    const orderBy = search.relevance
+        ? `${search.relevance} DESC, c.created_at DESC`
+        : 'c.created_at DESC';
+
+    const casesQuery = `${search.withClause}
+        SELECT
+            c.complaint_id,
+            c.username as complainant_username,
+            COALESCE(u.fullName, 'N/A') as complainant_fullname,
+            COALESCE(cat.name, c.complaint_type, 'General') as complaint_type,
+            c.category_id,
+            cat.name as category_name,
+            cat.crime_code,
+            c.created_at,
+            c.status,
+            COALESCE(c.description, '') as description,
+            COALESCE(c.location_address, '') as location_address,
+            COALESCE(ac.last_updated, c.created_at) as last_updated${search.relevance ? `,
+            ${search.relevance} as relevance` : ''}
+        FROM ${search.from}
+        LEFT JOIN category cat ON c.category_id = cat.category_id
+        LEFT JOIN admin_cases ac ON c.complaint_id = ac.complaint_id AND ac.admin_username = ?
+        WHERE ${search.where}
+        ORDER BY ${orderBy}${limit}`;
+
+    // One grouped row per (status, category); folded into both facets
+    const facetsQuery = `${search.withClause}
+        SELECT c.status, c.category_id, cat.name as category_name, COUNT(*) as count
+        FROM ${search.from}
+        LEFT JOIN category cat ON c.category_id = cat.category_id
+        WHERE ${search.where}
+        GROUP BY c.status, c.category_id, cat.name`;
+
+    return {
+        cases: {
+            sql: casesQuery,
+            params: [
+                ...search.cteParams, adminUsername, ...search.whereParams,
+                ...(filters.pageSize ? [filters.pageSize, (filters.page - 1) * filters.pageSize] : [])
+            ]
+        },
+        facets: {
+            sql: facetsQuery,
+            params: [...search.cteParams, ...search.whereParams]
+        }
+    };
+}
+
+/**
+ * Search an admin's cases
+ * @param {string} adminUsername - Assigned admin
+ * @param {object} filters - Output of parseCaseFilters
+ * @returns {Promise<object>} - { cases, facets, pagination }
+ */
+async function searchCases(adminUsername, filters) {
+    const queries = buildCaseQueries(adminUsername, filters);
+
+    const [[cases], [facetRows]] = await Promise.all([
+        pool.query(queries.cases.sql, queries.cases.params),
+        pool.query(queries.facets.sql, queries.facets.params)
+    ]);
+
+    const facets = buildFacets(facetRows);
+    const total = facets.status.total;
+
+    return {
+        cases,
+        facets,
+        pagination: {
+            page: filters.page,
+            pageSize: filters.pageSize || total,
+            total,
+            totalPages: filters.pageSize ? Math.ceil(total / filters.pageSize) : 1
+        }
+    };
+}
+
+module.exports = {
+    CaseSearchError,
+    parseCaseFilters,
+    buildCaseQueries,
+    searchCases
+};
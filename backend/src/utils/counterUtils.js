@@ -0,0 +1,320 @@
+const pool = require('../db');
+
+/**
+ * Complaint status counters for dashboards
+ *
+ * `complaint_counters` holds one row per scope (global, admin, user) with the
+ * total and per-status complaint counts, so dashboard stats are a single
+ * primary-key read. Writers update the rows in the same transaction as the
+ * complaint change; a periodic job recounts from `complaint` and corrects any
+ * drift (e.g. rows edited by hand or discarded outside the app).
+ * Archived complaints (utils/archiveUtils.js) drop out of the global and
+ * admin counts but still count for their owner, who keeps seeing them listed.
+ */
+
+const CONFIG = {
+    RECONCILE_INTERVAL_MS: parseInt(process.env.COUNTER_RECONCILE_MS) || 60 * 60 * 1000
+};
+
+const STATUSES = ['pending', 'verifying', 'investigating', 'resolved'];
+const COUNT_COLUMNS = ['total', ...STATUSES];
+
+// Audit log entries, live and archived, kept in memory; null until first loaded
+let auditActions = null;
+let reconcileTimer = null;
+
+function emptyCounts() {
+    return { total: 0, pending: 0, verifying: 0, investigating: 0, resolved: 0 };
+}
+
+/**
+ * Scopes a complaint is counted in, in primary-key order so concurrent
+ * writers lock counter rows in the same order
+ * Discarded complaints drop out of the global and admin counts but still
+ * count for their owner.
+ * @param {object} complaint - Row with username, admin_username, is_discarded
+ */
+function scopesFor(complaint) {
+    const scopes = [];
+    if (!complaint.is_discarded) {
+        scopes.push(['global', '']);
+        if (complaint.admin_username) scopes.push(['admin', complaint.admin_username]);
+    }
+    if (complaint.username) scopes.push(['user', complaint.username]);
+    return scopes;
+}
+
+const SCOPE_ORDER = ['global', 'admin', 'user'];
+
+function compareScopes([scopeA, keyA], [scopeB, keyB]) {
+    return SCOPE_ORDER.indexOf(scopeA) - SCOPE_ORDER.indexOf(scopeB)
+        || keyA.toLowerCase().localeCompare(keyB.toLowerCase());
+}
+
+async function applyDelta(connection, scopes, delta) {
+    await applyDeltas(connection, scopes.map(([scope, key]) => [scope, key, delta]));
+}
+
+// entries: [scope, key, delta], already in primary-key order
+async function applyDeltas(connection, entries) {
+    if (entries.length === 0) return;
+
+    const rows = entries.map(([scope, key, delta]) => [scope, key, ...COUNT_COLUMNS.map(column => delta[column])]);
+    await connection.query(
+        `INSERT INTO complaint_counters (scope, scope_key, ${COUNT_COLUMNS.join(', ')})
+         VALUES ?
+         ON DUPLICATE KEY UPDATE ${COUNT_COLUMNS.map(column => `${column} = ${column} + VALUES(${column})`).join(', ')}`,
+        [rows]
+    );
+}
+
+/**
+ * Count a new complaint; call inside the transaction that inserts it
+ * @param {object} connection - Connection with an open transaction
+ * @param {object} complaint - username, admin_username and status of the new row
+ */
+async function recordComplaintCreated(connection, complaint) {
+    const delta = emptyCounts();
+    delta.total = 1;
+    delta[complaint.status || 'pending'] = 1;
+    await applyDelta(connection, scopesFor(complaint), delta);
+}
+
+/**
+ * Move a complaint between status counts; call inside the transaction that
+ * updates it, with the row read FOR UPDATE before the change
+ * @param {object} connection - Connection with an open transaction
+ * @param {object} complaint - username, admin_username, status, is_discarded before the update
+ * @param {string} newStatus - Status being set
+ */
+async function recordStatusChange(connection, complaint, newStatus) {
+    if (complaint.status === newStatus) return;
+
+    const delta = emptyCounts();
+    if (STATUSES.includes(complaint.status)) delta[complaint.status] = -1;
+    delta[newStatus] = 1;
+    await applyDelta(connection, scopesFor(complaint), delta);
+}
+
+/**
+ * Move many complaints to one status with a single counter write
+ * Deltas are summed per scope and applied in primary-key order.
+ * @param {object} connection - Connection with an open transaction
+ * @param {Array<object>} complaints - Rows read FOR UPDATE before the update
+ * @param {string} newStatus - Status being set
+ */
+async function recordStatusChanges(connection, complaints, newStatus) {
+    const deltas = new Map();
+
+    for (const complaint of complaints) {
+        if (complaint.status === newStatus) continue;
+        for (const [scope, key] of scopesFor(complaint)) {
+            // Keys compare case-insensitively, like the column collation
+            const id = `${scope}:${key.toLowerCase()}`;
+            if (!deltas.has(id)) deltas.set(id, [scope, key, emptyCounts()]);
+            const delta = deltas.get(id)[2];
+            if (STATUSES.includes(complaint.status)) delta[complaint.status]--;
+            delta[newStatus]++;
+        }
+    }
+
+    await applyDeltas(connection, [...deltas.values()].sort(compareScopes));
+}
+
+/**
+ * Uncount a deleted complaint; call inside the transaction that deletes it
+ * @param {object} connection - Connection with an open transaction
+ * @param {object} complaint - username, admin_username, status, is_discarded of the deleted row
+ */
+async function recordComplaintDeleted(connection, complaint) {
+    const delta = emptyCounts();
+    delta.total = -1;
+    if (STATUSES.includes(complaint.status)) delta[complaint.status] = -1;
+    await applyDelta(connection, scopesFor(complaint), delta);
+}
+
+/**
+ * Uncount many complaints moved to the archive at once
+ * Their owner's counts are left alone, as the archive is listed with the
+ * owner's complaints.
+ * @param {object} connection - Connection with an open transaction
+ * @param {Array<object>} complaints - Rows read FOR UPDATE before the delete
+ */
+async function recordComplaintsRemoved(connection, complaints) {
+    const deltas = new Map();
+
+    for (const complaint of complaints) {
+        for (const [scope, key] of scopesFor(complaint)) {
+            if (scope === 'user') continue;
+            const id = `${scope}:${key.toLowerCase()}`;
+            if (!deltas.has(id)) deltas.set(id, [scope, key, emptyCounts()]);
+            const delta = deltas.get(id)[2];
+            delta.total--;
+            if (STATUSES.includes(complaint.status)) delta[complaint.status]--;
+        }
+    }
+
+    await applyDeltas(connection, [...deltas.values()].sort(compareScopes));
+}
+
+/**
+ * Read the counts for one scope
+ * @param {string} scope - 'global', 'admin' or 'user'
+ * @param {string} [key=''] - Admin or user username
+ * @returns {Promise<object>} - { total, pending, verifying, investigating, resolved }
+ */
+async function getCounts(scope, key = '') {
+    const [rows] = await pool.execute(
+        `SELECT ${COUNT_COLUMNS.join(', ')} FROM complaint_counters WHERE scope = ? AND scope_key = ?`,
+        [scope, key]
+    );
+    return rows.length > 0 ? { ...emptyCounts(), ...rows[0] } : emptyCounts();
+}
+
+// Called after each audit log insert
+function recordAuditAction(count = 1) {
+    if (auditActions !== null) auditActions += count;
+}
+
+// Archived entries still count: the audit log views list them too
+async function countAuditActions() {
+    const [rows] = await pool.query(
+        `SELECT (SELECT COUNT(*) FROM admin_audit_logs) + (SELECT COUNT(*) FROM admin_audit_logs_archive) as count`
+    );
+    return Number(rows[0].count);
+}
+
+async function getAuditActionCount() {
+    if (auditActions === null) {
+        auditActions = await countAuditActions();
+    }
+    return auditActions;
+}
+
+function countsFromRow(row) {
+    const counts = emptyCounts();
+    for (const column of COUNT_COLUMNS) counts[column] = Number(row[column]) || 0;
+    return counts;
+}
+
+/**
+ * Recount every scope from the complaint table and correct rows that drifted
+ * User counts include the owner's archived complaints.
+ * @returns {Promise<number>} - Number of counter rows corrected
+ */
+async function reconcileCounters() {
+    const statusSums = STATUSES.map(status => `SUM(status = '${status}') as ${status}`).join(', ');
+    const connection = await pool.getConnection();
+    let corrected = 0;
+
+    try {
+        await connection.beginTransaction();
+
+        // Lock the counters first. Writers that already bumped them have then
+        // committed and are visible to the counts below; writers still in
+        // flight wait here and apply their bump on top of the recount.
+        const [current] = await connection.query('SELECT * FROM complaint_counters FOR UPDATE');
+
+        const [globalRows] = await connection.query(
+            `SELECT COUNT(*) as total, ${statusSums} FROM complaint WHERE is_discarded = FALSE`
+        );
+        const [adminRows] = await connection.query(
+            `SELECT admin_username as scope_key, COUNT(*) as total, ${statusSums}
+             FROM complaint
+             WHERE admin_username IS NOT NULL AND is_discarded = FALSE
+             GROUP BY admin_username`
+        );
+        const [userRows] = await connection.query(
+            `SELECT username as scope_key, COUNT(*) as total, ${statusSums}
+             FROM (
+                 SELECT username, status FROM complaint WHERE username IS NOT NULL
+                 UNION ALL
+                 SELECT username, status FROM complaint_archive WHERE username IS NOT NULL
+             ) owned
+             GROUP BY username`
+        );
+
+        // Keys compare case-insensitively, like the column collation
+        const expected = new Map();
+        const add = (scope, key, row) => expected.set(`${scope}:${key.toLowerCase()}`, { scope, key, counts: countsFromRow(row) });
+        add('global', '', globalRows[0]);
+        adminRows.forEach(row => add('admin', row.scope_key, row));
+        userRows.forEach(row => add('user', row.scope_key, row));
+
+        const updates = [];
+        for (const row of current) {
+            const id = `${row.scope}:${row.scope_key.toLowerCase()}`;
+            const entry = expected.get(id);
+            const counts = entry ? entry.counts : emptyCounts();
+            if (COUNT_COLUMNS.some(column => Number(row[column]) !== counts[column])) {
+                updates.push([row.scope, row.scope_key, counts]);
+            }
+            expected.delete(id);
+        }
+        for (const { scope, key, counts } of expected.values()) {
+            updates.push([scope, key, counts]);
+        }
+
+        if (updates.length > 0) {
+            await connection.query(
+                `INSERT INTO complaint_counters (scope, scope_key, ${COUNT_COLUMNS.join(', ')})
+                 VALUES ?
+                 ON DUPLICATE KEY UPDATE ${COUNT_COLUMNS.map(column => `${column} = VALUES(${column})`).join(', ')}`,
+                [updates.map(([scope, key, counts]) => [scope, key, ...COUNT_COLUMNS.map(column => counts[column])])]
+            );
+        }
+
+        await connection.commit();
+        corrected = updates.length;
+    } catch (err) {
+        await connection.rollback();
+        throw err;
+    } finally {
+        connection.release();
+    }
+
+    auditActions = await countAuditActions();
+
+    return corrected;
+}
+
+async function runReconcile() {
+    try {
+        const corrected = await reconcileCounters();
+        if (corrected > 0) {
+            console.warn(`Complaint counters reconciled: ${corrected} row(s) corrected`);
+        }
+    } catch (err) {
+        console.error('Counter reconcile error:', err);
+    }
+}
+
+/**
+ * Reconcile on startup, then periodically
+ */
+function startCounterJobs() {
+    if (reconcileTimer) return;
+    runReconcile();
+    reconcileTimer = setInterval(runReconcile, CONFIG.RECONCILE_INTERVAL_MS);
+    reconcileTimer.unref();
+}
+
+function stopCounterJobs() {
+    clearInterval(reconcileTimer);
+    reconcileTimer = null;
+}
+
+module.exports = {
+    STATUSES,
+    recordComplaintCreated,
+    recordStatusChange,
+    recordStatusChanges,
+    recordComplaintDeleted,
+    recordComplaintsRemoved,
+    getCounts,
+    recordAuditAction,
+    getAuditActionCount,
+    reconcileCounters,
+    startCounterJobs,
+    stopCounterJobs
+};
@@ -0,0 +1,347 @@
+const pool = require('../db');
+const { sendEmail, transporter } = require('./emailUtils');
+const { Histogram, elapsedMs } = require('./metricsUtils');
+
+/**
+ * Email outbox
+ *
+ * Requests no longer wait on SMTP: queueEmail() inserts the message into
+ * `email_outbox` (020), inside the request's transaction where it has one,
+ * so an approval and its notification commit or roll back together. A
+ * dispatcher claims due rows with SKIP LOCKED (several server instances can
+ * share the queue) and sends them over the pooled transport in emailUtils,
+ * at most CONCURRENCY at a time.
+ *
+ * Temporary failures (network errors, 4xx replies) are retried with
+ * exponential backoff; 5xx replies fail the message at once. Each recipient
+ * domain gets a token bucket of DOMAIN_PER_MINUTE messages and at most
+ * DOMAIN_CONCURRENCY in flight, and a domain that answers 421/450/451 is
+ * paused, so a burst to one provider does not get the sender blocked there.
+ * Throttling is per process.
+ *
+ * Delivery is at least once: a server that dies between the SMTP reply and
+ * the status update sends that message again after STALE_CLAIM_MINUTES.
+ */
+
+const MINUTE = 60 * 1000;
+
+const CONFIG = {
+    CONCURRENCY: parseInt(process.env.EMAIL_CONCURRENCY) || 4,
+    POLL_INTERVAL_MS: parseInt(process.env.EMAIL_POLL_MS) || 5000,
+    MAX_ATTEMPTS: 6,
+    // Backoff doubles per attempt, from 30 seconds up to one hour
+    BASE_BACKOFF_MS: 30 * 1000,
+    MAX_BACKOFF_MS: 60 * MINUTE,
+    DOMAIN_PER_MINUTE: parseInt(process.env.EMAIL_DOMAIN_PER_MINUTE) || 60,
+    DOMAIN_CONCURRENCY: 2,
+    DOMAIN_PAUSE_MS: MINUTE,
+    // Claimed rows older than this belong to a crashed dispatcher
+    STALE_CLAIM_MINUTES: 5,
+    RETENTION_HOURS: parseInt(process.env.EMAIL_OUTBOX_RETENTION_HOURS) || 72,
+    PURGE_INTERVAL_MS: 15 * MINUTE,
+    PURGE_BATCH: 1000
+};
+
+// Lower is sent first
+const PRIORITY = {
+    OTP: 0,
+    ACCOUNT: 3,
+    NOTIFICATION: 5
+};
+
+// SMTP replies that mean the receiving domain wants us to slow down
+const THROTTLE_REPLIES = new Set([421, 450, 451]);
+
+const stats = { sent: 0, failed: 0, retried: 0, expired: 0, domainPauses: 0 };
+const sendLatency = new Histogram();
+// Refreshed by each poll
+let queue = { pending: 0, sending: 0, oldestPendingSeconds: 0 };
+
+// recipient domain -> { tokens, refilledAt, inFlight, pausedUntil }
+const domains = new Map();
+
+let active = 0;
+let filling = false;
+let stopped = true;
+let pollTimer = null;
+let purgeTimer = null;
+
+function domainOf(address) {
+    const text = String(address || '').trim().toLowerCase();
+    return text.slice(text.lastIndexOf('@') + 1);
+}
+
+/**
+ * Queue an email for the dispatcher
+ * Pass the transaction's connection so the message commits with the change
+ * it reports, then call drainEmailOutbox() after the commit.
+ * @param {string} to - Recipient address
+ * @param {string} subject - Subject line
+ * @param {string} html - HTML body
+ * @param {object} [options] - { connection, priority, ttlMs (drop if not sent by then) }
+ * @returns {Promise<number>} - Outbox row id
+ */
+async function queueEmail(to, subject, html, { connection = pool, priority = PRIORITY.NOTIFICATION, ttlMs = null } = {}) {
+    const [result] = await connection.query(
+        `INSERT INTO email_outbox (recipient, recipient_domain, subject, html, priority, expires_at)
+         VALUES (?, ?, ?, ?, ?, ?)`,
+        [to, domainOf(to), String(subject).slice(0, 255), html, priority, ttlMs ? new Date(Date.now() + ttlMs) : null]
+    );
+    if (connection === pool) drainEmailOutbox();
+    return result.insertId;
+}
+
+// ======================
+// PER-DOMAIN THROTTLING
+// ======================
+
+function domainState(domain) {
+    let state = domains.get(domain);
+    if (!state) {
+        state = { tokens: CONFIG.DOMAIN_PER_MINUTE, refilledAt: Date.now(), inFlight: 0, pausedUntil: 0 };
+        domains.set(domain, state);
+    }
+    const now = Date.now();
+    state.tokens = Math.min(
+        CONFIG.DOMAIN_PER_MINUTE,
+        state.tokens + ((now - state.refilledAt) / MINUTE) * CONFIG.DOMAIN_PER_MINUTE
+    );
+    state.refilledAt = now;
+    return state;
+}
+
+function domainAvailable(state) {
+    return state.tokens >= 1 && state.inFlight < CONFIG.DOMAIN_CONCURRENCY && state.pausedUntil <= Date.now();
+}
+
+// Domains the next claim must skip
+function blockedDomains() {
+    const blocked = [];
+    for (const domain of domains.keys()) {
+        if (!domainAvailable(domainState(domain))) blocked.push(domain);
+    }
+    return blocked;
+}
+
+function pauseDomain(domain) {
+    domainState(domain).pausedUntil = Date.now() + CONFIG.DOMAIN_PAUSE_MS;
+    stats.domainPauses++;
+}
+
+// Forget domains that are idle with a full bucket
+function pruneDomains() {
+    for (const [domain, state] of domains) {
+        domainState(domain);
+        if (state.inFlight === 0 && state.tokens >= CONFIG.DOMAIN_PER_MINUTE && state.pausedUntil <= Date.now()) {
+            domains.delete(domain);
+        }
+    }
+}
+
+// ======================
+// DISPATCHER
+// ======================
+
+/**
+ * Claim the most urgent due message outside the blocked domains, or null
+ */
+async function claimMessage(blocked) {
+    const connection = await pool.getConnection();
+    try {
+        await connection.beginTransaction();
+        const [rows] = await connection.query(
+            `SELECT id, recipient, recipient_domain, subject, html, attempts,
+                    (expires_at IS NOT NULL AND expires_at <= NOW()) AS expired
+             FROM email_outbox
+             WHERE status = 'pending' AND next_attempt_at <= NOW()
+                 ${blocked.length > 0 ? 'AND recipient_domain NOT IN (?)' : ''}
+             ORDER BY priority, next_attempt_at
+             LIMIT 1
+             FOR UPDATE SKIP LOCKED`,
+            blocked.length > 0 ? [blocked] : []
+        );
+        if (rows.length === 0) {
+            await connection.commit();
+            return null;
+        }
+        await connection.query(
+            `UPDATE email_outbox SET status = 'sending', attempts = attempts + 1, claimed_at = NOW() WHERE id = ?`,
+            [rows[0].id]
+        );
+        await connection.commit();
+        return { ...rows[0], attempts: rows[0].attempts + 1 };
+    } catch (err) {
+        await connection.rollback();
+        throw err;
+    } finally {
+        connection.release();
+    }
+}
+
+function backoffMs(attempts) {
+    return Math.min(CONFIG.BASE_BACKOFF_MS * 2 ** (attempts - 1), CONFIG.MAX_BACKOFF_MS);
+}
+
+async function deliver(message) {
+    if (message.expired) {
+        stats.expired++;
+        await pool.query(
+            `UPDATE email_outbox SET status = 'expired', html = NULL, last_error = 'Expired before it could be sent' WHERE id = ?`,
+            [message.id]
+        );
+        return;
+    }
+
+    const start = process.hrtime.bigint();
+    try {
+        const info = await sendEmail(message.recipient, message.subject, message.html);
+        sendLatency.observe(elapsedMs(start));
+        stats.sent++;
+        await pool.query(
+            `UPDATE email_outbox
+             SET status = 'sent', html = NULL, message_id = ?, last_error = NULL, sent_at = NOW()
+             WHERE id = ?`,
+            [info && info.messageId ? String(info.messageId).slice(0, 255) : null, message.id]
+        );
+    } catch (err) {
+        const code = err.responseCode || 0;
+        if (THROTTLE_REPLIES.has(code)) pauseDomain(message.recipient_domain);
+
+        // 5xx replies and unusable addresses will not succeed on a retry
+        const permanent = (code >= 500 && code < 600) || err.code === 'EENVELOPE';
+        const failed = permanent || message.attempts >= CONFIG.MAX_ATTEMPTS;
+        if (failed) stats.failed++;
+        else stats.retried++;
+
+        console.error(`Email send error (#${message.id} to ${message.recipient_domain}, attempt ${message.attempts}):`, err.message);
+        await pool.query(
+            `UPDATE email_outbox SET status = ?, last_error = ?, next_attempt_at = ? WHERE id = ?`,
+            [
+                failed ? 'failed' : 'pending',
+                String(err.message).slice(0, 255),
+                new Date(Date.now() + (failed ? 0 : backoffMs(message.attempts))),
+                message.id
+            ]
+        );
+    }
+}
+
+/**
+ * Claim and start sends until CONCURRENCY are in flight or nothing is due
+ * Claims run one at a time so domain limits are checked against the sends
+ * already started.
+ */
+async function drainEmailOutbox() {
+    if (stopped || filling) return;
+    filling = true;
+    try {
+        while (!stopped && active < CONFIG.CONCURRENCY) {
+            const message = await claimMessage(blockedDomains());
+            if (!message) break;
+
+            const state = domainState(message.recipient_domain);
+            state.tokens--;
+            state.inFlight++;
+            active++;
+            deliver(message)
+                .catch(err => console.error('Email outbox update error:', err))
+                .finally(() => {
+                    active--;
+                    state.inFlight--;
+                    drainEmailOutbox();
+                });
+        }
+    } catch (err) {
+        console.error('Email outbox claim error:', err);
+    } finally {
+        filling = false;
+    }
+}
+
+/**
+ * Requeue messages left 'sending' by a dispatcher that died, refresh the
+ * queue depth, then drain
+ */
+async function poll() {
+    try {
+        await pool.query(
+            `UPDATE email_outbox SET status = 'pending'
+             WHERE status = 'sending' AND claimed_at < NOW() - INTERVAL ? MINUTE`,
+            [CONFIG.STALE_CLAIM_MINUTES]
+        );
+        const [rows] = await pool.query(
+            `SELECT status, COUNT(*) AS count,
+                    COALESCE(TIMESTAMPDIFF(SECOND, MIN(created_at), NOW()), 0) AS oldest
+             FROM email_outbox
+             WHERE status IN ('pending', 'sending')
+             GROUP BY status`
+        );
+        const next = { pending: 0, sending: 0, oldestPendingSeconds: 0 };
+        for (const row of rows) {
+            next[row.status] = Number(row.count);
+            if (row.status === 'pending') next.oldestPendingSeconds = Number(row.oldest);
+        }
+        queue = next;
+        pruneDomains();
+        drainEmailOutbox();
+    } catch (err) {
+        console.error('Email outbox poll error:', err);
+    }
+}
+
+async function purgeOutbox() {
+    try {
+        let affectedRows;
+        do {
+            [{ affectedRows }] = await pool.query(
+                `DELETE FROM email_outbox
+                 WHERE status IN ('sent', 'failed', 'expired') AND created_at < NOW() - INTERVAL ? HOUR
+                 LIMIT ?`,
+                [CONFIG.RETENTION_HOURS, CONFIG.PURGE_BATCH]
+            );
+        } while (affectedRows === CONFIG.PURGE_BATCH);
+    } catch (err) {
+        console.error('Email outbox purge error:', err);
+    }
+}
+
+/**
+ * Delivery counts, queue depth and send latency for /api/metrics
+ */
+function getEmailOutboxStats() {
+    return {
+        ...stats,
+        active,
+        queue: { ...queue },
+        pausedDomains: [...domains.values()].filter(state => state.pausedUntil > Date.now()).length,
+        sendLatency
+    };
+}
+
+function startEmailJobs() {
+    if (pollTimer) return;
+    stopped = false;
+    poll();
+    pollTimer = setInterval(poll, CONFIG.POLL_INTERVAL_MS);
+    pollTimer.unref();
+    purgeTimer = setInterval(purgeOutbox, CONFIG.PURGE_INTERVAL_MS);
+    purgeTimer.unref();
+}
+
+function stopEmailJobs() {
+    stopped = true;
+    clearInterval(pollTimer);
+    clearInterval(purgeTimer);
+    pollTimer = null;
+    purgeTimer = null;
+    transporter.close();
+}
+
+module.exports = {
+    PRIORITY,
+    queueEmail,
+    drainEmailOutbox,
+    getEmailOutboxStats,
+    startEmailJobs,
+    stopEmailJobs
+};
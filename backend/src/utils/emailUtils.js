@@ -1,12 +1,17 @@
 const nodemailer = require('nodemailer');
 const config = require('../config/config');
 
-// Create transporter
+// Pooled transport: connections are kept open and reused across messages
+// (up to maxMessages each) instead of a new SMTP handshake per email.
+// Without EMAIL_USER no AUTH is attempted (local SMTP stand-in).
 const transporter = nodemailer.createTransport({
+    pool: true,
+    maxConnections: config.email.maxConnections,
+    maxMessages: config.email.maxMessages,
     host: config.email.host,
     port: config.email.port,
     secure: config.email.secure,
-    auth: config.email.auth,
+    auth: config.email.auth.user ? config.email.auth : undefined,
     tls: {
         rejectUnauthorized: false
     }
@@ -23,12 +28,15 @@ transporter.verify(function(error, success) {
 });
 
 // Export transporter and utility functions
+// Application email goes through the outbox (utils/emailOutboxUtils.js);
+// sendEmail talks to SMTP directly and is used by its dispatcher and the
+// configuration test page.
 module.exports = {
     transporter,
     
     sendEmail: async (to, subject, html) => {
         const mailOptions = {
-            from: config.email.auth.user,
+            from: config.email.from,
             to,
             subject,
             html
@@ -36,4 +44,4 @@ module.exports = {
         
         return transporter.sendMail(mailOptions);
     }
-};
\ No newline at end of file
+};
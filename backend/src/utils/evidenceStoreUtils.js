@@ -0,0 +1,175 @@
+const pool = require('../db');
+const path = require('path');
+const fs = require('fs').promises;
+
+/**
+ * Content-addressed evidence storage
+ *
+ * Files are stored once per SHA-256 under a sharded layout:
+ *   uploads/<images|videos|audio>/<h[0..2]>/<h[2..4]>/<hash><ext>
+ * The rows in `evidence` and `anonymous_evidence` carrying a content_hash
+ * are the references to that file.
+ */
+
+const UPLOADS_ROOT = path.join(__dirname, '../../uploads');
+
+// A file written within this window may belong to an upload whose database
+// row is not inserted yet, so reference checks never unlink it.
+const RECLAIM_GRACE_MS = 60 * 60 * 1000;
+
+/**
+ * Get the storage directory for a MIME type
+ */
+function getTypeDir(mimetype) {
+    if (mimetype.startsWith('image/')) return 'images';
+    if (mimetype.startsWith('video/')) return 'videos';
+    if (mimetype.startsWith('audio/')) return 'audio';
+    return 'files';
+}
+
+/**
+ * Build the sharded relative path for a content hash
+ * @param {string} contentHash - Hex SHA-256 digest
+ * @param {string} mimetype - File MIME type
+ * @param {string} extension - File extension including the dot
+ * @returns {string} - Path relative to uploads/ (e.g. "images/ab/cd/abcd...jpg")
+ */
+function getContentPath(contentHash, mimetype, extension = '') {
+    return [
+        getTypeDir(mimetype),
+        contentHash.slice(0, 2),
+        contentHash.slice(2, 4),
+        contentHash + extension.toLowerCase()
+    ].join('/');
+}
+
+// Renditions produced for image evidence (utils/imageProcessingUtils.js)
+const DERIVED_VARIANTS = ['thumb', 'preview'];
+
+/**
+ * Build the sharded relative path for a derived rendition of a file
+ * @param {string} contentHash - Hex SHA-256 digest of the original
+ * @param {string} variant - 'thumb' or 'preview'
+ * @returns {string} - Path relative to uploads/ (e.g. "derived/ab/cd/abcd...-thumb.webp")
+ */
+function getDerivedPath(contentHash, variant) {
+    return [
+        'derived',
+        contentHash.slice(0, 2),
+        contentHash.slice(2, 4),
+        `${contentHash}-${variant}.webp`
+    ].join('/');
+}
+
+/**
+ * Remove the renditions of a content hash once its original is gone
+ */
+async function releaseDerivatives(contentHash) {
+    await pool.query('DELETE FROM evidence_derivatives WHERE content_hash = ?', [contentHash]);
+    for (const variant of DERIVED_VARIANTS) {
+        try {
+            await fs.unlink(path.join(UPLOADS_ROOT, getDerivedPath(contentHash, variant)));
+        } catch (err) {
+            if (err.code !== 'ENOENT') throw err;
+        }
+    }
+}
+
+/**
+ * Count references to a content hash across the evidence tables
+ * (archived complaint evidence included)
+ */
+async function countReferences(contentHash) {
+    const [results] = await pool.query(
+        `SELECT
+            (SELECT COUNT(*) FROM evidence WHERE content_hash = ?) +
+            (SELECT COUNT(*) FROM evidence_archive WHERE content_hash = ?) +
+            (SELECT COUNT(*) FROM anonymous_evidence WHERE content_hash = ?) AS refs`,
+        [contentHash, contentHash, contentHash]
+    );
+    return Number(results[0].refs);
+}
+
+/**
+ * Count how many evidence rows share each content hash
+ * @param {Array<string>} contentHashes - Hashes to look up
+ * @returns {Promise<Object>} - Map of hash -> number of rows using it
+ */
+async function getDuplicateCounts(contentHashes) {
+    const hashes = [...new Set(contentHashes.filter(Boolean))];
+    if (hashes.length === 0) return {};
+
+    const [results] = await pool.query(
+        `SELECT content_hash, SUM(uses) AS uses FROM (
+            SELECT content_hash, COUNT(*) AS uses FROM evidence WHERE content_hash IN (?) GROUP BY content_hash
+            UNION ALL
+            SELECT content_hash, COUNT(*) AS uses FROM evidence_archive WHERE content_hash IN (?) GROUP BY content_hash
+            UNION ALL
+            SELECT content_hash, COUNT(*) AS uses FROM anonymous_evidence WHERE content_hash IN (?) GROUP BY content_hash
+         ) refs GROUP BY content_hash`,
+        [hashes, hashes, hashes]
+    );
+
+    const counts = {};
+    results.forEach(row => {
+        counts[row.content_hash] = Number(row.uses);
+    });
+    return counts;
+}
+
+/**
+ * Absolute path of a stored file, or null when it escapes uploads/
+ * @param {string} filePath - Path relative to uploads/ (a leading "uploads/" is accepted)
+ */
+function resolveUploadPath(filePath) {
+    const absolutePath = path.resolve(UPLOADS_ROOT, filePath.replace(/^\/?uploads\//, ''));
+    return absolutePath.startsWith(UPLOADS_ROOT + path.sep) ? absolutePath : null;
+}
+
+/**
+ * Unlink a released file if nothing references it any more
+ * Content-addressed files are kept while a row references them and for
+ * RECLAIM_GRACE_MS after they were written; legacy files (no content_hash)
+ * are unique and unlinked directly. Unexpected errors are thrown.
+ * @param {{file_path: string, content_hash: string}} file - Released file
+ * @returns {Promise<object>} - { status: 'deleted'|'missing'|'referenced'|'recent', retryAt }
+ */
+async function reclaimFile(file) {
+    const filePath = resolveUploadPath(file.file_path);
+    if (!filePath) return { status: 'missing' };
+
+    if (file.content_hash && await countReferences(file.content_hash) > 0) {
+        return { status: 'referenced' };
+    }
+
+    let status = 'deleted';
+    try {
+        if (file.content_hash) {
+            const stat = await fs.stat(filePath);
+            if (Date.now() - stat.mtimeMs < RECLAIM_GRACE_MS) {
+                return { status: 'recent', retryAt: new Date(stat.mtimeMs + RECLAIM_GRACE_MS) };
+            }
+        }
+        await fs.unlink(filePath);
+    } catch (err) {
+        if (err.code !== 'ENOENT') throw err;
+        status = 'missing';
+    }
+
+    if (file.content_hash) await releaseDerivatives(file.content_hash);
+    return { status };
+}
+
+module.exports = {
+    UPLOADS_ROOT,
+    getTypeDir,
+    getContentPath,
+    DERIVED_VARIANTS,
+    getDerivedPath,
+    releaseDerivatives,
+    countReferences,
+    getDuplicateCounts,
+    RECLAIM_GRACE_MS,
+    resolveUploadPath,
+    reclaimFile
+};
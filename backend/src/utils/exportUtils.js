@@ -0,0 +1,184 @@
+const zlib = require('zlib');
+const { Transform, pipeline } = require('stream');
+const { readerFor } = require('./readRoutingUtils');
+
+/**
+ * Streaming CSV / NDJSON exports
+ *
+ * Rows are streamed from MySQL (the read replica when one is configured),
+ * serialised one at a time and gzipped into the response; every stage
+ * honours backpressure, so an export runs in constant memory however many
+ * years it covers.
+ */
+
+const CONFIG = {
+    // Each running export holds a pool connection until it finishes
+    MAX_CONCURRENT: parseInt(process.env.EXPORT_MAX_CONCURRENT) || 2,
+    ROW_BUFFER: 200
+};
+
+const FORMATS = {
+    csv: { contentType: 'text/csv; charset=utf-8', extension: 'csv' },
+    ndjson: { contentType: 'application/x-ndjson; charset=utf-8', extension: 'ndjson' }
+};
+
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}$/;
+const NUMBER_PATTERN = /^[+-]?\d+(\.\d+)?$/;
+
+let running = 0;
+
+class ExportError extends Error {
+    constructor(status, message) {
+        super(message);
+        this.status = status;
+    }
+}
+
+function parseDate(value, name) {
+    if (!value || value.trim() === '') return null;
+    const date = value.trim();
+    if (!DATE_PATTERN.test(date) || isNaN(Date.parse(date))) {
+        throw new ExportError(400, `Invalid ${name}, expected YYYY-MM-DD`);
+    }
+    return date;
+}
+
+/**
+ * Normalise export query parameters
+ * @param {object} query - req.query
+ * @param {object} columns - Export column name -> SQL expression
+ * @returns {object} - { format, columns, dateFrom, dateTo }
+ */
+function parseExportOptions(query, columns) {
+    const format = String(query.format || 'csv').toLowerCase();
+    if (!FORMATS[format]) {
+        throw new ExportError(400, `Invalid format, expected one of: ${Object.keys(FORMATS).join(', ')}`);
+    }
+
+    let selected = Object.keys(columns);
+    if (query.columns) {
+        selected = [...new Set(String(query.columns).split(',').map(column => column.trim()).filter(Boolean))];
+        const unknown = selected.filter(column => !Object.prototype.hasOwnProperty.call(columns, column));
+        if (unknown.length > 0 || selected.length === 0) {
+            throw new ExportError(400, `Unknown columns: ${unknown.join(', ')}. Available: ${Object.keys(columns).join(', ')}`);
+        }
+    }
+
+    return {
+        format,
+        columns: selected,
+        dateFrom: parseDate(query.dateFrom, 'dateFrom'),
+        dateTo: parseDate(query.dateTo, 'dateTo')
+    };
+}
+
+/**
+ * SELECT list for the chosen columns; names come from the whitelist only
+ */
+function selectList(columns, names) {
+    return names.map(name => `${columns[name]} AS \`${name}\``).join(', ');
+}
+
+function formatValue(value) {
+    if (value === null || value === undefined) return null;
+    if (value instanceof Date) return isNaN(value) ? null : value.toISOString();
+    if (Buffer.isBuffer(value)) return value.toString('utf8');
+    return value;
+}
+
+function csvCell(value) {
+    const formatted = formatValue(value);
+    if (formatted === null) return '';
+    let text = String(formatted);
+    // Keep spreadsheet apps from evaluating cells as formulas (DECIMAL
+    // columns arrive as strings, so signed numbers are left alone)
+    if (/^[=+\-@\t\r]/.test(text) && !NUMBER_PATTERN.test(text)) text = `'${text}`;
+    return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+function createCsvTransform(columns) {
+    let headerWritten = false;
+    return new Transform({
+        writableObjectMode: true,
+        transform(row, encoding, callback) {
+            let chunk = '';
+            if (!headerWritten) {
+                chunk = columns.map(csvCell).join(',') + '\r\n';
+                headerWritten = true;
+            }
+            callback(null, chunk + columns.map(column => csvCell(row[column])).join(',') + '\r\n');
+        },
+        flush(callback) {
+            callback(null, headerWritten ? '' : columns.map(csvCell).join(',') + '\r\n');
+        }
+    });
+}
+
+function createNdjsonTransform(columns) {
+    return new Transform({
+        writableObjectMode: true,
+        transform(row, encoding, callback) {
+            const record = {};
+            for (const column of columns) record[column] = formatValue(row[column]);
+            callback(null, JSON.stringify(record) + '\n');
+        }
+    });
+}
+
+/**
+ * Stream a query result to the response as a file download
+ * Responds with 503 when MAX_CONCURRENT exports are already running. Once
+ * streaming has started errors can no longer be reported as JSON, so the
+ * response is aborted and the client sees a truncated download.
+ * @param {object} req - Express request (Accept-Encoding decides on gzip)
+ * @param {object} res - Express response
+ * @param {object} options - { filename, format, columns, sql, params }
+ */
+async function streamExport(req, res, { filename, format, columns, sql, params }) {
+    if (running >= CONFIG.MAX_CONCURRENT) {
+        throw new ExportError(503, 'Too many exports in progress, please retry shortly');
+    }
+
+    running++;
+    let rows;
+    try {
+        rows = await readerFor(req).stream(sql, params, CONFIG.ROW_BUFFER);
+    } catch (err) {
+        running--;
+        throw err;
+    }
+
+    const { contentType, extension } = FORMATS[format];
+    const gzip = /\bgzip\b/.test(req.get('accept-encoding') || '');
+    const stamp = new Date().toISOString().slice(0, 10);
+
+    res.status(200);
+    res.set({
+        'Content-Type': contentType,
+        'Content-Disposition': `attachment; filename="${filename}-${stamp}.${extension}"`,
+        'Cache-Control': 'no-store',
+        'Vary': 'Accept-Encoding'
+    });
+    if (gzip) res.set('Content-Encoding', 'gzip');
+
+    const stages = [rows, format === 'csv' ? createCsvTransform(columns) : createNdjsonTransform(columns)];
+    if (gzip) stages.push(zlib.createGzip());
+    stages.push(res);
+
+    return new Promise(resolve => {
+        pipeline(...stages, (err) => {
+            running--;
+            if (err && err.code !== 'ERR_STREAM_PREMATURE_CLOSE') {
+                console.error(`Export ${filename} error:`, err);
+            }
+            resolve();
+        });
+    });
+}
+
+module.exports = {
+    ExportError,
+    parseExportOptions,
+    selectList,
+    streamExport
+};
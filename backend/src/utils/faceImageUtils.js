@@ -0,0 +1,168 @@
+const path = require('path');
+const fs = require('fs').promises;
+const crypto = require('crypto');
+const { UPLOADS_ROOT } = require('./evidenceStoreUtils');
+const { loadSharp } = require('./imageProcessingUtils');
+
+/**
+ * Registration face captures
+ *
+ * The webcam capture arrives as a multipart file, is downsized to a small
+ * metadata-free WebP and stored under uploads/faces/pending/ while the
+ * registration is in progress. The registration session only holds the
+ * relative path; signup moves the file to uploads/faces/ before inserting
+ * the account (and moves it back if the insert fails), storing that path in
+ * users.face_image. Older accounts keep their data URL there.
+ *
+ * Without sharp the capture is stored as uploaded.
+ */
+
+const CONFIG = {
+    MAX_BYTES: 5 * 1024 * 1024,
+    // Longest edge of the stored capture
+    MAX_EDGE: 640,
+    WEBP_QUALITY: 85,
+    MAX_INPUT_PIXELS: 40 * 1000 * 1000,
+    // Captures of registrations that never finish are removed after this
+    PENDING_TTL_MS: 2 * 60 * 60 * 1000,
+    SWEEP_INTERVAL_MS: 15 * 60 * 1000
+};
+
+const FACES_DIR = 'faces';
+const PENDING_DIR = 'faces/pending';
+const ALLOWED_TYPES = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp'
+};
+
+let sweepTimer = null;
+
+/**
+ * Whether a users.face_image value is a stored file rather than a data URL
+ */
+function isStoredFaceImage(value) {
+    return typeof value === 'string' && value.startsWith(`${FACES_DIR}/`) && !value.startsWith(`${PENDING_DIR}/`);
+}
+
+/**
+ * Absolute path of a stored face image, or null when it escapes faces/
+ */
+function resolveFaceImage(relativePath) {
+    const facesRoot = path.join(UPLOADS_ROOT, FACES_DIR);
+    const absolutePath = path.resolve(UPLOADS_ROOT, relativePath);
+    return absolutePath.startsWith(facesRoot + path.sep) ? absolutePath : null;
+}
+
+async function removeFile(absolutePath) {
+    try {
+        await fs.unlink(absolutePath);
+    } catch (err) {
+        if (err.code !== 'ENOENT') throw err;
+    }
+}
+
+/**
+ * Downsize an uploaded capture into faces/pending/
+ * The multer temp file is always removed.
+ * @param {object} file - Multer file (path, mimetype)
+ * @returns {string} - Path relative to uploads/ (e.g. "faces/pending/<id>.webp")
+ */
+async function storePendingFaceImage(file) {
+    const sharp = loadSharp();
+    const id = crypto.randomBytes(16).toString('hex');
+    const extension = sharp ? '.webp' : ALLOWED_TYPES[file.mimetype];
+    const relativePath = `${PENDING_DIR}/${id}${extension}`;
+    const target = path.join(UPLOADS_ROOT, relativePath);
+
+    await fs.mkdir(path.dirname(target), { recursive: true });
+    try {
+        if (sharp) {
+            // rotate() applies the EXIF orientation; no metadata is written
+            await sharp(file.path, { limitInputPixels: CONFIG.MAX_INPUT_PIXELS, failOn: 'error' })
+                .rotate()
+                .resize({ width: CONFIG.MAX_EDGE, height: CONFIG.MAX_EDGE, fit: 'inside', withoutEnlargement: true })
+                .webp({ quality: CONFIG.WEBP_QUALITY })
+                .toFile(target);
+        } else {
+            await fs.rename(file.path, target);
+        }
+    } finally {
+        await removeFile(file.path);
+    }
+    return relativePath;
+}
+
+/**
+ * Final path a pending capture gets once the account is created
+ */
+function getCommittedPath(pendingPath) {
+    return `${FACES_DIR}/${path.basename(pendingPath)}`;
+}
+
+/**
+ * Move a pending capture to its final path
+ */
+async function commitFaceImage(pendingPath) {
+    const committedPath = getCommittedPath(pendingPath);
+    await fs.rename(path.join(UPLOADS_ROOT, pendingPath), path.join(UPLOADS_ROOT, committedPath));
+    return committedPath;
+}
+
+/**
+ * Move a committed capture back to pending, when the account it was
+ * committed for could not be created
+ */
+async function uncommitFaceImage(pendingPath) {
+    await fs.rename(path.join(UPLOADS_ROOT, getCommittedPath(pendingPath)), path.join(UPLOADS_ROOT, pendingPath));
+}
+
+/**
+ * Remove a stored or pending capture
+ */
+async function removeFaceImage(relativePath) {
+    const absolutePath = resolveFaceImage(relativePath);
+    if (absolutePath) await removeFile(absolutePath);
+}
+
+/**
+ * Remove pending captures older than PENDING_TTL_MS
+ */
+async function sweepPendingFaceImages() {
+    const pendingRoot = path.join(UPLOADS_ROOT, PENDING_DIR);
+    try {
+        const cutoff = Date.now() - CONFIG.PENDING_TTL_MS;
+        for (const name of await fs.readdir(pendingRoot)) {
+            const absolutePath = path.join(pendingRoot, name);
+            const stats = await fs.stat(absolutePath);
+            if (stats.mtimeMs < cutoff) await removeFile(absolutePath);
+        }
+    } catch (err) {
+        if (err.code !== 'ENOENT') console.error('Face image sweep error:', err);
+    }
+}
+
+function startFaceImageJobs() {
+    if (sweepTimer) return;
+    sweepTimer = setInterval(sweepPendingFaceImages, CONFIG.SWEEP_INTERVAL_MS);
+    sweepTimer.unref();
+}
+
+function stopFaceImageJobs() {
+    clearInterval(sweepTimer);
+    sweepTimer = null;
+}
+
+module.exports = {
+    FACE_IMAGE_CONFIG: CONFIG,
+    FACE_IMAGE_TYPES: ALLOWED_TYPES,
+    isStoredFaceImage,
+    resolveFaceImage,
+    storePendingFaceImage,
+    getCommittedPath,
+    commitFaceImage,
+    uncommitFaceImage,
+    removeFaceImage,
+    startFaceImageJobs,
+    stopFaceImageJobs
+};
@@ -0,0 +1,119 @@
+const pool = require('../db');
+
+/**
+ * Idempotency key store
+ *
+ * Backs middleware/idempotencyMiddleware.js with the `idempotency_keys`
+ * table (016), so replays are recognised across server instances. The
+ * first request with a key claims a 'processing' row; its JSON response is
+ * stored on the row and replayed to any retry until the row expires.
+ */
+
+const CONFIG = {
+    TTL_SECONDS: (parseInt(process.env.IDEMPOTENCY_TTL_HOURS) || 24) * 60 * 60,
+    // A 'processing' row this old belongs to a request that never finished
+    STALE_PROCESSING_SECONDS: 5 * 60,
+    PURGE_INTERVAL_MS: 15 * 60 * 1000,
+    PURGE_BATCH: 1000
+};
+
+let purgeTimer = null;
+
+/**
+ * Claim a key for a new request
+ * @returns {Promise<object>} - { claimed: true } for a new request,
+ *   { claimed: false, status, responseStatus, responseBody } for a replay
+ */
+async function claimKey(scope, owner, key) {
+    try {
+        await pool.query(
+            `INSERT INTO idempotency_keys (scope, owner, idempotency_key, expires_at)
+             VALUES (?, ?, ?, NOW() + INTERVAL ? SECOND)`,
+            [scope, owner, key, CONFIG.TTL_SECONDS]
+        );
+        return { claimed: true };
+    } catch (err) {
+        if (err.code !== 'ER_DUP_ENTRY') throw err;
+    }
+
+    // Expired rows and abandoned claims are taken over rather than replayed
+    const [takeover] = await pool.query(
+        `UPDATE idempotency_keys
+         SET status = 'processing', response_status = NULL, response_body = NULL,
+             created_at = NOW(), expires_at = NOW() + INTERVAL ? SECOND
+         WHERE scope = ? AND owner = ? AND idempotency_key = ?
+         AND (expires_at < NOW() OR (status = 'processing' AND created_at < NOW() - INTERVAL ? SECOND))`,
+        [CONFIG.TTL_SECONDS, scope, owner, key, CONFIG.STALE_PROCESSING_SECONDS]
+    );
+    if (takeover.affectedRows > 0) return { claimed: true };
+
+    const [rows] = await pool.query(
+        `SELECT status, response_status, response_body FROM idempotency_keys
+         WHERE scope = ? AND owner = ? AND idempotency_key = ?`,
+        [scope, owner, key]
+    );
+    // Purged in between: treat as new
+    if (rows.length === 0) return claimKey(scope, owner, key);
+
+    return {
+        claimed: false,
+        status: rows[0].status,
+        responseStatus: rows[0].response_status,
+        responseBody: rows[0].response_body
+    };
+}
+
+/**
+ * Store the response a claimed key is replayed with
+ */
+async function completeKey(scope, owner, key, responseStatus, body) {
+    await pool.query(
+        `UPDATE idempotency_keys SET status = 'done', response_status = ?, response_body = ?
+         WHERE scope = ? AND owner = ? AND idempotency_key = ?`,
+        [responseStatus, JSON.stringify(body), scope, owner, key]
+    );
+}
+
+/**
+ * Drop a claim whose request failed, so a retry runs again
+ */
+async function releaseKey(scope, owner, key) {
+    await pool.query(
+        `DELETE FROM idempotency_keys
+         WHERE scope = ? AND owner = ? AND idempotency_key = ? AND status = 'processing'`,
+        [scope, owner, key]
+    );
+}
+
+async function purgeExpiredKeys() {
+    try {
+        let affectedRows;
+        do {
+            [{ affectedRows }] = await pool.query(
+                'DELETE FROM idempotency_keys WHERE expires_at < NOW() LIMIT ?',
+                [CONFIG.PURGE_BATCH]
+            );
+        } while (affectedRows === CONFIG.PURGE_BATCH);
+    } catch (err) {
+        console.error('Idempotency key purge error:', err);
+    }
+}
+
+function startIdempotencyJobs() {
+    if (purgeTimer) return;
+    purgeTimer = setInterval(purgeExpiredKeys, CONFIG.PURGE_INTERVAL_MS);
+    purgeTimer.unref();
+}
+
+function stopIdempotencyJobs() {
+    clearInterval(purgeTimer);
+    purgeTimer = null;
+}
+
+module.exports = {
+    claimKey,
+    completeKey,
+    releaseKey,
+    startIdempotencyJobs,
+    stopIdempotencyJobs
+};
@@ -0,0 +1,219 @@
+const pool = require('../db');
+const path = require('path');
+const fs = require('fs').promises;
+const { UPLOADS_ROOT, getDerivedPath } = require('./evidenceStoreUtils');
+
+/**
+ * Background image evidence processing
+ *
+ * Stored images get a WebP thumbnail and preview, with EXIF/GPS metadata
+ * dropped and camera orientation applied, so dashboards never have to load
+ * the originals to show a case. `evidence_derivatives` (014) is the queue:
+ * uploads add a pending row per content hash and a small pool of workers
+ * claims rows with SKIP LOCKED, so several server instances can share it.
+ * Decoding and resizing run on libvips threads, off the event loop.
+ *
+ * sharp is loaded lazily: without it the server still runs, jobs stay
+ * pending and the dashboards fall back to the originals.
+ */
+
+const CONFIG = {
+    WORKERS: parseInt(process.env.IMAGE_WORKERS) || 2,
+    POLL_INTERVAL_MS: parseInt(process.env.IMAGE_POLL_MS) || 30 * 1000,
+    // Longest edge of each rendition; smaller images are not enlarged
+    SIZES: { thumb: 320, preview: 1280 },
+    WEBP_QUALITY: 80,
+    MAX_ATTEMPTS: 3,
+    // Claimed jobs older than this belong to a crashed worker
+    STALE_CLAIM_MINUTES: 10,
+    // Refuse decompression bombs (~ 100 megapixels)
+    MAX_INPUT_PIXELS: 100 * 1000 * 1000
+};
+
+let sharp;
+let active = 0;
+let pollTimer = null;
+let stopped = true;
+
+function loadSharp() {
+    if (sharp === undefined) {
+        try {
+            sharp = require('sharp');
+            // Workers already run jobs in parallel; keep libvips from
+            // oversubscribing the CPU on top of them
+            sharp.concurrency(1);
+        } catch (err) {
+            sharp = null;
+            console.warn('Image processing disabled: sharp is not installed (npm install sharp)');
+        }
+    }
+    return sharp;
+}
+
+/**
+ * Queue stored image uploads for processing
+ * Call after the evidence rows are inserted; files already processed or
+ * queued under the same content hash are skipped.
+ * @param {Array<object>} files - Uploaded files with mimetype, contentHash, relativePath
+ */
+async function queueImageProcessing(files) {
+    const rows = files
+        .filter(file => file.contentHash && file.mimetype && file.mimetype.startsWith('image/'))
+        .map(file => [file.contentHash, file.relativePath]);
+    if (rows.length === 0) return;
+
+    try {
+        await pool.query('INSERT IGNORE INTO evidence_derivatives (content_hash, source_path) VALUES ?', [rows]);
+        drain();
+    } catch (err) {
+        // The periodic sweep cannot find rows that were never inserted, but
+        // a missing thumbnail must not fail the upload
+        console.error('Queue image processing error:', err);
+    }
+}
+
+/**
+ * Claim the oldest pending job, or null when there is none
+ */
+async function claimJob() {
+    const connection = await pool.getConnection();
+    try {
+        await connection.beginTransaction();
+        const [rows] = await connection.query(
+            `SELECT content_hash, source_path, attempts FROM evidence_derivatives
+             WHERE status = 'pending'
+             ORDER BY created_at
+             LIMIT 1
+             FOR UPDATE SKIP LOCKED`
+        );
+        if (rows.length === 0) {
+            await connection.commit();
+            return null;
+        }
+        await connection.query(
+            `UPDATE evidence_derivatives
+             SET status = 'processing', attempts = attempts + 1, claimed_at = NOW()
+             WHERE content_hash = ?`,
+            [rows[0].content_hash]
+        );
+        await connection.commit();
+        return { ...rows[0], attempts: rows[0].attempts + 1 };
+    } catch (err) {
+        await connection.rollback();
+        throw err;
+    } finally {
+        connection.release();
+    }
+}
+
+async function writeRendition(image, contentHash, variant) {
+    const relativePath = getDerivedPath(contentHash, variant);
+    const target = path.join(UPLOADS_ROOT, relativePath);
+    const temp = `${target}.${process.pid}.tmp`;
+    const size = CONFIG.SIZES[variant];
+
+    await fs.mkdir(path.dirname(target), { recursive: true });
+    try {
+        // sharp writes no metadata unless asked to, so EXIF/GPS/XMP are dropped
+        await image.clone()
+            .resize({ width: size, height: size, fit: 'inside', withoutEnlargement: true })
+            .webp({ quality: CONFIG.WEBP_QUALITY })
+            .toFile(temp);
+        await fs.rename(temp, target);
+    } catch (err) {
+        await fs.unlink(temp).catch(() => {});
+        throw err;
+    }
+    return relativePath;
+}
+
+async function processJob(job) {
+    try {
+        const source = path.join(UPLOADS_ROOT, job.source_path.replace(/^\/?uploads\//, ''));
+        // rotate() with no angle applies the EXIF orientation, then drops it
+        const image = sharp(source, { limitInputPixels: CONFIG.MAX_INPUT_PIXELS, failOn: 'error' }).rotate();
+        const { width, height, orientation } = await image.metadata();
+        // Orientations 5-8 swap the axes
+        const swapped = orientation >= 5;
+
+        const thumbnailPath = await writeRendition(image, job.content_hash, 'thumb');
+        const previewPath = await writeRendition(image, job.content_hash, 'preview');
+
+        await pool.query(
+            `UPDATE evidence_derivatives
+             SET status = 'done', width = ?, height = ?, thumbnail_path = ?, preview_path = ?,
+                 last_error = NULL, processed_at = NOW()
+             WHERE content_hash = ?`,
+            [swapped ? height : width, swapped ? width : height, thumbnailPath, previewPath, job.content_hash]
+        );
+    } catch (err) {
+        const status = job.attempts >= CONFIG.MAX_ATTEMPTS ? 'failed' : 'pending';
+        console.error(`Image processing error (${job.content_hash}, attempt ${job.attempts}):`, err.message);
+        await pool.query(
+            'UPDATE evidence_derivatives SET status = ?, last_error = ? WHERE content_hash = ?',
+            [status, String(err.message).slice(0, 255), job.content_hash]
+        );
+    }
+}
+
+async function runWorker() {
+    active++;
+    try {
+        while (!stopped) {
+            const job = await claimJob();
+            if (!job) break;
+            await processJob(job);
+        }
+    } catch (err) {
+        console.error('Image worker error:', err);
+    } finally {
+        active--;
+    }
+}
+
+/**
+ * Start workers until CONFIG.WORKERS are running
+ */
+function drain() {
+    if (stopped || !loadSharp()) return;
+    while (active < CONFIG.WORKERS) {
+        runWorker();
+    }
+}
+
+/**
+ * Requeue jobs left 'processing' by a worker that died, then drain
+ */
+async function sweep() {
+    try {
+        await pool.query(
+            `UPDATE evidence_derivatives SET status = 'pending'
+             WHERE status = 'processing' AND claimed_at < NOW() - INTERVAL ? MINUTE`,
+            [CONFIG.STALE_CLAIM_MINUTES]
+        );
+        drain();
+    } catch (err) {
+        console.error('Image processing sweep error:', err);
+    }
+}
+
+function startImageJobs() {
+    if (pollTimer) return;
+    stopped = false;
+    sweep();
+    pollTimer = setInterval(sweep, CONFIG.POLL_INTERVAL_MS);
+    pollTimer.unref();
+}
+
+function stopImageJobs() {
+    stopped = true;
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
+module.exports = {
+    loadSharp,
+    queueImageProcessing,
+    startImageJobs,
+    stopImageJobs
+};
@@ -0,0 +1,223 @@
+/**
+ * In-process metrics primitives
+ *
+ * Histograms use fixed buckets so recording is a short loop and an
+ * increment; percentiles are estimated from bucket bounds when read.
+ * Everything here runs on the single JS thread, so plain numbers are the
+ * counters: no locks or atomics are needed.
+ */
+
+const { monitorEventLoopDelay, PerformanceObserver, constants: perfConstants } = require('perf_hooks');
+const v8 = require('v8');
+
+// Upper bounds in milliseconds
+const DEFAULT_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+
+class Histogram {
+    constructor(buckets = DEFAULT_BUCKETS_MS) {
+        this.buckets = buckets;
+        // One extra slot for values above the last bound (+Inf)
+        this.counts = new Array(buckets.length + 1).fill(0);
+        this.count = 0;
+        this.sum = 0;
+        this.max = 0;
+    }
+
+    observe(value) {
+        let i = 0;
+        while (i < this.buckets.length && value > this.buckets[i]) i++;
+        this.counts[i]++;
+        this.count++;
+        this.sum += value;
+        if (value > this.max) this.max = value;
+    }
+
+    /**
+     * Estimate a percentile as the upper bound of the bucket containing it
+     * @param {number} p - Fraction between 0 and 1
+     */
+    percentile(p) {
+        if (this.count === 0) return 0;
+        const target = Math.ceil(this.count * p);
+        let cumulative = 0;
+        for (let i = 0; i < this.counts.length; i++) {
+            cumulative += this.counts[i];
+            if (cumulative >= target) {
+                return i < this.buckets.length ? Math.min(this.buckets[i], this.max) : this.max;
+            }
+        }
+        return this.max;
+    }
+
+    snapshot() {
+        return {
+            count: this.count,
+            sum: round(this.sum),
+            avg: this.count ? round(this.sum / this.count) : 0,
+            max: round(this.max),
+            p50: round(this.percentile(0.5)),
+            p95: round(this.percentile(0.95)),
+            p99: round(this.percentile(0.99))
+        };
+    }
+}
+
+function round(value) {
+    return Math.round(value * 100) / 100;
+}
+
+/**
+ * Milliseconds elapsed since a process.hrtime.bigint() reading
+ */
+function elapsedMs(start) {
+    return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+// ======================
+// RUNTIME (event loop, GC, heap)
+// ======================
+
+const GC_KINDS = {
+    [perfConstants.NODE_PERFORMANCE_GC_MINOR]: 'minor',
+    [perfConstants.NODE_PERFORMANCE_GC_MAJOR]: 'major',
+    [perfConstants.NODE_PERFORMANCE_GC_INCREMENTAL]: 'incremental',
+    [perfConstants.NODE_PERFORMANCE_GC_WEAKCB]: 'weakcb'
+};
+
+// Sampling interval; each reading includes it, so it is subtracted to leave the lag
+const LOOP_DELAY_RESOLUTION_MS = 20;
+
+const runtime = {
+    loopDelay: null,
+    gcObserver: null,
+    // GC kind -> Histogram of pause durations (ms)
+    gcPauses: new Map()
+};
+
+/**
+ * Start sampling event-loop delay and observing GC pauses
+ */
+function startRuntimeMetrics() {
+    if (runtime.loopDelay) return;
+
+    runtime.loopDelay = monitorEventLoopDelay({ resolution: LOOP_DELAY_RESOLUTION_MS });
+    runtime.loopDelay.enable();
+
+    runtime.gcObserver = new PerformanceObserver(list => {
+        for (const entry of list.getEntries()) {
+            const kind = GC_KINDS[entry.detail ? entry.detail.kind : entry.kind] || 'other';
+            let histogram = runtime.gcPauses.get(kind);
+            if (!histogram) {
+                histogram = new Histogram();
+                runtime.gcPauses.set(kind, histogram);
+            }
+            histogram.observe(entry.duration);
+        }
+    });
+    runtime.gcObserver.observe({ entryTypes: ['gc'] });
+}
+
+function stopRuntimeMetrics() {
+    if (runtime.loopDelay) runtime.loopDelay.disable();
+    if (runtime.gcObserver) runtime.gcObserver.disconnect();
+    runtime.loopDelay = null;
+    runtime.gcObserver = null;
+}
+
+/**
+ * Event-loop delay since the previous read, GC pauses and heap usage
+ * Loop delay is reset on each read so it reflects the latest scrape interval.
+ */
+function getRuntimeStats() {
+    let eventLoopDelayMs = null;
+    if (runtime.loopDelay) {
+        const delay = runtime.loopDelay;
+        const lag = ns => round(Math.max(0, (ns || 0) / 1e6 - LOOP_DELAY_RESOLUTION_MS));
+        eventLoopDelayMs = {
+            mean: lag(delay.mean),
+            p50: lag(delay.percentile(50)),
+            p99: lag(delay.percentile(99)),
+            max: lag(delay.max)
+        };
+        delay.reset();
+    }
+
+    const memory = process.memoryUsage();
+    return {
+        eventLoopDelayMs,
+        gcPauses: runtime.gcPauses,
+        memory: {
+            rss: memory.rss,
+            heapUsed: memory.heapUsed,
+            heapTotal: memory.heapTotal,
+            external: memory.external,
+            heapLimit: v8.getHeapStatistics().heap_size_limit
+        }
+    };
+}
+
+// ======================
+// PROMETHEUS TEXT FORMAT
+// ======================
+
+function formatLabels(labels) {
+    const pairs = Object.entries(labels || {}).map(([key, value]) =>
+        `${key}="${String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"')}"`
+    );
+    return pairs.length ? `{${pairs.join(',')}}` : '';
+}
+
+/**
+ * Collects metric families as lines of the Prometheus exposition format
+ */
+class MetricsWriter {
+    constructor() {
+        this.lines = [];
+    }
+
+    family(name, type, help) {
+        this.lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`);
+        return this;
+    }
+
+    sample(name, labels, value) {
+        // Unknown values are left out rather than reported as 0
+        if (value === null || value === undefined) return this;
+        this.lines.push(`${name}${formatLabels(labels)} ${Number.isFinite(value) ? value : 0}`);
+        return this;
+    }
+
+    /**
+     * Write a Histogram's cumulative buckets, sum and count
+     * @param {number} [scale=0.001] - Multiplier from recorded units (ms) to exported units (s)
+     */
+    histogram(name, labels, histogram, scale = 0.001) {
+        let cumulative = 0;
+        histogram.buckets.forEach((bound, i) => {
+            cumulative += histogram.counts[i];
+            this.sample(`${name}_bucket`, { ...labels, le: round6(bound * scale) }, cumulative);
+        });
+        this.sample(`${name}_bucket`, { ...labels, le: '+Inf' }, histogram.count);
+        this.sample(`${name}_sum`, labels, round6(histogram.sum * scale));
+        this.sample(`${name}_count`, labels, histogram.count);
+        return this;
+    }
+
+    toString() {
+        return this.lines.join('\n') + '\n';
+    }
+}
+
+function round6(value) {
+    return Math.round(value * 1e6) / 1e6;
+}
+
+module.exports = {
+    DEFAULT_BUCKETS_MS,
+    Histogram,
+    elapsedMs,
+    startRuntimeMetrics,
+    stopRuntimeMetrics,
+    getRuntimeStats,
+    MetricsWriter
+};
@@ -0,0 +1,221 @@
+const crypto = require('crypto');
+const pool = require('../db');
+
+/**
+ * Token-bucket rate limiting
+ *
+ * Each policy holds one or more buckets per request: by client IP, and by
+ * the account the request names (username, email or phone), so an attacker
+ * can neither hammer one account from many addresses nor many accounts
+ * from one. Keys are hashed, so no address or identifier is kept.
+ *
+ * Buckets are stored as a theoretical arrival time (GCRA): `tat` moves one
+ * token's worth of time into the future per request and the request is
+ * refused once `tat` would be more than the bucket's refill period ahead.
+ * That is exactly a token bucket of `capacity` tokens refilling over
+ * `refillMs`, kept in a single number.
+ *
+ * The memory store serves a single server. RATE_LIMIT_STORE=mysql shares
+ * buckets across a cluster through `rate_limit_buckets` (018), one atomic
+ * statement per bucket. If the shared store fails, requests are allowed:
+ * the limiter sheds abuse, it must not take the login page down with it.
+ */
+
+const MINUTE = 60 * 1000;
+const HOUR = 60 * MINUTE;
+
+const CONFIG = {
+    STORE: process.env.RATE_LIMIT_STORE === 'mysql' ? 'mysql' : 'memory',
+    HASH_SALT: process.env.RATE_LIMIT_SALT || process.env.IP_HASH_SALT || 'securevoice-rate-limit',
+    SWEEP_INTERVAL_MS: 5 * MINUTE,
+    PURGE_INTERVAL_MS: 15 * MINUTE,
+    PURGE_BATCH_SIZE: 1000
+};
+
+const lower = (value) => typeof value === 'string' && value.trim() ? value.trim().toLowerCase() : null;
+
+/**
+ * Policies by name
+ * `ip` / `account` limits: capacity requests, refilled over refillMs.
+ * `account` reads the identifier from the (already parsed) request body.
+ */
+const POLICIES = {
+    login: {
+        ip: { capacity: 20, refillMs: 15 * MINUTE },
+        account: { capacity: 10, refillMs: 15 * MINUTE },
+        accountOf: (body) => lower(body.username)
+    },
+    admin_login: {
+        ip: { capacity: 10, refillMs: 15 * MINUTE },
+        account: { capacity: 5, refillMs: 15 * MINUTE },
+        accountOf: (body) => lower(body.username)
+    },
+    admin_registration: {
+        ip: { capacity: 5, refillMs: HOUR }
+    },
+    signup: {
+        ip: { capacity: 10, refillMs: HOUR }
+    },
+    otp_send: {
+        ip: { capacity: 10, refillMs: HOUR },
+        account: { capacity: 5, refillMs: HOUR },
+        accountOf: (body) => lower(body.phone) || lower(body.email)
+    },
+    otp_verify: {
+        ip: { capacity: 30, refillMs: 15 * MINUTE },
+        account: { capacity: 10, refillMs: 15 * MINUTE },
+        accountOf: (body) => lower(body.key) || lower(body.phone) || lower(body.email) || lower(body.username)
+    },
+    anonymous_report: {
+        ip: { capacity: 10, refillMs: HOUR }
+    }
+};
+
+// policy -> { allowed, limited, errors }
+const stats = new Map();
+
+// MEMORY STORE
+// ============
+
+// bucket key -> tat (epoch ms)
+const buckets = new Map();
+
+function takeFromMemory(key, intervalMs, periodMs, now) {
+    const tat = Math.max(buckets.get(key) || 0, now);
+    const next = tat + intervalMs;
+    if (next - now > periodMs) return { allowed: false, tat };
+    buckets.set(key, next);
+    return { allowed: true, tat: next };
+}
+
+// Full buckets carry no state
+function sweepBuckets() {
+    const now = Date.now();
+    for (const [key, tat] of buckets) {
+        if (tat <= now) buckets.delete(key);
+    }
+}
+
+// MYSQL STORE
+// ===========
+
+/**
+ * Take a token from a shared bucket in one statement
+ * LAST_INSERT_ID(expr) hands the outcome back in the OK packet's insertId
+ * without a second query: the new tat times two, plus one when refused.
+ * Assignments run left to right, so `tat` is derived from `last_result`.
+ */
+async function takeFromMysql(key, intervalMs, periodMs, now) {
+    const [result] = await pool.query(
+        `INSERT INTO rate_limit_buckets (bucket_key, tat, last_result, expires_at)
+         VALUES (?, ?, LAST_INSERT_ID(? * 2), FROM_UNIXTIME(? / 1000))
+         ON DUPLICATE KEY UPDATE
+             last_result = LAST_INSERT_ID(IF(GREATEST(tat, ?) + ? - ? <= ?, (GREATEST(tat, ?) + ?) * 2, tat * 2 + 1)),
+             tat = last_result DIV 2,
+             expires_at = FROM_UNIXTIME(tat / 1000)`,
+        [key, now + intervalMs, now + intervalMs, now + intervalMs,
+            now, intervalMs, now, periodMs, now, intervalMs]
+    );
+    const outcome = Number(result.insertId);
+    return { allowed: outcome % 2 === 0, tat: Math.floor(outcome / 2) };
+}
+
+async function purgeExpiredBuckets() {
+    try {
+        let affectedRows;
+        do {
+            [{ affectedRows }] = await pool.query(
+                'DELETE FROM rate_limit_buckets WHERE expires_at < NOW(3) LIMIT ?',
+                [CONFIG.PURGE_BATCH_SIZE]
+            );
+        } while (affectedRows === CONFIG.PURGE_BATCH_SIZE);
+    } catch (err) {
+        console.error('Rate limit purge error:', err);
+    }
+}
+
+// POLICIES
+// ========
+
+function hashKey(value) {
+    return crypto.createHash('sha256').update(`${value}:${CONFIG.HASH_SALT}`).digest('base64url').slice(0, 32);
+}
+
+function countDecision(policyName, result) {
+    let entry = stats.get(policyName);
+    if (!entry) {
+        entry = { allowed: 0, limited: 0, errors: 0 };
+        stats.set(policyName, entry);
+    }
+    entry[result]++;
+}
+
+/**
+ * Take one token from every bucket a request falls into
+ * @param {string} policyName - Key of POLICIES
+ * @param {object} identity - { ip, body }
+ * @returns {Promise<object>} - { allowed, retryAfterMs, remaining }
+ */
+async function consume(policyName, { ip, body }) {
+    const policy = POLICIES[policyName];
+    if (!policy) throw new Error(`Unknown rate limit policy: ${policyName}`);
+
+    const checks = [];
+    if (policy.ip && ip) checks.push(['ip', policy.ip, ip.replace(/^::ffff:/, '')]);
+    const account = policy.account && body ? policy.accountOf(body) : null;
+    if (account) checks.push(['account', policy.account, account]);
+
+    const take = CONFIG.STORE === 'mysql' ? takeFromMysql : takeFromMemory;
+    let remaining = Infinity;
+    try {
+        for (const [dimension, limit, value] of checks) {
+            const intervalMs = Math.ceil(limit.refillMs / limit.capacity);
+            const now = Date.now();
+            const { allowed, tat } = await take(`${policyName}:${dimension}:${hashKey(value)}`, intervalMs, limit.refillMs, now);
+            if (!allowed) {
+                countDecision(policyName, 'limited');
+                // Time until one more token fits under the period
+                return { allowed: false, retryAfterMs: Math.max(tat + intervalMs - limit.refillMs - now, 0), remaining: 0 };
+            }
+            remaining = Math.min(remaining, Math.floor((limit.refillMs - (tat - now)) / intervalMs));
+        }
+    } catch (err) {
+        console.error('Rate limit store error:', err);
+        countDecision(policyName, 'errors');
+        return { allowed: true, retryAfterMs: 0, remaining: null };
+    }
+
+    countDecision(policyName, 'allowed');
+    return { allowed: true, retryAfterMs: 0, remaining: remaining === Infinity ? null : remaining };
+}
+
+function getRateLimitStats() {
+    return {
+        store: CONFIG.STORE,
+        buckets: buckets.size,
+        policies: Array.from(stats, ([policy, counts]) => ({ policy, ...counts }))
+    };
+}
+
+let sweepTimer = null;
+
+function startRateLimitJobs() {
+    if (sweepTimer) return;
+    sweepTimer = CONFIG.STORE === 'mysql'
+        ? setInterval(purgeExpiredBuckets, CONFIG.PURGE_INTERVAL_MS)
+        : setInterval(sweepBuckets, CONFIG.SWEEP_INTERVAL_MS);
+    sweepTimer.unref();
+}
+
+function stopRateLimitJobs() {
+    clearInterval(sweepTimer);
+    sweepTimer = null;
+}
+
+module.exports = {
+    RATE_LIMIT_POLICIES: POLICIES,
+    consume,
+    getRateLimitStats,
+    startRateLimitJobs,
+    stopRateLimitJobs
+};
@@ -0,0 +1,238 @@
+const pool = require('../db');
+
+/**
+ * Read routing between the primary and the read replica
+ *
+ * Reporting reads (analytics, heatmaps, dashboard stats, audit log browsing,
+ * exports) go through readerFor(req) and run on the replica pool, so they no
+ * longer take connections from logins and complaint inserts on the primary.
+ * Everything else keeps using `pool` directly.
+ *
+ * The replica is used only while it is known to be fresh enough: a monitor
+ * reads its replication lag every DB_REPLICA_CHECK_MS and reads go to the
+ * primary while the lag exceeds DB_REPLICA_MAX_LAG_SECONDS, replication is
+ * stopped, or the last check is too old.
+ *
+ * Read-your-writes: after a user, admin or super admin makes a successful
+ * write (middleware/readRoutingMiddleware.js), their reads stay on the
+ * primary until a lag check proves the replica has applied everything up to
+ * that write. Last-write times are kept in memory, so stickiness is per
+ * process; behind a load balancer use sticky sessions.
+ *
+ * Without DB_REPLICA_HOST every read goes to the primary and none of this runs.
+ */
+
+const CONFIG = {
+    MAX_LAG_SECONDS: process.env.DB_REPLICA_MAX_LAG_SECONDS !== undefined
+        ? parseInt(process.env.DB_REPLICA_MAX_LAG_SECONDS) : 10,
+    CHECK_INTERVAL_MS: parseInt(process.env.DB_REPLICA_CHECK_MS) || 5000,
+    // Seconds_Behind_Source is whole seconds; allow for the truncation
+    LAG_MARGIN_MS: 1000
+};
+
+// Errors that mean the replica (not the statement) is the problem
+const CONNECTION_ERRORS = new Set([
+    'ECONNREFUSED',
+    'ECONNRESET',
+    'ETIMEDOUT',
+    'EHOSTUNREACH',
+    'ENOTFOUND',
+    'PROTOCOL_CONNECTION_LOST',
+    'PROTOCOL_SEQUENCE_TIMEOUT',
+    'POOL_QUEUE_FULL',
+    'ER_CON_COUNT_ERROR',
+    'ER_SERVER_SHUTDOWN'
+]);
+
+const replica = {
+    lagSeconds: null,
+    checkedAt: 0,
+    // Primary time the replica had applied everything up to, as of the last check
+    caughtUpTo: 0,
+    running: false,
+    error: null
+};
+
+const routed = { replica: 0, primary: 0, fallback: 0 };
+
+// actor -> time of their last successful write
+const lastWrites = new Map();
+
+let statusStatement = 'SHOW REPLICA STATUS';
+let monitorTimer = null;
+
+/**
+ * Session key of the user behind a request, or null for anonymous requests
+ */
+function actorOf(req) {
+    const session = req && req.session;
+    if (!session) return null;
+    if (session.adminUsername) return `admin:${session.adminUsername}`;
+    if (session.isSuperAdmin && session.superAdminUsername) return `super:${session.superAdminUsername}`;
+    if (session.username) return `user:${session.username}`;
+    return null;
+}
+
+/**
+ * Note a successful write, keeping the actor's reads on the primary until
+ * the replica has caught up with it
+ * @param {string|null} actor - Key from actorOf()
+ */
+function recordWrite(actor) {
+    if (pool.replica && actor) lastWrites.set(actor, Date.now());
+}
+
+function replicaHealthy() {
+    return replica.lagSeconds !== null
+        && replica.lagSeconds <= CONFIG.MAX_LAG_SECONDS
+        && Date.now() - replica.checkedAt <= CONFIG.CHECK_INTERVAL_MS * 3;
+}
+
+function canReadFromReplica(req) {
+    if (!pool.replica || !replicaHealthy()) return false;
+
+    const actor = actorOf(req);
+    if (!actor) return true;
+    const lastWrite = lastWrites.get(actor);
+    return lastWrite === undefined || lastWrite < replica.caughtUpTo;
+}
+
+function markReplicaDown(err) {
+    replica.lagSeconds = null;
+    replica.error = err.code || err.message;
+}
+
+/**
+ * Run a read on the replica, retrying on the primary if the replica is
+ * unreachable; statement errors are returned as they are
+ */
+async function onReplica(method, args) {
+    try {
+        return await pool.replica[method](...args);
+    } catch (err) {
+        if (!CONNECTION_ERRORS.has(err.code)) throw err;
+        console.warn(`Read replica unavailable (${err.code}), using primary`);
+        markReplicaDown(err);
+        routed.fallback++;
+        return pool[method](...args);
+    }
+}
+
+const replicaReader = {
+    query: (...args) => onReplica('query', args),
+    execute: (...args) => onReplica('execute', args),
+    stream: (...args) => onReplica('stream', args)
+};
+
+/**
+ * Pool to run a read-only query on
+ * Returns an object with query/execute/stream. Pass the request so a user's
+ * reads after their own writes stay on the primary; omit it for reads shared
+ * between users (cached aggregates).
+ * @param {object} [req] - Express request
+ */
+function readerFor(req) {
+    if (canReadFromReplica(req)) {
+        routed.replica++;
+        return replicaReader;
+    }
+    routed.primary++;
+    return pool;
+}
+
+// ======================
+// LAG MONITOR
+// ======================
+
+async function readReplicaStatus() {
+    try {
+        const [rows] = await pool.replica.query(statusStatement);
+        return rows;
+    } catch (err) {
+        // SHOW REPLICA STATUS is MySQL 8.0.22+
+        if (err.code === 'ER_PARSE_ERROR' && statusStatement === 'SHOW REPLICA STATUS') {
+            statusStatement = 'SHOW SLAVE STATUS';
+            return readReplicaStatus();
+        }
+        throw err;
+    }
+}
+
+/**
+ * Read the replica's lag and forget writes it has since applied
+ */
+async function checkReplica() {
+    if (!pool.replica || replica.running) return;
+    replica.running = true;
+
+    const startedAt = Date.now();
+    try {
+        const rows = await readReplicaStatus();
+        let lag = 0;
+        // No rows: the server is not replicating (e.g. a managed read endpoint)
+        if (rows.length > 0) {
+            const status = rows[0];
+            const seconds = status.Seconds_Behind_Source !== undefined
+                ? status.Seconds_Behind_Source : status.Seconds_Behind_Master;
+            // NULL while the SQL or IO thread is stopped
+            lag = seconds === null || seconds === undefined ? null : Number(seconds);
+        }
+
+        replica.lagSeconds = lag;
+        replica.checkedAt = Date.now();
+        replica.error = lag === null ? 'replication stopped' : null;
+        if (lag !== null) {
+            replica.caughtUpTo = startedAt - lag * 1000 - CONFIG.LAG_MARGIN_MS;
+        }
+    } catch (err) {
+        console.error('Replica lag check error:', err);
+        markReplicaDown(err);
+    } finally {
+        replica.running = false;
+    }
+
+    for (const [actor, writtenAt] of lastWrites) {
+        if (writtenAt < replica.caughtUpTo) lastWrites.delete(actor);
+    }
+}
+
+/**
+ * Routing counts and replica health for the stats endpoint and /api/metrics
+ */
+function getReadRoutingStats() {
+    return {
+        configured: Boolean(pool.replica),
+        healthy: Boolean(pool.replica) && replicaHealthy(),
+        lagSeconds: replica.lagSeconds,
+        maxLagSeconds: CONFIG.MAX_LAG_SECONDS,
+        lastCheckedAt: replica.checkedAt ? new Date(replica.checkedAt).toISOString() : null,
+        error: replica.error,
+        stickyActors: lastWrites.size,
+        routed: { ...routed }
+    };
+}
+
+/**
+ * Start the replica lag monitor (no-op without a replica)
+ */
+function startReadRoutingJobs() {
+    if (!pool.replica || monitorTimer) return;
+    checkReplica();
+    monitorTimer = setInterval(checkReplica, CONFIG.CHECK_INTERVAL_MS);
+    monitorTimer.unref();
+}
+
+function stopReadRoutingJobs() {
+    clearInterval(monitorTimer);
+    monitorTimer = null;
+}
+
+module.exports = {
+    actorOf,
+    recordWrite,
+    readerFor,
+    checkReplica,
+    getReadRoutingStats,
+    startReadRoutingJobs,
+    stopReadRoutingJobs
+};
@@ -0,0 +1,364 @@
+const pool = require('../db');
+const path = require('path');
+const fs = require('fs').promises;
+const { UPLOADS_ROOT, RECLAIM_GRACE_MS, reclaimFile } = require('./evidenceStoreUtils');
+
+/**
+ * Upload storage reclamation
+ *
+ * Deletion queue: code that drops evidence rows enqueues their files in
+ * `file_deletion_queue` (015), inside its transaction where it has one. A
+ * worker unlinks due rows through reclaimFile, which re-checks references,
+ * and retries failures with exponential backoff.
+ *
+ * Orphan collector: walks uploads/ in path order, a bounded number of files
+ * per run, and looks each batch up in the evidence tables. Files nothing
+ * refers to (failed uploads, rejected submissions, lost unlinks) are queued
+ * for deletion, or only reported in a dry run. The walk resumes where the
+ * previous run stopped. Files younger than RECLAIM_GRACE_MS are never
+ * orphans, since their rows may not be inserted yet.
+ */
+
+const CONFIG = {
+    POLL_INTERVAL_MS: 60 * 1000,
+    DELETE_BATCH: 100,
+    MAX_ATTEMPTS: 8,
+    // Backoff doubles per attempt, from one minute up to six hours
+    BASE_BACKOFF_MS: 60 * 1000,
+    MAX_BACKOFF_MS: 6 * 60 * 60 * 1000,
+    GC_INTERVAL_MS: parseInt(process.env.STORAGE_GC_INTERVAL_MS) || 60 * 60 * 1000,
+    GC_FILES_PER_RUN: parseInt(process.env.STORAGE_GC_FILES_PER_RUN) || 5000,
+    GC_LOOKUP_BATCH: 500,
+    // Reported orphan paths per run (counts cover everything)
+    REPORT_SAMPLE: 100
+};
+
+// Owned by their own cleanup jobs (faceImageUtils, uploadSessionUtils)
+const SKIPPED_DIRS = ['faces', 'tmp/sessions'];
+
+const CONTENT_PATTERN = /^(images|videos|audio|files)\/[0-9a-f]{2}\/[0-9a-f]{2}\/([0-9a-f]{64})(\.[^/]*)?$/;
+const DERIVED_PATTERN = /^derived\/[0-9a-f]{2}\/[0-9a-f]{2}\/([0-9a-f]{64})-[a-z]+\.webp$/;
+const TEMP_PATTERN = /^tmp\/|\.tmp$/;
+
+let pollTimer = null;
+let gcTimer = null;
+let draining = null;
+let gcRunning = false;
+// Where the background collector resumes its walk
+let gcCursor = null;
+
+/**
+ * Queue files for deletion
+ * Pass the transaction's connection so the rows commit with the delete,
+ * then call drainFileDeletions() after the commit.
+ * @param {Array<{file_path: string, content_hash: string}>} files - Released files
+ * @param {object} [connection] - Connection or pool to insert with
+ * @param {string} [reason] - 'released' or 'orphan'
+ */
+async function queueFileDeletions(files, connection = pool, reason = 'released') {
+    const seen = new Set();
+    const rows = [];
+    for (const file of files) {
+        if (!file.file_path) continue;
+        const filePath = file.file_path.replace(/^\/?uploads\//, '');
+        if (seen.has(filePath)) continue;
+        seen.add(filePath);
+        rows.push([filePath, file.content_hash || null, reason]);
+    }
+    if (rows.length === 0) return 0;
+
+    // Re-released files become due again, even if they had been given up on
+    await connection.query(
+        `INSERT INTO file_deletion_queue (file_path, content_hash, reason) VALUES ?
+         ON DUPLICATE KEY UPDATE next_attempt_at = CURRENT_TIMESTAMP, attempts = 0`,
+        [rows]
+    );
+    return rows.length;
+}
+
+function backoffMs(attempts) {
+    return Math.min(CONFIG.BASE_BACKOFF_MS * 2 ** (attempts - 1), CONFIG.MAX_BACKOFF_MS);
+}
+
+async function processDeletion(row) {
+    try {
+        const { status, retryAt } = await reclaimFile(row);
+        if (status === 'recent') {
+            await pool.query('UPDATE file_deletion_queue SET next_attempt_at = ? WHERE id = ?', [retryAt, row.id]);
+        } else {
+            await pool.query('DELETE FROM file_deletion_queue WHERE id = ?', [row.id]);
+        }
+        return status;
+    } catch (err) {
+        const attempts = row.attempts + 1;
+        const retryAt = attempts >= CONFIG.MAX_ATTEMPTS ? null : new Date(Date.now() + backoffMs(attempts));
+        console.error(`File deletion error (${row.file_path}, attempt ${attempts}):`, err.message);
+        await pool.query(
+            'UPDATE file_deletion_queue SET attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?',
+            [attempts, String(err.message).slice(0, 255), retryAt, row.id]
+        );
+        return 'failed';
+    }
+}
+
+async function processDueDeletions() {
+    let processed = 0;
+    while (true) {
+        const [rows] = await pool.query(
+            `SELECT id, file_path, content_hash, attempts FROM file_deletion_queue
+             WHERE next_attempt_at <= NOW()
+             ORDER BY next_attempt_at
+             LIMIT ?`,
+            [CONFIG.DELETE_BATCH]
+        );
+        for (const row of rows) {
+            await processDeletion(row);
+        }
+        processed += rows.length;
+        if (rows.length < CONFIG.DELETE_BATCH) return processed;
+    }
+}
+
+/**
+ * Process due deletions now; concurrent calls share one pass
+ */
+function drainFileDeletions() {
+    if (!draining) {
+        draining = processDueDeletions()
+            .catch(err => console.error('File deletion queue error:', err))
+            .finally(() => { draining = null; });
+    }
+    return draining;
+}
+
+/**
+ * Files under uploads/ in path order, starting after `cursor`
+ * Entries sort with a trailing "/" on directories so the order matches a
+ * plain comparison of relative paths, which lets whole directories before
+ * the cursor be skipped.
+ */
+async function* walkUploads(cursor, dir = '') {
+    let entries;
+    try {
+        entries = await fs.readdir(path.join(UPLOADS_ROOT, dir), { withFileTypes: true });
+    } catch (err) {
+        if (err.code === 'ENOENT') return;
+        throw err;
+    }
+
+    const keyed = entries
+        // Dotfiles (.gitkeep) are not uploads
+        .filter(entry => !entry.name.startsWith('.') && (entry.isDirectory() || entry.isFile()))
+        .map(entry => ({ entry, key: entry.name + (entry.isDirectory() ? '/' : '') }))
+        .sort((a, b) => (a.key < b.key ? -1 : a.key > b.key ? 1 : 0));
+
+    for (const { entry } of keyed) {
+        const relativePath = dir ? `${dir}/${entry.name}` : entry.name;
+        if (entry.isDirectory()) {
+            if (SKIPPED_DIRS.includes(relativePath)) continue;
+            if (cursor && `${relativePath}/` < cursor && !cursor.startsWith(`${relativePath}/`)) continue;
+            yield* walkUploads(cursor, relativePath);
+        } else if (!cursor || relativePath > cursor) {
+            yield relativePath;
+        }
+    }
+}
+
+/**
+ * Which files of a batch no database row refers to
+ * @param {Array<string>} relativePaths - Paths relative to uploads/
+ * @returns {Promise<Array<object>>} - { file_path, content_hash, kind }
+ */
+async function findUnreferenced(relativePaths) {
+    const content = new Map();
+    const derived = new Map();
+    const legacy = [];
+    const orphans = [];
+
+    for (const relativePath of relativePaths) {
+        let match;
+        if ((match = CONTENT_PATTERN.exec(relativePath))) {
+            content.set(relativePath, match[2]);
+        } else if ((match = DERIVED_PATTERN.exec(relativePath))) {
+            derived.set(relativePath, match[1]);
+        } else if (TEMP_PATTERN.test(relativePath)) {
+            orphans.push({ file_path: relativePath, content_hash: null, kind: 'temp' });
+        } else {
+            legacy.push(relativePath);
+        }
+    }
+
+    if (content.size > 0) {
+        const hashes = [...new Set(content.values())];
+        const [rows] = await pool.query(
+            `SELECT content_hash FROM evidence WHERE content_hash IN (?)
+             UNION
+             SELECT content_hash FROM evidence_archive WHERE content_hash IN (?)
+             UNION
+             SELECT content_hash FROM anonymous_evidence WHERE content_hash IN (?)`,
+            [hashes, hashes, hashes]
+        );
+        const referenced = new Set(rows.map(row => row.content_hash));
+        for (const [relativePath, hash] of content) {
+            if (!referenced.has(hash)) orphans.push({ file_path: relativePath, content_hash: hash, kind: 'content' });
+        }
+    }
+
+    if (derived.size > 0) {
+        const [rows] = await pool.query(
+            'SELECT content_hash FROM evidence_derivatives WHERE content_hash IN (?)',
+            [[...new Set(derived.values())]]
+        );
+        const referenced = new Set(rows.map(row => row.content_hash));
+        for (const [relativePath, hash] of derived) {
+            if (!referenced.has(hash)) orphans.push({ file_path: relativePath, content_hash: null, kind: 'derived' });
+        }
+    }
+
+    if (legacy.length > 0) {
+        // Pre-010 files have no hash; their rows store the path, with or
+        // without an "uploads/" prefix (file_path is not indexed, but these
+        // files only shrink in number)
+        const variants = legacy.flatMap(relativePath => [relativePath, `uploads/${relativePath}`, `/uploads/${relativePath}`]);
+        const [rows] = await pool.query(
+            `SELECT file_path FROM evidence WHERE file_path IN (?)
+             UNION
+             SELECT file_path FROM evidence_archive WHERE file_path IN (?)
+             UNION
+             SELECT file_path FROM anonymous_evidence WHERE file_path IN (?)`,
+            [variants, variants, variants]
+        );
+        const referenced = new Set(rows.map(row => row.file_path.replace(/^\/?uploads\//, '')));
+        for (const relativePath of legacy) {
+            if (!referenced.has(relativePath)) orphans.push({ file_path: relativePath, content_hash: null, kind: 'legacy' });
+        }
+    }
+
+    return orphans;
+}
+
+/**
+ * Scan part of uploads/ for files no row refers to
+ * @param {object} [options] - { dryRun, cursor, maxFiles }
+ * @returns {Promise<object>} - Report with counts, byte totals, sample paths
+ *                              and nextCursor (null once the walk is complete)
+ */
+async function collectOrphans({ dryRun = true, cursor = null, maxFiles = CONFIG.GC_FILES_PER_RUN } = {}) {
+    const report = {
+        dryRun,
+        startedAfter: cursor,
+        scanned: 0,
+        skippedRecent: 0,
+        orphans: 0,
+        orphanBytes: 0,
+        byKind: {},
+        queued: 0,
+        sample: [],
+        nextCursor: null
+    };
+    const cutoff = Date.now() - RECLAIM_GRACE_MS;
+    let batch = [];
+    let lastPath = null;
+
+    const flush = async () => {
+        if (batch.length === 0) return;
+        const sizes = new Map(batch.map(file => [file.path, file.size]));
+        const orphans = await findUnreferenced(batch.map(file => file.path));
+        batch = [];
+
+        for (const orphan of orphans) {
+            const size = sizes.get(orphan.file_path);
+            report.orphans++;
+            report.orphanBytes += size;
+            report.byKind[orphan.kind] = (report.byKind[orphan.kind] || 0) + 1;
+            if (report.sample.length < CONFIG.REPORT_SAMPLE) {
+                report.sample.push({ path: orphan.file_path, kind: orphan.kind, size });
+            }
+        }
+        if (!dryRun && orphans.length > 0) {
+            report.queued += await queueFileDeletions(orphans, pool, 'orphan');
+        }
+    };
+
+    for await (const relativePath of walkUploads(cursor)) {
+        if (report.scanned >= maxFiles) {
+            report.nextCursor = lastPath;
+            break;
+        }
+        report.scanned++;
+        lastPath = relativePath;
+
+        const stat = await fs.stat(path.join(UPLOADS_ROOT, relativePath)).catch(() => null);
+        if (!stat) continue;
+        if (stat.mtimeMs > cutoff) {
+            report.skippedRecent++;
+            continue;
+        }
+
+        batch.push({ path: relativePath, size: stat.size });
+        if (batch.length >= CONFIG.GC_LOOKUP_BATCH) await flush();
+    }
+    await flush();
+
+    if (report.queued > 0) drainFileDeletions();
+    return report;
+}
+
+/**
+ * Deletion queue backlog: rows due, waiting, and given up on
+ */
+async function getDeletionQueueStats() {
+    const [rows] = await pool.query(
+        `SELECT
+            SUM(next_attempt_at <= NOW()) AS due,
+            SUM(next_attempt_at > NOW()) AS waiting,
+            SUM(next_attempt_at IS NULL) AS failed
+         FROM file_deletion_queue`
+    );
+    return {
+        due: Number(rows[0].due) || 0,
+        waiting: Number(rows[0].waiting) || 0,
+        failed: Number(rows[0].failed) || 0
+    };
+}
+
+async function runBackgroundGc() {
+    if (gcRunning) return;
+    gcRunning = true;
+    try {
+        const report = await collectOrphans({ dryRun: false, cursor: gcCursor });
+        gcCursor = report.nextCursor;
+        if (report.queued > 0) {
+            console.log(`Storage GC queued ${report.queued} orphaned files (${report.orphanBytes} bytes)`);
+        }
+    } catch (err) {
+        console.error('Storage GC error:', err);
+    } finally {
+        gcRunning = false;
+    }
+}
+
+function startStorageGcJobs() {
+    if (pollTimer) return;
+    drainFileDeletions();
+    pollTimer = setInterval(drainFileDeletions, CONFIG.POLL_INTERVAL_MS);
+    pollTimer.unref();
+    gcTimer = setInterval(runBackgroundGc, CONFIG.GC_INTERVAL_MS);
+    gcTimer.unref();
+}
+
+function stopStorageGcJobs() {
+    clearInterval(pollTimer);
+    clearInterval(gcTimer);
+    pollTimer = null;
+    gcTimer = null;
+}
+
+module.exports = {
+    queueFileDeletions,
+    drainFileDeletions,
+    collectOrphans,
+    getDeletionQueueStats,
+    startStorageGcJobs,
+    stopStorageGcJobs
+};
@@ -0,0 +1,242 @@
+const pool = require('../db');
+
+/**
+ * In-memory throttling for anonymous submissions
+ *
+ * The sliding-window counters and duplicate-hash set live in memory so that
+ * checks never touch MySQL. New entries are checkpointed to
+ * `anonymous_rate_limits` / `anonymous_submission_hashes` in bulk so limits
+ * survive a restart, and a purge job deletes expired rows in batches so both
+ * tables stay bounded.
+ */
+
+const CONFIG = {
+    CHECKPOINT_INTERVAL_MS: parseInt(process.env.THROTTLE_CHECKPOINT_MS) || 30 * 1000,
+    PURGE_INTERVAL_MS: parseInt(process.env.THROTTLE_PURGE_MS) || 15 * 60 * 1000,
+    PURGE_BATCH_SIZE: 1000
+};
+
+// ipHash -> array of expiry timestamps (ms), one per recorded submission
+const submissionWindows = new Map();
+// `${contentHash}:${ipHash}` -> expiry timestamp (ms)
+const submissionHashes = new Map();
+
+// Entries recorded since the last checkpoint
+let pendingSubmissions = [];
+let pendingHashes = new Map();
+
+let loadPromise = null;
+let checkpointTimer = null;
+let purgeTimer = null;
+
+function hashKey(contentHash, ipHash) {
+    return `${contentHash}:${ipHash}`;
+}
+
+/**
+ * Load unexpired rows from the checkpoint tables into memory.
+ * Runs once per process; callers await it before the first check.
+ */
+function ensureLoaded() {
+    if (!loadPromise) {
+        loadPromise = (async () => {
+            const [limits] = await pool.query(
+                `SELECT ip_hash, expires_at FROM anonymous_rate_limits WHERE expires_at > NOW()`
+            );
+            for (const row of limits) {
+                const windows = submissionWindows.get(row.ip_hash) || [];
+                windows.push(new Date(row.expires_at).getTime());
+                submissionWindows.set(row.ip_hash, windows);
+            }
+
+            const [hashes] = await pool.query(
+                `SELECT content_hash, ip_hash, expires_at FROM anonymous_submission_hashes WHERE expires_at > NOW()`
+            );
+            for (const row of hashes) {
+                const key = hashKey(row.content_hash, row.ip_hash);
+                const expiresAt = new Date(row.expires_at).getTime();
+                submissionHashes.set(key, Math.max(submissionHashes.get(key) || 0, expiresAt));
+            }
+        })().catch((err) => {
+            console.error('Error loading throttle state:', err);
+            // Allow the next caller to retry the load
+            loadPromise = null;
+        });
+    }
+    return loadPromise;
+}
+
+/**
+ * Count unexpired submissions for an IP hash, dropping expired entries
+ * @param {string} ipHash - Hashed client IP
+ * @returns {number} - Submissions still inside the window
+ */
+function countActiveSubmissions(ipHash) {
+    const windows = submissionWindows.get(ipHash);
+    if (!windows) return 0;
+
+    const now = Date.now();
+    const active = windows.filter(expiresAt => expiresAt > now);
+    if (active.length === 0) {
+        submissionWindows.delete(ipHash);
+    } else if (active.length !== windows.length) {
+        submissionWindows.set(ipHash, active);
+    }
+    return active.length;
+}
+
+/**
+ * Record a submission in the sliding window
+ * @param {string} ipHash - Hashed client IP
+ * @param {number} windowMs - How long the submission counts against the limit
+ */
+function recordSubmission(ipHash, windowMs) {
+    const now = Date.now();
+    const expiresAt = now + windowMs;
+    const windows = submissionWindows.get(ipHash) || [];
+    windows.push(expiresAt);
+    submissionWindows.set(ipHash, windows);
+    pendingSubmissions.push([ipHash, new Date(now), new Date(expiresAt)]);
+}
+
+/**
+ * Check whether a content hash was already submitted from an IP hash
+ */
+function isDuplicate(contentHash, ipHash) {
+    const key = hashKey(contentHash, ipHash);
+    const expiresAt = submissionHashes.get(key);
+    if (!expiresAt) return false;
+    if (expiresAt <= Date.now()) {
+        submissionHashes.delete(key);
+        return false;
+    }
+    return true;
+}
+
+/**
+ * Record a content hash for duplicate detection
+ * @param {string} contentHash - Hashed report content
+ * @param {string} ipHash - Hashed client IP
+ * @param {number} ttlMs - How long the hash blocks identical submissions
+ */
+function recordSubmissionHash(contentHash, ipHash, ttlMs) {
+    const key = hashKey(contentHash, ipHash);
+    const expiresAt = Date.now() + ttlMs;
+    submissionHashes.set(key, expiresAt);
+    pendingHashes.set(key, [contentHash, ipHash, new Date(expiresAt)]);
+}
+
+/**
+ * Write entries recorded since the last checkpoint using multi-row inserts.
+ * Failed batches are re-queued for the next checkpoint.
+ */
+async function checkpoint() {
+    const submissions = pendingSubmissions;
+    const hashes = pendingHashes;
+    pendingSubmissions = [];
+    pendingHashes = new Map();
+
+    if (submissions.length > 0) {
+        try {
+            await pool.query(
+                'INSERT INTO anonymous_rate_limits (ip_hash, submitted_at, expires_at) VALUES ?',
+                [submissions]
+            );
+        } catch (err) {
+            console.error('Error checkpointing rate limits:', err);
+            pendingSubmissions = submissions.concat(pendingSubmissions);
+        }
+    }
+
+    if (hashes.size > 0) {
+        try {
+            await pool.query(
+                `INSERT INTO anonymous_submission_hashes (content_hash, ip_hash, expires_at) VALUES ?
+                 ON DUPLICATE KEY UPDATE expires_at = VALUES(expires_at)`,
+                [Array.from(hashes.values())]
+            );
+        } catch (err) {
+            console.error('Error checkpointing submission hashes:', err);
+            for (const [key, row] of hashes) {
+                if (!pendingHashes.has(key)) pendingHashes.set(key, row);
+            }
+        }
+    }
+}
+
+/**
+ * Delete expired rows in batches so each DELETE holds locks only briefly
+ * @param {string} table - Table with an indexed expires_at column
+ * @returns {Promise<number>} - Rows deleted
+ */
+async function purgeTable(table) {
+    let total = 0;
+    let affected;
+    do {
+        const [result] = await pool.query(
+            `DELETE FROM ${table} WHERE expires_at < NOW() LIMIT ?`,
+            [CONFIG.PURGE_BATCH_SIZE]
+        );
+        affected = result.affectedRows;
+        total += affected;
+    } while (affected === CONFIG.PURGE_BATCH_SIZE);
+    return total;
+}
+
+/**
+ * Drop expired entries from memory and purge expired rows from both tables
+ */
+async function purgeExpired() {
+    const now = Date.now();
+    for (const ipHash of submissionWindows.keys()) {
+        countActiveSubmissions(ipHash);
+    }
+    for (const [key, expiresAt] of submissionHashes) {
+        if (expiresAt <= now) submissionHashes.delete(key);
+    }
+
+    try {
+        const limits = await purgeTable('anonymous_rate_limits');
+        const hashes = await purgeTable('anonymous_submission_hashes');
+        if (limits > 0 || hashes > 0) {
+            console.log(`Purged ${limits} rate limit rows and ${hashes} submission hash rows`);
+        }
+    } catch (err) {
+        console.error('Error purging throttle tables:', err);
+    }
+}
+
+/**
+ * Start the checkpoint and purge timers (called once from server startup)
+ */
+function startThrottleJobs() {
+    if (checkpointTimer) return;
+    ensureLoaded();
+    checkpointTimer = setInterval(checkpoint, CONFIG.CHECKPOINT_INTERVAL_MS);
+    purgeTimer = setInterval(purgeExpired, CONFIG.PURGE_INTERVAL_MS);
+    checkpointTimer.unref();
+    purgeTimer.unref();
+}
+
+/**
+ * Stop the timers and flush anything not yet checkpointed
+ */
+async function stopThrottleJobs() {
+    clearInterval(checkpointTimer);
+    clearInterval(purgeTimer);
+    checkpointTimer = null;
+    purgeTimer = null;
+    await checkpoint();
+}
+
+module.exports = {
+    ensureLoaded,
+    countActiveSubmissions,
+    recordSubmission,
+    isDuplicate,
+    recordSubmissionHash,
+    checkpoint,
+    purgeExpired,
+    startThrottleJobs,
+    stopThrottleJobs
+};
@@ -0,0 +1,251 @@
+const crypto = require('crypto');
+const jwt = require('jsonwebtoken');
+const pool = require('../db');
+
+/**
+ * Signed-token authentication (optional)
+ *
+ * Enabled by setting JWT_SECRET. Clients opt in per request with an
+ * `X-Auth-Mode: token` header on login, receive a short-lived access token
+ * plus a refresh token, and then send `Authorization: Bearer <access>`.
+ * middleware/tokenAuthMiddleware.js turns a valid access token back into
+ * the same req.session fields a cookie login sets, so route guards and
+ * controllers work unchanged, without a session store lookup.
+ *
+ * Every token issued from one login shares a family id (`sid`). Logout
+ * revokes the family; refreshing rotates the refresh token and revokes
+ * the old one. Revocations live in the `revoked_tokens` table (017) and
+ * in an in-memory denylist that each server reloads periodically.
+ */
+
+const CONFIG = {
+    SECRET: process.env.JWT_SECRET || '',
+    ALGORITHM: 'HS256',
+    ISSUER: 'securevoice',
+    ACCESS_TTL_SECONDS: parseInt(process.env.JWT_ACCESS_TTL_SECONDS) || 15 * 60,
+    REFRESH_TTL_SECONDS: parseInt(process.env.JWT_REFRESH_TTL_SECONDS) || 7 * 24 * 60 * 60,
+    // How long a revocation made on another server can take to arrive here
+    DENYLIST_SYNC_MS: parseInt(process.env.JWT_DENYLIST_SYNC_MS) || 30 * 1000,
+    PURGE_INTERVAL_MS: 60 * 60 * 1000
+};
+
+// Session fields each role's claims map to (same names the login handlers set)
+const ROLES = {
+    user: {
+        toSession: (c) => ({ userId: c.id, username: c.username, email: c.email }),
+        fromSession: (s) => s.userId && { id: s.userId, username: s.username, email: s.email },
+        load: `SELECT userid AS id, username, email FROM users WHERE userid = ?`
+    },
+    admin: {
+        toSession: (c) => ({
+            adminId: c.id, adminUsername: c.username, adminEmail: c.email,
+            district: c.district, isAdmin: true
+        }),
+        fromSession: (s) => s.adminId && {
+            id: s.adminId, username: s.adminUsername, email: s.adminEmail, district: s.district
+        },
+        load: `SELECT a.adminid AS id, a.username, a.email, a.district_name AS district
+               FROM admins a
+               JOIN admin_approval_workflow w ON w.admin_username = a.username
+               WHERE a.adminid = ? AND a.is_active = 1 AND w.status = 'approved'`
+    },
+    super_admin: {
+        toSession: (c) => ({ superAdminId: c.id, superAdminUsername: c.username, isSuperAdmin: true }),
+        fromSession: (s) => s.superAdminId && { id: s.superAdminId, username: s.superAdminUsername },
+        load: `SELECT super_admin_id AS id, username FROM super_admins WHERE super_admin_id = ? AND is_active = 1`
+    }
+};
+
+// token_id -> expiry (ms); families and rotated refresh tokens
+let denylist = new Map();
+let syncTimer = null;
+let purgeTimer = null;
+
+class TokenError extends Error {
+    constructor(status, message) {
+        super(message);
+        this.status = status;
+    }
+}
+
+function isTokenAuthEnabled() {
+    return CONFIG.SECRET !== '';
+}
+
+function isRevoked(tokenId) {
+    const expiresAt = denylist.get(tokenId);
+    return expiresAt !== undefined && expiresAt > Date.now();
+}
+
+function sign(claims, typ, ttlSeconds) {
+    return jwt.sign({ ...claims, typ }, CONFIG.SECRET, {
+        algorithm: CONFIG.ALGORITHM,
+        issuer: CONFIG.ISSUER,
+        expiresIn: ttlSeconds,
+        jwtid: crypto.randomUUID()
+    });
+}
+
+function verify(token, typ) {
+    let claims;
+    try {
+        claims = jwt.verify(token, CONFIG.SECRET, { algorithms: [CONFIG.ALGORITHM], issuer: CONFIG.ISSUER });
+    } catch (err) {
+        return null;
+    }
+    if (claims.typ !== typ || !ROLES[claims.role]) return null;
+    return claims;
+}
+
+/**
+ * Issue an access/refresh token pair
+ * @param {string} role - user | admin | super_admin
+ * @param {object} profile - { id, username, email?, district? }
+ * @param {string} [sid] - Family id to continue (on refresh)
+ */
+function issueTokens(role, profile, sid = crypto.randomUUID()) {
+    const claims = { role, sid, ...profile };
+    return {
+        tokenType: 'Bearer',
+        accessToken: sign(claims, 'access', CONFIG.ACCESS_TTL_SECONDS),
+        expiresIn: CONFIG.ACCESS_TTL_SECONDS,
+        refreshToken: sign(claims, 'refresh', CONFIG.REFRESH_TTL_SECONDS),
+        refreshExpiresIn: CONFIG.REFRESH_TTL_SECONDS
+    };
+}
+
+/**
+ * Tokens for a login that just populated req.session, when the client
+ * asked for token mode; otherwise an empty object to spread into the response
+ */
+function sessionTokens(req, role) {
+    if (!isTokenAuthEnabled() || !req.session.isTokenSession) return {};
+    const profile = ROLES[role].fromSession(req.session);
+    return profile ? { tokens: issueTokens(role, profile) } : {};
+}
+
+/**
+ * Validate an access token using only the signature and the denylist
+ * @returns {object|null} - Claims, or null when invalid, expired or revoked
+ */
+function verifyAccessToken(token) {
+    const claims = verify(token, 'access');
+    if (!claims || isRevoked(claims.sid)) return null;
+    return claims;
+}
+
+function sessionFromClaims(claims) {
+    return ROLES[claims.role].toSession(claims);
+}
+
+async function insertRevocation(tokenId, kind, expiresAtSeconds) {
+    await pool.query(
+        'INSERT INTO revoked_tokens (token_id, kind, expires_at) VALUES (?, ?, FROM_UNIXTIME(?))',
+        [tokenId, kind, expiresAtSeconds]
+    );
+    denylist.set(tokenId, expiresAtSeconds * 1000);
+}
+
+/**
+ * Revoke every token issued from one login (logout)
+ */
+async function revokeFamily(sid) {
+    // No token of the family can outlive a refresh token issued right now
+    const expiresAt = Math.ceil(Date.now() / 1000) + CONFIG.REFRESH_TTL_SECONDS;
+    denylist.set(sid, expiresAt * 1000);
+    try {
+        await insertRevocation(sid, 'family', expiresAt);
+    } catch (err) {
+        if (err.code !== 'ER_DUP_ENTRY') throw err;
+    }
+}
+
+/**
+ * Exchange a refresh token for a new pair
+ * The account is re-read so suspended or deleted accounts stop refreshing,
+ * and profile changes (e.g. an admin's district) reach the new claims.
+ * A refresh token can be used once; presenting a used one again revokes
+ * its whole family, since one of the two holders is not the real client.
+ */
+async function refreshTokens(refreshToken) {
+    const claims = verify(refreshToken, 'refresh');
+    if (!claims || isRevoked(claims.sid) || isRevoked(claims.jti)) {
+        throw new TokenError(401, 'Invalid or expired refresh token');
+    }
+
+    const [rows] = await pool.query(ROLES[claims.role].load, [claims.id]);
+    if (rows.length === 0) {
+        await revokeFamily(claims.sid);
+        throw new TokenError(401, 'Account is no longer active');
+    }
+
+    try {
+        await insertRevocation(claims.jti, 'refresh', claims.exp);
+    } catch (err) {
+        if (err.code !== 'ER_DUP_ENTRY') throw err;
+        await revokeFamily(claims.sid);
+        throw new TokenError(401, 'Refresh token has already been used');
+    }
+
+    // The role's load query selects exactly the profile claims
+    return issueTokens(claims.role, { ...rows[0] }, claims.sid);
+}
+
+/**
+ * Reload the denylist from the database (picks up other servers' revocations)
+ */
+async function syncDenylist() {
+    try {
+        const [rows] = await pool.query(
+            'SELECT token_id, UNIX_TIMESTAMP(expires_at) AS expires_at FROM revoked_tokens WHERE expires_at > NOW()'
+        );
+        const next = new Map();
+        for (const row of rows) next.set(row.token_id, Number(row.expires_at) * 1000);
+        // Keep local revocations whose insert has not landed yet
+        const now = Date.now();
+        for (const [tokenId, expiresAt] of denylist) {
+            if (!next.has(tokenId) && expiresAt > now) next.set(tokenId, expiresAt);
+        }
+        denylist = next;
+    } catch (err) {
+        console.error('Token denylist sync error:', err);
+    }
+}
+
+async function purgeExpiredRevocations() {
+    try {
+        await pool.query('DELETE FROM revoked_tokens WHERE expires_at < NOW()');
+    } catch (err) {
+        console.error('Token denylist purge error:', err);
+    }
+}
+
+function startTokenJobs() {
+    if (!isTokenAuthEnabled() || syncTimer) return;
+    syncDenylist();
+    syncTimer = setInterval(syncDenylist, CONFIG.DENYLIST_SYNC_MS);
+    syncTimer.unref();
+    purgeTimer = setInterval(purgeExpiredRevocations, CONFIG.PURGE_INTERVAL_MS);
+    purgeTimer.unref();
+}
+
+function stopTokenJobs() {
+    clearInterval(syncTimer);
+    clearInterval(purgeTimer);
+    syncTimer = null;
+    purgeTimer = null;
+}
+
+module.exports = {
+    TokenError,
+    isTokenAuthEnabled,
+    issueTokens,
+    sessionTokens,
+    verifyAccessToken,
+    sessionFromClaims,
+    revokeFamily,
+    refreshTokens,
+    syncDenylist,
+    startTokenJobs,
+    stopTokenJobs
+};
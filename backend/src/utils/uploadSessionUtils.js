@@ -0,0 +1,530 @@
+const path = require('path');
+const fs = require('fs');
+const crypto = require('crypto');
+const { UPLOADS_ROOT, getContentPath } = require('./evidenceStoreUtils');
+const { queueFileDeletions, drainFileDeletions } = require('./storageGcUtils');
+
+/**
+ * Resumable chunked uploads
+ *
+ * A client creates an upload session, PUTs fixed-size chunks (in any order,
+ * in parallel) into a preallocated part file, then completes the session.
+ * Completion hashes the assembled file and moves it into the
+ * content-addressed store; the returned upload ID is then attached to a
+ * complaint or anonymous report in place of a multipart file.
+ *
+ * Each session's state is kept in a JSON file next to its part file,
+ * rewritten before a chunk or completion is acknowledged, so sessions are
+ * rebuilt on startup and a client can resume an upload across a restart.
+ */
+
+const CONFIG = {
+    CHUNK_SIZE: parseInt(process.env.UPLOAD_CHUNK_SIZE) || 5 * 1024 * 1024,
+    MAX_FILE_SIZE: parseInt(process.env.UPLOAD_MAX_FILE_SIZE) || 50 * 1024 * 1024,
+    // Sessions not touched for this long are abandoned and removed
+    SESSION_TTL_MS: parseInt(process.env.UPLOAD_SESSION_TTL_MS) || 24 * 60 * 60 * 1000,
+    CLEANUP_INTERVAL_MS: parseInt(process.env.UPLOAD_CLEANUP_MS) || 15 * 60 * 1000,
+    MAX_ACTIVE_SESSIONS: 1000,
+    MAX_SESSIONS_PER_CLIENT: 20
+};
+
+const PARTS_DIR = path.join(UPLOADS_ROOT, 'tmp', 'sessions');
+const PURPOSES = ['complaint', 'anonymous'];
+
+// Session fields kept in the JSON file; the rest are runtime state
+const SAVED_FIELDS = [
+    'uploadId', 'purpose', 'owner', 'clientKey', 'originalname', 'mimetype', 'size', 'chunkSize',
+    'totalChunks', 'expectedHash', 'file', 'createdAt', 'updatedAt'
+];
+
+// uploadId -> session
+const sessions = new Map();
+
+let cleanupTimer = null;
+
+class UploadSessionError extends Error {
+    constructor(status, message) {
+        super(message);
+        this.status = status;
+    }
+}
+
+function isAllowedMimeType(mimetype) {
+    return typeof mimetype === 'string' &&
+        (mimetype.startsWith('image/') ||
+         mimetype.startsWith('video/') ||
+         mimetype.startsWith('audio/'));
+}
+
+function isUploadId(value) {
+    return typeof value === 'string' && /^[a-f0-9]{64}$/.test(value);
+}
+
+function statePath(uploadId) {
+    return path.join(PARTS_DIR, `${uploadId}.json`);
+}
+
+/**
+ * Write a session's state file
+ * Writes for one session run in order, each saving the state at that time,
+ * and replace the file atomically.
+ */
+function saveSession(session) {
+    session.saving = session.saving.catch(() => {}).then(async () => {
+        const saved = { received: Array.from(session.received) };
+        for (const field of SAVED_FIELDS) saved[field] = session[field];
+        const tmpPath = `${statePath(session.uploadId)}.tmp`;
+        await fs.promises.writeFile(tmpPath, JSON.stringify(saved));
+        await fs.promises.rename(tmpPath, statePath(session.uploadId));
+    });
+    return session.saving;
+}
+
+/**
+ * Drop a session from memory and disk (its stored file is left alone)
+ */
+function forgetSession(session) {
+    sessions.delete(session.uploadId);
+    session.saving = session.saving.catch(() => {})
+        .then(() => fs.promises.unlink(statePath(session.uploadId)))
+        .catch(() => {});
+    return session.saving;
+}
+
+/**
+ * Create an upload session and preallocate its part file
+ * @param {Object} options
+ * @param {string} options.purpose - 'complaint' or 'anonymous'
+ * @param {string|null} options.owner - Username for complaint uploads, null for anonymous
+ * @param {string} options.clientKey - Key used to cap concurrent sessions per client
+ * @param {string} options.fileName - Original file name
+ * @param {number} options.fileSize - Total size in bytes
+ * @param {string} options.mimeType - File MIME type
+ * @param {string} [options.sha256] - Optional whole-file digest checked on completion
+ */
+async function createSession({ purpose, owner, clientKey, fileName, fileSize, mimeType, sha256 }) {
+    if (!PURPOSES.includes(purpose)) {
+        throw new UploadSessionError(400, 'Invalid upload purpose');
+    }
+    if (!fileName || typeof fileName !== 'string') {
+        throw new UploadSessionError(400, 'File name is required');
+    }
+    if (!isAllowedMimeType(mimeType)) {
+        throw new UploadSessionError(400, 'Invalid file type');
+    }
+    const size = parseInt(fileSize);
+    if (!Number.isInteger(size) || size <= 0) {
+        throw new UploadSessionError(400, 'Invalid file size');
+    }
+    if (size > CONFIG.MAX_FILE_SIZE) {
+        throw new UploadSessionError(413, 'File exceeds the maximum upload size');
+    }
+    if (sha256 && !/^[a-f0-9]{64}$/i.test(sha256)) {
+        throw new UploadSessionError(400, 'Invalid SHA-256 digest');
+    }
+
+    if (sessions.size >= CONFIG.MAX_ACTIVE_SESSIONS) {
+        throw new UploadSessionError(503, 'Too many uploads in progress, please try again later');
+    }
+    let clientSessions = 0;
+    for (const session of sessions.values()) {
+        if (session.clientKey === clientKey) clientSessions++;
+    }
+    if (clientSessions >= CONFIG.MAX_SESSIONS_PER_CLIENT) {
+        throw new UploadSessionError(429, 'Too many uploads in progress');
+    }
+
+    const uploadId = crypto.randomBytes(32).toString('hex');
+    const partPath = path.join(PARTS_DIR, `${uploadId}.part`);
+
+    await fs.promises.mkdir(PARTS_DIR, { recursive: true });
+    // Sparse preallocation lets chunks be written at their offsets in any order
+    const handle = await fs.promises.open(partPath, 'w');
+    try {
+        await handle.truncate(size);
+    } finally {
+        await handle.close();
+    }
+
+    const now = Date.now();
+    const session = {
+        uploadId,
+        purpose,
+        owner: owner || null,
+        clientKey,
+        originalname: path.basename(fileName).slice(0, 255),
+        mimetype: mimeType,
+        size,
+        chunkSize: CONFIG.CHUNK_SIZE,
+        totalChunks: Math.ceil(size / CONFIG.CHUNK_SIZE),
+        expectedHash: sha256 ? sha256.toLowerCase() : null,
+        received: new Set(),
+        partPath,
+        file: null,
+        completing: null,
+        saving: Promise.resolve(),
+        createdAt: now,
+        updatedAt: now
+    };
+    await saveSession(session);
+    sessions.set(uploadId, session);
+    return session;
+}
+
+/**
+ * Look up a session for a caller
+ * Complaint uploads are only visible to the user who created them.
+ */
+function getSession(uploadId, { purpose, owner } = {}) {
+    const session = isUploadId(uploadId) ? sessions.get(uploadId) : null;
+    if (!session) {
+        throw new UploadSessionError(404, 'Upload session not found');
+    }
+    if (purpose && session.purpose !== purpose) {
+        throw new UploadSessionError(404, 'Upload session not found');
+    }
+    if (session.purpose === 'complaint' && session.owner !== (owner || null)) {
+        throw new UploadSessionError(404, 'Upload session not found');
+    }
+    return session;
+}
+
+/**
+ * Summarize a session for API responses
+ */
+function describeSession(session) {
+    return {
+        uploadId: session.uploadId,
+        fileName: session.originalname,
+        size: session.size,
+        chunkSize: session.chunkSize,
+        totalChunks: session.totalChunks,
+        receivedChunks: Array.from(session.received).sort((a, b) => a - b),
+        completed: !!session.file,
+        expiresAt: new Date(session.updatedAt + CONFIG.SESSION_TTL_MS).toISOString()
+    };
+}
+
+/**
+ * Stream one chunk into the part file at its offset
+ * The chunk is recorded only if its length (and checksum, when given) match;
+ * a rejected chunk can simply be sent again.
+ * @param {Object} session - Upload session
+ * @param {number} index - Zero-based chunk index
+ * @param {stream.Readable} input - Request body
+ * @param {string} [checksum] - Hex SHA-256 of the chunk
+ * @returns {Promise<{offset: number, length: number}>}
+ */
+function writeChunk(session, index, input, checksum) {
+    if (session.file || session.completing) {
+        return Promise.reject(new UploadSessionError(409, 'Upload is already completed'));
+    }
+    if (!Number.isInteger(index) || index < 0 || index >= session.totalChunks) {
+        return Promise.reject(new UploadSessionError(400, 'Invalid chunk index'));
+    }
+    if (checksum && !/^[a-f0-9]{64}$/i.test(checksum)) {
+        return Promise.reject(new UploadSessionError(400, 'Invalid chunk checksum'));
+    }
+
+    const offset = index * session.chunkSize;
+    const expectedLength = Math.min(session.chunkSize, session.size - offset);
+
+    return new Promise((resolve, reject) => {
+        const hash = crypto.createHash('sha256');
+        const out = fs.createWriteStream(session.partPath, { flags: 'r+', start: offset });
+        let length = 0;
+        let failed = false;
+
+        // A rejected write may have overwritten bytes of this chunk, so it
+        // is marked missing until it arrives intact
+        const fail = (err) => {
+            if (failed) return;
+            failed = true;
+            session.received.delete(index);
+            input.unpipe(out);
+            out.destroy();
+            reject(err);
+        };
+
+        input.on('data', (chunk) => {
+            length += chunk.length;
+            if (length > expectedLength) {
+                // Drain the rest so the client receives the error response
+                input.resume();
+                return fail(new UploadSessionError(413, 'Chunk is larger than expected'));
+            }
+            hash.update(chunk);
+        });
+        input.on('aborted', () => fail(new UploadSessionError(400, 'Chunk upload aborted')));
+        input.on('error', fail);
+        out.on('error', fail);
+        out.on('finish', () => {
+            if (failed) return;
+            if (length !== expectedLength) {
+                return fail(new UploadSessionError(400, `Chunk must be ${expectedLength} bytes`));
+            }
+            if (checksum && hash.digest('hex') !== checksum.toLowerCase()) {
+                return fail(new UploadSessionError(422, 'Chunk checksum mismatch'));
+            }
+            if (!sessions.has(session.uploadId)) {
+                return reject(new UploadSessionError(404, 'Upload session not found'));
+            }
+            session.received.add(index);
+            session.updatedAt = Date.now();
+            saveSession(session).then(() => resolve({ offset, length }), reject);
+        });
+
+        input.pipe(out);
+    });
+}
+
+/**
+ * Hash a file by streaming it
+ */
+function hashFile(filePath) {
+    return new Promise((resolve, reject) => {
+        const hash = crypto.createHash('sha256');
+        fs.createReadStream(filePath)
+            .on('data', (chunk) => hash.update(chunk))
+            .on('error', reject)
+            .on('end', () => resolve(hash.digest('hex')));
+    });
+}
+
+/**
+ * Verify all chunks arrived, hash the file and move it into the content store
+ * Concurrent calls for the same session share one completion.
+ * @returns {Promise<Object>} - Multer-compatible file object
+ */
+function completeSession(session) {
+    if (session.file) return Promise.resolve(session.file);
+    if (session.completing) return session.completing;
+
+    if (session.received.size !== session.totalChunks) {
+        return Promise.reject(new UploadSessionError(409,
+            `Upload incomplete: ${session.received.size} of ${session.totalChunks} chunks received`));
+    }
+
+    session.completing = (async () => {
+        const contentHash = await hashFile(session.partPath);
+        if (session.expectedHash && session.expectedHash !== contentHash) {
+            // Restart the upload from scratch; every chunk is suspect
+            session.received.clear();
+            await saveSession(session);
+            throw new UploadSessionError(422, 'File checksum mismatch');
+        }
+
+        const relativePath = getContentPath(contentHash, session.mimetype, path.extname(session.originalname));
+        const finalPath = path.join(UPLOADS_ROOT, relativePath);
+        const deduplicated = fs.existsSync(finalPath);
+
+        await fs.promises.mkdir(path.dirname(finalPath), { recursive: true });
+        // Same as uploadMiddleware: renaming over identical bytes is atomic
+        await fs.promises.rename(session.partPath, finalPath);
+
+        session.file = {
+            fieldname: 'evidence',
+            originalname: session.originalname,
+            mimetype: session.mimetype,
+            destination: path.dirname(finalPath),
+            filename: path.basename(finalPath),
+            path: finalPath,
+            relativePath,
+            contentHash,
+            deduplicated,
+            size: session.size,
+            uploadId: session.uploadId
+        };
+        session.updatedAt = Date.now();
+        await saveSession(session);
+        return session.file;
+    })();
+
+    session.completing
+        .catch(() => {})
+        .then(() => { session.completing = null; });
+
+    return session.completing;
+}
+
+/**
+ * Normalize the uploadIds form field (repeated field, JSON array or comma list)
+ */
+function parseUploadIds(value) {
+    if (!value) return [];
+    let ids = value;
+    if (typeof value === 'string') {
+        try {
+            ids = value.trim().startsWith('[') ? JSON.parse(value) : value.split(',');
+        } catch (err) {
+            throw new UploadSessionError(400, 'Invalid upload IDs');
+        }
+    }
+    ids = [].concat(ids).map(id => String(id).trim()).filter(Boolean);
+    if (!ids.every(isUploadId)) {
+        throw new UploadSessionError(400, 'Invalid upload IDs');
+    }
+    return [...new Set(ids)];
+}
+
+/**
+ * Resolve completed uploads to file objects for a submission
+ * Sessions stay in place until consumeUploads() so a failed submission can
+ * be retried with the same IDs.
+ * @param {Array<string>} uploadIds - IDs from parseUploadIds()
+ * @param {{purpose: string, owner: string|null}} scope - Submitting caller
+ * @returns {Array<Object>} - Multer-compatible file objects
+ */
+function resolveUploads(uploadIds, scope) {
+    return uploadIds.map((uploadId) => {
+        const session = getSession(uploadId, scope);
+        if (!session.file) {
+            throw new UploadSessionError(409, 'Upload has not been completed');
+        }
+        return session.file;
+    });
+}
+
+/**
+ * Drop sessions whose files are now referenced by evidence rows
+ */
+function consumeUploads(uploadIds) {
+    for (const uploadId of uploadIds) {
+        const session = sessions.get(uploadId);
+        if (session) forgetSession(session);
+    }
+}
+
+/**
+ * Remove a session and whatever it has stored
+ * Completed files go through the deletion queue's reference check, so content
+ * shared with existing evidence is kept.
+ */
+async function discardSession(session) {
+    await forgetSession(session);
+    if (session.file) {
+        await queueFileDeletions([{
+            file_path: session.file.relativePath,
+            content_hash: session.file.contentHash
+        }]);
+        drainFileDeletions();
+    } else {
+        await fs.promises.unlink(session.partPath).catch(() => {});
+    }
+}
+
+/**
+ * Rebuild sessions from their state files after a restart
+ * Sessions whose part file (or completed file) is gone are skipped and
+ * their state files left to cleanupAbandoned().
+ */
+async function restoreSessions() {
+    let entries;
+    try {
+        entries = await fs.promises.readdir(PARTS_DIR);
+    } catch (err) {
+        if (err.code !== 'ENOENT') console.error('Error scanning upload sessions:', err);
+        return;
+    }
+
+    let restored = 0;
+    for (const entry of entries) {
+        const uploadId = path.basename(entry, '.json');
+        if (!entry.endsWith('.json') || !isUploadId(uploadId) || sessions.has(uploadId)) continue;
+        try {
+            const saved = JSON.parse(await fs.promises.readFile(path.join(PARTS_DIR, entry), 'utf8'));
+            const partPath = path.join(PARTS_DIR, `${uploadId}.part`);
+            if (!fs.existsSync(saved.file ? saved.file.path : partPath)) continue;
+
+            sessions.set(uploadId, {
+                ...saved,
+                uploadId,
+                received: new Set(saved.received),
+                partPath,
+                completing: null,
+                saving: Promise.resolve()
+            });
+            restored++;
+        } catch (err) {
+            console.error(`Error restoring upload session ${uploadId}:`, err);
+        }
+    }
+
+    if (restored > 0) {
+        console.log(`Restored ${restored} upload sessions`);
+    }
+}
+
+/**
+ * Remove abandoned sessions, and part and state files with no session
+ */
+async function cleanupAbandoned() {
+    const cutoff = Date.now() - CONFIG.SESSION_TTL_MS;
+    let removed = 0;
+
+    for (const session of Array.from(sessions.values())) {
+        if (session.updatedAt < cutoff && !session.completing) {
+            try {
+                await discardSession(session);
+                removed++;
+            } catch (err) {
+                console.error(`Error removing upload session ${session.uploadId}:`, err);
+            }
+        }
+    }
+
+    try {
+        const entries = await fs.promises.readdir(PARTS_DIR);
+        for (const entry of entries) {
+            // <id>.part, <id>.json or <id>.json.tmp
+            const uploadId = entry.split('.')[0];
+            if (sessions.has(uploadId)) continue;
+            const filePath = path.join(PARTS_DIR, entry);
+            const stat = await fs.promises.stat(filePath).catch(() => null);
+            if (stat && stat.mtimeMs < cutoff) {
+                await fs.promises.unlink(filePath).catch(() => {});
+                if (entry.endsWith('.part')) removed++;
+            }
+        }
+    } catch (err) {
+        if (err.code !== 'ENOENT') console.error('Error scanning upload parts:', err);
+    }
+
+    if (removed > 0) {
+        console.log(`Removed ${removed} abandoned upload sessions`);
+    }
+}
+
+/**
+ * Restore saved sessions and start the abandoned-session cleanup timer
+ * (called once from server startup)
+ */
+function startUploadSessionJobs() {
+    if (cleanupTimer) return;
+    restoreSessions();
+    cleanupTimer = setInterval(cleanupAbandoned, CONFIG.CLEANUP_INTERVAL_MS);
+    cleanupTimer.unref();
+}
+
+function stopUploadSessionJobs() {
+    clearInterval(cleanupTimer);
+    cleanupTimer = null;
+}
+
+module.exports = {
+    CONFIG,
+    UploadSessionError,
+    createSession,
+    getSession,
+    describeSession,
+    writeChunk,
+    completeSession,
+    parseUploadIds,
+    resolveUploads,
+    consumeUploads,
+    discardSession,
+    cleanupAbandoned,
+    restoreSessions,
+    startUploadSessionJobs,
+    stopUploadSessionJobs
+};
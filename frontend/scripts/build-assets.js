@@ -0,0 +1,503 @@
+#!/usr/bin/env node
+/**
+ * Static asset build
+ *
+ * Reads every HTML page, bundles each run of adjacent local stylesheets and
+ * classic scripts into one fingerprinted file per page, minifies it, and
+ * writes brotli/gzip variants next to it. Raster images get fingerprinted
+ * copies plus responsive WebP/AVIF sizes. Rewritten pages, the assets and
+ * manifest.json go to dist/, which the backend serves with immutable caching
+ * (see backend/src/middleware/staticMiddleware.js).
+ *
+ * terser (JS minification) and sharp (image variants) are optional: without
+ * them scripts are bundled unminified and images are only fingerprinted.
+ *
+ * Usage: npm run build:assets
+ */
+
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+const zlib = require('zlib');
+
+const ROOT = path.join(__dirname, '..');
+const DIST = path.join(ROOT, 'dist');
+const ASSETS_DIR = path.join(DIST, 'assets');
+const ASSET_URL_PREFIX = '/assets/';
+
+// Same URL prefixes staticMiddleware mounts onto the frontend tree
+const URL_ALIASES = [
+    ['/src/', 'src/'],
+    ['/css/', 'src/css/'],
+    ['/js/', 'src/js/'],
+    ['/images/', 'images/'],
+    ['/public/', 'public/']
+];
+
+const COMPRESSIBLE = ['.css', '.js', '.svg', '.ico', '.json'];
+const RASTER_IMAGES = ['.jpg', '.jpeg', '.png'];
+const IMAGE_DIRS = ['images', 'public/images'];
+const IMAGE_WIDTHS = [480, 960, 1600];
+
+function optionalRequire(name) {
+    try {
+        return require(name);
+    } catch (err) {
+        return null;
+    }
+}
+
+const terser = optionalRequire('terser');
+const sharp = optionalRequire('sharp');
+
+// Relative source path -> public URL, filled as assets are emitted
+const assets = {};
+// Emitted file name -> encodings with a precompressed variant
+const compressed = {};
+// Relative image path -> responsive sources
+const images = {};
+const bundles = {};
+const pages = {};
+const warnings = [];
+
+// ======================
+// HELPERS
+// ======================
+
+function contentHash(buffer) {
+    return crypto.createHash('sha256').update(buffer).digest('hex').slice(0, 10);
+}
+
+function toPosix(p) {
+    return p.split(path.sep).join('/');
+}
+
+/**
+ * Resolve an href/src/url() reference to a path relative to the frontend root
+ * @returns {string|null} - Relative path of an existing local file, or null
+ */
+function resolveReference(ref, fromFile) {
+    if (!ref || /^(?:[a-z]+:|\/\/|#)/i.test(ref)) return null;
+
+    let target = decodeURI(ref.split(/[?#]/)[0]);
+    if (target.startsWith('/')) {
+        const alias = URL_ALIASES.find(([prefix]) => target.startsWith(prefix));
+        target = alias ? alias[1] + target.slice(alias[0].length) : target.slice(1);
+    } else {
+        target = path.posix.join(path.posix.dirname(fromFile), target);
+    }
+    target = path.posix.normalize(target);
+
+    if (target.startsWith('..') || !fs.existsSync(path.join(ROOT, target)) ||
+        !fs.statSync(path.join(ROOT, target)).isFile()) {
+        warnings.push(`${fromFile}: unresolved reference ${ref}`);
+        return null;
+    }
+    return target;
+}
+
+/**
+ * Write a fingerprinted asset and its brotli/gzip variants
+ * @returns {string} - Public URL of the asset
+ */
+function emitAsset(baseName, ext, content) {
+    const buffer = Buffer.isBuffer(content) ? content : Buffer.from(content);
+    const fileName = `${baseName}.${contentHash(buffer)}${ext}`;
+    const filePath = path.join(ASSETS_DIR, fileName);
+
+    if (!fs.existsSync(filePath)) {
+        fs.writeFileSync(filePath, buffer);
+
+        if (COMPRESSIBLE.includes(ext)) {
+            const variants = [
+                ['br', '.br', zlib.brotliCompressSync(buffer, {
+                    params: {
+                        [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+                        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: buffer.length
+                    }
+                })],
+                ['gzip', '.gz', zlib.gzipSync(buffer, { level: 9 })]
+            ];
+            for (const [encoding, suffix, data] of variants) {
+                // Not worth a variant unless it saves at least 10%
+                if (data.length < buffer.length * 0.9) {
+                    fs.writeFileSync(filePath + suffix, data);
+                    (compressed[fileName] = compressed[fileName] || []).push(encoding);
+                }
+            }
+        }
+    }
+
+    return ASSET_URL_PREFIX + fileName;
+}
+
+// ======================
+// CSS
+// ======================
+
+const IMPORT_RE = /^@import\s+(?:url\(\s*(?:"[^"]*"|'[^']*'|[^)]*)\s*\)|"[^"]*"|'[^']*')[^;]*;/;
+
+/**
+ * Collapse whitespace and drop comments outside of strings
+ */
+function minifyCss(css) {
+    const SEPARATORS = '{};,>';
+    let out = '';
+
+    for (let i = 0; i < css.length; i++) {
+        const ch = css[i];
+
+        if (ch === '"' || ch === "'") {
+            let end = i + 1;
+            while (end < css.length && css[end] !== ch) {
+                if (css[end] === '\\') end++;
+                end++;
+            }
+            out += css.slice(i, end + 1);
+            i = end;
+        } else if (ch === '/' && css[i + 1] === '*') {
+            const end = css.indexOf('*/', i + 2);
+            i = end === -1 ? css.length : end + 1;
+        } else if (/\s/.test(ch)) {
+            while (i + 1 < css.length && /\s/.test(css[i + 1])) i++;
+            const prev = out[out.length - 1];
+            const next = css[i + 1];
+            // Space after ':' never matters; before it, it can be a descendant combinator
+            if (prev && prev !== ' ' && prev !== ':' && !SEPARATORS.includes(prev) && next && !SEPARATORS.includes(next)) {
+                out += ' ';
+            }
+        } else {
+            if (SEPARATORS.includes(ch) && out.endsWith(' ')) out = out.slice(0, -1);
+            if (ch === '}' && out.endsWith(';')) out = out.slice(0, -1);
+            out += ch;
+        }
+    }
+
+    return out.trim();
+}
+
+/**
+ * Rewrite url() references to fingerprinted assets and split off the
+ * @import rules that lead the file. Browsers ignore @import after other
+ * rules, so later ones are dropped rather than hoisted.
+ * @returns {{imports: Array<string>, body: string}}
+ */
+function processCss(relPath) {
+    let css = fs.readFileSync(path.join(ROOT, relPath), 'utf8');
+
+    css = css.replace(/url\(\s*(?:"([^"]*)"|'([^']*)'|([^)\s]*))\s*\)/g, (match, dq, sq, bare) => {
+        const ref = dq || sq || bare;
+        const target = resolveReference(ref, relPath);
+        return target ? `url("${copyAsset(target)}")` : match;
+    });
+
+    const imports = [];
+    let body = css.replace(/^﻿?(?:\s|\/\*[\s\S]*?\*\/|@charset\s+"[^"]*";)*/, '');
+    let match;
+    while ((match = body.match(IMPORT_RE))) {
+        imports.push(match[0]);
+        body = body.slice(match[0].length).replace(/^(?:\s|\/\*[\s\S]*?\*\/)*/, '');
+    }
+    body = body.replace(new RegExp(IMPORT_RE.source.slice(1), 'g'), '');
+
+    return { imports, body };
+}
+
+function buildCss(relPaths) {
+    const imports = [];
+    const bodies = [];
+    for (const relPath of relPaths) {
+        const css = processCss(relPath);
+        css.imports.forEach(rule => { if (!imports.includes(rule)) imports.push(rule); });
+        bodies.push(css.body);
+    }
+    return minifyCss(imports.join('\n') + '\n' + bodies.join('\n'));
+}
+
+// ======================
+// JS
+// ======================
+
+async function buildJs(relPaths) {
+    // Classic scripts share one global scope, so concatenation keeps semantics
+    const code = relPaths
+        .map(relPath => fs.readFileSync(path.join(ROOT, relPath), 'utf8'))
+        .join('\n;\n');
+
+    if (!terser) return code;
+
+    const result = await terser.minify(code, {
+        compress: true,
+        mangle: true,
+        // Top-level names are globals other scripts and inline handlers use
+        toplevel: false
+    });
+    return result.code;
+}
+
+function hasUseStrict(relPath) {
+    return /^(?:\s|\/\/[^\n]*\n|\/\*[\s\S]*?\*\/)*['"]use strict['"]/.test(
+        fs.readFileSync(path.join(ROOT, relPath), 'utf8')
+    );
+}
+
+// ======================
+// ASSETS & IMAGES
+// ======================
+
+const copied = new Map();
+
+/**
+ * Emit a single referenced file (memoized so pages share one URL)
+ */
+function copyAsset(relPath) {
+    if (copied.has(relPath)) return copied.get(relPath);
+
+    const ext = path.extname(relPath).toLowerCase();
+    const baseName = path.basename(relPath, path.extname(relPath));
+    let url;
+
+    if (ext === '.css') {
+        // Reserve the entry first: stylesheets may reference each other
+        copied.set(relPath, '/' + relPath);
+        url = emitAsset(baseName, ext, buildCss([relPath]));
+    } else {
+        url = emitAsset(baseName, ext, fs.readFileSync(path.join(ROOT, relPath)));
+    }
+
+    copied.set(relPath, url);
+    assets[relPath] = url;
+    return url;
+}
+
+async function copyScript(relPath) {
+    if (copied.has(relPath)) return copied.get(relPath);
+    const url = emitAsset(path.basename(relPath, '.js'), '.js', await buildJs([relPath]));
+    copied.set(relPath, url);
+    assets[relPath] = url;
+    return url;
+}
+
+/**
+ * Fingerprint a raster image and generate responsive WebP/AVIF sizes
+ */
+async function processImage(relPath) {
+    if (images[relPath]) return images[relPath];
+
+    const source = fs.readFileSync(path.join(ROOT, relPath));
+    const baseName = path.basename(relPath, path.extname(relPath));
+    const entry = { url: copyAsset(relPath), sources: {} };
+
+    if (sharp) {
+        const { width, height } = await sharp(source).metadata();
+        entry.width = width;
+        entry.height = height;
+
+        const widths = IMAGE_WIDTHS.filter(w => w < width).concat(width);
+        for (const [format, options] of [['avif', { quality: 50 }], ['webp', { quality: 78 }]]) {
+            const candidates = [];
+            for (const w of widths) {
+                const data = await sharp(source).resize({ width: w }).toFormat(format, options).toBuffer();
+                candidates.push(`${emitAsset(`${baseName}-${w}w`, '.' + format, data)} ${w}w`);
+            }
+            entry.sources[format] = candidates.join(', ');
+        }
+    }
+
+    images[relPath] = entry;
+    return entry;
+}
+
+function listImages() {
+    const found = [];
+    const walk = (dir) => {
+        const absDir = path.join(ROOT, dir);
+        if (!fs.existsSync(absDir)) return;
+        for (const entry of fs.readdirSync(absDir, { withFileTypes: true })) {
+            const relPath = path.posix.join(dir, entry.name);
+            if (entry.isDirectory()) walk(relPath);
+            else if (RASTER_IMAGES.includes(path.extname(entry.name).toLowerCase())) found.push(relPath);
+        }
+    };
+    IMAGE_DIRS.forEach(walk);
+    return found;
+}
+
+// ======================
+// HTML
+// ======================
+
+function parseAttributes(tag) {
+    const attrs = {};
+    const head = tag.replace(/^<\w+/, '').replace(/\/?>[\s\S]*$/, '');
+    const re = /([^\s=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?/g;
+    let match;
+    while ((match = re.exec(head))) {
+        attrs[match[1].toLowerCase()] = match[2] ?? match[3] ?? match[4] ?? '';
+    }
+    return attrs;
+}
+
+function setAttribute(tag, name, value) {
+    const re = new RegExp(`(\\s${name}\\s*=\\s*)(?:"[^"]*"|'[^']*'|[^\\s>]+)`, 'i');
+    return tag.replace(re, `$1"${value}"`);
+}
+
+function pictureTag(imgTag, image) {
+    const img = setAttribute(imgTag, 'src', image.url);
+    if (!image.sources.avif) return img;
+    const sizes = parseAttributes(imgTag).sizes;
+    const sizesAttr = sizes ? ` sizes="${sizes}"` : '';
+    return '<picture>' +
+        `<source type="image/avif" srcset="${image.sources.avif}"${sizesAttr}>` +
+        `<source type="image/webp" srcset="${image.sources.webp}"${sizesAttr}>` +
+        img +
+        '</picture>';
+}
+
+/**
+ * Classify a tag for bundling
+ * @returns {{kind: string, key: string, file: string}|null}
+ */
+function classifyTag(tag, attrs, relPage) {
+    if (/^<link/i.test(tag) && /\bstylesheet\b/i.test(attrs.rel || '')) {
+        const file = resolveReference(attrs.href, relPage);
+        return file ? { kind: 'css', key: `css:${attrs.media || ''}`, file } : null;
+    }
+    if (/^<script\b[^>]*>\s*<\/script>$/i.test(tag) && attrs.src !== undefined &&
+        attrs.type !== 'module' && attrs.async === undefined) {
+        const file = resolveReference(attrs.src, relPage);
+        if (!file) return null;
+        // A leading directive would apply to (or be lost in) the whole bundle
+        if (hasUseStrict(file)) return { kind: 'js', key: `js-alone:${file}`, file };
+        return { kind: 'js', key: `js:${attrs.defer !== undefined ? 'defer' : ''}`, file };
+    }
+    return null;
+}
+
+async function buildPage(relPage) {
+    const html = fs.readFileSync(path.join(ROOT, relPage), 'utf8');
+    const slug = path.basename(relPage, '.html');
+
+    const comments = [];
+    html.replace(/<!--[\s\S]*?-->/g, (match, offset) => { comments.push([offset, offset + match.length]); });
+    const inComment = (offset) => comments.some(([start, end]) => offset >= start && offset < end);
+
+    const tagRe = /<script\b[^>]*>[\s\S]*?<\/script>|<link\b[^>]*>|<img\b[^>]*>/gi;
+    const replacements = [];
+    const runs = [];
+    let run = null;
+    let lastEnd = 0;
+    let match;
+
+    while ((match = tagRe.exec(html))) {
+        const tag = match[0];
+        const start = match.index;
+        const end = start + tag.length;
+        if (inComment(start)) continue;
+
+        const attrs = parseAttributes(tag);
+        const info = classifyTag(tag, attrs, relPage);
+        const gap = html.slice(lastEnd, start);
+        lastEnd = end;
+
+        if (info) {
+            const adjacent = run && run.key === info.key && /^(?:\s|<!--[\s\S]*?-->)*$/.test(gap);
+            if (adjacent) {
+                run.files.push(info.file);
+                run.end = end;
+            } else {
+                run = { ...info, files: [info.file], start, end, attrs };
+                runs.push(run);
+            }
+            continue;
+        }
+        run = null;
+
+        if (/^<img/i.test(tag)) {
+            const file = resolveReference(attrs.src, relPage);
+            if (file && RASTER_IMAGES.includes(path.extname(file).toLowerCase())) {
+                replacements.push([start, end, pictureTag(tag, await processImage(file))]);
+            } else if (file) {
+                replacements.push([start, end, setAttribute(tag, 'src', copyAsset(file))]);
+            }
+        } else if (/^<link/i.test(tag) && attrs.href) {
+            const file = resolveReference(attrs.href, relPage);
+            if (file) replacements.push([start, end, setAttribute(tag, 'href', copyAsset(file))]);
+        }
+    }
+
+    const pageBundles = { css: [], js: [] };
+    let bundleIndex = 0;
+    for (const r of runs) {
+        let url;
+        if (r.files.length === 1) {
+            url = r.kind === 'css' ? copyAsset(r.files[0]) : await copyScript(r.files[0]);
+        } else {
+            bundleIndex++;
+            const content = r.kind === 'css' ? buildCss(r.files) : await buildJs(r.files);
+            url = emitAsset(`${slug}.${bundleIndex}`, '.' + r.kind, content);
+            bundles[url] = r.files;
+        }
+        pageBundles[r.kind].push(url);
+
+        const tag = r.kind === 'css'
+            ? `<link rel="stylesheet" href="${url}"${r.attrs.media ? ` media="${r.attrs.media}"` : ''}>`
+            : `<script src="${url}"${r.attrs.defer !== undefined ? ' defer' : ''}></script>`;
+        replacements.push([r.start, r.end, tag]);
+    }
+
+    let output = html;
+    replacements
+        .sort((a, b) => b[0] - a[0])
+        .forEach(([start, end, text]) => {
+            output = output.slice(0, start) + text + output.slice(end);
+        });
+
+    const outPath = path.join(DIST, 'pages', relPage);
+    fs.mkdirSync(path.dirname(outPath), { recursive: true });
+    fs.writeFileSync(outPath, output);
+    pages[relPage] = { file: toPosix(path.join('pages', relPage)), ...pageBundles };
+}
+
+// ======================
+// MAIN
+// ======================
+
+async function main() {
+    fs.rmSync(DIST, { recursive: true, force: true });
+    fs.mkdirSync(ASSETS_DIR, { recursive: true });
+
+    const pageFiles = ['index.html'].concat(
+        fs.readdirSync(path.join(ROOT, 'src/pages'))
+            .filter(name => name.endsWith('.html'))
+            .map(name => `src/pages/${name}`)
+    );
+
+    for (const relPage of pageFiles) {
+        await buildPage(relPage);
+    }
+    for (const relPath of listImages()) {
+        await processImage(relPath);
+    }
+
+    const manifest = {
+        generatedAt: new Date().toISOString(),
+        assets,
+        bundles,
+        images,
+        compressed,
+        pages
+    };
+    fs.writeFileSync(path.join(DIST, 'manifest.json'), JSON.stringify(manifest, null, 2));
+
+    if (!terser) console.log('terser not installed: scripts bundled without minification');
+    if (!sharp) console.log('sharp not installed: images fingerprinted without WebP/AVIF variants');
+    [...new Set(warnings)].forEach(warning => console.warn(`Warning: ${warning}`));
+    console.log(`Built ${pageFiles.length} pages, ${Object.keys(assets).length + Object.keys(bundles).length} assets -> ${toPosix(path.relative(process.cwd(), DIST)) || 'dist'}`);
+}
+
+main().catch((err) => {
+    console.error('Asset build failed:', err);
+    process.exit(1);
+});
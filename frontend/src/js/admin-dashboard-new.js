@@ -443,15 +443,13 @@ function renderEvidence(evidence) {
         const isVideo = ['mp4', 'webm', 'ogg'].includes(ext);
         const isAudio = ['mp3', 'wav', 'ogg'].includes(ext);
 
-        // The file_path already includes the folder (images/, videos/, audio/)
-        const filePath = `/uploads/${e.file_path}`;
-        
-        console.log('Evidence file path:', e.file_path);
-        console.log('Full path:', filePath);
+        // Evidence is streamed through the access-checked evidence endpoint
+        const filePath = e.url;
 
         let mediaHtml = '';
         if (isImage) {
-            mediaHtml = `<img src="${filePath}" alt="Evidence" style="max-width: 100%; border-radius: 8px;">`;
+            // Processed preview first; the original opens on click
+            mediaHtml = `<a href="${filePath}" target="_blank"><img src="${e.preview_url || filePath}" alt="Evidence" loading="lazy" style="max-width: 100%; border-radius: 8px;"></a>`;
         } else if (isVideo) {
             mediaHtml = `<video controls style="max-width: 100%;"><source src="${filePath}"></video>`;
         } else if (isAudio) {
@@ -544,7 +542,10 @@ async function sendChatMessage() {
     try {
         const response = await fetch('/admin-send-chat-message', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: {
+                'Content-Type': 'application/json',
+                'Idempotency-Key': IdempotencyKey.get('chat', `${currentComplaintId}|${message}`)
+            },
             credentials: 'include',
             body: JSON.stringify({
                 complaintId: currentComplaintId,
@@ -555,6 +556,7 @@ async function sendChatMessage() {
         const data = await response.json();
 
         if (data.success) {
+            IdempotencyKey.done('chat');
             input.value = '';
             await loadChatMessages(currentComplaintId);
         } else {
@@ -1071,7 +1073,7 @@ async function viewAnonEvidence(reportId) {
                                 <p class="file-name">${escapeHtml(e.original_name)}</p>
                                 <p class="file-meta">${formatFileSize(e.file_size)} • ${e.file_type}</p>
                             </div>
-                            <a href="/${e.file_path}" target="_blank" class="btn btn-sm btn-outline">
+                            <a href="${e.url}?download=1" target="_blank" class="btn btn-sm btn-outline">
                                 <i class="fas fa-download"></i> Download
                             </a>
                         </div>
@@ -1095,10 +1097,10 @@ async function viewAnonEvidence(reportId) {
 
 function getEvidencePreview(evidence) {
     const fileType = evidence.file_type || '';
-    const filePath = `/${evidence.file_path}`;
+    const filePath = evidence.url;
     
     if (fileType === 'image') {
-        return `<img src="${filePath}" alt="${escapeHtml(evidence.original_name)}" class="evidence-preview">`;
+        return `<img src="${evidence.thumbnail_url || filePath}" alt="${escapeHtml(evidence.original_name)}" class="evidence-preview" loading="lazy">`;
     } else if (fileType === 'video') {
         return `<video src="${filePath}" controls class="evidence-preview"></video>`;
     } else if (fileType === 'audio') {
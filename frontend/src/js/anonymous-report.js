@@ -715,16 +715,38 @@ document.addEventListener('DOMContentLoaded', function() {
                 formData.append('locationAccuracy', locationAccuracyInput.value);
             }
             
-            // Add files
-            selectedFiles.forEach(file => {
-                formData.append('evidence', file);
-            });
-            
             const apiUrl = getApiUrl();
+            
+            // Add files (large files go through resumable chunked upload)
+            const chunkedFiles = [];
+            for (const file of selectedFiles) {
+                if (typeof ChunkedUpload !== 'undefined' && ChunkedUpload.shouldUse(file)) {
+                    const uploadId = await ChunkedUpload.upload(file, {
+                        purpose: 'anonymous',
+                        baseUrl: apiUrl,
+                        onProgress: (fraction) => {
+                            submitBtn.innerHTML = `<span class="spinner"></span> Uploading ${file.name} (${Math.round(fraction * 100)}%)...`;
+                        }
+                    });
+                    formData.append('uploadIds', uploadId);
+                    chunkedFiles.push(file);
+                } else {
+                    formData.append('evidence', file);
+                }
+            }
+            submitBtn.innerHTML = '<span class="spinner"></span> Submitting...';
+            
             console.log('Submitting to:', `${apiUrl}/anonymous-report`);
             
+            // Retrying the same report reuses its key, so the server cannot file it twice
+            const idempotencyKey = IdempotencyKey.get('anonymous-report', JSON.stringify([
+                formData.get('crimeType'), formData.get('description'), formData.get('incidentDate'), formData.get('location'),
+                selectedFiles.map(file => `${file.name}:${file.size}`)
+            ]));
+
             const response = await fetch(`${apiUrl}/anonymous-report`, {
                 method: 'POST',
+                headers: { 'Idempotency-Key': idempotencyKey },
                 body: formData
             });
             
@@ -743,6 +765,9 @@ document.addEventListener('DOMContentLoaded', function() {
             const data = await response.json();
             
             if (data.success) {
+                IdempotencyKey.done('anonymous-report');
+                chunkedFiles.forEach(file => ChunkedUpload.forget(file, 'anonymous'));
+                
                 // Show success page
                 reportContainer.classList.add('hidden');
                 successContainer.classList.remove('hidden');
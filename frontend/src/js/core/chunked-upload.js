@@ -0,0 +1,143 @@
+// ============================================
+// RESUMABLE CHUNKED UPLOADS
+// ============================================
+// Large evidence files are sent in chunks through /upload-sessions so a
+// dropped connection only repeats the chunks in flight. Progress is kept in
+// localStorage, so re-submitting the same file resumes the upload.
+
+const ChunkedUpload = (() => {
+    // Files at or above this size use chunked upload instead of multipart
+    const THRESHOLD = 8 * 1024 * 1024;
+    const PARALLEL_CHUNKS = 3;
+    const MAX_RETRIES = 5;
+    const STORAGE_PREFIX = 'securevoice_upload_';
+
+    const shouldUse = (file) => !!file && file.size >= THRESHOLD;
+
+    const storageKey = (file, purpose) =>
+        `${STORAGE_PREFIX}${purpose}_${file.name}_${file.size}_${file.lastModified}`;
+
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+    const request = async (url, options = {}) => {
+        const response = await fetch(url, { credentials: 'include', ...options });
+        let data = {};
+        try {
+            data = await response.json();
+        } catch (e) { /* Non-JSON error page */ }
+        if (!response.ok || data.success === false) {
+            const error = new Error(data.message || `Upload failed: ${response.status}`);
+            error.status = response.status;
+            throw error;
+        }
+        return data;
+    };
+
+    const sha256Hex = async (buffer) => {
+        // crypto.subtle is only available on secure origins (https, localhost)
+        if (!window.crypto || !window.crypto.subtle) return null;
+        const digest = await window.crypto.subtle.digest('SHA-256', buffer);
+        return Array.from(new Uint8Array(digest))
+            .map(b => b.toString(16).padStart(2, '0'))
+            .join('');
+    };
+
+    // Reuse a stored session for this file if the server still has it
+    const resumeSession = async (baseUrl, key) => {
+        const uploadId = localStorage.getItem(key);
+        if (!uploadId) return null;
+        try {
+            return await request(`${baseUrl}/upload-sessions/${uploadId}`);
+        } catch (e) {
+            localStorage.removeItem(key);
+            return null;
+        }
+    };
+
+    const uploadChunk = async (baseUrl, session, file, index) => {
+        const start = index * session.chunkSize;
+        const blob = file.slice(start, Math.min(start + session.chunkSize, file.size));
+        const buffer = await blob.arrayBuffer();
+        const checksum = await sha256Hex(buffer);
+
+        const headers = { 'Content-Type': 'application/octet-stream' };
+        if (checksum) headers['X-Chunk-Sha256'] = checksum;
+
+        for (let attempt = 0; ; attempt++) {
+            try {
+                return await request(`${baseUrl}/upload-sessions/${session.uploadId}/chunks/${index}`, {
+                    method: 'PUT',
+                    headers,
+                    body: buffer
+                });
+            } catch (error) {
+                // 4xx other than a checksum mismatch will not succeed on retry
+                const retryable = !error.status || error.status >= 500 || error.status === 422;
+                if (!retryable || attempt >= MAX_RETRIES) throw error;
+                await sleep(Math.min(1000 * 2 ** attempt, 15000));
+            }
+        }
+    };
+
+    /**
+     * Upload a file and return its upload ID for the submission form
+     * @param {File} file - File to upload
+     * @param {Object} options
+     * @param {string} options.purpose - 'complaint' or 'anonymous'
+     * @param {string} [options.baseUrl] - Backend origin ('' when same-origin)
+     * @param {Function} [options.onProgress] - Called with a 0-1 fraction
+     */
+    const upload = async (file, { purpose, baseUrl = '', onProgress } = {}) => {
+        const key = storageKey(file, purpose);
+
+        let session = await resumeSession(baseUrl, key);
+        if (!session) {
+            session = await request(`${baseUrl}/upload-sessions`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    purpose,
+                    fileName: file.name,
+                    fileSize: file.size,
+                    mimeType: file.type
+                })
+            });
+            localStorage.setItem(key, session.uploadId);
+        }
+
+        if (!session.completed) {
+            const received = new Set(session.receivedChunks);
+            const pending = [];
+            for (let i = 0; i < session.totalChunks; i++) {
+                if (!received.has(i)) pending.push(i);
+            }
+
+            let done = received.size;
+            const report = () => onProgress && onProgress(done / session.totalChunks);
+            report();
+
+            const worker = async () => {
+                while (pending.length > 0) {
+                    const index = pending.shift();
+                    await uploadChunk(baseUrl, session, file, index);
+                    done++;
+                    report();
+                }
+            };
+            const workers = [];
+            for (let i = 0; i < Math.min(PARALLEL_CHUNKS, pending.length); i++) {
+                workers.push(worker());
+            }
+            await Promise.all(workers);
+
+            await request(`${baseUrl}/upload-sessions/${session.uploadId}/complete`, { method: 'POST' });
+        }
+
+        return session.uploadId;
+    };
+
+    // Forget a finished upload once the report referencing it is submitted
+    const forget = (file, purpose) => localStorage.removeItem(storageKey(file, purpose));
+
+    return { THRESHOLD, shouldUse, upload, forget };
+})();
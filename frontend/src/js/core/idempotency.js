@@ -0,0 +1,34 @@
+// ============================================
+// IDEMPOTENCY KEYS
+// ============================================
+// Submissions send an Idempotency-Key header. A retry of the same payload
+// (after a timeout or dropped connection) reuses the key, so the server
+// answers with the stored result instead of creating a duplicate. A new key
+// is issued once a payload succeeds or the payload changes.
+
+const IdempotencyKey = (() => {
+    // scope -> { fingerprint, key }
+    const pending = new Map();
+
+    const generate = () => {
+        if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+    };
+
+    /**
+     * Key for a submission; the same scope and fingerprint keep their key
+     * until done() is called
+     */
+    const get = (scope, fingerprint = '') => {
+        const entry = pending.get(scope);
+        if (entry && entry.fingerprint === fingerprint) return entry.key;
+        const key = generate();
+        pending.set(scope, { fingerprint, key });
+        return key;
+    };
+
+    // The submission succeeded: the next one gets a fresh key
+    const done = (scope) => pending.delete(scope);
+
+    return { get, done };
+})();
@@ -1157,18 +1157,10 @@ async function handleReportSubmit(e) {
         }
     }
 
-    // Add files
-    if (selectedFiles.image && selectedFiles.image.length > 0) {
-        selectedFiles.image.forEach(file => {
-            formData.append('evidence', file);
-        });
-    }
-    if (selectedFiles.video) {
-        formData.append('evidence', selectedFiles.video);
-    }
-    if (selectedFiles.audio) {
-        formData.append('evidence', selectedFiles.audio);
-    }
+    // Collect files
+    const evidenceFiles = [...(selectedFiles.image || [])];
+    if (selectedFiles.video) evidenceFiles.push(selectedFiles.video);
+    if (selectedFiles.audio) evidenceFiles.push(selectedFiles.audio);
 
     console.log('Submitting complaint with data:', {
         complaintType,
@@ -1178,9 +1170,36 @@ async function handleReportSubmit(e) {
         fileCount: (selectedFiles.image?.length || 0) + (selectedFiles.video ? 1 : 0) + (selectedFiles.audio ? 1 : 0)
     });
 
+    const chunkedFiles = [];
+    const loadingLabel = btnLoading?.querySelector('[data-i18n]');
+    const submittingText = loadingLabel?.textContent;
     try {
+        // Large files go through resumable chunked upload, the rest as multipart
+        for (const file of evidenceFiles) {
+            if (typeof ChunkedUpload !== 'undefined' && ChunkedUpload.shouldUse(file)) {
+                const uploadId = await ChunkedUpload.upload(file, {
+                    purpose: 'complaint',
+                    onProgress: (fraction) => {
+                        if (loadingLabel) loadingLabel.textContent = `Uploading ${file.name} (${Math.round(fraction * 100)}%)...`;
+                    }
+                });
+                formData.append('uploadIds', uploadId);
+                chunkedFiles.push(file);
+            } else {
+                formData.append('evidence', file);
+            }
+        }
+        if (loadingLabel) loadingLabel.textContent = submittingText;
+
+        // Retrying the same report reuses its key, so the server cannot file it twice
+        const idempotencyKey = IdempotencyKey.get('complaint', JSON.stringify([
+            complaintType, incidentDateTime, location, description,
+            evidenceFiles.map(file => `${file.name}:${file.size}`)
+        ]));
+
         const response = await fetch('/submit-complaint', {
             method: 'POST',
+            headers: { 'Idempotency-Key': idempotencyKey },
             body: formData,
             credentials: 'include'
         });
@@ -1198,6 +1217,9 @@ async function handleReportSubmit(e) {
         console.log('Response data:', data);
 
         if (data.success) {
+            IdempotencyKey.done('complaint');
+            chunkedFiles.forEach(file => ChunkedUpload.forget(file, 'complaint'));
+
             // Show success modal
             showReportSuccess(data.complaintId);
             
@@ -1543,7 +1565,10 @@ async function handleSendMessage(e) {
     try {
         const response = await fetch(`/send-chat-message`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: {
+                'Content-Type': 'application/json',
+                'Idempotency-Key': IdempotencyKey.get('chat', `${currentChatComplaintId}|${message}`)
+            },
             credentials: 'include',
             body: JSON.stringify({
                 complaintId: currentChatComplaintId,
@@ -1554,6 +1579,7 @@ async function handleSendMessage(e) {
         const data = await response.json();
         
         if (data.success) {
+            IdempotencyKey.done('chat');
             input.value = '';
             loadChatMessages(currentChatComplaintId);
         } else {
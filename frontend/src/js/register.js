@@ -4,6 +4,7 @@ const totalSteps = 7;
 let otpTimer = null;
 let cameraStream = null;
 let capturedImageData = null;
+let capturedImageBlob = null; // Promise of the capture as a JPEG Blob
 let registrationSessionId = null; // Track registration session
 
 // API Base URL - Uses centralized config from config.js
@@ -29,7 +30,6 @@ const userData = {
     nameBn: '',
     fatherName: '',
     motherName: '',
-    faceImage: '',
     division: '',
     district: '',
     policeStation: '',
@@ -651,6 +651,9 @@ function capturePhoto() {
     // Get image data
     capturedImageData = canvas.toDataURL('image/jpeg', 0.8);
     capturedImage.src = capturedImageData;
+    // Binary copy for the upload (the data URL is only used for previews);
+    // toBlob is asynchronous, so the upload awaits this promise
+    capturedImageBlob = new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
     
     // Update UI
     cameraContainer.style.display = 'none';
@@ -664,6 +667,7 @@ function capturePhoto() {
 
 function retakePhoto() {
     capturedImageData = null;
+    capturedImageBlob = null;
     startCamera();
 }
 
@@ -676,7 +680,6 @@ async function validateStep4() {
     }
     
     errorEl.textContent = '';
-    userData.faceImage = capturedImageData;
     
     // Save face image to backend
     await saveFaceToBackend();
@@ -686,14 +689,16 @@ async function validateStep4() {
 // Save face image to backend
 async function saveFaceToBackend() {
     try {
+        // toBlob yields null if encoding fails; fall back to the data URL
+        const blob = (await capturedImageBlob) || await (await fetch(capturedImageData)).blob();
+        const formData = new FormData();
+        formData.append('sessionId', registrationSessionId);
+        formData.append('faceImage', blob, 'face.jpg');
+
         const response = await fetch(`${API_BASE_URL}/auth/save-face`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
             credentials: 'include',
-            body: JSON.stringify({
-                faceImage: capturedImageData,
-                sessionId: registrationSessionId
-            })
+            body: formData
         });
         
         const result = await response.json();
@@ -1051,7 +1056,6 @@ async function submitRegistration() {
                 nameBn: userData.nameBn,
                 fatherName: userData.fatherName,
                 motherName: userData.motherName,
-                faceImage: userData.faceImage,
                 division: userData.division,
                 district: userData.district,
                 policeStation: userData.policeStation,
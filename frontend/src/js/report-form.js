@@ -155,7 +155,7 @@ export function initComplaintForm() {
 
         // Form submission
         if (form) {
-            form.addEventListener("submit", function (e) {
+            form.addEventListener("submit", async function (e) {
                 e.preventDefault();
 
                 // Create FormData object
@@ -167,10 +167,23 @@ export function initComplaintForm() {
                 formData.append('incidentDate', document.getElementById('incidentDate').value);
                 formData.append('location', document.getElementById('location').value);
 
-                // Add files
-                if (selectedFiles.image) formData.append('evidence', selectedFiles.image);
-                if (selectedFiles.video) formData.append('evidence', selectedFiles.video);
-                if (selectedFiles.audio) formData.append('evidence', selectedFiles.audio);
+                // Add files (large files go through resumable chunked upload)
+                const chunkedFiles = [];
+                try {
+                    for (const file of [selectedFiles.image, selectedFiles.video, selectedFiles.audio]) {
+                        if (!file) continue;
+                        if (typeof ChunkedUpload !== 'undefined' && ChunkedUpload.shouldUse(file)) {
+                            formData.append('uploadIds', await ChunkedUpload.upload(file, { purpose: 'complaint' }));
+                            chunkedFiles.push(file);
+                        } else {
+                            formData.append('evidence', file);
+                        }
+                    }
+                } catch (error) {
+                    console.error('Upload error:', error);
+                    alert(error.message || 'Error uploading evidence');
+                    return;
+                }
 
                 // Submit form using API module
                 apiCall('/reports/submit', {
@@ -179,6 +192,8 @@ export function initComplaintForm() {
                 })
                 .then(data => {
                     if (data.success) {
+                        chunkedFiles.forEach(file => ChunkedUpload.forget(file, 'complaint'));
+
                         // Notify admin about new complaint
                         if (data.complaint && data.complaint.id) {
                             apiCall('/admin/notify', {